@@ -86,6 +86,10 @@ def classFactory(iface):
     try:
         from pyprecag import config
         config.set_debug_mode(read_setting(PLUGIN_NAME + "/DEBUG",bool))
+
+        from .util.raster_windows import set_geotiff_options
+        set_geotiff_options(compress=read_setting(PLUGIN_NAME + "/GEOTIFF_COMPRESSION"),
+                            overviews=read_setting(PLUGIN_NAME + "/GEOTIFF_OVERVIEWS", bool))
     except ImportError:
         # pyprecag is not yet installed
         pass
@@ -99,7 +103,8 @@ def classFactory(iface):
     LOGGER.addHandler(logging.NullHandler())   # logging.StreamHandler()
 
     from .util.check_dependencies import (check_pat_symbols, check_R_dependency,check_gdal_dependency,
-                                          check_python_dependencies)
+                                          check_python_dependencies, check_pip_for_update,
+                                          dependency_check_required, save_dependency_check)
 
     meta_version = pluginMetadata('pat','version')
     plugin_state = '\nPAT Plugin:\n'
@@ -124,12 +129,20 @@ def classFactory(iface):
     #     sys.exit(message)
 
     gdal_ver = check_gdal_dependency()
-    
-    check_py = check_python_dependencies(PLUGIN_DIR, iface)
-    if len(check_py) > 0:
-        sys.exit(check_py)
-    
-    check_pat_symbols()
+
+    # only run the full checks when the environment has changed since the last successful check.
+    if dependency_check_required(PLUGIN_DIR):
+        check_py = check_python_dependencies(PLUGIN_DIR, iface)
+        if len(check_py) > 0:
+            sys.exit(check_py)
+
+        check_pat_symbols()
+        save_dependency_check(PLUGIN_DIR)
+    else:
+        LOGGER.debug('Environment unchanged since last start. Skipping dependency checks')
+
+    # runs in the background so it doesn't delay QGIS starting.
+    check_pip_for_update('pyprecag')
     # check_R_dependency()
 
         #iface.messageBar().pushMessage("ERROR Failed Dependency Check", result, level= Qgis.Critical, duration=0)
@@ -32,11 +32,11 @@ import logging
 import os
 
 from qgis.PyQt import QtGui
-from qgis.PyQt import uic
 from qgis.PyQt.QtGui import QPixmap
+from util.ui_forms import load_ui_form
 
 pluginPath = os.path.split(os.path.dirname(__file__))[0]
-WIDGET, BASE = uic.loadUiType(os.path.join(pluginPath, 'gui', 'about_dialog_base.ui'))
+WIDGET, BASE = load_ui_form(os.path.join(pluginPath, 'gui', 'about_dialog_base.ui'))
 
 LOGGER = logging.getLogger(__name__)
 LOGGER.addHandler(logging.NullHandler())  # logging.StreamHandler()
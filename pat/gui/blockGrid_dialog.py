@@ -32,7 +32,7 @@ from pat import LOGGER_NAME, PLUGIN_NAME, TEMPDIR, PLUGIN_SHORT
 
 from qgis.core import Qgis, QgsApplication
 
-from qgis.PyQt import QtGui, uic, QtCore, QtWidgets
+from qgis.PyQt import QtGui, QtCore, QtWidgets
 from qgis.PyQt.QtGui import QColor
 from qgis.PyQt.QtWidgets import QPushButton, QDialog, QApplication
 from qgis.core import QgsMapLayer, QgsVectorFileWriter, QgsMessageLog, \
@@ -43,13 +43,17 @@ from util.custom_logging import errorCatcher, openLogPanel
 from util.qgis_common import (removeFileFromQGIS, addVectorFileToQGIS, addRasterFileToQGIS,
                                 save_as_dialog, get_UTM_Coordinate_System,get_layer_source)
 from util.qgis_symbology import RASTER_SYMBOLOGY, raster_apply_unique_value_renderer
+from util.block_grid import block_grid
+from util.workspace import export_layer
 from util.settings import read_setting, write_setting
+from util.qgis_crs import get_epsg
 
-from pyprecag import config, processing
+from pyprecag import config
 from pyprecag.convert import numeric_pixelsize_to_string
+from util.ui_forms import load_ui_form
 
 
-FORM_CLASS, _ = uic.loadUiType(os.path.join(
+FORM_CLASS, _ = load_ui_form(os.path.join(
     os.path.dirname(__file__), 'blockGrid_dialog_base.ui'))
 
 LOGGER = logging.getLogger(LOGGER_NAME)
@@ -257,9 +261,9 @@ class BlockGridDialog(QDialog, FORM_CLASS):
     def on_chkAutoCRS_stateChanged(self, state):
         if self.chkAutoCRS.isChecked():
             layer = self.mcboTargetLayer.currentLayer()
-            self.outQgsCRS = get_UTM_Coordinate_System(self, layer.extent().xMinimum(),
-                                                    layer.extent().yMinimum(),
-                                                    int(layer.crs().authid().replace('EPSG:', '')))
+            self.outQgsCRS = get_UTM_Coordinate_System(layer.extent().xMinimum(),
+                                                       layer.extent().yMinimum(),
+                                                       get_epsg(layer.crs()))
 
             if self.outQgsCRS:
                 self.mCRSoutput.setCrs(self.outQgsCRS)
@@ -278,7 +282,7 @@ class BlockGridDialog(QDialog, FORM_CLASS):
             else:
                 self.lblTargetLayer.setStyleSheet('color:black')
 
-            if not self.mCRSoutput.crs().isValid() or self.mCRSoutput.crs().isGeographic():
+            if get_epsg(self.mCRSoutput.crs()) is None or self.mCRSoutput.crs().isGeographic():
 
                 errorList.append(self.tr('Output coordinate system is geographic. Please select a PROJECTED coordinate system'))
                 self.lblOutCRSTitle.setStyleSheet('color:red')
@@ -344,30 +348,22 @@ class BlockGridDialog(QDialog, FORM_CLASS):
             removeFileFromQGIS(rasterFile)
 
             if self.chkUseSelected.isChecked():
-                polyFile = os.path.join(TEMPDIR, '{}_selection.shp'.format(lyrTarget.name()))
-                removeFileFromQGIS(polyFile)
-                writer = QgsVectorFileWriter.writeAsVectorFormat(lyrTarget,
-                                                                 polyFile,
-                                                                 "utf-8",
-                                                                 lyrTarget.crs(),
-                                                                 driverName="ESRI Shapefile",
-                                                                 onlySelected=True)
-
-                LOGGER.info('{:<30} {:<15} {}'.format('Save layer/selection to file', polyFile, ''))
+                polyFile = export_layer(lyrTarget, '{}_selection.shp'.format(lyrTarget.name()), only_selected=True)
+
                 if self.DISP_TEMP_LAYERS:
                     addVectorFileToQGIS(polyFile, group_layer_name='DEBUG', atTop=True)
 
             else:
                 polyFile = get_layer_source(lyrTarget)
 
-            processing.block_grid(in_shapefilename=polyFile,
-                                  pixel_size=self.dsbPixelSize.value(),
-                                  out_rasterfilename=rasterFile,
-                                  out_vesperfilename=os.path.splitext(rasterFile)[0] + '_v.txt',
-                                  nodata_val=self.spnNoDataVal.value(),
-                                  snap=self.chkSnapExtent.isChecked(),
-                                  out_epsg=int(self.mCRSoutput.crs().authid().replace("EPSG:",'')),
-                                  overwrite=True)  # The saveAS dialog takes care of the overwrite issue.
+            block_grid(in_shapefilename=polyFile,
+                       pixel_size=self.dsbPixelSize.value(),
+                       out_rasterfilename=rasterFile,
+                       out_vesperfilename=os.path.splitext(rasterFile)[0] + '_v.txt',
+                       nodata_val=self.spnNoDataVal.value(),
+                       snap=self.chkSnapExtent.isChecked(),
+                       out_epsg=get_epsg(self.mCRSoutput.crs()),
+                       overwrite=True)  # The saveAS dialog takes care of the overwrite issue.
 
             if self.chkDisplayResults.isChecked():
                 raster_layer = addRasterFileToQGIS(rasterFile, atTop=False)
@@ -31,25 +31,28 @@ import traceback
 from pat import LOGGER_NAME, PLUGIN_NAME, TEMPDIR
 from util.custom_logging import errorCatcher, openLogPanel
 from util.qgis_common import save_as_dialog, file_in_use, removeFileFromQGIS, \
-    copyLayerToMemory, addVectorFileToQGIS, addRasterFileToQGIS
+    copyLayerToMemory, addVectorFileToQGIS, addRasterFilesToQGIS
 from util.settings import read_setting, write_setting
+from util.qgis_crs import resolve_crs, get_epsg
 
-from util.qgis_symbology import RASTER_SYMBOLOGY, raster_apply_classified_renderer
+from util.qgis_symbology import RASTER_SYMBOLOGY
 from pyprecag import config, crs
 from pyprecag.bandops import BandMapping, CalculateIndices
 
-from qgis.PyQt import QtGui, uic, QtCore, QtWidgets
+from qgis.PyQt import QtGui, QtCore, QtWidgets
 from qgis.PyQt.QtWidgets import QPushButton, QDialog, QFileDialog, QApplication
 
 from qgis.core import (QgsProject, QgsMapLayer, QgsMessageLog,
                        QgsVectorFileWriter, QgsCoordinateReferenceSystem, Qgis, QgsApplication, QgsMapLayerProxyModel)
 from qgis.gui import QgsMessageBar
 
-from pyprecag.processing import calc_indices_for_block
+from util.block_processing import calc_indices_for_block
 
-from pat.util.qgis_common import get_UTM_Coordinate_System, build_layer_table, get_layer_source
+from util.qgis_common import get_UTM_Coordinate_System, build_layer_table, get_layer_source
+from util.workspace import export_layer
+from util.ui_forms import load_ui_form
 
-FORM_CLASS, _ = uic.loadUiType(os.path.join(os.path.dirname(__file__), 'calcImageIndices_dialog_base.ui'))
+FORM_CLASS, _ = load_ui_form(os.path.join(os.path.dirname(__file__), 'calcImageIndices_dialog_base.ui'))
 
 LOGGER = logging.getLogger(LOGGER_NAME)
 LOGGER.addHandler(logging.NullHandler())  # logging.StreamHandler()  # Handle logging, no logging has been configured
@@ -127,6 +130,12 @@ class CalculateImageIndicesDialog(QDialog, FORM_CLASS):
                 if item.widget() is not None:
                     item.widget().deleteLater()
 
+    def block_progress(self, completed, n_blocks, block_name):
+        """ Show the progress of the block processing in the status bar."""
+        self.iface.mainWindow().statusBar().showMessage('Processing {} - completed block {} of {} ({})'.format(
+            self.windowTitle(), completed, n_blocks, block_name))
+        QApplication.processEvents()
+
     def send_to_messagebar(self, message, title='', level=Qgis.Info, duration=5, exc_info=None,
                            core_QGIS=False, addToLog=False, showLogPanel=False):
 
@@ -205,14 +214,10 @@ class CalculateImageIndicesDialog(QDialog, FORM_CLASS):
         self.mCRSoutput.setCrs(QgsCoordinateReferenceSystem())
 
         # set default coordinate system
-        rast_crs = rast_layer.crs()
-        if rast_crs.authid() == '':
-            # Convert from the older style strings
-            rast_crs = QgsCoordinateReferenceSystem()
-            if not rast_crs.createFromProj(rast_layer.crs().toWkt()):
-                rast_crs = rast_layer.crs()
-            else:
-                self.mcboRasterLayer.currentLayer().setCrs(rast_crs)
+        # Convert from the older style strings
+        rast_crs = resolve_crs(rast_layer.crs())
+        if rast_crs.authid() != rast_layer.crs().authid():
+            self.mcboRasterLayer.currentLayer().setCrs(rast_crs)
         
         rast_crs = get_UTM_Coordinate_System(rast_layer.extent().xMinimum(),
                                              rast_layer.extent().yMinimum(),
@@ -378,7 +383,7 @@ class CalculateImageIndicesDialog(QDialog, FORM_CLASS):
                 self.lblNoDataVal.setStyleSheet("color:red")
                 errorList.append(self.tr('The raster nodata value must be numeric'))
 
-            if self.mcboRasterLayer.currentLayer().crs() is None:
+            if get_epsg(self.mcboRasterLayer.currentLayer().crs()) is None:
                 self.lblRasterLayer.setStyleSheet('color:red')
                 errorList.append(self.tr("Please assign a coordinate system to the image layer."))
             else:
@@ -404,7 +409,7 @@ class CalculateImageIndicesDialog(QDialog, FORM_CLASS):
                 self.lblCalcStats.setStyleSheet('color:red')
                 errorList.append(self.tr("Please select at least one index to calculate."))
 
-            if self.mCRSoutput.crs().authid() == '':
+            if get_epsg(self.mCRSoutput.crs()) is None:
                 self.lblOutCRSTitle.setStyleSheet('color:red')
                 errorList.append(self.tr("Select output projected coordinate system"))
             else:
@@ -499,12 +504,7 @@ class CalculateImageIndicesDialog(QDialog, FORM_CLASS):
                 lyrBoundary = self.mcboPolygonLayer.currentLayer()
 
                 if self.chkUseSelected.isChecked():
-                    savePlyName = lyrBoundary.name() + '_poly.shp'
-                    filePoly = os.path.join(TEMPDIR, savePlyName)
-                    if os.path.exists(filePoly):  removeFileFromQGIS(filePoly)
-
-                    QgsVectorFileWriter.writeAsVectorFormat(lyrBoundary, filePoly, "utf-8", lyrBoundary.crs(),
-                                                            driverName="ESRI Shapefile", onlySelected=True)
+                    filePoly = export_layer(lyrBoundary, lyrBoundary.name() + '_poly.shp', only_selected=True)
 
                     if self.DISP_TEMP_LAYERS:
                         addVectorFileToQGIS(filePoly, layer_name=os.path.splitext(os.path.basename(filePoly))[0]
@@ -516,36 +516,39 @@ class CalculateImageIndicesDialog(QDialog, FORM_CLASS):
             x = self.lneNoDataVal.text()
             nodata_val = int(float(x)) if int(float(x)) == float(x) else float(x)
 
-            files = calc_indices_for_block(get_layer_source(lyrRaster),
-                                           self.dsbPixelSize.value(),
-                                           self.band_mapping,
-                                           self.lneOutputFolder.text(),
-                                           indices=selectedIndices,
-                                           image_epsg=int(lyrRaster.crs().authid().replace('EPSG:', '')),
-                                           image_nodata=nodata_val,
-                                           polygon_shapefile=filePoly,
-                                           groupby=self.mFieldComboBox.currentField() if self.mFieldComboBox.currentField() else None,
-                                           out_epsg=int(self.mCRSoutput.crs().authid().replace('EPSG:', '')))
+            files, failures = calc_indices_for_block(get_layer_source(lyrRaster),
+                                                     self.dsbPixelSize.value(),
+                                                     self.band_mapping,
+                                                     self.lneOutputFolder.text(),
+                                                     indices=selectedIndices,
+                                                     image_epsg=get_epsg(lyrRaster.crs()),
+                                                     image_nodata=nodata_val,
+                                                     polygon_shapefile=filePoly,
+                                                     groupby=self.mFieldComboBox.currentField() if self.mFieldComboBox.currentField() else None,
+                                                     out_epsg=get_epsg(self.mCRSoutput.crs()),
+                                                     progress_callback=self.block_progress)
 
             if self.chkAddToDisplay.isChecked():
+                group_names = []
                 for ea_file in files:
-                    raster_sym = RASTER_SYMBOLOGY['Image Indices (ie PCD, NDVI)']
                     group_name =  os.path.basename(os.path.dirname(ea_file))
                     if self.mFieldComboBox.currentField():
                         group_name = os.path.basename(ea_file).split('_')[0] + ' - ' + os.path.basename(os.path.dirname(ea_file))
-                    
-                    raster_lyr = addRasterFileToQGIS(ea_file,atTop=False, group_layer_name=group_name)
+                    group_names.append(group_name)
 
-                    raster_apply_classified_renderer(raster_lyr,
-                                    rend_type=raster_sym['type'],
-                                    num_classes=raster_sym['num_classes'],
-                                    color_ramp=raster_sym['colour_ramp'])
+                addRasterFilesToQGIS(files, group_layer_names=group_names, atTop=False,
+                                     raster_sym=RASTER_SYMBOLOGY['Image Indices (ie PCD, NDVI)'])
 
             self.cleanMessageBars(True)
             self.fraMain.setDisabled(False)
 
             self.iface.mainWindow().statusBar().clearMessage()
             self.iface.messageBar().popWidget()
+
+            if len(failures) > 0:
+                self.send_to_messagebar('{} block(s) failed: {}'.format(len(failures), ', '.join(failures)),
+                                        level=Qgis.Warning, duration=0, core_QGIS=True, showLogPanel=True)
+
             QApplication.restoreOverrideCursor()
             return super(CalculateImageIndicesDialog, self).accept(*args, **kwargs)
 
@@ -0,0 +1,421 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ CSIRO Precision Agriculture Tools (PAT) Plugin
+
+ CleanTrimBatchDialog - Clean, trim and normalise many CSV files using the same parameters
+           -------------------
+        begin      : 2026-10-19
+        git sha    : $Format:%H$
+        copyright  : (c) 2026, Commonwealth Scientific and Industrial Research Organisation (CSIRO)
+        email      : PAT@csiro.au
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the associated CSIRO Open Source Software       *
+ *   License Agreement (GPLv3) provided with this plugin.                  *
+ *                                                                         *
+ ***************************************************************************/
+"""
+
+from builtins import str
+from builtins import range
+import glob
+import logging
+import os
+import sys
+import traceback
+
+from qgis.PyQt import QtGui, QtCore, QtWidgets
+from qgis.PyQt.QtWidgets import QPushButton, QApplication, QDialog, QFileDialog
+
+from qgis.core import QgsMessageLog, Qgis, QgsApplication, QgsMapLayerProxyModel, QgsCoordinateReferenceSystem
+from qgis.gui import QgsMessageBar
+
+from pat import LOGGER_NAME, PLUGIN_NAME, TEMPDIR
+from util.custom_logging import errorCatcher, openLogPanel
+from util.qgis_crs import get_epsg
+from util.settings import read_setting, write_setting
+
+from util.clean_trim import batch_clean_trim_points
+from pyprecag.describe import CsvDescribe, VectorDescribe
+from util.ui_forms import load_ui_form
+from util.vector_formats import VECTOR_FORMATS, get_available_formats
+from util.workspace import export_layer
+
+FORM_CLASS, _ = load_ui_form(os.path.join(os.path.dirname(__file__), 'cleanTrimBatch_dialog_base.ui'))
+
+LOGGER = logging.getLogger(LOGGER_NAME)
+LOGGER.addHandler(logging.NullHandler())  # logging.StreamHandler()  # Handle logging, no logging has been configured
+
+
+class CleanTrimBatchDialog(QDialog, FORM_CLASS):
+    """Dialog for cleaning, trimming and normalising many CSV files in parallel"""
+
+    toolKey = 'CleanTrimBatchDialog'
+
+    def __init__(self, iface, parent=None):
+
+        super(CleanTrimBatchDialog, self).__init__(parent)
+
+        # Set up the user interface from Designer.
+        self.setupUi(self)
+
+        # The qgis interface
+        self.iface = iface
+        self.DISP_TEMP_LAYERS = read_setting(PLUGIN_NAME + '/DISP_TEMP_LAYERS', bool)
+
+        # the summary of the last run
+        self.results_table = None
+
+        # Catch and redirect python errors directed at the log messages python error tab.
+        QgsApplication.messageLog().messageReceived.connect(errorCatcher)
+
+        if not os.path.exists(TEMPDIR):
+            os.mkdir(TEMPDIR)
+
+        # Setup for validation messagebar on gui --------------------------
+        self.messageBar = QgsMessageBar(self)  # leave this message bar for bailouts
+        self.validationLayout = QtWidgets.QFormLayout(self)  # new layout to gui
+
+        if isinstance(self.layout(), QtWidgets.QFormLayout):
+            # create a validation layout so multiple messages can be added and cleaned up.
+            self.layout().insertRow(0, self.validationLayout)
+            self.layout().insertRow(0, self.messageBar)
+        else:
+            self.layout().insertWidget(0, self.messageBar)  # for use with Vertical/horizontal layout box
+
+        # GUI Customisation -----------------------------------------------
+        self.setWindowIcon(QtGui.QIcon(':/plugins/pat/icons/icon_cleanTrimPoints.svg'))
+        self.mcboClipPolygon.setFilters(QgsMapLayerProxyModel.PolygonLayer)
+        self.mcboClipPolygon.setLayer(None)
+        self.mCRSinput.setCrs(QgsCoordinateReferenceSystem().fromEpsgId(4326))
+
+        for driver in get_available_formats():
+            self.cboVectorFormat.addItem(VECTOR_FORMATS[driver][0], driver)
+
+        lastFolder = read_setting(PLUGIN_NAME + "/" + self.toolKey + "/LastOutFolder")
+        if lastFolder is not None and os.path.exists(lastFolder):
+            self.lneOutputFolder.setText(lastFolder)
+
+    def cleanMessageBars(self, AllBars=True):
+        """Clean Messages from the validation layout.
+        Args:
+            AllBars (bool): Remove All bars including those which haven't timed-out. Defaults to True
+        """
+        layout = self.validationLayout
+        for i in reversed(list(range(layout.count()))):
+            # when it timed out the row becomes empty....
+            if layout.itemAt(i).isEmpty():
+                # .removeItem doesn't always work. so takeAt(pop) it instead
+                item = layout.takeAt(i)
+            elif AllBars:  # ie remove all
+                item = layout.takeAt(i)
+                # also have to remove any widgets associated with it.
+                if item.widget() is not None:
+                    item.widget().deleteLater()
+
+    def send_to_messagebar(self, message, title='', level=Qgis.Info, duration=5, exc_info=None,
+                           core_QGIS=False, addToLog=False, showLogPanel=False):
+
+        """ Add a message to the forms message bar.
+
+        Args:
+            message (str): Message to display
+            title (str): Title of message. Will appear in bold. Defaults to ''
+            level (QgsMessageBarLevel): The level of message to log. Defaults to Qgis.Info
+            duration (int): Number of seconds to display message for. 0 is no timeout. Defaults to 5
+            core_QGIS (bool): Add to QGIS interface rather than the dialog
+            addToLog (bool): Also add message to Log. Defaults to False
+            showLogPanel (bool): Display the log panel
+            exc_info () : Information to be used as a traceback if required
+
+        """
+
+        if core_QGIS:
+            newMessageBar = self.iface.messageBar()
+        else:
+            newMessageBar = QgsMessageBar(self)
+
+        widget = newMessageBar.createMessage(title, message)
+
+        if showLogPanel:
+            button = QPushButton(widget)
+            button.setText('View')
+            button.setContentsMargins(0, 0, 0, 0)
+            button.setFixedWidth(35)
+            button.pressed.connect(openLogPanel)
+            widget.layout().addWidget(button)
+
+        newMessageBar.pushWidget(widget, level, duration=duration)
+
+        if not core_QGIS:
+            rowCount = self.validationLayout.count()
+            self.validationLayout.insertRow(rowCount + 1, newMessageBar)
+
+        if addToLog:
+            if level == 1:  # 'WARNING':
+                LOGGER.warning(message)
+            elif level == 2:  # 'CRITICAL':
+                # Add a traceback to log only for bailouts only
+                if exc_info is not None:
+                    exc_type, exc_value, exc_traceback = sys.exc_info()
+                    mess = str(traceback.format_exc())
+                    message = message + '\n' + mess
+
+                LOGGER.critical(message)
+            else:  # INFO = 0
+                LOGGER.info(message)
+
+    def csv_files(self):
+        """Get the list of csv files to process."""
+        return [self.lstFiles.item(i).text() for i in range(self.lstFiles.count())]
+
+    def add_files(self, files):
+        """Add files to the list, skipping any already added, then update the field list."""
+        existing = self.csv_files()
+        for ea_file in sorted(files):
+            ea_file = os.path.normpath(ea_file)
+            if ea_file not in existing:
+                self.lstFiles.addItem(ea_file)
+                existing.append(ea_file)
+
+        self.lblInputFiles.setStyleSheet('color:black')
+        self.update_field_list()
+
+    def update_field_list(self):
+        """Populate the process field list with the numeric columns of the first file."""
+        current = self.cboProcessField.currentText()
+        self.cboProcessField.clear()
+
+        if self.lstFiles.count() == 0:
+            return
+
+        try:
+            pdf_csv = CsvDescribe(self.lstFiles.item(0).text()).open_pandas_dataframe(nrows=100)
+            self.cboProcessField.addItems(pdf_csv.select_dtypes('number').columns.tolist())
+        except Exception as err:
+            self.send_to_messagebar('Could not read columns from {}: {}'.format(
+                os.path.basename(self.lstFiles.item(0).text()), err), level=Qgis.Warning)
+
+        if current != '':
+            self.cboProcessField.setCurrentText(current)
+
+    @QtCore.pyqtSlot(name='on_cmdAddFiles_clicked')
+    def on_cmdAddFiles_clicked(self):
+        inFolder = read_setting(PLUGIN_NAME + "/" + self.toolKey + "/LastInFolder")
+        if inFolder is None or not os.path.exists(inFolder):
+            inFolder = read_setting(PLUGIN_NAME + '/BASE_IN_FOLDER')
+
+        files, _f = QFileDialog.getOpenFileNames(self, self.tr("Select CSV files to clean"), inFolder,
+                                                 self.tr("Comma delimited files") + " (*.csv);;")
+        if len(files) == 0:
+            return
+
+        write_setting(PLUGIN_NAME + "/" + self.toolKey + "/LastInFolder", os.path.dirname(files[0]))
+        self.add_files(files)
+
+    @QtCore.pyqtSlot(name='on_cmdAddFolder_clicked')
+    def on_cmdAddFolder_clicked(self):
+        inFolder = read_setting(PLUGIN_NAME + "/" + self.toolKey + "/LastInFolder")
+        if inFolder is None or not os.path.exists(inFolder):
+            inFolder = read_setting(PLUGIN_NAME + '/BASE_IN_FOLDER')
+
+        s = QFileDialog.getExistingDirectory(self, self.tr("Add all CSV files in a folder"), inFolder,
+                                             QFileDialog.ShowDirsOnly)
+        if s == '' or s is None:
+            return
+
+        write_setting(PLUGIN_NAME + "/" + self.toolKey + "/LastInFolder", s)
+        self.add_files(glob.glob(os.path.join(s, '*.csv')))
+
+    @QtCore.pyqtSlot(name='on_cmdRemoveFiles_clicked')
+    def on_cmdRemoveFiles_clicked(self):
+        for item in self.lstFiles.selectedItems():
+            self.lstFiles.takeItem(self.lstFiles.row(item))
+        self.update_field_list()
+
+    @QtCore.pyqtSlot(name='on_cmdOutputFolder_clicked')
+    def on_cmdOutputFolder_clicked(self):
+        outFolder = self.lneOutputFolder.text()
+        if outFolder == '':
+            outFolder = read_setting(PLUGIN_NAME + "/" + self.toolKey + "/LastOutFolder")
+            if outFolder is None or not os.path.exists(outFolder):
+                outFolder = read_setting(PLUGIN_NAME + '/BASE_OUT_FOLDER')
+
+        s = QFileDialog.getExistingDirectory(self, self.tr("Save output files to a folder"), outFolder,
+                                             QFileDialog.ShowDirsOnly)
+        if s == '' or s is None:
+            return
+
+        s = os.path.normpath(s)
+        self.lblOutputFolder.setStyleSheet('color:black')
+        self.lneOutputFolder.setStyleSheet('color:black')
+        self.lneOutputFolder.setText(s)
+        write_setting(PLUGIN_NAME + "/" + self.toolKey + "/LastOutFolder", s)
+
+    def on_mcboClipPolygon_layerChanged(self):
+        lyrTarget = self.mcboClipPolygon.currentLayer()
+
+        if lyrTarget is None or lyrTarget.selectedFeatureCount() == 0:
+            self.chkUseSelected_ClipPoly.setText('No features selected')
+            self.chkUseSelected_ClipPoly.setEnabled(False)
+            self.chkUseSelected_ClipPoly.setChecked(False)
+            self.chkUseSelected_ClipPoly.setStyleSheet('font:regular')
+        else:
+            self.chkUseSelected_ClipPoly.setText(
+                'Use the {} selected feature(s) ?'.format(lyrTarget.selectedFeatureCount()))
+            self.chkUseSelected_ClipPoly.setEnabled(True)
+            self.chkUseSelected_ClipPoly.setStyleSheet('font:bold')
+
+    def on_chkUtmZone_stateChanged(self, state):
+        self.mCRSoutput.setEnabled(not self.chkUtmZone.isChecked())
+
+    def file_progress(self, completed, n_files, summary):
+        """ Show the progress of the batch in the status bar."""
+        self.iface.mainWindow().statusBar().showMessage('Processing {} - completed {} of {} ({})'.format(
+            self.windowTitle(), completed, n_files, summary['File']))
+        QApplication.processEvents()
+
+    def validate(self):
+        """Check to see that all required gui elements have been entered and are valid."""
+        try:
+            errorList = []
+
+            if self.lstFiles.count() == 0:
+                self.lblInputFiles.setStyleSheet('color:red')
+                errorList.append(self.tr("Add one or more CSV files to clean"))
+            else:
+                self.lblInputFiles.setStyleSheet('color:black')
+
+            if self.cboProcessField.currentText() == '':
+                self.lblProcessField.setStyleSheet('color:red')
+                errorList.append(self.tr("Select or enter the field to process"))
+            else:
+                self.lblProcessField.setStyleSheet('color:black')
+
+            if get_epsg(self.mCRSinput.crs()) is None:
+                self.lblInCRS.setStyleSheet('color:red')
+                errorList.append(self.tr("Select the coordinate system of the CSV files"))
+            else:
+                self.lblInCRS.setStyleSheet('color:black')
+
+            if self.chkUtmZone.isChecked():
+                self.lblOutCRS.setStyleSheet('color:black')
+            elif get_epsg(self.mCRSoutput.crs()) is None or self.mCRSoutput.crs().isGeographic():
+                self.lblOutCRS.setStyleSheet('color:red')
+                errorList.append(self.tr("Select a projected output coordinate system"))
+            else:
+                self.lblOutCRS.setStyleSheet('color:black')
+
+            if self.lneOutputFolder.text() == '':
+                self.lblOutputFolder.setStyleSheet('color:red')
+                errorList.append(self.tr("Select an output folder"))
+            elif not os.path.exists(self.lneOutputFolder.text()):
+                self.lneOutputFolder.setStyleSheet('color:red')
+                errorList.append(self.tr("Output folder cannot be found"))
+            else:
+                self.lblOutputFolder.setStyleSheet('color:black')
+                self.lneOutputFolder.setStyleSheet('color:black')
+
+            if len(errorList) > 0:
+                raise ValueError(errorList)
+
+        except ValueError as e:
+            self.cleanMessageBars(True)
+            if len(errorList) > 0:
+                for i, ea in enumerate(errorList):
+                    self.send_to_messagebar(str(ea), level=Qgis.Warning, duration=(i + 1) * 5)
+                return False
+
+        return True
+
+    def accept(self, *args, **kwargs):
+        if not self.validate():
+            return False
+
+        try:
+            # disable form via a frame, this will still allow interaction with the message bar
+            self.fraMain.setDisabled(True)
+            self.cleanMessageBars(True)
+
+            QApplication.setOverrideCursor(QtCore.Qt.WaitCursor)
+            self.iface.mainWindow().statusBar().showMessage('Processing {}'.format(self.windowTitle()))
+            LOGGER.info('{st}\nProcessing {}'.format(self.windowTitle(), st='*' * 50))
+
+            # Add settings to log
+            settingsStr = 'Parameters:---------------------------------------'
+            settingsStr += '\n    {:30}\t{}'.format('CSV files:', self.lstFiles.count())
+            for ea_file in self.csv_files():
+                settingsStr += '\n        {}'.format(ea_file)
+            settingsStr += '\n    {:30}\t{}'.format('CSV coordinate system:', self.mCRSinput.crs().authid())
+            settingsStr += '\n    {:30}\t{}'.format('Process Field:', self.cboProcessField.currentText())
+
+            if self.mcboClipPolygon.currentLayer() is not None:
+                settingsStr += '\n    {:30}\t{}'.format('Clip Polygon Layer:',
+                                                        self.mcboClipPolygon.currentLayer().name())
+                if self.chkUseSelected_ClipPoly.isChecked():
+                    settingsStr += '\n    {:30}\t{}'.format('Clip Polygon Selected Features:',
+                                                            self.mcboClipPolygon.currentLayer().selectedFeatureCount())
+
+            settingsStr += '\n    {:30}\t{}'.format('Thinning Distance:', self.dsbThinDist.value())
+            settingsStr += '\n    {:30}\t{}'.format('Remove Zeros:', self.chkRemoveZero.isChecked())
+            settingsStr += '\n    {:30}\t{}'.format('Standard Devs:', self.dsbStdCount.value())
+            settingsStr += '\n    {:30}\t{}'.format('Iteratively Trim:', self.chkIterate.isChecked())
+            if self.chkUtmZone.isChecked():
+                settingsStr += '\n    {:30}\t{}'.format('Output coordinate system:', 'UTM zone of each file')
+            else:
+                settingsStr += '\n    {:30}\t{}'.format('Output coordinate system:', self.mCRSoutput.crs().authid())
+            settingsStr += '\n    {:30}\t{}'.format('Output Folder:', self.lneOutputFolder.text())
+            settingsStr += '\n    {:30}\t{}'.format('Save Vector Files:', self.chkSaveVectors.isChecked())
+            if self.chkSaveVectors.isChecked():
+                settingsStr += '\n    {:30}\t{}'.format('Vector Format:', self.cboVectorFormat.currentText())
+            settingsStr += '\n'
+
+            LOGGER.info(settingsStr)
+
+            gdf_poly = None
+            lyrClipPoly = self.mcboClipPolygon.currentLayer()
+            if lyrClipPoly is not None:
+                # export so the selection, filter and unsaved edits are used and any layer type can be read
+                filePoly = export_layer(lyrClipPoly, lyrClipPoly.name() + '_poly.shp',
+                                        only_selected=self.chkUseSelected_ClipPoly.isChecked())
+                gdf_poly = VectorDescribe(filePoly).open_geo_dataframe()
+
+            self.results_table = batch_clean_trim_points(self.csv_files(), self.lneOutputFolder.text(),
+                                                         self.cboProcessField.currentText(),
+                                                         coord_columns_epsg=get_epsg(self.mCRSinput.crs()),
+                                                         out_epsg=-1 if self.chkUtmZone.isChecked() else get_epsg(
+                                                             self.mCRSoutput.crs()),
+                                                         poly_geodataframe=gdf_poly,
+                                                         remove_zeros=self.chkRemoveZero.isChecked(),
+                                                         stdevs=self.dsbStdCount.value(),
+                                                         iterative=self.chkIterate.isChecked(),
+                                                         thin_dist_m=self.dsbThinDist.value(),
+                                                         save_vectors=self.chkSaveVectors.isChecked(),
+                                                         vector_driver=self.cboVectorFormat.currentData(),
+                                                         progress_callback=self.file_progress)
+
+            failed = self.results_table[self.results_table['Error'] != '']
+            if len(failed) > 0:
+                self.send_to_messagebar('{} of {} file(s) failed: {}'.format(len(failed), len(self.results_table),
+                                                                            ', '.join(failed['File'])),
+                                        level=Qgis.Warning, duration=0, core_QGIS=True, showLogPanel=True)
+
+            self.cleanMessageBars(True)
+            self.fraMain.setDisabled(False)
+            QApplication.restoreOverrideCursor()
+            self.iface.mainWindow().statusBar().clearMessage()
+            return super(CleanTrimBatchDialog, self).accept(*args, **kwargs)
+
+        except Exception as err:
+            QApplication.restoreOverrideCursor()
+            self.cleanMessageBars(True)
+            self.fraMain.setDisabled(False)
+            self.iface.mainWindow().statusBar().clearMessage()
+
+            self.send_to_messagebar(str(err), level=Qgis.Critical,
+                                    duration=0, addToLog=True, showLogPanel=True, exc_info=sys.exc_info())
+            return False  # leave dialog open
@@ -49,7 +49,7 @@ from pat import LOGGER_NAME, PLUGIN_NAME, TEMPDIR
 from pyprecag import processing, describe, crs as pyprecag_crs, convert, config, LOGGER
 from pyprecag.describe import predictCoordinateColumnNames
 
-from qgis.PyQt import uic, QtGui, QtCore, QtWidgets
+from qgis.PyQt import QtGui, QtCore, QtWidgets
 from qgis.PyQt.QtWidgets import (QDialog, QSpinBox, QHeaderView, QTableView, QPushButton, QFrame, QFileDialog,
                                  QApplication, QDialogButtonBox)
 
@@ -59,11 +59,16 @@ from qgis.gui import QgsMessageBar, QgsProjectionSelectionWidget
 
 from util.qgis_common import (copyLayerToMemory, removeFileFromQGIS, addVectorFileToQGIS, save_as_dialog,get_layer_source,
                               file_in_use, get_UTM_Coordinate_System)
+from util.clean_trim import clean_trim_points
 from util.settings import read_setting, write_setting
+from util.qgis_crs import get_epsg
 
 from util.custom_logging import errorCatcher, openLogPanel
 
-from pat.util.qgis_symbology import vector_apply_unique_value_renderer
+from util.qgis_symbology import vector_apply_unique_value_renderer
+from util.workspace import export_layer, get_intermediate_format, new_run_folder, release_run_folder
+from util.vector_formats import change_vector_format, save_vector, vector_file_filter
+from util.ui_forms import load_ui_form
 
 
 class PandasModel(QtCore.QAbstractTableModel):
@@ -106,7 +111,7 @@ class PandasModel(QtCore.QAbstractTableModel):
         return None
 
 
-FORM_CLASS, _ = uic.loadUiType(os.path.join(os.path.dirname(__file__), 'cleanTrimPoints_wizard_base.ui'))
+FORM_CLASS, _ = load_ui_form(os.path.join(os.path.dirname(__file__), 'cleanTrimPoints_wizard_base.ui'))
 
 
 class CleanTrimPointsDialog(QDialog, FORM_CLASS):
@@ -517,10 +522,10 @@ class CleanTrimPointsDialog(QDialog, FORM_CLASS):
             fld = re.sub('[^A-Za-z0-9_-]+', '', unidecode(self.processField()))[:10]
             if self.optLayer.isChecked():
                 lyrTarget = self.mcboTargetLayer.currentLayer()
-                filename = lyrTarget.name() + '_{}_normtrimmed.shp'.format(fld)
+                filename = lyrTarget.name() + '_{}_normtrimmed.gpkg'.format(fld)
             else:
                 fn, ext = os.path.splitext(self.lneSaveCSVFile.text())
-                filename = fn + '.shp'
+                filename = fn + '.gpkg'
         else:
             filename = os.path.splitext(self.lneSaveCSVFile.text())[0]
 
@@ -529,7 +534,7 @@ class CleanTrimPointsDialog(QDialog, FORM_CLASS):
         filename = re.sub(r"_+", "_", filename)
 
         s = save_as_dialog(self, self.tr("Save As"),
-                           self.tr("ESRI Shapefile") + " (*.shp);;",
+                           vector_file_filter(),
                            default_name=os.path.join(lastFolder, filename))
 
         if s == '' or s is None:
@@ -714,7 +719,7 @@ class CleanTrimPointsDialog(QDialog, FORM_CLASS):
                     else:
                         self.lblYField.setStyleSheet('color:black')
 
-                    if self.qgsCRScsv.crs().authid() == '':
+                    if get_epsg(self.qgsCRScsv.crs()) is None:
                         self.lblInCRSTitle.setStyleSheet('color:red')
                         errorList.append(self.tr("Select coordinate system for geometry fields"))
                     else:
@@ -728,7 +733,7 @@ class CleanTrimPointsDialog(QDialog, FORM_CLASS):
                     self.lblProcessField.setStyleSheet('color:black')
 
             if widget_page == 'pgeOutput' or widget_idx == self.stackedWidget.count() :
-                if self.mCRSoutput.crs().isValid():
+                if get_epsg(self.mCRSoutput.crs()) is not None:
                     if self.mCRSoutput.crs().isGeographic():
                         self.lblOutCRSTitle.setStyleSheet('color:red')
                         self.mCRSoutput.setStyleSheet('color:red')
@@ -833,7 +838,7 @@ class CleanTrimPointsDialog(QDialog, FORM_CLASS):
                 if 'norm_trim' in os.path.basename(points_clean_shp):
                     points_remove_shp = self.lneSavePointsFile.text().replace('_normtrimmed', '_removedpts')
                 else:
-                    points_remove_shp = self.lneSavePointsFile.text().replace('.shp', '_removedpts.shp')
+                    points_remove_shp = '_removedpts'.join(os.path.splitext(self.lneSavePointsFile.text()))
 
                 settingsStr += '\n    {:40}\t{}'.format('Saved Removed Points:', points_remove_shp)
 
@@ -843,6 +848,7 @@ class CleanTrimPointsDialog(QDialog, FORM_CLASS):
         if not self.validate():
             return False
 
+        runFolder = None
         try:
             # disable form via a frame, this will still allow interaction with the message bar
             self.stackedWidget.setDisabled(True)
@@ -861,6 +867,9 @@ class CleanTrimPointsDialog(QDialog, FORM_CLASS):
 
             LOGGER.info('{st}\nProcessing {}'.format(self.windowTitle(), st='*' * 50))
 
+            # scratch folder for the intermediate files of this run
+            runFolder = new_run_folder(self.toolKey)
+
             points_clean_shp = None
             points_remove_shp = None
             gp_layer_name = ''
@@ -870,26 +879,25 @@ class CleanTrimPointsDialog(QDialog, FORM_CLASS):
                 if 'norm_trim' in os.path.basename(points_clean_shp):
                     points_remove_shp = self.lneSavePointsFile.text().replace('_normtrimmed', '_removedpts')
                 else:
-                    points_remove_shp = self.lneSavePointsFile.text().replace('.shp', '_removedpts.shp')
+                    points_remove_shp = '_removedpts'.join(os.path.splitext(self.lneSavePointsFile.text()))
 
             elif self.DEBUG:
                 gp_layer_name = 'DEBUG'
-                points_clean_shp = os.path.join(TEMPDIR,
-                                                os.path.basename(self.lneSaveCSVFile.text().replace('.csv', '.shp')))
-                points_remove_shp = os.path.join(TEMPDIR, os.path.basename(
-                    self.lneSaveCSVFile.text().replace('.csv', '_removepts.shp')))
+                points_clean_shp = os.path.join(runFolder, change_vector_format(
+                    os.path.basename(self.lneSaveCSVFile.text()), get_intermediate_format()))
+                points_remove_shp = '_removepts'.join(os.path.splitext(points_clean_shp))
 
             LOGGER.info(self.create_summary())
             stepTime = time.time()
 
             if self.optFile.isChecked():
-                in_epsg = int(self.qgsCRScsv.crs().authid().replace('EPSG:', ''))
+                in_epsg = get_epsg(self.qgsCRScsv.crs())
                 in_crs = self.qgsCRScsv.crs()
             else:
-                in_epsg = self.mcboTargetLayer.currentLayer().crs().authid().replace('EPSG:', '')
+                in_epsg = get_epsg(self.mcboTargetLayer.currentLayer().crs())
                 in_crs = self.mcboTargetLayer.currentLayer().crs()
 
-            out_epsg = int(self.mCRSoutput.crs().authid().replace('EPSG:', ''))
+            out_epsg = get_epsg(self.mCRSoutput.crs())
 
             filePoly = None
 
@@ -898,12 +906,7 @@ class CleanTrimPointsDialog(QDialog, FORM_CLASS):
 
                 if self.chkUseSelected_ClipPoly.isChecked():
 
-                    savePlyName = lyrPlyTarget.name() + '_poly.shp'
-                    filePoly = os.path.join(TEMPDIR, savePlyName)
-                    if os.path.exists(filePoly):  removeFileFromQGIS(filePoly)
-
-                    QgsVectorFileWriter.writeAsVectorFormat(lyrPlyTarget, filePoly, 'utf-8',
-                                                            driverName='ESRI Shapefile', onlySelected=True)
+                    filePoly = export_layer(lyrPlyTarget, lyrPlyTarget.name() + '_poly.shp', only_selected=True)
 
                     LOGGER.info('{:<30} {d:<15} {}'.format('Save Clip Polygon layer selection to file', filePoly,
                                                          d=str(timedelta(seconds=time.time() - stepTime))))
@@ -921,10 +924,12 @@ class CleanTrimPointsDialog(QDialog, FORM_CLASS):
             if self.optFile.isChecked():
 
                 if self.DEBUG:
-                    filePoints = os.path.join(TEMPDIR, os.path.splitext(os.path.basename(self.lneSaveCSVFile.text()))[0] + '_table2pts.shp')
+                    filePoints = os.path.join(runFolder, change_vector_format(
+                        os.path.splitext(os.path.basename(self.lneSaveCSVFile.text()))[0] + '_table2pts',
+                        get_intermediate_format()))
 
                 if os.path.splitext(self.lneInCSVFile.text())[-1] == '.csv':
-                    gdfPoints, gdfPtsCrs = convert.convert_csv_to_points(self.lneInCSVFile.text() , out_shapefilename=filePoints,
+                    gdfPoints, gdfPtsCrs = convert.convert_csv_to_points(self.lneInCSVFile.text(),
                                                                          coord_columns=[self.cboXField.currentText(),
                                                                                         self.cboYField.currentText()],
                                                                          coord_columns_epsg=in_epsg)
@@ -948,7 +953,7 @@ class CleanTrimPointsDialog(QDialog, FORM_CLASS):
                 stepTime = time.time()
 
                 if filePoints is not None:
-                    describe.save_geopandas_tofile(gdfPoints, filePoints)  # , file_encoding=self.file_encoding)
+                    save_vector(gdfPoints, filePoints)
 
                 if self.DISP_TEMP_LAYERS and filePoints != '':
                     addVectorFileToQGIS(filePoints, layer_name=os.path.splitext(os.path.basename(filePoints))[0],
@@ -961,31 +966,27 @@ class CleanTrimPointsDialog(QDialog, FORM_CLASS):
                         os.path.splitext(get_layer_source(layerPts))[-1] == '.vrt' or \
                         self.chkUseSelected.isChecked() or self.optFile.isChecked():
 
-                    filePoints = os.path.join(TEMPDIR, "{}_points.shp".format(layerPts.name()))
-
+                    fileName = "{}_points.shp".format(layerPts.name())
                     if self.chkUseSelected.isChecked():
-                        filePoints = os.path.join(TEMPDIR, "{}_selected_points.shp".format(layerPts.name()))
-
-                    if os.path.exists(filePoints):
-                        removeFileFromQGIS(filePoints)
+                        fileName = "{}_selected_points.shp".format(layerPts.name())
 
-                    ptsLayer = copyLayerToMemory(layerPts, layerPts.name() + "_memory", bAddUFI=True,
-                                                 bOnlySelectedFeat=self.chkUseSelected.isChecked())
-
-                    _writer = QgsVectorFileWriter.writeAsVectorFormat(ptsLayer, filePoints, "utf-8",
-                                                                      self.mCRSoutput.crs(), driverName="ESRI Shapefile")
+                    filePoints = export_layer(layerPts, fileName, crs=self.mCRSoutput.crs(),
+                                              only_selected=self.chkUseSelected.isChecked(),
+                                              prepare_layer=lambda: copyLayerToMemory(
+                                                  layerPts, layerPts.name() + "_memory", bAddUFI=True,
+                                                  bOnlySelectedFeat=self.chkUseSelected.isChecked(),
+                                                  bEsriFieldNames=get_intermediate_format() == 'ESRI Shapefile'))
 
                     # reset field to match truncated field in the saved shapefile.
-                    shpField = re.sub('[^A-Za-z0-9_-]+', '', self.cboProcessField.currentText())[:10]
+                    if get_intermediate_format() == 'ESRI Shapefile':
+                        shpField = re.sub('[^A-Za-z0-9_-]+', '', self.cboProcessField.currentText())[:10]
 
-                    idx = self.cboProcessField.findText(shpField)
-                    if idx == -1:
-                        self.cboProcessField.addItem(shpField)
                         idx = self.cboProcessField.findText(shpField)
+                        if idx == -1:
+                            self.cboProcessField.addItem(shpField)
+                            idx = self.cboProcessField.findText(shpField)
 
-                    self.cboProcessField.setCurrentIndex(idx)
-
-                    del ptsLayer
+                        self.cboProcessField.setCurrentIndex(idx)
 
                     if self.DISP_TEMP_LAYERS:
                         addVectorFileToQGIS(filePoints, layer_name=os.path.splitext(os.path.basename(filePoints))[0],
@@ -1016,10 +1017,10 @@ class CleanTrimPointsDialog(QDialog, FORM_CLASS):
                 gdfPoints['EN_EPSG'] = out_epsg
 
                 if self.DEBUG:
-                    filePoints = os.path.join(TEMPDIR, os.path.basename(
-                        self.lneSaveCSVFile.text().replace('.csv', '_ptsprj.shp')))
+                    filePoints = os.path.join(runFolder, change_vector_format(os.path.basename(
+                        self.lneSaveCSVFile.text().replace('.csv', '_ptsprj')), get_intermediate_format()))
                     removeFileFromQGIS(filePoints)
-                    describe.save_geopandas_tofile(gdfPoints, filePoints)
+                    save_vector(gdfPoints, filePoints)
                     if self.DISP_TEMP_LAYERS:
                         if self.DEBUG:
                             addVectorFileToQGIS(filePoints,
@@ -1040,25 +1041,26 @@ class CleanTrimPointsDialog(QDialog, FORM_CLASS):
                                                                     dur=timedelta(seconds=time.time() - step_time)))
                 
                 if points_clean_shp is not None:
-                    describe.save_geopandas_tofile(gdfPoints,points_clean_shp)
+                    save_vector(gdfPoints, points_clean_shp)
                     points_remove_shp=None
                 
             else:
-                _ = processing.clean_trim_points(gdfPoints, gdfPtsCrs, self.processField(),
-                                                 output_csvfile=self.lneSaveCSVFile.text(), boundary_polyfile=filePoly,
-                                                 out_keep_shapefile=points_clean_shp,
-                                                 out_removed_shapefile=points_remove_shp,
-                                                 thin_dist_m=self.dsbThinDist.value(),
-                                                 remove_zeros=self.chkRemoveZero.isChecked(),
-                                                 stdevs=self.dsbStdCount.value(),
-                                                 iterative=self.chkIterate.isChecked())
+                _ = clean_trim_points(gdfPoints, gdfPtsCrs, self.processField(),
+                                      output_csvfile=self.lneSaveCSVFile.text(), boundary_polyfile=filePoly,
+                                      out_keep_shapefile=points_clean_shp,
+                                      out_removed_shapefile=points_remove_shp,
+                                      thin_dist_m=self.dsbThinDist.value(),
+                                      remove_zeros=self.chkRemoveZero.isChecked(),
+                                      stdevs=self.dsbStdCount.value(),
+                                      iterative=self.chkIterate.isChecked())
 
             if points_clean_shp is not None and points_clean_shp != '':
                 lyrFilter = addVectorFileToQGIS(points_clean_shp,
                                                 layer_name=os.path.basename(os.path.splitext(points_clean_shp)[0]),
                                                 atTop=True, group_layer_name=gp_layer_name)
 
-            if points_remove_shp is not None and points_remove_shp != '':
+            # the removed points file is not created when no points were removed.
+            if points_remove_shp is not None and points_remove_shp != '' and os.path.exists(points_remove_shp):
                 lyrRemoveFilter = addVectorFileToQGIS(points_remove_shp,
                                                       layer_name=os.path.basename(os.path.splitext(points_remove_shp)[0]),
                                                       atTop=True, group_layer_name=gp_layer_name)
@@ -1084,3 +1086,7 @@ class CleanTrimPointsDialog(QDialog, FORM_CLASS):
                                     exc_info=sys.exc_info())
 
             return False  # leave dialog open
+
+        finally:
+            # the intermediate files can now be removed by the workspace clean up
+            release_run_folder(runFolder)
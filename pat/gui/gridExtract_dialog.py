@@ -38,18 +38,23 @@ from util.custom_logging import errorCatcher, openLogPanel
 from util.qgis_common import save_as_dialog, file_in_use
 from util.settings import read_setting, write_setting
 
-from qgis.PyQt import QtGui, uic, QtCore, QtWidgets
+from qgis.PyQt import QtGui, QtCore, QtWidgets
 from qgis.PyQt.QtWidgets import QTableWidgetItem, QPushButton, QDialog, QApplication
 from qgis.core import QgsProject, QgsMapLayer, QgsMessageLog, QgsVectorFileWriter, QgsUnitTypes, QgsApplication, Qgis, \
     QgsMapLayerProxyModel
 from qgis.gui import QgsMessageBar
 
-from util.qgis_common import removeFileFromQGIS, copyLayerToMemory, addVectorFileToQGIS, get_layer_source
+from util.qgis_common import (removeFileFromQGIS, copyLayerToMemory, addVectorFileToQGIS, get_layer_source,
+                              get_layer_source_key)
 
-from pat.util.qgis_common import build_layer_table, get_pixel_size
+from util.qgis_common import build_layer_table, get_pixel_size
+from util.point_statistics import extract_pixel_statistics_for_points
+from util.result_cache import result_cache_key, fetch_cached_result, store_result
+from util.workspace import export_layer, get_intermediate_format
+from util.ui_forms import load_ui_form
 
-FORM_CLASS, _ = uic.loadUiType(os.path.join(
-    os.path.dirname(__file__), 'gridextract_dialog_base.ui'))
+FORM_CLASS, _ = load_ui_form(os.path.join(
+    os.path.dirname(__file__), 'gridExtract_dialog_base.ui'))
 
 LOGGER = logging.getLogger(LOGGER_NAME)
 LOGGER.addHandler(logging.NullHandler())  # logging.StreamHandler()  # Handle logging, no logging has been configured
@@ -473,31 +478,43 @@ class GridExtractDialog(QDialog, FORM_CLASS):
             LOGGER.info(settingsStr)
 
             layerPts = self.mcboPointsLayer.currentLayer()
+
+            # reuse the last result if the points, rasters and parameters haven't changed. Unsaved edits
+            # aren't in the layer file so a modified layer is never cached.
+            cacheParams = settingsStr + '\n' + layerPts.subsetString()
+            if self.chkUseSelected.isChecked():
+                cacheParams += '\n' + str(sorted(layerPts.selectedFeatureIds()))
+
+            cache_key = None
+            if not layerPts.isModified():
+                cache_key = result_cache_key(self.toolKey, cacheParams,
+                                             [get_layer_source_key(layerPts)] + rasterSource,
+                                             [self.lneSaveCSVFile.text()])
+            if fetch_cached_result(cache_key, [self.lneSaveCSVFile.text()]):
+                self.cleanMessageBars(True)
+                self.fraMain.setDisabled(False)
+
+                self.iface.mainWindow().statusBar().clearMessage()
+                self.iface.messageBar().popWidget()
+                QApplication.restoreOverrideCursor()
+                return super(GridExtractDialog, self).accept(*args, **kwargs)
+
             stepTime = time.time()
             if layerPts.providerType() == 'delimitedtext' or \
                     os.path.splitext(get_layer_source(layerPts))[-1] == '.vrt' or \
                     self.chkUseSelected.isChecked():
 
-                filePoints = os.path.join(TEMPDIR, "{}_GEpoints.shp".format(layerPts.name()))
-
+                fileName = "{}_GEpoints.shp".format(layerPts.name())
                 if self.chkUseSelected.isChecked():
-                    filePoints = os.path.join(TEMPDIR, "{}_selected_GEpoints.shp".format(layerPts.name()))
+                    fileName = "{}_selected_GEpoints.shp".format(layerPts.name())
 
-                if os.path.exists(filePoints):
-                    removeFileFromQGIS(filePoints)
-
-                ptsMemLayer = copyLayerToMemory(layerPts, layerPts.name() + "_memory", bAddUFI=True,
-                                                bOnlySelectedFeat=self.chkUseSelected.isChecked())
-
-                _writer = QgsVectorFileWriter.writeAsVectorFormat(ptsMemLayer, filePoints, "utf-8", layerPts.crs(),
-                                                                  driverName="ESRI Shapefile")
-                LOGGER.info('{:<30} {:<15} {}'.format('Save layer/selection to file',
-                                                      str(timedelta(seconds=time.time() - stepTime)), filePoints))
+                filePoints = export_layer(layerPts, fileName, only_selected=self.chkUseSelected.isChecked(),
+                                          prepare_layer=lambda: copyLayerToMemory(
+                                              layerPts, layerPts.name() + "_memory", bAddUFI=True,
+                                              bOnlySelectedFeat=self.chkUseSelected.isChecked(),
+                                              bEsriFieldNames=get_intermediate_format() == 'ESRI Shapefile'))
                 stepTime = time.time()
 
-                # reset field to match truncated field in the saved shapefile.
-                del ptsMemLayer, _writer
-
                 if self.DISP_TEMP_LAYERS:
                     addVectorFileToQGIS(filePoints, group_layer_name='DEBUG', atTop=True)
 
@@ -517,9 +534,10 @@ class GridExtractDialog(QDialog, FORM_CLASS):
                 sizeList = [1]
             sizeList.append(int(self.btgrpSize.checkedButton().text()[0]))
 
-            _ = processing.extract_pixel_statistics_for_points(gdfPoints, ptsDesc.crs, rasterSource,
-                                                               function_list=statsFunctions, size_list=sizeList,
-                                                               output_csvfile=self.lneSaveCSVFile.text())
+            _ = extract_pixel_statistics_for_points(gdfPoints, ptsDesc.crs, rasterSource,
+                                                    function_list=statsFunctions, size_list=sizeList,
+                                                    output_csvfile=self.lneSaveCSVFile.text())
+            store_result(cache_key, [self.lneSaveCSVFile.text()])
 
             self.cleanMessageBars(True)
             self.fraMain.setDisabled(False)
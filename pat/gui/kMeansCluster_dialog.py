@@ -41,12 +41,15 @@ from util.qgis_common import (save_as_dialog, file_in_use, removeFileFromQGIS, a
 from util.qgis_symbology import raster_apply_unique_value_renderer, RASTER_SYMBOLOGY
 from util.settings import read_setting, write_setting
 
-from qgis.PyQt import QtGui, uic, QtCore, QtWidgets
+from qgis.PyQt import QtGui, QtCore, QtWidgets
 from qgis.PyQt.QtWidgets import QTableWidgetItem, QPushButton, QDialog, QApplication
 
 from qgis.core import QgsProject, QgsMapLayer, QgsMessageLog, QgsUnitTypes, QgsApplication, Qgis, QgsMapLayerProxyModel
 from qgis.gui import QgsMessageBar
-FORM_CLASS, _ = uic.loadUiType(os.path.join(os.path.dirname(__file__), 'kMeansCluster_dialog_base.ui'))
+from util.kmeans import kmeans_clustering
+from util.result_cache import result_cache_key, fetch_cached_result, store_result
+from util.ui_forms import load_ui_form
+FORM_CLASS, _ = load_ui_form(os.path.join(os.path.dirname(__file__), 'kMeansCluster_dialog_base.ui'))
 
 LOGGER = logging.getLogger(LOGGER_NAME)
 LOGGER.addHandler(logging.NullHandler())  # logging.StreamHandler()  # Handle logging, no logging has been configured
@@ -321,6 +324,15 @@ class KMeansClusterDialog(QDialog, FORM_CLASS):
                 else:
                     errorList.append(self.tr('No raster layers to process. Please add a RASTER layer into QGIS'))
 
+            if self.chkEvaluate.isChecked() and self.spnClusters.value() < 3:
+                self.lblNoClusters.setStyleSheet('color:red')
+                errorList.append(self.tr('Please set the number of clusters to 3 or more to evaluate'))
+            elif self.spnClusters.value() < 2:
+                self.lblNoClusters.setStyleSheet('color:red')
+                errorList.append(self.tr('Please set the number of clusters to 2 or more'))
+            else:
+                self.lblNoClusters.setStyleSheet('color:black')
+
             if self.lneSaveFile.text() == '':
                 self.lneSaveFile.setStyleSheet('color:red')
                 self.lblSaveFile.setStyleSheet('color:red')
@@ -387,11 +399,32 @@ class KMeansClusterDialog(QDialog, FORM_CLASS):
                 settingsStr += '\n\t\t' + '\n\t\t'.join(rasterLyrNames)
 
             settingsStr += '\n    {:20}\t{}'.format('Number of Clusters ', self.spnClusters.value())
+            settingsStr += '\n    {:20}\t{}'.format('Sample Size ', self.spnSampleSize.text())
+            settingsStr += '\n    {:20}\t{}'.format('Evaluate 2 to n ', self.chkEvaluate.isChecked())
             settingsStr += '\n    {:20}\t{}\n'.format('Output TIFF File:', self.lneSaveFile.text())
 
             LOGGER.info(settingsStr)
-            _ = processing.kmeans_clustering(rasterSource, self.lneSaveFile.text(), self.spnClusters.value())
+            if self.chkEvaluate.isChecked():
+                n_clusters = list(range(2, self.spnClusters.value() + 1))
+            else:
+                n_clusters = self.spnClusters.value()
+
             csv_file = self.lneSaveFile.text().replace('.tif', '_statistics.csv')
+            eval_file = self.lneSaveFile.text().replace('.tif', '_cluster_evaluation.csv')
+            out_files = [self.lneSaveFile.text(), csv_file]
+            if self.chkEvaluate.isChecked():
+                out_files.append(eval_file)
+
+            # reuse the last result if the rasters and parameters haven't changed.
+            cache_key = result_cache_key(self.toolKey, settingsStr, rasterSource, out_files)
+            if not fetch_cached_result(cache_key, out_files):
+                _ = kmeans_clustering(rasterSource, self.lneSaveFile.text(), n_clusters,
+                                      sample_size=self.spnSampleSize.value())
+                store_result(cache_key, out_files)
+
+            if self.chkEvaluate.isChecked():
+                addVectorFileToQGIS(eval_file, os.path.basename(eval_file), atTop=True)
+
             vect_layer = addVectorFileToQGIS(csv_file, os.path.basename(csv_file), atTop=True)
 
             raster_sym = RASTER_SYMBOLOGY['Zones']
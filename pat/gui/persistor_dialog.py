@@ -34,11 +34,10 @@ from pat import LOGGER_NAME, PLUGIN_NAME, TEMPDIR
 from util.custom_logging import errorCatcher, openLogPanel
 from util.qgis_common import save_as_dialog, file_in_use
 from util.settings import read_setting, write_setting
-from qgis.PyQt import QtGui, uic, QtCore, QtWidgets
+from qgis.PyQt import QtGui, QtCore, QtWidgets
 from qgis.PyQt.QtWidgets import QTableWidgetItem, QPushButton, QApplication, QDialog
 
 from pyprecag import config
-from pyprecag.processing import persistor_target_probability, persistor_all_years
 
 from qgis.core import QgsProject, QgsMapLayer, QgsMessageLog, QgsVectorFileWriter, \
     QgsUnitTypes, Qgis, QgsApplication, QgsMapLayerProxyModel
@@ -47,9 +46,11 @@ from qgis.gui import QgsMessageBar
 from util.qgis_common import removeFileFromQGIS, copyLayerToMemory, addRasterFileToQGIS
 import util.qgis_symbology as rs
 
-from pat.util.qgis_common import build_layer_table, get_pixel_size
+from util.qgis_common import build_layer_table, get_pixel_size
+from util.persistor import persistor_target_probability, persistor_all_years
+from util.ui_forms import load_ui_form
 
-FORM_CLASS, _ = uic.loadUiType(os.path.join(os.path.dirname(__file__), 'persistor_dialog_base.ui'))
+FORM_CLASS, _ = load_ui_form(os.path.join(os.path.dirname(__file__), 'persistor_dialog_base.ui'))
 
 LOGGER = logging.getLogger(LOGGER_NAME)
 LOGGER.addHandler(logging.NullHandler())
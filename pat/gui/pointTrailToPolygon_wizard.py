@@ -45,10 +45,10 @@ import pandas as pd
 
 from pat import LOGGER_NAME, PLUGIN_NAME, TEMPDIR
 
-from pyprecag import processing, describe, crs as pyprecag_crs, convert, config, LOGGER
+from pyprecag import describe, crs as pyprecag_crs, convert, config, LOGGER
 from pyprecag.describe import predictCoordinateColumnNames
 
-from qgis.PyQt import uic, QtGui, QtCore, QtWidgets
+from qgis.PyQt import QtGui, QtCore, QtWidgets
 from qgis.PyQt.QtWidgets import (QDialog, QSpinBox, QHeaderView, QTableView, QPushButton, QFrame, QFileDialog,
                                  QApplication, QDialogButtonBox)
 
@@ -59,10 +59,15 @@ from qgis.gui import QgsMessageBar, QgsProjectionSelectionWidget
 from util.qgis_common import (copyLayerToMemory, removeFileFromQGIS, addVectorFileToQGIS, save_as_dialog,
                               file_in_use, get_UTM_Coordinate_System, get_layer_source)
 from util.settings import read_setting, write_setting
+from util.qgis_crs import get_epsg
+from util.point_trail import create_polygon_from_point_trail
 
 from util.custom_logging import errorCatcher, openLogPanel
 
 from util.qgis_symbology import vector_apply_unique_value_renderer
+from util.workspace import export_layer, get_intermediate_format, new_run_folder, release_run_folder
+from util.vector_formats import change_vector_format, save_vector, vector_file_filter
+from util.ui_forms import load_ui_form
 
 
 class PandasModel(QtCore.QAbstractTableModel):
@@ -105,7 +110,7 @@ class PandasModel(QtCore.QAbstractTableModel):
         return None
 
 
-FORM_CLASS, _ = uic.loadUiType(os.path.join(os.path.dirname(__file__), 'pointTrailToPolygon_wizard_base.ui'))
+FORM_CLASS, _ = load_ui_form(os.path.join(os.path.dirname(__file__), 'pointTrailToPolygon_wizard_base.ui'))
 
 
 class PointTrailToPolygonDialog(QDialog, FORM_CLASS):
@@ -405,14 +410,14 @@ class PointTrailToPolygonDialog(QDialog, FORM_CLASS):
 
 
         # add the chosen field name to the filename
-        filename = '{}_polygon.shp'.format(filename)
+        filename = '{}_polygon.gpkg'.format(filename)
 
         # replace more than one instance of underscore with a single one.
         # ie'file____norm__control___yield_h__' to 'file_norm_control_yield_h_'
         filename = re.sub(r"_+", "_", filename)
 
         s = save_as_dialog(self, self.tr("Save Polygon As"),
-                           self.tr("ESRI Shapefile") + " (*.shp);;",
+                           vector_file_filter(),
                            default_name=os.path.join(lastFolder, filename))
 
         if s == '' or s is None:
@@ -439,18 +444,18 @@ class PointTrailToPolygonDialog(QDialog, FORM_CLASS):
         if self.lneSaveCSVFile.text() == '':
             if self.optLayer.isChecked():
                 lyrTarget = self.mcboTargetLayer.currentLayer()
-                filename = lyrTarget.name() + '_points.shp'
+                filename = lyrTarget.name() + '_points.gpkg'
             else:
-                filename = os.path.splitext(self.lneInCSVFile.text())[0] + '_points.shp'
+                filename = os.path.splitext(self.lneInCSVFile.text())[0] + '_points.gpkg'
         else:
-            filename = os.path.splitext(self.lneInCSVFile.text())[0] + '_points.shp'
+            filename = os.path.splitext(self.lneInCSVFile.text())[0] + '_points.gpkg'
 
         # replace more than one instance of underscore with a single one.
         # ie'file____norm__control___yield_h__' to 'file_norm_control_yield_h_'
         filename = re.sub(r"_+", "_", filename)
 
         s = save_as_dialog(self, self.tr("Save As"),
-                           self.tr("ESRI Shapefile") + " (*.shp);;",
+                           vector_file_filter(),
                            default_name=os.path.join(lastFolder, filename))
 
         if s == '' or s is None:
@@ -630,14 +635,14 @@ class PointTrailToPolygonDialog(QDialog, FORM_CLASS):
                     else:
                         self.lblYField.setStyleSheet('color:black')
 
-                    if self.qgsCRScsv.crs().isValid():
+                    if get_epsg(self.qgsCRScsv.crs()) is not None:
                         self.lblInCRSTitle.setStyleSheet('color:black')
                     else:
                         self.lblInCRSTitle.setStyleSheet('color:red')
                         errorList.append(self.tr("Select coordinate system for geometry fields"))
 
             if widget_page == 'pgeOutput' or widget_idx == self.stackedWidget.count() :
-                if self.mCRSoutput.crs().isValid():
+                if get_epsg(self.mCRSoutput.crs()) is not None:
                     if self.mCRSoutput.crs().isGeographic():
                         self.lblOutCRSTitle.setStyleSheet('color:red')
                         self.mCRSoutput.setStyleSheet('color:red')
@@ -700,6 +705,7 @@ class PointTrailToPolygonDialog(QDialog, FORM_CLASS):
         if not self.validate():
             return False
 
+        runFolder = None
         try:
             # disable form via a frame, this will still allow interaction with the message bar
             self.stackedWidget.setDisabled(True)
@@ -741,26 +747,29 @@ class PointTrailToPolygonDialog(QDialog, FORM_CLASS):
             settingsStr += '\n    {:30}\t{} {}'.format("Buffer Distance:", self.dsbBufferDist.value(),crs_units)
             settingsStr += '\n    {:30}\t{} {}'.format("Shrink Distance:", self.dsbShrinkDist.value(),crs_units)
 
-            settingsStr += '\n    {:30}\t{}'.format('Output Polygon Shapefile:', self.lneSavePolyFile.text())
+            settingsStr += '\n    {:30}\t{}'.format('Output Polygon File:', self.lneSavePolyFile.text())
 
             if self.lneSavePointsFile.text() == '':
-                settingsStr += '\n    {:30}\t{}'.format('Saved Points Shapefile:', self.lneSavePointsFile.text())
+                settingsStr += '\n    {:30}\t{}'.format('Saved Points File:', self.lneSavePointsFile.text())
 
             settingsStr += '\n    {:30}\t{} - {}\n\n'.format('Output Projected Coordinate System:',
                                                               self.mCRSoutput.crs().authid(),
                                                               self.mCRSoutput.crs().description())
 
             LOGGER.info(settingsStr)
+
+            # scratch folder for the intermediate files of this run
+            runFolder = new_run_folder(self.toolKey)
             stepTime = time.time()
 
             if self.optFile.isChecked():
-                in_epsg = int(self.qgsCRScsv.crs().authid().replace('EPSG:',''))
+                in_epsg = get_epsg(self.qgsCRScsv.crs())
                 in_crs = self.qgsCRScsv.crs()
             else:
-                in_epsg =self.mcboTargetLayer.currentLayer().crs().authid().replace('EPSG:','')
+                in_epsg = get_epsg(self.mcboTargetLayer.currentLayer().crs())
                 in_crs = self.mcboTargetLayer.currentLayer().crs()
 
-            out_epsg = int(self.mCRSoutput.crs().authid().replace('EPSG:',''))
+            out_epsg = get_epsg(self.mCRSoutput.crs())
 
             filePoly = None
 
@@ -769,10 +778,12 @@ class PointTrailToPolygonDialog(QDialog, FORM_CLASS):
 
             if self.optFile.isChecked():
                 if self.DEBUG:
-                    filePoints = os.path.join(TEMPDIR, os.path.splitext(os.path.basename(self.lneSavePolyFile.text()))[0] + '_table2pts.shp')
+                    filePoints = os.path.join(runFolder, change_vector_format(
+                        os.path.splitext(os.path.basename(self.lneSavePolyFile.text()))[0] + '_table2pts',
+                        get_intermediate_format()))
 
                 if os.path.splitext(self.lneInCSVFile.text())[-1] == '.csv':
-                    gdfPoints, gdfPtsCrs = convert.convert_csv_to_points(self.lneInCSVFile.text() , out_shapefilename=filePoints,
+                    gdfPoints, gdfPtsCrs = convert.convert_csv_to_points(self.lneInCSVFile.text(),
                                                                          coord_columns=[self.cboXField.currentText(),
                                                                                         self.cboYField.currentText()],
                                                                          coord_columns_epsg=in_epsg)
@@ -794,7 +805,7 @@ class PointTrailToPolygonDialog(QDialog, FORM_CLASS):
                 stepTime = time.time()
                 
                 if filePoints is not None:
-                    describe.save_geopandas_tofile(gdfPoints, filePoints) #, file_encoding=self.file_encoding)
+                    save_vector(gdfPoints, filePoints)
 
                 if self.DISP_TEMP_LAYERS and filePoints is not None:
                     addVectorFileToQGIS(filePoints, layer_name=os.path.splitext(os.path.basename(filePoints))[0],
@@ -807,26 +818,18 @@ class PointTrailToPolygonDialog(QDialog, FORM_CLASS):
                         os.path.splitext(get_layer_source(layerPts))[-1] == '.vrt' or \
                         self.chkUseSelected.isChecked() or self.optFile.isChecked():
 
-                    filePoints = os.path.join(TEMPDIR, "{}_points.shp".format(layerPts.name()))
-
+                    fileName = "{}_points.shp".format(layerPts.name())
                     if self.chkUseSelected.isChecked():
-                        filePoints = os.path.join(TEMPDIR, "{}_selected_points.shp".format(layerPts.name()))
-
-                    if os.path.exists(filePoints):
-                        removeFileFromQGIS(filePoints)
-
-                    ptsLayer = copyLayerToMemory(layerPts, layerPts.name() + "_memory", bAddUFI=True,
-                                                 bOnlySelectedFeat=self.chkUseSelected.isChecked())
-
-                    _writer = QgsVectorFileWriter.writeAsVectorFormat(ptsLayer, filePoints, "utf-8",
-                                                                      self.mCRSoutput.crs(), driverName="ESRI Shapefile")
-
-                    LOGGER.info('{:<30} {d:<15} {}'.format('Save layer/selection to file',filePoints,
-                                                          d=str(timedelta(seconds=time.time() - stepTime) )))
+                        fileName = "{}_selected_points.shp".format(layerPts.name())
+
+                    filePoints = export_layer(layerPts, fileName, crs=self.mCRSoutput.crs(),
+                                              only_selected=self.chkUseSelected.isChecked(),
+                                              prepare_layer=lambda: copyLayerToMemory(
+                                                  layerPts, layerPts.name() + "_memory", bAddUFI=True,
+                                                  bOnlySelectedFeat=self.chkUseSelected.isChecked(),
+                                                  bEsriFieldNames=get_intermediate_format() == 'ESRI Shapefile'))
                     stepTime = time.time()
 
-                    del ptsLayer
-
                     if self.DISP_TEMP_LAYERS:
                         addVectorFileToQGIS(filePoints, layer_name=os.path.splitext(os.path.basename(filePoints))[0],
                                             group_layer_name='DEBUG', atTop=True)
@@ -850,10 +853,12 @@ class PointTrailToPolygonDialog(QDialog, FORM_CLASS):
                                                              d=str(timedelta(seconds=time.time() - stepTime))))
 
                 if self.DEBUG:
-                    filePoints = os.path.join(TEMPDIR, os.path.basename(self.lneSavePolyFile.text().replace('.csv', '_ptsprj.shp')))
+                    filePoints = os.path.join(runFolder, change_vector_format(
+                        os.path.splitext(os.path.basename(self.lneSavePolyFile.text()))[0] + '_ptsprj',
+                        get_intermediate_format()))
 
                     removeFileFromQGIS(filePoints)
-                    describe.save_geopandas_tofile(gdfPoints, filePoints)
+                    save_vector(gdfPoints, filePoints)
                     if self.DISP_TEMP_LAYERS:
                         if self.DEBUG:
                             addVectorFileToQGIS(filePoints,
@@ -864,12 +869,12 @@ class PointTrailToPolygonDialog(QDialog, FORM_CLASS):
                                                 layer_name=os.path.splitext(os.path.basename(filePoints))[0],
                                                 atTop=True)
             stepTime = time.time()
-            result = processing.create_polygon_from_point_trail(gdfPoints, gdfPtsCrs,
-                                                                out_filename=self.lneSavePolyFile.text(),
-                                                                thin_dist_m=self.dsbThinDist.value(),
-                                                                aggregate_dist_m=self.dsbAggregateDist.value(),
-                                                                buffer_dist_m=self.dsbBufferDist.value(),
-                                                                shrink_dist_m=self.dsbShrinkDist.value())
+            result = create_polygon_from_point_trail(gdfPoints, gdfPtsCrs,
+                                                     out_filename=self.lneSavePolyFile.text(),
+                                                     thin_dist_m=self.dsbThinDist.value(),
+                                                     aggregate_dist_m=self.dsbAggregateDist.value(),
+                                                     buffer_dist_m=self.dsbBufferDist.value(),
+                                                     shrink_dist_m=self.dsbShrinkDist.value())
 
             addVectorFileToQGIS(self.lneSavePolyFile.text(), atTop=True)
 
@@ -879,7 +884,7 @@ class PointTrailToPolygonDialog(QDialog, FORM_CLASS):
             self.iface.messageBar().popWidget()
             self.iface.mainWindow().statusBar().clearMessage()
 
-            if result is not None:
+            if isinstance(result, str):
                 self.fraMain.setDisabled(False)
                 self.send_to_messagebar(result, level=Qgis.Warning, duration=0, addToLog=False)
                 return False  # leave dialog open
@@ -897,3 +902,7 @@ class PointTrailToPolygonDialog(QDialog, FORM_CLASS):
                                     exc_info=sys.exc_info())
 
             return False  # leave dialog open
+
+        finally:
+            # the intermediate files can now be removed by the workspace clean up
+            release_run_folder(runFolder)
@@ -32,7 +32,7 @@ import traceback
 from qgis.PyQt.QtWidgets import QPushButton, QDialog, QApplication, QFileDialog
 
 from pat import LOGGER_NAME, PLUGIN_NAME, TEMPDIR, PLUGIN_SHORT
-from qgis.PyQt import QtCore, QtGui, uic, QtWidgets
+from qgis.PyQt import QtCore, QtGui, QtWidgets
 from qgis.core import QgsMessageLog, QgsCoordinateReferenceSystem, QgsApplication, Qgis
 from qgis.gui import QgsMessageBar
 
@@ -41,13 +41,16 @@ from pyprecag.kriging_ops import vesper_text_to_raster
 from util.custom_logging import errorCatcher, openLogPanel
 from util.qgis_common import removeFileFromQGIS, addRasterFileToQGIS
 from util.settings import read_setting, write_setting
-from pat.util.qgis_symbology import RASTER_SYMBOLOGY,\
+from util.qgis_crs import get_epsg
+from pat.util.raster_windows import optimise_geotiff
+from util.qgis_symbology import RASTER_SYMBOLOGY,\
     raster_apply_classified_renderer
+from util.ui_forms import load_ui_form
 
 LOGGER = logging.getLogger(LOGGER_NAME)
 LOGGER.addHandler(logging.NullHandler())  # logging.StreamHandler()
 
-FORM_CLASS, _ = uic.loadUiType(os.path.join(
+FORM_CLASS, _ = load_ui_form(os.path.join(
     os.path.dirname(__file__), 'postVesper_dialog_base.ui'))
 
 
@@ -215,9 +218,9 @@ class PostVesperDialog(QDialog, FORM_CLASS):
             else:
                 self.lblInVesperCtrlFile.setStyleSheet('color:black')
 
-            if self.vesper_qgscrs is None or not self.vesper_qgscrs.isValid():
+            if self.vesper_qgscrs is None or get_epsg(self.vesper_qgscrs) is None:
                 self.lblInCRSTitle.setStyleSheet('color:red')
-                errorList.append(self.tr("Select a valid coordinate system"))
+                errorList.append(self.tr("Select a valid EPSG coordinate system"))
             else:
                 self.lblInCRSTitle.setStyleSheet('color:black')
                 
@@ -257,18 +260,22 @@ class PostVesperDialog(QDialog, FORM_CLASS):
             if self.chkRunVesper.isChecked():
                 # if epsg is in the vesp queue, then run vesper to raster
                 if self.vesper_qgscrs is not None:
-                    epsg = int(self.vesper_qgscrs.authid().replace('EPSG:', ''))
+                    epsg = get_epsg(self.vesper_qgscrs)
 
                 self.vesp_dict = {'control_file': self.lneInVesperCtrlFile.text(), 'epsg': epsg}
 
             else:
                 out_PredTif, out_SETif, out_CITxt = vesper_text_to_raster(self.lneInVesperCtrlFile.text(),
-                                                                          int(self.vesper_qgscrs.authid().replace(
-                                                                              'EPSG:', '')))
+                                                                          get_epsg(self.vesper_qgscrs))
 
                 raster_sym = RASTER_SYMBOLOGY['Yield']
 
                 removeFileFromQGIS(out_PredTif)
+                removeFileFromQGIS(out_SETif)
+                for ea_tif in [out_PredTif, out_SETif]:
+                    # the unoptimised TIFF is still valid so continue loading it.
+                    optimise_geotiff(ea_tif, raise_errors=False)
+
                 rasterLyr = addRasterFileToQGIS(out_PredTif, atTop=False)
                 raster_apply_classified_renderer(rasterLyr,
                                 rend_type=raster_sym['type'],
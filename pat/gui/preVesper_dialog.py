@@ -32,7 +32,7 @@ import pandas as pd
 from shapely.geometry import box
 from unidecode import unidecode
 
-from qgis.PyQt import QtCore, QtGui, QtWidgets, uic
+from qgis.PyQt import QtCore, QtGui, QtWidgets
 from qgis.PyQt.QtWidgets import QMessageBox, QPushButton, QApplication, QFileDialog, QDialog
 from qgis.PyQt.QtGui import QIntValidator
 
@@ -41,18 +41,23 @@ from qgis.core import QgsCoordinateReferenceSystem, QgsApplication, QgsMessageLo
 
 from pat import LOGGER_NAME, PLUGIN_NAME, TEMPDIR
 from pyprecag import describe, config
-from pyprecag.kriging_ops import prepare_for_vesper_krige, VesperControl
+from pyprecag.kriging_ops import VesperControl
 from pyprecag.describe import predictCoordinateColumnNames
 
 from util.check_dependencies import check_vesper_dependency
 from util.custom_logging import errorCatcher, openLogPanel
 from util.settings import read_setting, write_setting
 from util.qgis_common import check_for_overlap
+from util.qgis_crs import get_epsg
+from util.file_extents import csv_extent, vesper_grid_extent
+from util.vesper_prepare import (EPSG_COLUMNS, count_vesper_data_rows, get_vesper_data_columns,
+                                 prepare_for_vesper_krige)
+from util.ui_forms import load_ui_form
 
 LOGGER = logging.getLogger(LOGGER_NAME)
 LOGGER.addHandler(logging.NullHandler())
 
-FORM_CLASS, _ = uic.loadUiType(os.path.join(os.path.dirname(__file__), 'preVesper_dialog_base.ui'))
+FORM_CLASS, _ = load_ui_form(os.path.join(os.path.dirname(__file__), 'preVesper_dialog_base.ui'))
 
 
 class PreVesperDialog(QDialog, FORM_CLASS):
@@ -227,12 +232,34 @@ class PreVesperDialog(QDialog, FORM_CLASS):
             ctrl_name = re.sub(r"_+", "_", ctrl_name)
             self.lneCtrlFile.setText(ctrl_name + '.txt')
 
+    def vesper_point_count(self):
+        """ Count the points written to the VESPER data file. ie rows with coordinates, a value in any EPSG
+        column and a value in the krig column.
+
+        Only part of the file is opened, so the count comes from a scan of the file.
+        """
+        csv_file = self.lneInCSVFile.text()
+        csv_columns = pd.read_csv(csv_file, nrows=0).columns
+        value_columns = [col for col in csv_columns if col in EPSG_COLUMNS]
+        if self.cboKrigColumn.currentText() != '':
+            value_columns.append(self.cboKrigColumn.currentText())
+        return csv_extent(csv_file, value_columns).count
+
+    def updateMinPoints(self):
+        if self.dfCSV is None or 'Low Density Kriging' not in self.cboMethod.currentText():
+            return
+
+        point_count = self.vesper_point_count()
+        self.lblRowCount.setText("The maximum number of points is {}.".format(point_count))
+        self.lneMinPoint.setText(str(point_count - 2))
+
     @QtCore.pyqtSlot(int)
     def on_cboKrigColumn_currentIndexChanged(self, index):
         if self.cboKrigColumn.currentText() != '':
             self.lblKrigColumn.setStyleSheet('color:black')
         if self.chkAutoCtrlFileName.isChecked():
             self.updateCtrlFileName()
+        self.updateMinPoints()
 
     @QtCore.pyqtSlot(name='on_cmdInCSVFile_clicked')
     def on_cmdInCSVFile_clicked(self):
@@ -446,11 +473,7 @@ class PreVesperDialog(QDialog, FORM_CLASS):
                 self, 'Cannot Krige', 'Kriging is not advised for less than 100 points')
 
         if 'Low Density Kriging' in self.cboMethod.currentText():
-            if len(self.dfCSV) <= 150:  # only partial file opened so open it all
-                descCSV = describe.CsvDescribe(self.lneInCSVFile.text())
-                self.dfCSV = descCSV.open_pandas_dataframe()
-            self.lblRowCount.setText("The maximum number of points is {}.".format(len(self.dfCSV)))
-            self.lneMinPoint.setText(str(len(self.dfCSV) - 2))
+            self.updateMinPoints()
         else:
             self.lneMinPoint.clear()
             self.lblRowCount.setText('')
@@ -494,6 +517,9 @@ class PreVesperDialog(QDialog, FORM_CLASS):
         """ validate the csv and grid files and check for overlap assuming that they are
         of the same coordinate system if True then message will be blank else a message
         will be generated
+
+        Only the coordinates are read and the extents are cached, so choosing the same file again
+        does not read it again.
         """
 
         overlaps = False
@@ -503,10 +529,7 @@ class PreVesperDialog(QDialog, FORM_CLASS):
                 return False, 'CSV file does not exist'
             else:
                 try:
-                    df_csv = pd.read_csv(csv_file)
-                    csvX, csvY = predictCoordinateColumnNames(df_csv.columns)
-                    csv_bbox = box(df_csv[csvX].min(), df_csv[csvY].min(),
-                                   df_csv[csvX].max(), df_csv[csvY].max())
+                    csv_bbox = box(*csv_extent(csv_file).bounds)
 
                 except Exception as err:
                     self.lblInCSVFile.setStyleSheet('color:red')
@@ -518,12 +541,7 @@ class PreVesperDialog(QDialog, FORM_CLASS):
                 return False, 'Grid file does not exist'
             else:
                 try:
-                    df_grid = pd.read_table(grid_file, names=['X', 'Y'],
-                                            delimiter=' ', skipinitialspace=True)
-
-                    grid_bbox = box(df_grid['X'].min(), df_grid['Y'].min(),
-                                    df_grid['X'].max(), df_grid['Y'].max())
-
+                    grid_bbox = box(*vesper_grid_extent(grid_file).bounds)
 
                 except Exception as err:
                     self.lblInGridFile.setStyleSheet('color:red')
@@ -597,9 +615,9 @@ class PreVesperDialog(QDialog, FORM_CLASS):
                 self.lblInGridFile.setStyleSheet('color:black')
                 self.lneInGridFile.setStyleSheet('color:black')
 
-            if not self.mCRSinput.crs().isValid():
+            if get_epsg(self.mCRSinput.crs()) is None:
                 self.lblInCRS.setStyleSheet('color:red;background:transparent;')
-                errorList.append(self.tr("Select a valid coordinate system"))
+                errorList.append(self.tr("Select a valid EPSG coordinate system"))
             else:
                 self.lblInCRS.setStyleSheet('color:black;background:transparent;')
 
@@ -630,7 +648,7 @@ class PreVesperDialog(QDialog, FORM_CLASS):
                     self.lblVariogramFile.setStyleSheet('color:black')
                     self.lneVariogramFile.setStyleSheet('color:black')
 
-                if int(self.lneMinPoint.text()) >= len(self.dfCSV):
+                if int(self.lneMinPoint.text()) >= self.vesper_point_count():
                     self.lneMinPoint.setStyleSheet('color:red')
                     self.lneMinPoint.setStyleSheet('color:red')
                     errorList.append(
@@ -728,8 +746,16 @@ class PreVesperDialog(QDialog, FORM_CLASS):
 
             LOGGER.info(settingsStr)
 
-            # get a fresh dataframe for the input csv file
-            self.dfCSV = pd.read_csv(self.lneInCSVFile.text())
+            # get a fresh dataframe for the input csv file reading only the columns written to the VESPER data file
+            coord_columns = csv_extent(self.lneInCSVFile.text()).coord_columns
+            csv_columns = pd.read_csv(self.lneInCSVFile.text(), nrows=0).columns
+            use_columns = ([col for col in csv_columns if col in EPSG_COLUMNS] + coord_columns +
+                           [self.cboKrigColumn.currentText()])
+            self.dfCSV = pd.read_csv(self.lneInCSVFile.text(), usecols=use_columns, engine='c')
+
+            # maxpts is the number of rows written to the data file, not the number of rows read
+            data_columns = get_vesper_data_columns(self.dfCSV, coord_columns, self.cboKrigColumn.currentText())
+            point_count = count_vesper_data_rows(self.dfCSV, data_columns)
 
             vc = VesperControl()
 
@@ -747,23 +773,23 @@ class PreVesperDialog(QDialog, FORM_CLASS):
                 vc.update({'jpntkrg': 1,
                            'jlockrg': 0,
                            'minpts': int(self.lneMinPoint.text()),
-                           'maxpts': len(self.dfCSV),
+                           'maxpts': point_count,
                            'jcomvar': 0,
                            })
-            epsg = int(self.mCRSinput.crs().authid().replace('EPSG:', ''))
+            epsg = get_epsg(self.mCRSinput.crs())
             bat_file, ctrl_file = prepare_for_vesper_krige(self.dfCSV,
                                                            self.cboKrigColumn.currentText(),
                                                            self.lneInGridFile.text(),
                                                            self.lneVesperFold.text(),
                                                            control_textfile=self.lneCtrlFile.text(),
-                                                           coord_columns=[],
+                                                           coord_columns=coord_columns,
                                                            epsg=epsg,
                                                            display_graphics=self.chkDisplayGraphics.isChecked(),
                                                            control_options=vc)
 
             epsg = 0
             if self.mCRSinput.crs() is not None and self.chkVesper2Raster.isChecked():
-                epsg = int(self.mCRSinput.crs().authid().replace('EPSG:', ''))
+                epsg = get_epsg(self.mCRSinput.crs())
 
             if self.gbRunVesper.isChecked():
                 # Add to vesper queue
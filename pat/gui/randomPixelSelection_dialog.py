@@ -27,20 +27,21 @@ import os
 import sys
 import traceback
 
-import rasterio
 from pat import LOGGER_NAME, PLUGIN_NAME, TEMPDIR, PLUGIN_SHORT
-from qgis.PyQt import QtGui, uic, QtCore, QtWidgets
+from qgis.PyQt import QtGui, QtCore, QtWidgets
 from qgis.PyQt.QtWidgets import QDockWidget, QTabWidget, QPushButton, QApplication, QDialog
 
 from qgis.core import QgsMessageLog, Qgis, QgsApplication, QgsMapLayerProxyModel
 from qgis.gui import QgsMessageBar
 
-from pyprecag import processing, crs as pyprecag_crs
+from pyprecag import crs as pyprecag_crs
 from util.custom_logging import errorCatcher, openLogPanel
 from util.qgis_common import removeFileFromQGIS, save_as_dialog, addVectorFileToQGIS, get_layer_source
+from util.pixel_sampling import random_pixel_selection
 from util.settings import read_setting, write_setting
+from util.ui_forms import load_ui_form
 
-FORM_CLASS, _ = uic.loadUiType(os.path.join(os.path.dirname(__file__), 'randomPixelSelection_dialog_base.ui'))
+FORM_CLASS, _ = load_ui_form(os.path.join(os.path.dirname(__file__), 'randomPixelSelection_dialog_base.ui'))
 
 LOGGER = logging.getLogger(LOGGER_NAME)
 LOGGER.addHandler(logging.NullHandler())  # logging.StreamHandler()  # Handle logging, no logging has been configured
@@ -186,7 +187,7 @@ class RandomPixelSelectionDialog(QDialog, FORM_CLASS):
         filename = re.sub(r"_+", "_", filename)
 
         s = save_as_dialog(self, self.tr("Save As"),
-                         self.tr("ESRI Shapefile") + " (*.shp);;",
+                         self.tr("ESRI Shapefile") + " (*.shp);;" + self.tr("GeoPackage") + " (*.gpkg);;",
                          default_name=os.path.join(lastFolder, filename))
 
         if s == '' or s is None:
@@ -257,8 +258,7 @@ class RandomPixelSelectionDialog(QDialog, FORM_CLASS):
             if rasterCRS.epsg is None:
                 rasterCRS.getFromEPSG(lyrTarget.crs().authid())
 
-            with rasterio.open(os.path.normpath(raster_file)) as src:
-                processing.random_pixel_selection(src, rasterCRS, int(self.dsbSize.value()), self.lneSaveFile.text())
+            random_pixel_selection(raster_file, rasterCRS, int(self.dsbSize.value()), self.lneSaveFile.text())
 
             lyrPts = addVectorFileToQGIS(self.lneSaveFile.text(), atTop=True,
                                          layer_name=os.path.splitext(os.path.basename(self.lneSaveFile.text()))[0])
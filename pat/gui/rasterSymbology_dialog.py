@@ -29,7 +29,7 @@ import sys
 import traceback
 from collections import OrderedDict
 
-from qgis.PyQt import QtGui, uic, QtCore, QtWidgets
+from qgis.PyQt import QtGui, QtCore, QtWidgets
 from qgis.PyQt.QtWidgets import QPushButton, QApplication, QDialog
 
 from qgis.core import QgsMessageLog, QgsStyle, QgsMapLayer, QgsApplication, QgsMapLayerProxyModel, Qgis
@@ -41,8 +41,9 @@ from util.custom_logging import errorCatcher, openLogPanel
 from util.qgis_common import removeFileFromQGIS, addRasterFileToQGIS, save_as_dialog
 from util.settings import read_setting, write_setting
 import util.qgis_symbology as rs
+from util.ui_forms import load_ui_form
 
-FORM_CLASS, _ = uic.loadUiType(os.path.join(
+FORM_CLASS, _ = load_ui_form(os.path.join(
     os.path.dirname(__file__), 'rasterSymbology_dialog_base.ui'))
 
 LOGGER = logging.getLogger(LOGGER_NAME)
@@ -30,22 +30,25 @@ import traceback
 from pat import LOGGER_NAME, PLUGIN_NAME, TEMPDIR
 from util.custom_logging import errorCatcher, openLogPanel
 from util.qgis_common import save_as_dialog, file_in_use, removeFileFromQGIS, \
-    copyLayerToMemory, addVectorFileToQGIS, addRasterFileToQGIS
+    copyLayerToMemory, addVectorFileToQGIS, addRasterFilesToQGIS
 from util.settings import read_setting, write_setting
+from util.qgis_crs import resolve_crs, get_epsg
 
 from pyprecag import config, crs
-from pyprecag.processing import resample_bands_to_block
+from util.block_processing import resample_bands_to_block
 
-from qgis.PyQt import QtGui, uic, QtCore, QtWidgets
+from qgis.PyQt import QtGui, QtCore, QtWidgets
 from qgis.PyQt.QtWidgets import QPushButton, QApplication, QDialog, QFileDialog
 
 from qgis.core import (QgsMapLayer, QgsMessageLog, QgsVectorFileWriter, QgsCoordinateReferenceSystem, QgsApplication,
                        Qgis, QgsMapLayerProxyModel)
 from qgis.gui import QgsMessageBar
 
-from pat.util.qgis_common import get_UTM_Coordinate_System, get_layer_source
+from util.qgis_common import get_UTM_Coordinate_System, get_layer_source
+from util.workspace import export_layer
+from util.ui_forms import load_ui_form
 
-FORM_CLASS, _ = uic.loadUiType(os.path.join(os.path.dirname(__file__), 'resampleImageToBlock_dialog_base.ui'))
+FORM_CLASS, _ = load_ui_form(os.path.join(os.path.dirname(__file__), 'resampleImageToBlock_dialog_base.ui'))
 
 LOGGER = logging.getLogger(LOGGER_NAME)
 LOGGER.addHandler(logging.NullHandler())  # logging.StreamHandler()  # Handle logging, no logging has been configured
@@ -119,6 +122,12 @@ class ResampleImageToBlockDialog(QDialog, FORM_CLASS):
                 if item.widget() is not None:
                     item.widget().deleteLater()
 
+    def block_progress(self, completed, n_blocks, block_name):
+        """ Show the progress of the block processing in the status bar."""
+        self.iface.mainWindow().statusBar().showMessage('Processing {} - completed block {} of {} ({})'.format(
+            self.windowTitle(), completed, n_blocks, block_name))
+        QApplication.processEvents()
+
     def send_to_messagebar(self, message, title='', level=Qgis.Info, duration=5, exc_info=None,
                            core_QGIS=False, addToLog=False, showLogPanel=False):
 
@@ -192,14 +201,9 @@ class ResampleImageToBlockDialog(QDialog, FORM_CLASS):
         self.cboBand.addItems(sorted(band_list))
         
         #set default coordinate system
-        rast_crs = layer.crs()
-        if rast_crs.authid()== '':
-            # Convert from the older style strings
-            rast_crs = QgsCoordinateReferenceSystem()
-            if not rast_crs.createFromProj(layer.crs().toWkt()):
-                rast_crs = layer.crs()
-        
-        
+        # Convert from the older style strings
+        rast_crs = resolve_crs(layer.crs())
+
         rast_crs = get_UTM_Coordinate_System(layer.extent().xMinimum(),
                                                    layer.extent().yMinimum(),
                                                    rast_crs.authid())
@@ -295,6 +299,9 @@ class ResampleImageToBlockDialog(QDialog, FORM_CLASS):
             if self.mcboRasterLayer.currentLayer() is None:
                 self.lblRasterLayer.setStyleSheet('color:red')
                 errorList.append(self.tr("Input image layer required."))
+            elif get_epsg(self.mcboRasterLayer.currentLayer().crs()) is None:
+                self.lblRasterLayer.setStyleSheet('color:red')
+                errorList.append(self.tr("Please assign a coordinate system to the image layer."))
             else:
                 self.lblRasterLayer.setStyleSheet('color:black')
 
@@ -317,7 +324,7 @@ class ResampleImageToBlockDialog(QDialog, FORM_CLASS):
                 self.lblNoDataVal.setStyleSheet("color:red")
                 errorList.append(self.tr('The raster nodata value must be numeric'))
 
-            if self.mCRSoutput.crs().authid() == '':
+            if get_epsg(self.mCRSoutput.crs()) is None:
                 self.lblOutCRSTitle.setStyleSheet('color:red')
                 errorList.append(self.tr("Select output projected coordinate system"))
             else:
@@ -409,12 +416,7 @@ class ResampleImageToBlockDialog(QDialog, FORM_CLASS):
                 lyrBoundary = self.mcboPolygonLayer.currentLayer()
 
                 if self.chkUseSelected.isChecked():
-                    savePlyName = lyrBoundary.name() + '_poly.shp'
-                    filePoly = os.path.join(TEMPDIR, savePlyName)
-                    if os.path.exists(filePoly):  removeFileFromQGIS(filePoly)
-
-                    QgsVectorFileWriter.writeAsVectorFormat(lyrBoundary, filePoly, "utf-8", lyrBoundary.crs(),
-                                                            driverName="ESRI Shapefile", onlySelected=True)
+                    filePoly = export_layer(lyrBoundary, lyrBoundary.name() + '_poly.shp', only_selected=True)
 
                     if self.DISP_TEMP_LAYERS:
                         addVectorFileToQGIS(filePoly, layer_name=os.path.splitext(os.path.basename(filePoly))[0]
@@ -427,30 +429,37 @@ class ResampleImageToBlockDialog(QDialog, FORM_CLASS):
             nodata_val = int(float(x)) if int(float(x)) == float(x) else float(x)
             
             band_num = [int(self.cboBand.currentText().replace('Band ', ''))]
-            files = resample_bands_to_block(get_layer_source(lyrRaster),
-                                            self.dsbPixelSize.value(),
-                                            self.lneOutputFolder.text(),
-                                            band_nums=band_num,
-                                            image_epsg=int(lyrRaster.crs().authid().replace('EPSG:', '')),
-                                            image_nodata=nodata_val,
-                                            polygon_shapefile=filePoly,
-                                            groupby=self.mFieldComboBox.currentField() if self.mFieldComboBox.currentField() else None,
-                                            out_epsg=int(self.mCRSoutput.crs().authid().replace('EPSG:', '')))
+            files, failures = resample_bands_to_block(get_layer_source(lyrRaster),
+                                                      self.dsbPixelSize.value(),
+                                                      self.lneOutputFolder.text(),
+                                                      band_nums=band_num,
+                                                      image_epsg=get_epsg(lyrRaster.crs()),
+                                                      image_nodata=nodata_val,
+                                                      polygon_shapefile=filePoly,
+                                                      groupby=self.mFieldComboBox.currentField() if self.mFieldComboBox.currentField() else None,
+                                                      out_epsg=get_epsg(self.mCRSoutput.crs()),
+                                                      progress_callback=self.block_progress)
 
             if self.chkAddToDisplay.isChecked():
+                group_names = []
                 for ea_file in files:
-                    removeFileFromQGIS(ea_file)
                     group_name =  os.path.basename(os.path.dirname(ea_file))
                     if self.mFieldComboBox.currentField():
                         group_name = os.path.basename(ea_file).split('_')[0] + ' - ' + os.path.basename(os.path.dirname(ea_file))
-                    
-                    addRasterFileToQGIS(ea_file, group_layer_name=group_name,atTop=False)
+                    group_names.append(group_name)
+
+                addRasterFilesToQGIS(files, group_layer_names=group_names, atTop=False)
 
             self.cleanMessageBars(True)
             self.fraMain.setDisabled(False)
 
             self.iface.mainWindow().statusBar().clearMessage()
             self.iface.messageBar().popWidget()
+
+            if len(failures) > 0:
+                self.send_to_messagebar('{} block(s) failed: {}'.format(len(failures), ', '.join(failures)),
+                                        level=Qgis.Warning, duration=0, core_QGIS=True, showLogPanel=True)
+
             QApplication.restoreOverrideCursor()
             return super(ResampleImageToBlockDialog, self).accept(*args, **kwargs)
 
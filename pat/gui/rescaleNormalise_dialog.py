@@ -28,22 +28,22 @@ import re
 import sys
 import traceback
 
-from qgis.PyQt import QtGui, uic, QtCore, QtWidgets
+from qgis.PyQt import QtGui, QtCore, QtWidgets
 from qgis.PyQt.QtWidgets import QPushButton, QApplication, QDialog
 
 from qgis.core import QgsMessageLog, Qgis, QgsApplication, QgsMapLayerProxyModel
 from qgis.gui import QgsMessageBar
 
-import rasterio
 from pat import LOGGER_NAME, PLUGIN_NAME, TEMPDIR, PLUGIN_SHORT
 from util.custom_logging import errorCatcher, openLogPanel
 from util.qgis_common import removeFileFromQGIS, addRasterFileToQGIS, save_as_dialog, get_layer_source
 from util.settings import read_setting, write_setting
 
-from pyprecag.raster_ops import rescale, normalise
+from pat.util.raster_windows import rescale_raster, normalise_raster
 from pyprecag import crs as pyprecag_crs
+from util.ui_forms import load_ui_form
 
-FORM_CLASS, _ = uic.loadUiType(os.path.join(os.path.dirname(__file__), 'rescaleNormalise_dialog_base.ui'))
+FORM_CLASS, _ = load_ui_form(os.path.join(os.path.dirname(__file__), 'rescaleNormalise_dialog_base.ui'))
 
 LOGGER = logging.getLogger(LOGGER_NAME)
 LOGGER.addHandler(logging.NullHandler())  # logging.StreamHandler()  # Handle logging, no logging has been configured
@@ -263,20 +263,12 @@ class RescaleNormaliseDialog(QDialog, FORM_CLASS):
             in_crswkt = lyrTarget.crs().toWkt()
 
             band_num = int(self.cboBand.currentText().replace('Band ', ''))
-            with rasterio.open(os.path.normpath(rasterIn)) as src:
-                if self.cboMethod.currentText() == 'Rescale':
-                    rast_result = rescale(src, self.dsbRescaleLower.value(), self.dsbRescaleUpper.value(),
-                                          band_num=band_num, ignore_nodata=True)
-                else:
-                    rast_result = normalise(src, band_num=band_num, ignore_nodata=True)
-                meta = src.meta.copy()
-
-                meta['crs'] = str(in_crswkt)
-                meta['count'] = 1
-                meta['dtype'] = rasterio.float32
-
-            with rasterio.open(os.path.normpath(rasterOut), 'w', **meta) as dst:
-                dst.write_band(1, rast_result)
+            # statistics are calculated in a first pass, then the band is processed window by window
+            if self.cboMethod.currentText() == 'Rescale':
+                rescale_raster(rasterIn, rasterOut, self.dsbRescaleLower.value(), self.dsbRescaleUpper.value(),
+                               band_num=band_num, crs_wkt=in_crswkt)
+            else:
+                normalise_raster(rasterIn, rasterOut, band_num=band_num, crs_wkt=in_crswkt)
 
             rasterLyr = addRasterFileToQGIS(rasterOut, atTop=False)
 
@@ -33,30 +33,27 @@ from util.qgis_common import save_as_dialog, file_in_use, removeFileFromQGIS, \
     copyLayerToMemory, addVectorFileToQGIS
 from util.qgis_symbology import vector_apply_unique_value_renderer
 from util.settings import read_setting, write_setting
+from util.qgis_crs import resolve_crs, get_epsg
+from util.strip_trial import create_points_along_line
 
-from qgis.PyQt import QtGui, uic, QtCore, QtWidgets
+from qgis.PyQt import QtGui, QtCore, QtWidgets
 from qgis.PyQt.QtWidgets import QPushButton, QDialog, QApplication
 from qgis.core import (QgsMapLayer, QgsMessageLog, QgsVectorFileWriter, QgsCoordinateReferenceSystem, QgsApplication,
                        Qgis, QgsMapLayerProxyModel)
 from qgis.gui import QgsMessageBar
 
-from pat.util.qgis_common import get_UTM_Coordinate_System, get_layer_source
+from util.qgis_common import get_UTM_Coordinate_System, get_layer_source
+from util.workspace import export_layer
+from util.vector_formats import vector_file_filter
+from util.ui_forms import load_ui_form
 
-FORM_CLASS, _ = uic.loadUiType(os.path.join(os.path.dirname(__file__), 'stripTrialPoints_dialog_base.ui'))
+FORM_CLASS, _ = load_ui_form(os.path.join(os.path.dirname(__file__), 'stripTrialPoints_dialog_base.ui'))
 
 LOGGER = logging.getLogger(LOGGER_NAME)
 LOGGER.addHandler(logging.NullHandler())
 
-import pyprecag
 from pyprecag import config, crs, describe
 
-# check to see if new version of pyprecag is required
-try:
-    from pyprecag.processing import create_points_along_line
-except ImportError:
-    LOGGER.warning(" Create strip trial points tool is not supported by pyprecag {}. "
-                   "Upgrade to version 0.2.0+".format(pyprecag.__version__))
-
 
 class StripTrialPointsDialog(QDialog, FORM_CLASS):
     """Extract statistics from a list of rasters at set locations."""
@@ -180,12 +177,8 @@ class StripTrialPointsDialog(QDialog, FORM_CLASS):
         if layer is None:
             return
 
-        line_crs = layer.crs()
-        if line_crs.authid() == '':
-            # Convert from the older style strings
-            line_crs = QgsCoordinateReferenceSystem()
-            if not line_crs.createFromProj(layer.crs().toWkt()):
-                line_crs = layer.crs()
+        # Convert from the older style strings
+        line_crs = resolve_crs(layer.crs())
 
         line_crs = get_UTM_Coordinate_System(layer.extent().xMinimum(),
                                              layer.extent().yMinimum(),
@@ -209,7 +202,7 @@ class StripTrialPointsDialog(QDialog, FORM_CLASS):
         filename = self.mcboLineLayer.currentLayer().name() + '_strip-trial-points'
 
         s = save_as_dialog(self, self.tr("Save As"),
-                         self.tr("ESRI Shapefile") + " (*.shp);;",
+                         vector_file_filter(),
                          default_name=os.path.join(lastFolder, filename))
 
         if s == '' or s is None:
@@ -240,7 +233,7 @@ class StripTrialPointsDialog(QDialog, FORM_CLASS):
             filename = os.path.join(path, file.replace('-points', '') + '-lines' + ext)
 
         s = save_as_dialog(self, self.tr("Save As"),
-                         self.tr("ESRI Shapefile") + " (*.shp);;",
+                         vector_file_filter(),
                          default_name=os.path.join(lastFolder, filename))
 
         if s == '' or s is None:
@@ -278,7 +271,7 @@ class StripTrialPointsDialog(QDialog, FORM_CLASS):
             else:
                 self.lblLineOffsetDist.setStyleSheet('color:black')
 
-            if self.mCRSoutput.crs().authid() == '':
+            if get_epsg(self.mCRSoutput.crs()) is None:
                 self.lblOutCRSTitle.setStyleSheet('color:red')
                 errorList.append(self.tr("Select output projected coordinate system"))
             else:
@@ -364,7 +357,7 @@ class StripTrialPointsDialog(QDialog, FORM_CLASS):
 
             settingsStr += '\n    {:30}\t{}'.format('Output points :', self.lneSavePointsFile.text())
 
-            if self.lneSaveLinesFile.text() == '':
+            if self.lneSaveLinesFile.text() != '':
                 settingsStr += '\n    {:30}\t{}\n'.format('Output lines:', self.lneSaveLinesFile.text())
 
             LOGGER.info(settingsStr)
@@ -372,12 +365,8 @@ class StripTrialPointsDialog(QDialog, FORM_CLASS):
             lyr_line = self.mcboLineLayer.currentLayer()
 
             if self.chkUseSelected.isChecked():
-                line_shapefile = os.path.join(TEMPDIR, lyr_line.name() + '_lines.shp')
-
-                if os.path.exists(line_shapefile):  removeFileFromQGIS(line_shapefile)
-
-                QgsVectorFileWriter.writeAsVectorFormat(lyr_line, line_shapefile, "utf-8", self.mCRSoutput.crs(),
-                                                        driverName="ESRI Shapefile", onlySelected=True)
+                line_shapefile = export_layer(lyr_line, lyr_line.name() + '_lines.shp', crs=self.mCRSoutput.crs(),
+                                              only_selected=True)
 
                 if self.DISP_TEMP_LAYERS:
                     addVectorFileToQGIS(line_shapefile, layer_name=os.path.splitext(os.path.basename(line_shapefile))[0]
@@ -387,10 +376,10 @@ class StripTrialPointsDialog(QDialog, FORM_CLASS):
 
             lines_desc = describe.VectorDescribe(line_shapefile)
             gdf_lines = lines_desc.open_geo_dataframe()
-            epsgOut = int(self.mCRSoutput.crs().authid().replace('EPSG:', ''))
+            epsgOut = get_epsg(self.mCRSoutput.crs())
 
             out_lines = None
-            if self.lneSaveLinesFile.text() == '':
+            if self.lneSaveLinesFile.text() != '':
                 out_lines = self.lneSaveLinesFile.text()
 
             _ = create_points_along_line(gdf_lines, lines_desc.crs, self.dsbDistBtwnPoints.value(),
@@ -402,7 +391,7 @@ class StripTrialPointsDialog(QDialog, FORM_CLASS):
                                                  os.path.splitext(os.path.basename(self.lneSavePointsFile.text()))[0])
             vector_apply_unique_value_renderer(out_lyr_points, 'Strip_Name')
 
-            if self.lneSaveLinesFile.text() == '':
+            if self.lneSaveLinesFile.text() != '':
                 out_lyr_lines = addVectorFileToQGIS(self.lneSaveLinesFile.text(), atTop=True,
                                                     layer_name=os.path.splitext(os.path.basename(self.lneSaveLinesFile.text()))[0])
 
@@ -37,13 +37,14 @@ from util.custom_logging import errorCatcher, openLogPanel
 from util.qgis_common import (save_as_dialog, file_in_use, removeFileFromQGIS, get_layer_source,
                               copyLayerToMemory, addVectorFileToQGIS, addRasterFileToQGIS, check_for_overlap,
                               build_layer_table, get_pixel_size)
+from util.qgis_crs import get_coordinate_transform
 
 from util.settings import read_setting, write_setting
 
 from pyprecag import config, crs, describe
-from pyprecag.processing import ttest_analysis
+from util.strip_stats import ttest_analysis
 
-from qgis.PyQt import QtGui, uic, QtCore, QtWidgets
+from qgis.PyQt import QtGui, QtCore, QtWidgets
 from qgis.PyQt.QtWidgets import QPushButton, QDialog, QFileDialog, QApplication
 
 from qgis.core import (QgsMapLayer, QgsMessageLog, QgsVectorFileWriter,
@@ -51,9 +52,11 @@ from qgis.core import (QgsMapLayer, QgsMessageLog, QgsVectorFileWriter,
                        QgsCoordinateTransform, QgsProject)
 
 from qgis.gui import QgsMessageBar
+from util.workspace import export_layer
+from util.ui_forms import load_ui_form
 
-FORM_CLASS, _ = uic.loadUiType(os.path.join(os.path.dirname(__file__),
-                                            'tTestAnalysis_dialog_base.ui'))
+FORM_CLASS, _ = load_ui_form(os.path.join(os.path.dirname(__file__),
+                                          'tTestAnalysis_dialog_base.ui'))
 
 LOGGER = logging.getLogger(LOGGER_NAME)
 LOGGER.addHandler(logging.NullHandler())
@@ -209,9 +212,8 @@ class tTestAnalysisDialog(QDialog, FORM_CLASS):
         if self.chkUseSelected.isChecked():
             layer = self.mcboPointsLayer.currentLayer()
 
-            transform = QgsCoordinateTransform(QgsCoordinateReferenceSystem(df_pts['epsg'].values[0]),
-                                               QgsProject.instance().crs(),
-                                               QgsProject.instance())
+            transform = get_coordinate_transform(QgsCoordinateReferenceSystem(df_pts['epsg'].values[0]),
+                                                 QgsProject.instance().crs())
 
             prj_ext = transform.transformBoundingBox(layer.boundingBoxOfSelected())
             df_pts['geometry'] = wkt.loads(prj_ext.asWktPolygon())
@@ -426,15 +428,8 @@ class tTestAnalysisDialog(QDialog, FORM_CLASS):
             lyrPoints = self.mcboPointsLayer.currentLayer()
 
             if self.chkUseSelected.isChecked() or lyrPoints.providerType() == 'delimitedtext':
-                savePtsName = lyrPoints.name() + '_strippts.shp'
-                fileStripPts = os.path.join(TEMPDIR, savePtsName)
-
-                if os.path.exists(fileStripPts):
-                    removeFileFromQGIS(fileStripPts)
-
-                QgsVectorFileWriter.writeAsVectorFormat(lyrPoints, fileStripPts, "utf-8",
-                                                        lyrPoints.crs(), driverName="ESRI Shapefile",
-                                                        onlySelected=self.chkUseSelected.isChecked())
+                fileStripPts = export_layer(lyrPoints, lyrPoints.name() + '_strippts.shp',
+                                            only_selected=self.chkUseSelected.isChecked())
 
                 if self.DISP_TEMP_LAYERS:
                     addVectorFileToQGIS(fileStripPts, layer_name=os.path.splitext(os.path.basename(fileStripPts))[0],
@@ -60,6 +60,7 @@ from .gui.settings_dialog import SettingsDialog
 
 from .gui.blockGrid_dialog import BlockGridDialog
 from .gui.cleanTrimPoints_wizard import CleanTrimPointsDialog
+from .gui.cleanTrimBatch_dialog import CleanTrimBatchDialog
 from .gui.pointTrailToPolygon_wizard import PointTrailToPolygonDialog
 from .gui.rasterSymbology_dialog import RasterSymbologyDialog
 from .gui.preVesper_dialog import PreVesperDialog
@@ -76,10 +77,16 @@ from .gui.tTestAnalysis_dialog import tTestAnalysisDialog
 
 from .util.check_dependencies import check_vesper_dependency, check_R_dependency
 from .util.custom_logging import stop_logging
-from .util.qgis_common import addRasterFileToQGIS, removeFileFromQGIS
 from .util.settings import read_setting, write_setting
+from .util.workspace import start_cleanup
+from .util.raster_windows import optimise_geotiff
 from .util.processing_alg_logging import ProcessingAlgMessages
-from .util.qgis_symbology import ( RASTER_SYMBOLOGY, raster_apply_classified_renderer)
+
+# the qgis modules hold the layer source index and the crs and class break caches. Import them the
+# same way as the forms so there is only one copy of each.
+from util.qgis_common import addRasterFileToQGIS, removeFileFromQGIS, clear_layer_source_index
+from util.qgis_crs import clear_crs_cache
+from util.qgis_symbology import RASTER_SYMBOLOGY, raster_apply_classified_renderer
 
 import pyprecag
 from pyprecag import config
@@ -155,6 +162,9 @@ class pat_toolbar(object):
         if not os.path.exists(TEMPDIR):
             os.mkdir(TEMPDIR)
 
+        # remove old runs left by a previous session which went over the workspace quota
+        start_cleanup()
+
     def tr(self, message):
         """Get the translation for a string using Qt translation API.
 
@@ -244,6 +254,15 @@ class pat_toolbar(object):
             callback=self.run_cleanTrimPoints,
             parent=self.iface.mainWindow())
 
+        self.add_action(
+            icon_path=':/plugins/pat/icons/icon_cleanTrimPoints.svg',
+            text=self.tr(u'Batch clean, trim and normalise CSV files'),
+            tool_tip=self.tr(u'Batch clean, trim and normalise CSV files'),
+            status_tip=self.tr(u'Clean, trim and normalise many CSV files using the same settings'),
+            add_to_toolbar=False,
+            callback=self.run_cleanTrimBatch,
+            parent=self.iface.mainWindow())
+
         self.add_action(
             icon_path=':/plugins/pat/icons/icon_vesperKriging.svg',
             text=self.tr(u'Run kriging using VESPER'),
@@ -430,7 +449,9 @@ class pat_toolbar(object):
                                                 QMessageBox.Ok)
         
         stop_logging('pyprecag')
-        
+        clear_layer_source_index()
+        clear_crs_cache()
+
 #         layermap = QgsProject.instance().mapLayers()
 #         RemoveLayers = []
 #         for name, layer in layermap.items():
@@ -596,13 +617,17 @@ class pat_toolbar(object):
                     raster_sym = RASTER_SYMBOLOGY['Yield']
 
                     removeFileFromQGIS(out_PredTif)
+                    removeFileFromQGIS(out_SETif)
+                    for ea_tif in [out_PredTif, out_SETif]:
+                        # the unoptimised TIFF is still valid so continue loading it.
+                        optimise_geotiff(ea_tif, raise_errors=False)
+
                     rasterLyr = addRasterFileToQGIS(out_PredTif, atTop=False)
                     raster_apply_classified_renderer(rasterLyr,
                                     rend_type=raster_sym['type'],
                                     num_classes=raster_sym['num_classes'],
                                     color_ramp=raster_sym['colour_ramp'])
 
-                    removeFileFromQGIS(out_SETif)
                     addRasterFileToQGIS(out_SETif, atTop=False)
 
                 except Exception as err:
@@ -1011,6 +1036,41 @@ class pat_toolbar(object):
         # Refresh QGIS
         QCoreApplication.processEvents()
 
+    def run_cleanTrimBatch(self):
+        """Run method for the batch cleanTrimPoints dialog"""
+        dlgCleanTrimBatch = CleanTrimBatchDialog(self.iface)
+
+        # show the dialog
+        dlgCleanTrimBatch.show()
+
+        if dlgCleanTrimBatch.exec_():
+            output_folder = dlgCleanTrimBatch.lneOutputFolder.text()
+            import webbrowser
+            from urllib.request import pathname2url
+
+            def open_folder():
+                url = 'file:{}'.format(pathname2url(os.path.abspath(output_folder)))
+                webbrowser.open(url)
+
+            results = dlgCleanTrimBatch.results_table
+            message = 'Cleaned and trimmed {} of {} files successfully !'.format(
+                (results['Error'] == '').sum(), len(results))
+
+            widget = self.iface.messageBar().createMessage('', message)
+            button = QPushButton(widget)
+            button.setText('Open Folder')
+            button.pressed.connect(open_folder)
+            widget.layout().addWidget(button)
+
+            self.iface.messageBar().pushWidget(widget, level=Qgis.Success, duration=15)
+            LOGGER.info(message)
+
+        # Close Dialog
+        dlgCleanTrimBatch.deleteLater()
+
+        # Refresh QGIS
+        QCoreApplication.processEvents()
+
     def run_blockGrid(self):
         """Run method for the block grid dialog"""
         dlgBlockGrid = BlockGridDialog(self.iface)
@@ -0,0 +1,257 @@
+# coding=utf-8
+"""
+/***************************************************************************
+ CSIRO Precision Agriculture Tools (PAT) Plugin
+
+ block_grid -  Convert polygon boundaries to a 0,1 raster and a VESPER grid file of the pixel
+               coordinates. The grid is rasterised and written in strips of rows so memory use does
+               not grow with the size of the paddock or the pixel size.
+           -------------------
+        begin      : 2026-10-19
+        git sha    : $Format:%H$
+        copyright  : (c) 2026, Commonwealth Scientific and Industrial Research Organisation (CSIRO)
+        email      : PAT@csiro.au
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the associated CSIRO Open Source Software       *
+ *   License Agreement (GPLv3) provided with this plugin.                  *
+ *                                                                         *
+ ***************************************************************************/
+"""
+import logging
+import os
+import re
+import time
+from contextlib import nullcontext
+from datetime import timedelta
+
+import numpy as np
+import rasterio
+import six
+from rasterio import features
+from rasterio.crs import CRS
+from rasterio.enums import Resampling
+from rasterio.windows import Window, bounds as window_bounds, transform as window_transform
+from shapely.geometry import box
+
+from pyprecag import number_types
+from pyprecag.describe import VectorDescribe
+from pyprecag.errors import GeometryError
+from pyprecag.raster_ops import create_raster_transform
+
+from pat import LOGGER_NAME
+from pat.util.raster_windows import TILE_SIZE, build_overviews, tiled_profile
+from pat.util.workers import get_worker_count, map_in_batches, process_pool
+
+LOGGER = logging.getLogger(LOGGER_NAME)
+LOGGER.addHandler(logging.NullHandler())  # logging.StreamHandler()
+
+# The approximate number of pixels rasterised at a time. Strips are a whole number of tile rows.
+STRIP_PIXELS = 1048576
+
+
+def _rasterise_strip(geometry, transform, window, nodata_val, dtype):
+    """ Rasterise the part of a polygon within a strip of rows.
+
+    Returns:
+        numpy.ndarray: the strip with 1 inside the polygon and nodata outside
+    """
+    strip_transform = window_transform(window, transform)
+
+    # clip to the strip plus a pixel either side to keep the rasterisation fast
+    left, bottom, right, top = window_bounds(window, transform)
+    margin = abs(transform.a)
+    clipped = geometry.intersection(box(left - margin, bottom - margin, right + margin, top + margin))
+
+    shape = (int(window.height), int(window.width))
+    if clipped.is_empty:
+        return np.full(shape, nodata_val, dtype=dtype)
+
+    return features.rasterize(shapes=[(clipped, 1)], out_shape=shape, fill=nodata_val,
+                              transform=strip_transform, dtype=dtype)
+
+
+def write_block_grid(geometry, pixel_size, out_rasterfilename, out_vesperfilename, out_epsg,
+                     nodata_val=-9999, snap=True, max_workers=None):
+    """ Rasterise a polygon to a block grid and write the VESPER grid file strip by strip.
+
+    The VESPER format contains the xy coordinates for the center of each pixel with one space
+    before the x and three spaces between the x and y values. The coordinates are written as rows
+    from the Upper Left corner of the raster.
+
+    This differs from pyprecag which always used -9999 as nodata whatever nodata_val was set to,
+    and wrote pixels greater than nodata to the VESPER grid so a nodata above 1 gave an empty
+    grid. Here nodata_val is written to the raster and every pixel which is not nodata is written
+    to the VESPER grid. The dtype is the smallest holding both 1 and nodata_val as in pyprecag.
+
+    Args:
+        geometry (shapely.geometry.Polygon|shapely.geometry.MultiPolygon): the polygon
+        pixel_size (float): The required output pixel size
+        out_rasterfilename (str): Filename of the raster Tiff that will be created
+        out_vesperfilename (str): The output vesper file
+        out_epsg (int): The epsg number for the output raster coordinate system.
+        nodata_val (int): an integer other than 1 to use as nodata
+        snap (bool): Snap Extent to a factor of the Pixel size
+        max_workers (int): the number of worker processes used to rasterise strips. Use 1 to
+            rasterise in this process.
+
+    Returns:
+        str: the output raster file
+    """
+    if nodata_val == 1:
+        raise ValueError('nodata_val can not be 1 as it is the value of pixels inside the polygon')
+
+    transform, width, height, _ = create_raster_transform(geometry.bounds, pixel_size, snap)
+    dtype = rasterio.dtypes.get_minimum_dtype([1, nodata_val])
+
+    # a multiple of the tile height so each compressed tile is written once.
+    strip_height = max(1, STRIP_PIXELS // max(width, 1) // TILE_SIZE) * TILE_SIZE
+    windows = [Window(0, row, width, min(strip_height, height - row)) for row in range(0, height, strip_height)]
+
+    # creation options like tfw are passed separately as tiled_profile only copies the georeferencing.
+    profile = tiled_profile(dict(count=1, width=width, height=height, transform=transform,
+                                 crs=CRS.from_epsg(out_epsg), nodata=nodata_val, dtype=dtype), tfw='YES')
+
+    n_windows = len(windows)
+    n_workers = min(get_worker_count(max_workers), n_windows)
+    args = ([geometry] * n_windows, [transform] * n_windows, windows, [nodata_val] * n_windows,
+            [dtype] * n_windows)
+
+    with (process_pool(n_workers) if n_workers > 1 else nullcontext()) as executor, \
+            rasterio.open(out_rasterfilename, 'w', **profile) as dest, \
+            open(out_vesperfilename, 'w') as ves_file:
+
+        if executor is None:
+            strips = map(_rasterise_strip, *args)
+        else:
+            strips = map_in_batches(executor, _rasterise_strip, *args)
+
+        for window, strip in zip(windows, strips):
+
+            dest.write(strip, 1, window=window)
+
+            # coordinates for the cell centres of the valid pixels in row order.
+            rows, cols = np.nonzero(strip != nodata_val)
+            if len(rows) == 0:
+                continue
+
+            xs, ys = transform * (cols + 0.5, rows + int(window.row_off) + 0.5)
+            ves_file.write(''.join(map(' {}   {}\n'.format, xs.tolist(), ys.tolist())))
+
+        build_overviews(dest, Resampling.nearest)
+
+    return out_rasterfilename
+
+
+def _block_grid_feature(geometry, feat_name, status, pixel_size, out_file, out_vesperfile, out_epsg,
+                        nodata_val, snap, max_workers=1):
+    """Create the block grid and VESPER grid file for one feature.
+
+    When run as a worker task max_workers is 1 so the worker does not start its own pool.
+    """
+    step_time = time.time()
+
+    write_block_grid(geometry, pixel_size, out_file, out_vesperfile, out_epsg, nodata_val, snap,
+                     max_workers)
+
+    LOGGER.info('{:<30} {:>10}   {:<15} {dur}'.format('Feature to block_grid', status, feat_name,
+                                                      dur=str(timedelta(seconds=time.time() - step_time))))
+    return out_file
+
+
+def block_grid(in_shapefilename, pixel_size, out_rasterfilename, out_vesperfilename,
+               out_epsg=0, groupby=None, nodata_val=-9999, snap=True, overwrite=False, max_workers=None):
+    """Convert a polygon boundary to a 0,1 raster and generate a VESPER compatible list of
+       coordinates for kriging.
+
+       The input polygon shapefile will be reproject to the out_epsg coordinate system.
+
+       Will process in a loop based on the groupby field name. All polygons with the same
+       attribute will be dissolved together and a single block grid will be created. The
+       groupby attribute will be added to the output filename. Groups are processed in parallel
+       worker processes. Without a groupby the strips of the single grid are rasterised in
+       parallel worker processes instead.
+
+        Args:
+            in_shapefilename (str): Input polygon shapefile
+            pixel_size (float):  The required output pixel size
+            out_rasterfilename (str): Filename of the raster Tiff that will be created
+            out_vesperfilename (str):  The output vesper file. For groups the name is derived from
+                                       the raster filename.
+            out_epsg (int): The epsg number for the output raster coordinate system.
+            groupby (str): Column name to group polygon features with.
+            nodata_val (int): an integer other than 1 to use as nodata. See write_block_grid
+            snap (bool): Snap Extent to a factor of the Pixel size
+            overwrite (bool): if true overwrite existing file
+            max_workers (int): the number of worker processes used for groups or strips.
+
+        Returns:
+            List[str]: the output raster files
+    """
+
+    if not isinstance(pixel_size, number_types):
+        raise TypeError('Pixel size must be an integer or floating number.')
+
+    for ea_arg in [('nodata_val', nodata_val), ('out_epsg', out_epsg)]:
+        if not isinstance(ea_arg[1], six.integer_types):
+            raise TypeError('{} must be a integer - Got {}'.format(*ea_arg))
+
+    if nodata_val == 1:
+        raise ValueError('nodata_val can not be 1 as it is the value of pixels inside the polygon')
+
+    if out_epsg <= 0:
+        raise ValueError('EPSG Code ({}) must be a positive integer above 0'.format(out_epsg))
+
+    if CRS.from_epsg(out_epsg).is_geographic:
+        raise ValueError('EPSG Code ({}) must be a projected coordinate system'.format(out_epsg))
+
+    desc_poly_shp = VectorDescribe(in_shapefilename)
+    gdf_poly = desc_poly_shp.open_geo_dataframe()
+
+    if 'POLY' not in desc_poly_shp.geometry_type.upper():
+        raise GeometryError('Invalid Geometry. Input shapefile should be polygon or multipolygon')
+
+    if groupby is None or groupby.strip() == '':
+        groupby = None
+
+    if groupby is not None and groupby not in gdf_poly.columns:
+        raise ValueError('Groupby column {} does not exist'.format(groupby))
+
+    # reproject shapefile
+    if desc_poly_shp.crs.epsg_number != out_epsg:
+        gdf_poly.to_crs(epsg=out_epsg, inplace=True)
+
+    del desc_poly_shp
+
+    if groupby is None:
+        if out_vesperfilename is None or out_vesperfilename == '':
+            out_vesperfilename = os.path.splitext(out_rasterfilename)[0] + '_v.txt'
+
+        return [_block_grid_feature(gdf_poly.unary_union, 'All Polygons', '1 of 1', pixel_size,
+                                    out_rasterfilename, out_vesperfilename, out_epsg, nodata_val, snap,
+                                    max_workers)]
+
+    # dissolve by the groupby column and create multi-polygons
+    gdf_poly[groupby] = gdf_poly[groupby].fillna('')
+    gdf_poly = gdf_poly.dissolve(groupby, as_index=False)
+
+    r_file, r_ext = os.path.splitext(out_rasterfilename)
+    feat_names, out_files, out_vesperfiles = [], [], []
+    for feat in gdf_poly[groupby]:
+        feat_name = re.sub('[^0-9a-zA-Z]+', '-', str(feat)).strip('-')
+        feat_names.append(feat_name if feat_name != '' else 'No-Name')
+        out_files.append(r_file + "_" + feat_names[-1] + r_ext)
+        out_vesperfiles.append(r_file + "_" + feat_names[-1] + '_v.txt')
+
+    n_feat = len(gdf_poly)
+    status = ['{} of {}'.format(i, n_feat) for i in range(1, n_feat + 1)]
+
+    with process_pool(min(get_worker_count(max_workers), n_feat)) as executor:
+        output_files = list(executor.map(_block_grid_feature, list(gdf_poly.geometry), feat_names, status,
+                                         [pixel_size] * n_feat, out_files, out_vesperfiles, [out_epsg] * n_feat,
+                                         [nodata_val] * n_feat, [snap] * n_feat))
+
+    return output_files
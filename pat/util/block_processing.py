@@ -0,0 +1,321 @@
+# coding=utf-8
+"""
+/***************************************************************************
+ CSIRO Precision Agriculture Tools (PAT) Plugin
+
+ block_processing -  Clip, resample and smooth an image for each block (polygon) in parallel.
+           -------------------
+        begin      : 2026-10-19
+        git sha    : $Format:%H$
+        copyright  : (c) 2026, Commonwealth Scientific and Industrial Research Organisation (CSIRO)
+        email      : PAT@csiro.au
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the associated CSIRO Open Source Software       *
+ *   License Agreement (GPLv3) provided with this plugin.                  *
+ *                                                                         *
+ ***************************************************************************/
+"""
+import glob
+import logging
+import os
+import re
+import time
+from concurrent.futures import as_completed
+from datetime import timedelta
+from tempfile import NamedTemporaryFile
+
+import rasterio
+import six
+from geopandas import GeoDataFrame
+from rasterio import features
+
+from pyprecag import config
+from pyprecag.describe import save_geopandas_tofile, VectorDescribe
+from pyprecag.errors import GeometryError
+from pyprecag.processing import multi_block_bands_processing
+from pyprecag.raster_ops import reproject_image
+
+from pat import LOGGER_NAME, TEMPDIR
+from pat.util.image_indices import calculate_image_indices
+from pat.util.raster_windows import optimise_geotiff
+from pat.util.workers import get_worker_count, process_pool
+
+LOGGER = logging.getLogger(LOGGER_NAME)
+LOGGER.addHandler(logging.NullHandler())  # logging.StreamHandler()
+
+# the column holding the block name in the per block polygon files.
+BLOCK_ID = 'BlockID'
+
+
+def get_block_polygons(image_file, polygon_shapefile=None, groupby=None):
+    """ Get the block polygons in the coordinate system of the image.
+
+    Polygons are dissolved by the groupby column, or into a single block when no column is given.
+    When no polygon shapefile is given a single block is created from the image's valid data mask.
+
+    Args:
+        image_file (str): the image to be processed
+        polygon_shapefile (str): a polygon shapefile used to cut up an image.
+        groupby (str):  the column/field to use to group multiple features.
+
+    Returns:
+        geopandas.geodataframe.GeoDataFrame: the blocks. The block names are in the BLOCK_ID column
+                                             when groupby is used
+    """
+
+    with rasterio.open(os.path.normpath(image_file)) as src:
+        image_crs = src.crs
+
+        if polygon_shapefile is None:
+            # create a polygon from the image. hopefully by now the nodata val is correct.
+            band = src.dataset_mask()
+            rast_shapes = features.shapes(band, transform=src.transform, mask=band == 255)
+            geoms_geojson = [{'properties': {'val': val}, 'geometry': geom} for geom, val in rast_shapes]
+            gdf_poly = GeoDataFrame.from_features(geoms_geojson, crs=image_crs)
+            return GeoDataFrame(geometry=[gdf_poly.unary_union], crs=image_crs)
+
+    desc_poly = VectorDescribe(polygon_shapefile)
+
+    if 'POLY' not in desc_poly.geometry_type.upper():
+        raise GeometryError('Invalid geometry. Input shapefile should be poly or multipolygon')
+
+    gdf_poly = desc_poly.open_geo_dataframe()
+    del desc_poly
+
+    if groupby is not None and groupby not in gdf_poly.columns:
+        raise ValueError('Input groupby column does not exist in the shapefile')
+
+    gdf_poly.to_crs(image_crs, inplace=True)
+
+    if groupby is None:
+        return GeoDataFrame(geometry=[gdf_poly.unary_union], crs=image_crs)
+
+    # change null/nones to blank string
+    gdf_poly[groupby] = gdf_poly[groupby].fillna('')
+    gdf_poly = gdf_poly.dissolve(groupby, as_index=False)
+
+    return GeoDataFrame({BLOCK_ID: gdf_poly[groupby].astype(str).values},
+                        geometry=gdf_poly.geometry.values, crs=image_crs)
+
+
+def _process_block(image_file, pixel_size, out_folder, band_nums, block_gdf):
+    """ Worker task to create the resampled band images for one block.
+
+    The block is saved to its own polygon file so multi_block_bands_processing only clips and
+    reads the image window covering the block. The images are then rewritten as tiled GeoTIFFs
+    with overviews.
+
+    Returns:
+        List[str]: the created files
+        str: the error message if the block failed
+    """
+    filename = os.path.splitext(os.path.basename(image_file))[0]
+    with NamedTemporaryFile(prefix='{}_block_'.format(filename), suffix='.shp', dir=TEMPDIR) as new_file:
+        block_shapefile = os.path.normpath(new_file.name)
+
+    try:
+        save_geopandas_tofile(block_gdf, block_shapefile, overwrite=True)
+
+        block_files = multi_block_bands_processing(image_file, pixel_size, out_folder, band_nums=band_nums,
+                                                   polygon_shapefile=block_shapefile,
+                                                   groupby=BLOCK_ID if BLOCK_ID in block_gdf.columns else None)
+        for ea_file in block_files:
+            if ea_file.lower().endswith('.tif'):
+                optimise_geotiff(ea_file)
+
+        return block_files, None
+
+    except Exception as err:
+        return [], '{}: {}'.format(type(err).__name__, err)
+
+    finally:
+        if not config.get_debug_mode():
+            for ea_file in glob.glob(os.path.splitext(block_shapefile)[0] + '.*'):
+                os.remove(ea_file)
+
+
+def process_blocks(image_file, pixel_size, out_folder, band_nums=[], polygon_shapefile=None,
+                   groupby=None, max_workers=None, progress_callback=None):
+    """Derive resampled image bands matching the specified pixel size and block grid extent for
+    each block, processing the blocks in parallel worker processes.
+
+    See pyprecag.processing.multi_block_bands_processing for the processing steps and output
+    names. A block which fails is reported and skipped and does not stop the other blocks.
+
+    Args:
+        image_file (str): An input image
+        pixel_size (int, float): The desired output pixel size in metres.
+        out_folder (str): The output folder for the created images.
+        band_nums  (List[int]): a list of band numbers to process. If empty all bands will be used
+        polygon_shapefile (str): a polygon shapefile used to cut up an image.
+        groupby (str):  the column/field to use to group multiple features.
+        max_workers (int): the number of worker processes.
+        progress_callback (function): Optional. Called with the number of blocks completed, the
+                                      number of blocks and the block name as each block finishes.
+
+    Returns:
+        List[str]: a list of created files.
+        Dict[str, str]: the error message for each block which failed.
+    """
+
+    if isinstance(polygon_shapefile, six.string_types) and polygon_shapefile.strip() == '':
+        polygon_shapefile = None
+    if isinstance(groupby, six.string_types) and groupby.strip() == '':
+        groupby = None
+
+    gdf_blocks = get_block_polygons(image_file, polygon_shapefile, groupby)
+
+    block_names = []
+    for block_id in gdf_blocks.get(BLOCK_ID, ['All Polygons']):
+        block_name = re.sub('[^0-9a-zA-Z]+', '-', str(block_id)).strip('-')
+        block_names.append(block_name if block_name != '' else 'No-Name')
+
+    n_blocks = len(gdf_blocks)
+    block_files = [[] for _ in range(n_blocks)]
+    failures = {}
+
+    start_time = time.time()
+    with process_pool(min(get_worker_count(max_workers), n_blocks)) as executor:
+        futures = {executor.submit(_process_block, image_file, pixel_size, out_folder, band_nums,
+                                   gdf_blocks.iloc[[i]]): i for i in range(n_blocks)}
+
+        for completed, future in enumerate(as_completed(futures), start=1):
+            i = futures[future]
+            block_files[i], error = future.result()
+            status = '{} of {}'.format(completed, n_blocks)
+
+            if error is None:
+                LOGGER.info('{:<30} {:>10}   {:<15} {dur}'.format(
+                    'Created {} files for feature'.format(len(block_files[i])), status, block_names[i],
+                    dur=str(timedelta(seconds=time.time() - start_time))))
+            else:
+                failures[block_names[i]] = error
+                LOGGER.warning('{:<30} {:>10}   {:<15} {}'.format('Block failed', status, block_names[i], error))
+
+            if progress_callback is not None:
+                progress_callback(completed, n_blocks, block_names[i])
+
+    if len(failures) == n_blocks:
+        raise GeometryError('All blocks failed - {}'.format('; '.join(failures.values())))
+
+    return [ea_file for ea_block in block_files for ea_file in ea_block], failures
+
+
+def _check_block_args(image_file, out_folder):
+    """ Check the common arguments and return the output folder for the image."""
+    for ea_arg in [('image_file', image_file), ('out_folder', out_folder)]:
+        if ea_arg[1] is None or ea_arg[1].strip() == '':
+            raise ValueError('{} is required '.format(ea_arg[0]))
+
+        if not os.path.exists(ea_arg[1]):
+            raise IOError('{} does not exist-Got {}'.format(ea_arg[0], os.path.dirname(ea_arg[1])))
+
+    if not os.path.basename(out_folder) == os.path.basename(image_file).replace('.', '_'):
+        out_folder = os.path.join(out_folder, os.path.basename(image_file).replace('.', '_'))
+
+    if not os.path.exists(out_folder):
+        os.mkdir(out_folder)
+
+    return out_folder
+
+
+def calc_indices_for_block(image_file, pixel_size, band_map, out_folder, indices=[], image_epsg=0,
+                           image_nodata=None, polygon_shapefile=None, groupby=None, out_epsg=0,
+                           max_workers=None, progress_callback=None):
+    """ Calculate indices for a multi band image then resample to a specified pixel size
+      and block grid extent for each shapefile polygon. Blocks are processed in parallel.
+
+      See pyprecag.processing.calc_indices_for_block for a full description.
+
+    Args:
+        image_file (str): the input image file
+        pixel_size (int): the pixel size used for resampling
+        band_map (pyprecag.bandops.BandMapping): A dictionary matching band numbers to
+                                                band type (ie Red, Green, Blue etc.)
+        out_folder (str): The output folder for the created images.
+        indices (List[str]): The list of indices to calculate.
+        image_epsg (int):  epsg number of the image to be used when missing in image
+        image_nodata (int): nodata value of the image to be used when missing in image
+        polygon_shapefile (str): a polygon shapefile used to cut up an image.
+        groupby (str):  the column/field to use to group multiple features.
+        out_epsg (int): The epsg number representing the coordinate system of the output images.
+        max_workers (int): the number of worker processes.
+        progress_callback (function): Optional. See process_blocks
+
+    Returns:
+        List[str]: the list of created images.
+        Dict[str, str]: the error message for each block which failed.
+    """
+
+    for ea_arg in [('image_epsg', image_epsg), ('out_epsg', out_epsg)]:
+        if not isinstance(ea_arg[1], six.integer_types):
+            raise TypeError('{} must be a integer - Got {}'.format(*ea_arg))
+
+    out_folder = _check_block_args(image_file, out_folder)
+    filename, ext = os.path.splitext(os.path.basename(image_file))
+
+    with NamedTemporaryFile(prefix='{}_reproj_'.format(filename), suffix='.tif', dir=TEMPDIR) as new_file:
+        reproj_image = os.path.normpath(new_file.name)
+
+    reproject_image(image_file, reproj_image, out_epsg, image_nodata=image_nodata, image_epsg=image_epsg)
+
+    with NamedTemporaryFile(prefix='{}_indices_'.format(filename), suffix='.tif', dir=TEMPDIR) as new_file:
+        indices_image = os.path.normpath(new_file.name)
+
+    calculate_image_indices(reproj_image, band_map, indices_image, indices)
+
+    try:
+        return process_blocks(indices_image, pixel_size, out_folder, polygon_shapefile=polygon_shapefile,
+                              groupby=groupby, max_workers=max_workers, progress_callback=progress_callback)
+    finally:
+        if not config.get_debug_mode():
+            for ea_file in [indices_image, reproj_image]:
+                if os.path.exists(ea_file):
+                    os.remove(ea_file)
+
+
+def resample_bands_to_block(image_file, pixel_size, out_folder, band_nums=[], image_epsg=0,
+                            image_nodata=None, polygon_shapefile=None, groupby=None, out_epsg=0,
+                            max_workers=None, progress_callback=None):
+    """Derive multiple resampled image bands matching the specified pixel size and block grid extent
+     for each shapefile polygon. Blocks are processed in parallel.
+
+     See pyprecag.processing.resample_bands_to_block for a full description.
+
+    Args:
+        image_file (str): An input image
+        pixel_size (int, float): The desired output pixel size in metres.
+        out_folder (str): The output folder for the created images.
+        band_nums  (List[int]): a list of band numbers to process. If empty all bands will be used
+        image_epsg (int):  epsg number of the image to be used when missing in image
+        image_nodata (int): nodata value of the image to be used when missing in image
+        polygon_shapefile (str): a polygon shapefile used to cut up an image.
+        groupby (str):  the column/field to use to group multiple features.
+        out_epsg (int): The epsg number representing the output coordinate system.
+        max_workers (int): the number of worker processes.
+        progress_callback (function): Optional. See process_blocks
+
+    Returns:
+        List[str]: a list of created files.
+        Dict[str, str]: the error message for each block which failed.
+    """
+
+    out_folder = _check_block_args(image_file, out_folder)
+    filename, ext = os.path.splitext(os.path.basename(image_file))
+
+    with NamedTemporaryFile(prefix='{}_reproj_'.format(filename), suffix='.tif', dir=TEMPDIR) as new_file:
+        reproj_image = os.path.normpath(new_file.name)
+
+    reproject_image(image_file, reproj_image, out_epsg, image_nodata=image_nodata, image_epsg=image_epsg)
+
+    try:
+        return process_blocks(reproj_image, pixel_size, out_folder, band_nums=band_nums,
+                              polygon_shapefile=polygon_shapefile, groupby=groupby,
+                              max_workers=max_workers, progress_callback=progress_callback)
+    finally:
+        if not config.get_debug_mode() and os.path.exists(reproj_image):
+            os.remove(reproj_image)
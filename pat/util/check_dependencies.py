@@ -27,6 +27,8 @@ from builtins import str
 import os
 import traceback
 import glob
+import hashlib
+import site
 import platform
 import configparser
 import subprocess
@@ -42,7 +44,7 @@ from pkg_resources import parse_version, get_distribution, DistributionNotFound
 from qgis.PyQt.QtWidgets import QMessageBox
 import qgis
 from qgis.gui import QgsMessageBar
-from qgis.core import Qgis, QgsApplication, QgsStyle, QgsSymbolLayerUtils
+from qgis.core import Qgis, QgsApplication, QgsStyle, QgsSymbolLayerUtils, QgsTask
 
 from qgis.PyQt.QtXml import QDomDocument
 from qgis.PyQt.QtCore import QFile, QIODevice
@@ -63,6 +65,9 @@ from util.settings import read_setting, write_setting
 LOGGER = logging.getLogger(LOGGER_NAME)
 LOGGER.addHandler(logging.NullHandler())  # logging.StreamHandler()
 
+# Hold a reference to background tasks so they are not garbage collected before they finish.
+_BACKGROUND_TASKS = []
+
 
 def check_pat_symbols():
     pat_xml = os.path.join(PLUGIN_DIR, 'PAT_Symbols.xml')
@@ -246,11 +251,76 @@ def check_package(package):
     return pack_dict
 
 
-def check_pip_for_update(package):
-    """ Check a package against online pip via json get the most current release
-    version number
+def get_environment_fingerprint(plugin_path):
+    """ Create a fingerprint of the environment the dependency checks depend on.
+
+    The fingerprint is built from the python version, the QGIS install prefix, the modified
+    time of each site-packages folder, the PAT plugin version, the PAT symbology file and any
+    local install files. If none of these have changed since the last successful check, the
+    result of the full dependency check is still valid.
+
+    Args:
+        plugin_path (str): The path to the users plugin directory.
+
+    Returns (str): an md5 hex digest representing the current environment
+    """
+    from qgis.utils import pluginMetadata
+
+    env_parts = [sys.version,
+                 os.path.normpath(QgsApplication.prefixPath()),
+                 '{} {}'.format(pluginMetadata('pat', 'version'), pluginMetadata('pat', 'update_date'))]
+
+    site_folders = site.getsitepackages() + [site.getusersitepackages()]
+    for ea_path in [os.path.join(plugin_path, 'PAT_Symbols.xml'),
+                    os.path.join(plugin_path, 'install_files')] + site_folders:
+        if os.path.exists(ea_path):
+            env_parts.append('{}={}'.format(os.path.normpath(ea_path), os.path.getmtime(ea_path)))
+
+    return hashlib.md5('\n'.join(env_parts).encode('utf-8')).hexdigest()
+
+
+def dependency_check_required(plugin_path):
+    """ Check to see if the environment has changed since the last successful dependency check.
+
+    Args:
+        plugin_path (str): The path to the users plugin directory.
+
+    Returns (bool): True if the full dependency checks need to be run.
+    """
+    return read_setting(PLUGIN_NAME + '/DEPENDENCY_FINGERPRINT') != get_environment_fingerprint(plugin_path)
+
+
+def save_dependency_check(plugin_path):
+    """ Store the environment fingerprint after a successful dependency check."""
+    write_setting(PLUGIN_NAME + '/DEPENDENCY_FINGERPRINT', get_environment_fingerprint(plugin_path))
+
+
+def get_pip_version(package, timeout=10):
+    """ Get the most current release version number of a package from online pip via json
 
     source: https://stackoverflow.com/a/40745656
+
+    Args:
+        package (str): the name of the package
+        timeout (int): number of seconds to wait for pypi to respond
+
+    Returns (str): the most current version of the package
+    """
+    url = 'https://pypi.python.org/pypi/{}/json'.format(package)
+    releases = requests.get(url, timeout=timeout).json()['releases']
+    return sorted(releases, key=parse_version, reverse=True)[0]
+
+
+def check_pip_for_update(package):
+    """ Check a package against online pip via json on a background thread so it never delays
+    the loading of QGIS.
+
+    The most current version is stored in the settings and is used by check_python_dependencies
+    on the next start. If a newer version is found the stored environment fingerprint is cleared
+    so the full dependency check will run when QGIS is next started.
+
+    Args:
+        package (str): the name of the package
     """
 
     # only check once a month for pyprecag updates.
@@ -258,18 +328,33 @@ def check_pip_for_update(package):
     if last_pip_check is not None:
         last_pip_check = datetime.strptime(last_pip_check, '%Y-%m-%d')
 
-    if last_pip_check is None or (datetime.now() - last_pip_check).days > 30:
-        url = 'https://pypi.python.org/pypi/{}/json'.format(package)
-        try:
-            releases = requests.get(url).json()['releases']
-            current_version = sorted(releases, key=parse_version, reverse=True)[0]
+    if last_pip_check is not None and (datetime.now() - last_pip_check).days <= 30:
+        return
 
-            write_setting(PLUGIN_NAME + '/LAST_PIP_CHECK', datetime.now().strftime('%Y-%m-%d'))
+    def _fetch(task):
+        return get_pip_version(package)
 
-            return current_version
-        except requests.ConnectionError:
-            LOGGER.info('Skipping pyprecag version check. Cannot reach {}'.format(url))
-    return
+    def _finished(exception, current_version=None):
+        # runs on the main thread so it is safe to log and write settings.
+        _BACKGROUND_TASKS.remove(task)
+
+        if exception is not None or current_version is None:
+            LOGGER.info('Skipping {} version check. Cannot reach pypi'.format(package))
+            return
+
+        write_setting(PLUGIN_NAME + '/LAST_PIP_CHECK', datetime.now().strftime('%Y-%m-%d'))
+        write_setting(PLUGIN_NAME + '/{}_PIP_VERSION'.format(package.upper()), current_version)
+
+        installed = check_package(package)['Version']
+        if installed == '' or parse_version(installed) < parse_version(current_version):
+            LOGGER.info('{} {} is available. Dependencies will be checked when QGIS is next '
+                        'started'.format(package, current_version))
+            write_setting(PLUGIN_NAME + '/DEPENDENCY_FINGERPRINT', '')
+
+    task = QgsTask.fromFunction('PAT {} version check'.format(package), _fetch,
+                                on_finished=_finished)
+    _BACKGROUND_TASKS.append(task)
+    QgsApplication.taskManager().addTask(task)
 
 
 def create_file_from_template(template_file, arg_dict, write_file):
@@ -345,7 +430,9 @@ def check_python_dependencies(plugin_path, iface):
                 osgeo_packs += [argCheck]
 
         packCheck['pyprecag'] = check_package('pyprecag')
-        cur_pyprecag_ver = check_pip_for_update('pyprecag')
+
+        # the latest version is retrieved in the background by check_pip_for_update
+        cur_pyprecag_ver = read_setting(PLUGIN_NAME + '/PYPRECAG_PIP_VERSION')
         if cur_pyprecag_ver is not None:
             if parse_version(packCheck['pyprecag']['Version']) < parse_version(cur_pyprecag_ver):
                 packCheck['pyprecag']['Action'] = 'Upgrade'
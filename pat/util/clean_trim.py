@@ -0,0 +1,634 @@
+# coding=utf-8
+"""
+/***************************************************************************
+ CSIRO Precision Agriculture Tools (PAT) Plugin
+
+ clean_trim -  Clean and trim points using a sorted outlier trim and array based thinning, and clean
+               many csv files in parallel.
+           -------------------
+        begin      : 2026-10-19
+        git sha    : $Format:%H$
+        copyright  : (c) 2026, Commonwealth Scientific and Industrial Research Organisation (CSIRO)
+        email      : PAT@csiro.au
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the associated CSIRO Open Source Software       *
+ *   License Agreement (GPLv3) provided with this plugin.                  *
+ *                                                                         *
+ ***************************************************************************/
+"""
+import logging
+import os
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import as_completed
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import shapely
+from geopandas import GeoDataFrame
+
+from pyprecag import config, crs as pyprecag_crs, number_types
+from pyprecag.convert import convert_csv_to_points
+from pyprecag.errors import GeometryError
+
+from pat import LOGGER_NAME
+from pat.util.vector_formats import DEFAULT_VECTOR_FORMAT, change_vector_format, save_vector
+from pat.util.workers import get_worker_count, process_pool
+
+LOGGER = logging.getLogger(LOGGER_NAME)
+LOGGER.addHandler(logging.NullHandler())  # logging.StreamHandler()
+
+
+def thin_point_by_distance(point_geodataframe, thin_distance_metres=1.0, out_filename=None):
+    """ Thin points by a distance in metres. All points less than the set distance will be removed.
+
+    This gives the same result as pyprecag.vector_ops.thin_point_by_distance. The points are
+    joined dot to dot into a line in file order, then sorted by x and then by y, and vertices closer
+    than the thin distance to the previous kept vertex are removed. The point order and ids are
+    kept as arrays rather than shapely points so there is no per point python work.
+
+    Args:
+        point_geodataframe (geopandas.geodataframe.GeoDataFrame): The input points geodataframe in a
+                                                                  projected coordinate system
+        thin_distance_metres (float):   A floating number representing the minimum distance between points
+        out_filename (str): (Optional) The path and filename to save the result to
+
+    Returns:
+        geopandas.GeoDataFrame: The thinned GeoDataFrame with the filter and filter_inc columns updated
+    """
+
+    if not isinstance(thin_distance_metres, number_types):
+        raise TypeError('thinDist_m must be a floating number.')
+
+    if not isinstance(point_geodataframe, GeoDataFrame):
+        raise TypeError("Input Points should be a geopandas data frame")
+
+    if not any("POINT" in g.upper() for g in point_geodataframe.geom_type.unique()):
+        raise GeometryError('Invalid geometry. input shapefile should be point or multipoint')
+
+    if point_geodataframe.crs.is_geographic:
+        raise TypeError("Input data is not in a projected coordinate system")
+
+    if out_filename is not None and not os.path.exists(os.path.dirname(out_filename)):
+        raise IOError('Output directory {} does not exist'.format(os.path.dirname(out_filename)))
+
+    point_geodataframe = point_geodataframe.copy()
+
+    if thin_distance_metres == 0:
+        LOGGER.warning('A thin distance of Zero (0) was used. Thinning of input data not undertaken')
+        return point_geodataframe
+
+    if 'filter' not in point_geodataframe.columns:
+        point_geodataframe['filter'] = np.nan
+    if 'filter_inc' not in point_geodataframe.columns:
+        point_geodataframe['filter_inc'] = 0
+    point_geodataframe['filter'] = point_geodataframe['filter'].astype(object)
+
+    coords = shapely.get_coordinates(point_geodataframe.geometry.values)
+    filter_col = point_geodataframe.columns.get_loc('filter')
+    filter_inc_col = point_geodataframe.columns.get_loc('filter_inc')
+
+    # positions of the remaining points in their current order
+    subset = np.arange(len(point_geodataframe))
+
+    for iloop, sort_by in enumerate(['pointXY', 'pointX', 'pointY'], start=1):
+        if sort_by == 'pointX':
+            subset = subset[np.argsort(coords[subset, 0], kind='quicksort')]
+        elif sort_by == 'pointY':
+            subset = subset[np.argsort(coords[subset, 1], kind='quicksort')]
+
+        # play dot to dot to create a single very long line using the position for z
+        line = shapely.linestrings(coords[subset, 0], coords[subset, 1], subset.astype(np.float64))
+
+        # thin the line by the desired distance and get the position of the remaining vertices
+        simp_line = shapely.remove_repeated_points(line, tolerance=thin_distance_metres)
+        thin_idx = shapely.get_coordinates(simp_line, include_z=True)[:, 2].astype(np.int64)
+
+        filter_str = '{} ({}m)'.format(sort_by, thin_distance_metres)
+        filtered = subset[~np.isin(subset, thin_idx)]
+
+        LOGGER.info('remaining: {:.>10,} ... removed: {:.>10,} ... {}'.format(len(thin_idx), len(filtered),
+                                                                              filter_str))
+        if len(thin_idx) == 0:
+            raise TypeError("There are no features left after {}. Check the coordinate systems and "
+                            "try again".format(sort_by))
+
+        point_geodataframe.iloc[filtered, [filter_col, filter_inc_col]] = [filter_str, iloop + 1]
+
+        subset = thin_idx
+
+    if config.get_debug_mode() and out_filename is not None:  # save with filter column.
+        save_vector(point_geodataframe, out_filename)
+    elif out_filename is not None:
+        save_vector(point_geodataframe.drop('filter', axis=1), out_filename)
+
+    return point_geodataframe
+
+
+def trim_outliers(values, stdevs, iterative=True):
+    """ Find the values which are outliers by more than a number of standard deviations from the mean.
+
+    When iterative, the mean and standard deviation are recalculated from the remaining values and
+    trimming is repeated until no values are removed. The values are sorted once so the remaining
+    values are always a contiguous range, and the mean and variance of the range are updated from
+    cumulative sums rather than recalculated from every remaining value.
+
+    Args:
+        values (numpy.ndarray): the values to trim. These should not contain nan.
+        stdevs (float): The number of standard deviations used to trim outliers
+        iterative (bool): Iteratively Trim outliers
+
+    Returns:
+        numpy.ndarray: the iteration (from 1) each value was trimmed or 0 for those remaining
+    """
+    values = np.asarray(values, dtype=np.float64)
+    trimmed = np.zeros(len(values), dtype=np.int64)
+    if len(values) == 0:
+        return trimmed
+
+    order = np.argsort(values, kind='mergesort')
+    sorted_vals = values[order]
+
+    # centre the values to limit the precision lost in the cumulative sums.
+    shift = sorted_vals.mean()
+    centred = sorted_vals - shift
+    cum_sum = np.concatenate([[0.], np.cumsum(centred)])
+    cum_sq = np.concatenate([[0.], np.cumsum(centred ** 2)])
+
+    lo, hi = 0, len(values)
+    i = 0
+    while hi - lo > 0:
+        i += 1
+        count = hi - lo
+        total = cum_sum[hi] - cum_sum[lo]
+        mean = total / count + shift
+        with np.errstate(divide='ignore', invalid='ignore'):
+            std = np.sqrt(np.float64(max(cum_sq[hi] - cum_sq[lo] - total ** 2 / count, 0.)) / (count - 1))
+
+        def is_outlier(pos):
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return abs((sorted_vals[pos] - mean) / std) >= stdevs
+
+        # the values are sorted so find the cut off either side then step to the exact boundary.
+        new_lo = min(max(int(np.searchsorted(sorted_vals, mean - stdevs * std, 'left')), lo), hi)
+        while new_lo > lo and not is_outlier(new_lo - 1):
+            new_lo -= 1
+        while new_lo < hi and is_outlier(new_lo):
+            new_lo += 1
+
+        new_hi = max(min(int(np.searchsorted(sorted_vals, mean + stdevs * std, 'right')), hi), new_lo)
+        while new_hi < hi and not is_outlier(new_hi):
+            new_hi += 1
+        while new_hi > new_lo and is_outlier(new_hi - 1):
+            new_hi -= 1
+
+        if new_lo == lo and new_hi == hi:
+            break
+
+        trimmed[order[lo:new_lo]] = i
+        trimmed[order[new_hi:hi]] = i
+        lo, hi = new_lo, new_hi
+
+        if not iterative:
+            break
+
+    return trimmed
+
+
+def clean_trim_points(points_geodataframe, points_crs, process_column, output_csvfile, poly_geodataframe=None,
+                      boundary_polyfile=None, out_keep_shapefile=None, out_removed_shapefile=None,
+                      remove_zeros=True, stdevs=3, iterative=True, thin_dist_m=1.0):
+    """ Clean and/or Trim a points dataframe.
+
+        This gives the same result as pyprecag.processing.clean_trim_points. The iterative
+        standard deviation trim is calculated from sorted values using trim_outliers and
+        thinning uses the array based thin_point_by_distance.
+
+        Preparation includes:
+            - Clip data to polygon.
+            - Remove values where data_column are less than or equal to zero
+            - Calculate Normalised value for data_column (number of StDev).
+            - Iteratively Trim outliers based on Normalised data_column
+            - Remove points closer than a set distance (trim_dist_m)
+
+    Args:
+        points_geodataframe (geopandas.geodataframe.GeoDataFrame): The input points geodataframe
+        points_crs (pyprecag_crs.crs): The Spatial Reference System of the point_geodataframe
+        process_column (str):  The column  to normalise, trim and clean.
+        output_csvfile (str): The Trimmed & Cleaned output CSV file
+        poly_geodataframe (geopandas.geodataframe.GeoDataFrame): Optionally a polygon used to Clip the points.
+        boundary_polyfile (str): Optionally a polygon file used to Clip the points.
+        out_keep_shapefile (str): Optionally save the Trimmed & Cleaned to a vector file. eg .gpkg or .shp
+        out_removed_shapefile (str): Optionally save a vector file containing features removed while
+                    cleaning/filtering. A column called filter will be added showing the reason a
+                    point was removed.
+        remove_zeros (bool): Optionally remove values where data_column are <= to zero
+                    prior to removing outliers.
+        stdevs (int): The number of standard deviations used to trim outliers
+        iterative (bool): Optionally Iteratively Trim outliers based on Normalised Data column
+        thin_dist_m (float): A distance in metres representing the minimum allowed distance
+                    between points. Points less than this distance will be removed.
+
+    Returns:
+        geopandas.geodataframe.GeoDataFrame: Representing the cleaned/trimmed data file.
+        pyprecag_crs.crs: The pyprecag CRS object of the points dataframe.
+    """
+
+    if not isinstance(points_geodataframe, GeoDataFrame):
+        raise TypeError('Invalid input data : points_geodataframe')
+
+    if not any("POINT" in g.upper() for g in points_geodataframe.geom_type.unique()):
+        raise TypeError('Invalid input data : a points geopandas dataframe is required')
+
+    if points_crs and not isinstance(points_crs, pyprecag_crs.crs):
+        raise TypeError('Crs must be an instance of pyprecag.crs.crs')
+
+    if output_csvfile is None:
+        raise TypeError('Invalid input data : an output csv path and file is required')
+
+    for argCheck in [output_csvfile, out_keep_shapefile, out_removed_shapefile]:
+        if argCheck is None:
+            continue
+
+        if not os.path.exists(os.path.dirname(argCheck)):
+            raise IOError('Output folder does not exist: {}'.format(os.path.dirname(argCheck)))
+
+    for argCheck in [('thinDist_m', thin_dist_m), ('stdev', stdevs)]:
+        if not isinstance(argCheck[1], number_types):
+            raise TypeError('{} must be a integer or floating number.'.format(argCheck[0]))
+
+    if process_column not in points_geodataframe.columns:
+        raise TypeError('Column {} does not exist in input geodataframe'.format(process_column))
+
+    for argCheck in [('remove_zeros', remove_zeros), ('iterative', iterative)]:
+        if not isinstance(argCheck[1], bool):
+            raise TypeError('{} should be a boolean.'.format(argCheck[0]))
+
+    if points_crs:
+        points_geodataframe.crs = points_crs.epsg
+
+    norm_column = 'nrm_' + process_column
+    LOGGER.info('Normalized Column is {}'.format(norm_column))
+
+    if norm_column in points_geodataframe.columns:
+        LOGGER.warning('Column {} already exists and will be overwritten'.format(norm_column))
+
+    if boundary_polyfile is not None:
+        if not os.path.exists(boundary_polyfile):
+            raise IOError("Invalid path: {}".format(boundary_polyfile))
+        poly_geodataframe = GeoDataFrame.from_file(boundary_polyfile)
+
+    if poly_geodataframe is not None:
+        if not isinstance(poly_geodataframe, GeoDataFrame):
+            raise TypeError('Invalid input data : poly_geodataframe')
+
+        if not any("POLY" in g.upper() for g in poly_geodataframe.geom_type.unique()):
+            raise GeometryError('Invalid geometry. Input poly_geodataframe or boundary_polyfile should be polygon'
+                                ' or multipolygon')
+
+    start_time = time.time()
+
+    # set a UniqueID Field which ISNT the FID for use through out the processing
+    id_col = 'PT_UID'  # IE clean/trim fid
+    points_geodataframe[id_col] = points_geodataframe.index
+    gdf_points = points_geodataframe.copy()
+
+    # To speed things up, drop all un-required columns
+    gdf_points.drop(columns=gdf_points.columns.difference(['geometry', id_col, norm_column, process_column]),
+                    axis=1, inplace=True)
+
+    step_time = time.time()
+
+    # set defaults
+    gdf_points['filter'] = pd.Series(np.nan, index=gdf_points.index, dtype=object)
+    gdf_points['filter_inc'] = 0
+
+    filters_applied = []
+    remaining = np.ones(len(gdf_points), dtype=bool)
+
+    def apply_filter(remove, filter_string):
+        """ flag points to remove with the filter string and the order the filter was applied."""
+        remove = remove & remaining
+        if not remove.any():
+            return
+
+        filters_applied.append(filter_string)
+        gdf_points.loc[remove, ['filter', 'filter_inc']] = [filter_string, len(filters_applied)]
+        remaining[remove] = False
+
+        # use ..... to space out values as QGIS doesn't honour multiple spaces or tabs in the log panel.
+        LOGGER.info('remaining: {:.>10,} ... removed: {:.>10,} ... {}'.format(int(remaining.sum()),
+                                                                              int(remove.sum()), filter_string))
+
+    # Remove rows where data col is empty/null
+    apply_filter(gdf_points[process_column].isnull().values, 'null/missing data')
+
+    # remove missing or empty geometry
+    apply_filter((gdf_points.is_empty | gdf_points.geometry.isna()).values, 'empty/missing geom')
+
+    # Remove duplicated geometries
+    apply_filter(gdf_points["geometry"].to_wkb().duplicated(keep='first').values, 'Duplicate XY')
+
+    if poly_geodataframe is not None:
+        if poly_geodataframe.crs.to_epsg() != gdf_points.crs.to_epsg():
+            poly_geodataframe = poly_geodataframe.to_crs(gdf_points.crs)
+            LOGGER.info(f'{"Reproject clip polygon": <30} {"to": >10}   {gdf_points.crs.to_epsg():<15}')
+
+        # Clip to boundary then apply to filter column
+        apply_filter(~gdf_points.geometry.within(poly_geodataframe.unary_union).values, 'clip')
+
+        if not remaining.any():
+            raise GeometryError('Clipping removed all features. Check coordinate systems and/or '
+                                'clip polygon layer and try again')
+
+        del poly_geodataframe
+
+    if remove_zeros:
+        apply_filter((gdf_points[process_column] <= 0).values, '<= zero')
+
+        if not remaining.any():
+            raise GeometryError(f"Zero filter removed all points in column {process_column}")
+
+    if stdevs > 0:
+        trimmed = np.zeros(len(gdf_points), dtype=np.int64)
+        trimmed[remaining] = trim_outliers(gdf_points.loc[remaining, process_column].values, stdevs, iterative)
+
+        for i in range(1, int(trimmed.max(initial=0)) + 1):
+            apply_filter(trimmed == i, f'{stdevs} std iter {int(i)}')
+
+    gdf_thin = thin_point_by_distance(gdf_points[remaining], thin_dist_m)
+
+    # update the filter incremental number
+    gdf_thin['filter_inc'] = gdf_thin['filter_inc'] + len(filters_applied)
+
+    # update(join/merge) gdfPoints['filter'] column with results from thinning.
+    gdf_points.update(gdf_thin[gdf_thin['filter'].notnull()])
+    step_time = time.time()
+
+    del gdf_thin
+
+    # Add the incremental number to the filter column ie '01 clip'
+    removed = gdf_points['filter'].notnull()
+    gdf_points.loc[removed, 'filter'] = gdf_points.loc[removed, 'filter_inc'].map('{:02n}'.format) + ' ' + \
+        gdf_points.loc[removed, 'filter']
+
+    # recalculate normalised col.
+    yld_mean = gdf_points[gdf_points['filter'].isnull()][process_column].mean()
+    yld_std = gdf_points[gdf_points['filter'].isnull()][process_column].std()
+    gdf_points.loc[gdf_points['filter'].isnull(), norm_column] = (gdf_points[process_column] - yld_mean) / yld_std
+
+    # prepare some summary results for filtered features.
+    # Filter is the reason a point is removed,and filter_inc keeps them in the order they were
+    # removed. ie std it before thining by distance.
+    results_table = gdf_points.copy()
+    results_table.loc[gdf_points['filter'].isnull(), ['filter_inc', 'filter']] = \
+        [len(gdf_points['filter'].unique()), 'Pts remaining']
+
+    results_table = results_table[['filter_inc', 'filter']].value_counts(sort=False).to_frame('count')
+    results_table.reset_index(drop=False, inplace=True)
+
+    results_table.loc[results_table['filter'].isnull(),
+                      ['filter_inc', 'filter']] = [len(results_table), 'Pts remaining']
+
+    results_table['%'] = ((results_table['count'] / results_table['count'].sum()) * 100).round(3)
+    results_table.sort_values('filter_inc', inplace=True)
+
+    results_table.loc['Total'] = results_table.sum(numeric_only=True)  # this will convert int's to floats !!
+    results_table.loc[results_table['filter'].isnull(), ['filter_inc', 'filter']] = [len(results_table), 'Total']
+
+    # Clean up filtered results by removing all columns except those new ones which
+    # have to be copied back to original
+    dropcols = [ea for ea in gdf_points.columns.tolist() if ea not in [norm_column, 'filter', id_col]]
+    gdf_points.drop(dropcols, axis=1, inplace=True)
+
+    # Clean up the original input dataframe and remove existing geometry and coord columns
+    alt_coord_columns = config.get_config_key('geoCSV')['xCoordinate_ColumnName']
+    alt_coord_columns += config.get_config_key('geoCSV')['yCoordinate_ColumnName']
+
+    # Find and Drop coord columns if already exist.
+    coord_columns = [fld for fld in points_geodataframe.columns if fld.upper() in alt_coord_columns]
+
+    if len(coord_columns) > 0:
+        points_geodataframe.drop(coord_columns, axis=1, inplace=True)
+
+    # Use geopandas merge instead of concat to maintain coordinate system info etc.
+    gdf_final = points_geodataframe.merge(gdf_points, on=id_col, how='left')
+
+    # Add x,y coordinates to match coordinate system
+    gdf_final['Easting'] = gdf_final.geometry.x
+    gdf_final['Northing'] = gdf_final.geometry.y
+    gdf_final['EN_EPSG'] = gdf_final.crs.to_epsg()
+
+    # move newer columns to end (geometry, filter, etc)
+    gdf_final.drop([id_col], inplace=True, axis=1)
+
+    # get the appropriate file encoding and save the file
+    try:
+        file_encoding = config.read_config()['geoCSV']['file_encoding']
+    except KeyError:
+        file_encoding = 'utf-8'
+
+    gdf_final[gdf_final['filter'].isnull()].drop(['geometry', 'filter'], axis=1) \
+        .to_csv(output_csvfile, index=False, encoding=file_encoding)
+
+    LOGGER.info(f'{"Save to CSV":<30} {len(gdf_final[gdf_final["filter"].isnull()]): >10,} '
+                f'  {os.path.basename(output_csvfile):<15}'
+                f' {str(timedelta(seconds=time.time() - step_time))}')
+
+    step_time = time.time()
+
+    # gdfPoints have all points with a filter string assigned
+    if out_keep_shapefile is not None and out_keep_shapefile != '':
+        save_vector(gdf_final[gdf_final['filter'].isnull()].drop(['filter'], axis=1), out_keep_shapefile)
+
+        LOGGER.info('{:<30} {:>10,}   {:<15} {dur}'.format(
+            'Save kept points', len(gdf_final[gdf_final['filter'].isnull()]),
+            os.path.basename(out_keep_shapefile), dur=str(timedelta(seconds=time.time() - step_time))))
+
+        step_time = time.time()
+
+    if out_removed_shapefile is not None and out_removed_shapefile != '':
+        if gdf_final[gdf_final['filter'].notnull()].empty:
+            LOGGER.info('No features removed. File containing removed points not created.')
+        else:
+            save_vector(gdf_final[gdf_final['filter'].notnull()].drop([norm_column], axis=1),
+                        out_removed_shapefile)
+
+            LOGGER.info('{:<30} {:>10,}   {:<15} {dur}'.format(
+                'Save removed points', len(gdf_final[gdf_final['filter'].notnull()]),
+                os.path.basename(out_removed_shapefile), dur=str(timedelta(seconds=time.time() - step_time))))
+
+    LOGGER.info('\nResults:---------------------------------------\n{}\n'.format(
+        results_table.drop('filter_inc', axis=1).to_string(index=False, justify='center',
+                                                           formatters={'count': "{:,.0f}".format,
+                                                                       '%': "{:.3f}%".format})))
+
+    LOGGER.info(f'{process_column} mean....{yld_mean:.5f} ')
+    LOGGER.info(f'{process_column} std....{yld_std: .5f} ')
+    LOGGER.info(f'{process_column} CV....{ 100 * yld_std / yld_mean: .5f} ')
+
+    LOGGER.info('{:<30}\t{dur:<15}\t{}'.format('clean_trim_points', '',
+                                               dur=str(timedelta(seconds=time.time() - start_time))))
+
+    if points_crs:
+        points_crs = pyprecag_crs.crs()
+        points_crs.getFromEPSG(gdf_final.crs.to_epsg())
+
+    return gdf_final[gdf_final['filter'].isnull()], points_crs
+
+
+def _batch_output_names(csv_files, process_column):
+    """ Create the name of the output csv for each input csv file.
+
+    Files are named <filename>_<process_column>_normtrimmed.csv. Where files from different
+    folders have the same name the parent folder name is added to the front, and a counter is added
+    if the names still match. Names are compared ignoring case as on Windows.
+
+    Returns:
+        List[str]: the output file names without a folder
+    """
+    filenames = [os.path.splitext(os.path.basename(ea))[0] for ea in csv_files]
+    counts = Counter(ea.lower() for ea in filenames)
+
+    for i, csv_file in enumerate(csv_files):
+        if counts[filenames[i].lower()] > 1:
+            parent = os.path.basename(os.path.dirname(os.path.abspath(csv_file)))
+            filenames[i] = '{}_{}'.format(parent, filenames[i]) if parent else filenames[i]
+
+    out_names, used = [], set()
+    for filename in filenames:
+        out_name, counter = filename, 1
+        while out_name.lower() in used:
+            counter += 1
+            out_name = '{}_{}'.format(filename, counter)
+
+        used.add(out_name.lower())
+        out_names.append('{}_{}_normtrimmed.csv'.format(out_name, process_column))
+
+    return out_names
+
+
+def _clean_trim_csv(csv_file, out_csvfile, process_column, coord_columns_epsg, out_epsg, poly_geodataframe,
+                    remove_zeros, stdevs, iterative, thin_dist_m, save_vectors, vector_driver):
+    """ Worker task to clean and trim one csv file.
+
+    Returns:
+        dict: the summary of the file. Error is set if the file failed.
+    """
+    start_time = time.time()
+
+    summary = OrderedDict([('File', os.path.basename(csv_file)), ('Points', 0), ('Kept', 0), ('Removed', 0),
+                           ('Duration', ''), ('Output', ''), ('Error', '')])
+    try:
+        gdf_points, _ = convert_csv_to_points(csv_file, coord_columns_epsg=coord_columns_epsg,
+                                              out_epsg=out_epsg)
+        summary['Points'] = len(gdf_points)
+
+        out_keep_shapefile, out_removed_shapefile = None, None
+        if save_vectors:
+            out_keep_shapefile = change_vector_format(out_csvfile, vector_driver)
+
+            # only replace the suffix of the file name, not any folder or earlier part of the name.
+            keep_root, keep_ext = os.path.splitext(out_keep_shapefile)
+            out_removed_shapefile = keep_root[:-len('_normtrimmed')] + '_removedpts' + keep_ext
+
+        gdf_keep, _ = clean_trim_points(gdf_points, None, process_column, out_csvfile,
+                                        poly_geodataframe=poly_geodataframe,
+                                        out_keep_shapefile=out_keep_shapefile,
+                                        out_removed_shapefile=out_removed_shapefile,
+                                        remove_zeros=remove_zeros, stdevs=stdevs, iterative=iterative,
+                                        thin_dist_m=thin_dist_m)
+
+        summary['Kept'] = len(gdf_keep)
+        summary['Removed'] = summary['Points'] - summary['Kept']
+        summary['Output'] = out_csvfile
+
+    except Exception as err:
+        summary['Error'] = '{}: {}'.format(type(err).__name__, err)
+
+    summary['Duration'] = str(timedelta(seconds=time.time() - start_time))
+    return summary
+
+
+def batch_clean_trim_points(csv_files, out_folder, process_column, coord_columns_epsg=4326, out_epsg=-1,
+                            poly_geodataframe=None, remove_zeros=True, stdevs=3, iterative=True,
+                            thin_dist_m=1.0, save_vectors=False, vector_driver=DEFAULT_VECTOR_FORMAT, max_workers=None,
+                            progress_callback=None):
+    """ Clean and trim a list of csv files in parallel worker processes using the same parameters.
+
+    Each file is saved to out_folder as <filename>_<process_column>_normtrimmed.csv. Files with
+    the same name from different folders have the folder name added to the front. A file which
+    fails is recorded in the summary and does not stop the other files. The summary is saved to
+    out_folder as clean_trim_summary.csv.
+
+    Args:
+        csv_files (List[str]): the csv files to clean and trim.
+        out_folder (str): The output folder.
+        process_column (str):  The column to normalise, trim and clean. It must exist in every file.
+        coord_columns_epsg (int): EPSG number for the coordinate columns in the csv files.
+        out_epsg (int): The EPSG number of the projected coordinate system used for cleaning, or -1
+                        to use the utm zone of each file.
+        poly_geodataframe (geopandas.geodataframe.GeoDataFrame): Optionally a polygon used to Clip the points.
+        remove_zeros (bool): Optionally remove values where data_column are <= to zero
+        stdevs (int): The number of standard deviations used to trim outliers
+        iterative (bool): Optionally Iteratively Trim outliers
+        thin_dist_m (float): The minimum allowed distance between points.
+        save_vectors (bool): Also save the kept and removed points to vector files.
+        vector_driver (str): The OGR driver of the vector files. eg 'GPKG' or 'ESRI Shapefile'
+        max_workers (int): the number of worker processes.
+        progress_callback (function): Optional. Called with the number of files completed, the
+                                      number of files and the file summary as each file finishes.
+
+    Returns:
+        pandas.core.frame.DataFrame: the summary of kept and removed points and duration for each file.
+    """
+
+    if len(csv_files) == 0:
+        raise ValueError('No csv files to process')
+
+    if not os.path.exists(out_folder):
+        raise IOError('Output folder does not exist: {}'.format(out_folder))
+
+    start_time = time.time()
+    n_files = len(csv_files)
+    summaries = [None] * n_files
+    out_csvfiles = [os.path.join(out_folder, ea) for ea in _batch_output_names(csv_files, process_column)]
+
+    with process_pool(min(get_worker_count(max_workers), n_files)) as executor:
+        futures = {executor.submit(_clean_trim_csv, csv_file, out_csvfiles[i], process_column, coord_columns_epsg,
+                                   out_epsg, poly_geodataframe, remove_zeros, stdevs, iterative,
+                                   thin_dist_m, save_vectors, vector_driver): i for i, csv_file in enumerate(csv_files)}
+
+        for completed, future in enumerate(as_completed(futures), start=1):
+            summary = future.result()
+            summaries[futures[future]] = summary
+            status = '{} of {}'.format(completed, n_files)
+
+            if summary['Error'] == '':
+                LOGGER.info('{:<30} {:>10}   {:<15} {dur}'.format(
+                    'Cleaned {:,} of {:,} points'.format(summary['Kept'], summary['Points']), status,
+                    summary['File'], dur=summary['Duration']))
+            else:
+                LOGGER.warning('{:<30} {:>10}   {:<15} {}'.format('File failed', status, summary['File'],
+                                                                  summary['Error']))
+
+            if progress_callback is not None:
+                progress_callback(completed, n_files, summary)
+
+    results_table = pd.DataFrame(summaries)
+    results_table.to_csv(os.path.join(out_folder, 'clean_trim_summary.csv'), index=False)
+
+    LOGGER.info('\nResults:---------------------------------------\n{}\n'.format(
+        results_table.drop(columns=['Output']).to_string(index=False, justify='center',
+                                                         formatters={'Points': "{:,.0f}".format,
+                                                                     'Kept': "{:,.0f}".format,
+                                                                     'Removed': "{:,.0f}".format})))
+
+    LOGGER.info('{:<30}\t{dur:<15}\t{}'.format('batch_clean_trim_points', '',
+                                               dur=str(timedelta(seconds=time.time() - start_time))))
+    return results_table
@@ -0,0 +1,179 @@
+# coding=utf-8
+"""
+/***************************************************************************
+ CSIRO Precision Agriculture Tools (PAT) Plugin
+
+ file_extents -  Find the extent of the points in a CSV or VESPER grid file by reading only the
+                 coordinate columns in chunks.
+           -------------------
+        begin      : 2026-10-19
+        git sha    : $Format:%H$
+        copyright  : (c) 2026, Commonwealth Scientific and Industrial Research Organisation (CSIRO)
+        email      : PAT@csiro.au
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the associated CSIRO Open Source Software       *
+ *   License Agreement (GPLv3) provided with this plugin.                  *
+ *                                                                         *
+ ***************************************************************************/
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from pyprecag.describe import predictCoordinateColumnNames
+
+from pat import LOGGER_NAME
+from pat.util.result_cache import file_fingerprint
+
+LOGGER = logging.getLogger(LOGGER_NAME)
+LOGGER.addHandler(logging.NullHandler())  # logging.StreamHandler()
+
+# The number of rows parsed at a time.
+CHUNK_SIZE = 500000
+
+# The number of file extents kept in memory.
+MAX_CACHED = 32
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+class FileExtent(object):
+    """ The extent and number of points in a file.
+
+    Attributes:
+        bounds (tuple): xmin, ymin, xmax, ymax of the coordinates
+        count (int): the number of rows with valid coordinates and values
+        coord_columns (List[str]): the x and y column names
+    """
+
+    def __init__(self, bounds, count, coord_columns):
+        self.bounds = bounds
+        self.count = count
+        self.coord_columns = coord_columns
+
+    def __repr__(self):
+        return 'FileExtent(bounds={}, count={}, coord_columns={})'.format(self.bounds, self.count,
+                                                                          self.coord_columns)
+
+
+def _scan_chunks(chunks):
+    """ Merge the minimum, maximum and count of the x and y columns of each chunk.
+
+    Args:
+        chunks (iterator): pandas dataframes with the x and y columns first. Rows with a missing
+            value in any column are not counted.
+
+    Returns:
+        tuple, int: the bounds (xmin, ymin, xmax, ymax) and the number of valid rows
+    """
+    mins = np.full(2, np.inf)
+    maxs = np.full(2, -np.inf)
+    count = 0
+    for chunk in chunks:
+        xy = chunk.to_numpy(dtype=np.float64)
+        xy = xy[~np.isnan(xy).any(axis=1), :2]
+        if len(xy) == 0:
+            continue
+
+        mins = np.minimum(mins, xy.min(axis=0))
+        maxs = np.maximum(maxs, xy.max(axis=0))
+        count += len(xy)
+
+    if count == 0:
+        raise ValueError('The file does not contain any valid coordinates')
+
+    return (mins[0], mins[1], maxs[0], maxs[1]), count
+
+
+def _cached_extent(kind, filename, scan, options=()):
+    """ Get the extent of a file from the cache or scan it.
+
+    The cache is keyed on the options and the file fingerprint so a file which is changed is
+    scanned again.
+    """
+    key = json.dumps([kind, list(options), file_fingerprint(filename)])
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    step_time = time.time()
+    extent = scan(filename)
+
+    LOGGER.debug('{:<30} {:>10,}   {:<15} {dur}'.format('Scan {} extent'.format(kind), extent.count,
+                                                       os.path.basename(filename),
+                                                       dur=str(timedelta(seconds=time.time() - step_time))))
+
+    with _cache_lock:
+        _cache[key] = extent
+        while len(_cache) > MAX_CACHED:
+            _cache.popitem(last=False)
+
+    return extent
+
+
+def csv_extent(csv_file, value_columns=()):
+    """ Find the extent of the points in a CSV file.
+
+    The coordinate columns are found from the header using predictCoordinateColumnNames, then only
+    those columns are parsed in chunks so the whole file is never held in memory.
+
+    Args:
+        csv_file (str): the CSV file
+        value_columns (List[str]): numeric columns which must also have a value for a row to be
+            counted. eg the columns written to a VESPER data file.
+
+    Returns:
+        FileExtent: the extent, number of points and coordinate columns
+    """
+    value_columns = list(value_columns)
+
+    def _scan(filename):
+        columns = pd.read_csv(filename, nrows=0).columns
+        coord_columns = predictCoordinateColumnNames(columns)
+        if None in coord_columns or len(coord_columns) != 2:
+            raise ValueError('Could not find the coordinate columns in {}'.format(os.path.basename(filename)))
+
+        missing = [ea for ea in value_columns if ea not in columns]
+        if len(missing) > 0:
+            raise ValueError('Columns {} not found in {}'.format(', '.join(missing), os.path.basename(filename)))
+
+        read_columns = coord_columns + [ea for ea in value_columns if ea not in coord_columns]
+        chunks = pd.read_csv(filename, usecols=read_columns, engine='c', chunksize=CHUNK_SIZE)
+        bounds, count = _scan_chunks(chunk[read_columns] for chunk in chunks)
+        return FileExtent(bounds, count, coord_columns)
+
+    return _cached_extent('csv', csv_file, _scan, value_columns)
+
+
+def vesper_grid_extent(grid_file):
+    """ Find the extent of the cell centres in a VESPER grid file.
+
+    The file holds a space separated x and y on each line with no header.
+
+    Args:
+        grid_file (str): the VESPER grid file
+
+    Returns:
+        FileExtent: the extent, number of cells and coordinate columns
+    """
+
+    def _scan(filename):
+        chunks = pd.read_csv(filename, sep=r'\s+', header=None, names=['X', 'Y'], usecols=[0, 1],
+                             engine='c', chunksize=CHUNK_SIZE)
+        bounds, count = _scan_chunks(chunks)
+        return FileExtent(bounds, count, ['X', 'Y'])
+
+    return _cached_extent('grid', grid_file, _scan)
@@ -0,0 +1,148 @@
+# coding=utf-8
+"""
+/***************************************************************************
+ CSIRO Precision Agriculture Tools (PAT) Plugin
+
+ image_indices -  Calculate several image indices together in a single pass over an image.
+           -------------------
+        begin      : 2026-10-19
+        git sha    : $Format:%H$
+        copyright  : (c) 2026, Commonwealth Scientific and Industrial Research Organisation (CSIRO)
+        email      : PAT@csiro.au
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the associated CSIRO Open Source Software       *
+ *   License Agreement (GPLv3) provided with this plugin.                  *
+ *                                                                         *
+ ***************************************************************************/
+"""
+import logging
+import os
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+import numpy as np
+import rasterio
+from rasterio.enums import Resampling
+
+from pyprecag.bandops import BandMapping
+
+from pat import LOGGER_NAME
+from pat.util.raster_windows import BLOCK_SIZE, build_overviews, get_windows, map_windows, tiled_profile
+
+LOGGER = logging.getLogger(LOGGER_NAME)
+LOGGER.addHandler(logging.NullHandler())  # logging.StreamHandler()
+
+# The band types used by each index and the equation using those bands in the same order.
+# These match pyprecag.bandops.CalculateIndices
+INDEX_EQUATIONS = OrderedDict([
+    ('NDVI', (('infrared', 'red'), lambda ir, red: (ir - red) / (ir + red))),
+    ('PCD', (('infrared', 'red'), lambda ir, red: ir / red)),
+    ('GNDVI', (('infrared', 'green'), lambda ir, green: (ir - green) / (ir + green))),
+    ('NDRE', (('infrared', 'rededge'), lambda ir, re: (ir - re) / (ir + re))),
+    ('CHLRE', (('infrared', 'rededge'), lambda ir, re: ir / re - 1)),
+])
+
+
+def get_index_bands(band_map, indices):
+    """ Get the band numbers required to calculate a list of indices.
+
+    Args:
+        band_map (pyprecag.bandops.BandMapping): a Band mapping matching a band number to band type.
+        indices (List[str]): The list of indices to calculate.
+
+    Returns:
+        Dict[str, int]: the band number for each band type required.
+    """
+    band_nums = {}
+    for ea_index in indices:
+        if ea_index.upper() not in INDEX_EQUATIONS:
+            raise ValueError('{} is not a supported index. Options are {}'.format(
+                ea_index, ', '.join(INDEX_EQUATIONS)))
+
+        for band_type in INDEX_EQUATIONS[ea_index.upper()][0]:
+            if band_map[band_type] == 0:
+                raise ValueError('{} band not specified'.format(band_type.title()))
+            band_nums[band_type] = band_map[band_type]
+
+    return band_nums
+
+
+def calculate_image_indices(image_file, band_map, out_image_file, indices=[], out_nodata=-9999,
+                            src_nodata=None, block_size=BLOCK_SIZE, max_workers=None):
+    """Creates a multi-band image where each band represents a calculated index.
+
+    Each band used by the indices is read once per window and all indices are calculated from the
+    same window, so the image is read once regardless of the number of indices. Each index is
+    written to its own band of the output image with a name tag. The results match
+    pyprecag.raster_ops.calculate_image_indices.
+
+    Indices currently supported are:
+        NDVI - Normalised difference vegetation index
+        PCD - Plant cell density index
+        GNDVI - Green normalised difference vegetation index
+        CHLRE - Chlorophyll red-edge index
+        NDRE - Normalised difference red-edge index
+
+    Args:
+        image_file (str): the input image file
+        band_map (pyprecag.bandops.BandMapping): a Band mapping matching a band number to band type.
+        out_image_file (str): the name and location of the output image file.
+        indices (List[str]): The list of indices to calculate.
+        out_nodata (int): the value to use in the output image for the nodata
+        src_nodata (int): the nodata value of the image. Only used if the image does not have one.
+        block_size (int): the size of the windows
+        max_workers (int): the number of threads used to calculate windows
+    """
+
+    if not isinstance(indices, list):
+        raise TypeError('indices must be a list of indices to calculate')
+
+    start_time = time.time()
+    band_map = BandMapping(**band_map)
+    band_nums = get_index_bands(band_map, indices)
+    mask_band = band_map['mask'] if band_map['mask'] > 0 else 1
+
+    read_bands = sorted(set(band_nums.values()) | {mask_band})
+    equations = [INDEX_EQUATIONS[ea.upper()] for ea in indices]
+
+    def _calculate(src, window):
+        data = dict(zip(read_bands, src.read(read_bands, window=window, masked=True)))
+
+        if src.nodata is not None:
+            mask = np.ma.getmaskarray(data[mask_band])
+        elif src_nodata is not None:
+            mask = np.ma.getdata(data[mask_band]) == src_nodata
+        else:
+            mask = np.zeros(data[mask_band].shape, dtype=bool)
+
+        bands = {band_type: np.where(mask, np.nan, np.ma.getdata(data[band_num])).astype(np.float32)
+                 for band_type, band_num in band_nums.items()}
+
+        results = np.empty((len(equations),) + mask.shape, dtype=np.float32)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for i, (band_types, equation) in enumerate(equations):
+                results[i] = equation(*[bands[ea] for ea in band_types])
+
+        results[np.isnan(results)] = out_nodata
+        return window, results
+
+    with rasterio.open(os.path.normpath(image_file)) as src:
+        profile = tiled_profile(src.meta, count=len(indices), dtype=rasterio.float32, nodata=out_nodata)
+        windows = get_windows(src.width, src.height, block_size)
+
+    with rasterio.open(os.path.normpath(out_image_file), 'w', **profile) as dest:
+        for window, results in map_windows(image_file, _calculate, windows, max_workers):
+            dest.write(results, window=window)
+
+        for i, ea_index in enumerate(indices, 1):
+            dest.update_tags(i, name=ea_index)
+
+        build_overviews(dest, Resampling.average)
+
+    LOGGER.info('{:<30} {:>10}   {:<15} {dur}'.format('Indices Calculate for Image', '', ', '.join(indices),
+                                                      dur=str(timedelta(seconds=time.time() - start_time))))
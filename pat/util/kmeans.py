@@ -0,0 +1,646 @@
+# coding=utf-8
+"""
+/***************************************************************************
+ CSIRO Precision Agriculture Tools (PAT) Plugin
+
+ kmeans -  Create zones with k-means clustering from multiple rasters. The clusters are fitted with
+           mini-batch k-means on a stratified sample of pixels, then every pixel is assigned to a
+           cluster window by window in worker processes.
+           -------------------
+        begin      : 2026-10-19
+        git sha    : $Format:%H$
+        copyright  : (c) 2026, Commonwealth Scientific and Industrial Research Organisation (CSIRO)
+        email      : PAT@csiro.au
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the associated CSIRO Open Source Software       *
+ *   License Agreement (GPLv3) provided with this plugin.                  *
+ *                                                                         *
+ ***************************************************************************/
+"""
+import logging
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import rasterio
+from rasterio.enums import Resampling
+import six
+
+from pyprecag import processing
+
+from pat import LOGGER_NAME, TEMPDIR
+from pat.util.raster_windows import (build_overviews, common_area_profile, get_window_bounds, raster_cache,
+                                     read_aligned, tiled_profile)
+from pat.util.workers import process_pool, map_in_batches
+
+LOGGER = logging.getLogger(LOGGER_NAME)
+LOGGER.addHandler(logging.NullHandler())  # logging.StreamHandler()
+
+# The most pixels used to evaluate each cluster count. This is independent of the sample size used to
+# create the output clusters.
+EVALUATION_SAMPLE_SIZE = 20000
+
+# The number of pixels used for each mini-batch k-means iteration
+BATCH_SIZE = 1024
+
+# The number of times k-means is run with different starting centres. The best fit is kept.
+N_INIT = 3
+
+# The number of sampled pixels used to calculate the silhouette coefficient
+SILHOUETTE_SIZE = 2000
+
+# The fuzziness exponent used to calculate the fuzzy performance index and entropy
+FUZZY_EXPONENT = 1.3
+
+# The evaluation sample memory mapped in a worker process, keyed by the file name.
+_EVALUATION_DATA = {}
+
+
+def _window_statistics(raster_files, bounds, shape):
+    """ Worker task to get the count, mean and sum of squared differences of each raster for the
+    pixels in a window which are valid in all rasters."""
+    stack = read_aligned(raster_files, bounds, shape)
+    count = stack[0].count()
+    if count == 0:
+        return 0, None, None
+
+    values = np.array([ea.compressed() for ea in stack])
+    means = values.mean(axis=1)
+    return count, means, ((values - means[:, None]) ** 2).sum(axis=1)
+
+
+def _window_sample(raster_files, bounds, shape, n_samples, seed):
+    """ Worker task to randomly select pixels from a window.
+
+    Returns:
+        numpy.ndarray: the values of the selected pixels in shape (pixels, rasters)
+    """
+    stack = read_aligned(raster_files, bounds, shape)
+    values = np.array([ea.compressed() for ea in stack]).T
+    if n_samples >= len(values):
+        return values
+
+    rng = np.random.default_rng(seed)
+    return values[rng.choice(len(values), n_samples, replace=False)]
+
+
+def _window_predict(raster_files, bounds, shape, means, stds, centres):
+    """ Worker task to assign each pixel in a window to the nearest cluster centre and total the
+    values of each raster by cluster.
+
+    Returns:
+        tuple: the cluster of each pixel (-1 for nodata), and the count, sum and sum of squares of
+            each raster for each cluster
+    """
+    stack = read_aligned(raster_files, bounds, shape)
+    valid = ~np.ma.getmaskarray(stack[0])
+
+    labels = np.full(shape, -1, dtype=np.int16)
+    n_clusters, n_rasters = centres.shape
+    counts = np.zeros(n_clusters, dtype=np.int64)
+    sums = np.zeros((n_clusters, n_rasters))
+    sum_squares = np.zeros((n_clusters, n_rasters))
+
+    if valid.any():
+        values = np.array([ea.compressed() for ea in stack]).T
+        codes = nearest_centre((values - means) / stds, centres)
+        labels[valid] = codes
+
+        counts += np.bincount(codes, minlength=n_clusters)
+        np.add.at(sums, codes, values)
+        np.add.at(sum_squares, codes, values ** 2)
+
+    return labels, counts, sums, sum_squares
+
+
+def nearest_distances(data, centres):
+    """Get the squared euclidean distance between each observation and each centre."""
+    return ((data ** 2).sum(axis=1)[:, None] - 2 * data.dot(centres.T) +
+            (centres ** 2).sum(axis=1)[None, :])
+
+
+def nearest_centre(data, centres):
+    """ Find the nearest cluster centre for each observation.
+
+    Args:
+        data (numpy.ndarray): observations of shape (n, features)
+        centres (numpy.ndarray): cluster centres of shape (k, features)
+
+    Returns:
+        numpy.ndarray: the index of the nearest centre for each observation
+    """
+    return nearest_distances(data, centres).argmin(axis=1)
+
+
+def minibatch_kmeans(data, n_clusters, max_iterations=500, batch_size=BATCH_SIZE, tolerance=1e-4,
+                     random_state=0):
+    """ Fit cluster centres with mini-batch k-means (Sculley 2010) using k-means++ initialisation.
+
+    Args:
+        data (numpy.ndarray): observations of shape (n, features)
+        n_clusters (int): The number of clusters to create.
+        max_iterations (int): The maximum number of mini-batches.
+        batch_size (int): The number of observations in each mini-batch.
+        tolerance (float): Stop when the centres move less than this for 10 consecutive batches.
+        random_state (int): seed for the random number generator so results are repeatable.
+
+    Returns:
+        numpy.ndarray: the cluster centres of shape (n_clusters, features)
+    """
+    rng = np.random.default_rng(random_state)
+    n_obs = len(data)
+
+    if n_obs < n_clusters:
+        raise ValueError('Not enough pixels ({}) to create {} clusters'.format(n_obs, n_clusters))
+
+    # k-means++ initialisation
+    centres = [data[rng.integers(n_obs)]]
+    closest = ((data - centres[0]) ** 2).sum(axis=1)
+    for _ in range(1, n_clusters):
+        if closest.sum() > 0:
+            centre = data[rng.choice(n_obs, p=closest / closest.sum())]
+        else:
+            centre = data[rng.integers(n_obs)]
+        centres.append(centre)
+        closest = np.minimum(closest, ((data - centre) ** 2).sum(axis=1))
+
+    centres = np.array(centres, dtype=np.float64)
+
+    counts = np.zeros(n_clusters)
+    no_change = 0
+    for _ in range(max_iterations):
+        batch = data[rng.choice(n_obs, min(batch_size, n_obs), replace=False)]
+        codes = nearest_centre(batch, centres)
+
+        batch_counts = np.bincount(codes, minlength=n_clusters)
+        batch_sums = np.zeros_like(centres)
+        np.add.at(batch_sums, codes, batch)
+
+        # move each centre towards the mean of its batch members with a per centre learning rate
+        counts += batch_counts
+        updated = batch_counts > 0
+        shift = (batch_sums[updated] - batch_counts[updated, None] * centres[updated]) / counts[updated, None]
+        centres[updated] += shift
+
+        no_change = no_change + 1 if (shift ** 2).sum() < tolerance else 0
+        if no_change >= 10:
+            break
+
+    return centres
+
+
+def fit_kmeans(data, n_clusters, max_iterations=500, n_init=N_INIT, random_state=0):
+    """ Run mini-batch k-means from several starting points and keep the fit with the lowest
+    within-cluster sum of squares.
+
+    Args:
+        data (numpy.ndarray): observations of shape (n, features)
+        n_clusters (int): The number of clusters to create.
+        max_iterations (int): The maximum number of mini-batches.
+        n_init (int): The number of starts.
+        random_state (int): seed for the first start. Each start uses the next seed.
+
+    Returns:
+        tuple: the cluster centres and the within-cluster sum of squares
+    """
+    best_centres, best_inertia = None, np.inf
+    for i in range(max(n_init, 1)):
+        centres = minibatch_kmeans(data, n_clusters, max_iterations, random_state=random_state + i)
+        codes = nearest_centre(data, centres)
+        inertia = ((data - centres[codes]) ** 2).sum()
+        if inertia < best_inertia:
+            best_centres, best_inertia = centres, inertia
+
+    return best_centres, best_inertia
+
+
+def silhouette_score(data, codes):
+    """ Calculate the mean silhouette coefficient of clustered observations.
+
+    Args:
+        data (numpy.ndarray): observations of shape (n, features)
+        codes (numpy.ndarray): the cluster of each observation
+
+    Returns:
+        float: the mean silhouette coefficient between -1 and 1
+    """
+    distance = np.sqrt(np.maximum(nearest_distances(data, data), 0))
+    clusters = np.unique(codes)
+    if len(clusters) < 2:
+        return np.nan
+
+    # mean distance from each observation to the members of each cluster
+    members = codes[None, :] == clusters[:, None]
+    sizes = members.sum(axis=1)
+    mean_dist = distance.dot(members.T.astype(np.float64))
+
+    own = np.searchsorted(clusters, codes)
+    own_size = sizes[own]
+    a = np.where(own_size > 1, mean_dist[np.arange(len(codes)), own] / np.maximum(own_size - 1, 1), 0)
+
+    mean_dist = mean_dist / sizes[None, :]
+    mean_dist[np.arange(len(codes)), own] = np.inf
+    b = mean_dist.min(axis=1)
+
+    score = np.where(own_size > 1, (b - a) / np.maximum(a, b), 0)
+    return float(np.nanmean(score))
+
+
+def fuzzy_indices(data, centres, exponent=FUZZY_EXPONENT):
+    """ Calculate the fuzzy performance index (FPI) and normalised classification entropy (NCE)
+    as described in Fridgen et al. (2004) using fuzzy memberships to the cluster centres.
+
+    References:
+        Fridgen JJ, Kitchen NR, Sudduth KA, Drummond ST, Wiebold WJ, Fraisse CW (2004) Management
+        Zone Analyst (MZA): software for subfield management zone delineation. Agronomy Journal
+        96, 100-108. doi:10.2134/agronj2004.1000.
+
+    Args:
+        data (numpy.ndarray): observations of shape (n, features)
+        centres (numpy.ndarray): cluster centres of shape (k, features)
+        exponent (float): the fuzziness exponent
+
+    Returns:
+        tuple: the FPI and NCE. Lower values indicate better defined clusters.
+    """
+    n_obs, n_clusters = len(data), len(centres)
+    distance = np.maximum(nearest_distances(data, centres), 1e-12)
+
+    # fuzzy c-means membership from the squared distances
+    weight = distance ** (-1.0 / (exponent - 1))
+    membership = weight / weight.sum(axis=1)[:, None]
+
+    partition = (membership ** 2).sum() / n_obs
+    fpi = 1 - (n_clusters / (n_clusters - 1.0)) * (1 - partition)
+
+    entropy = -(membership * np.log(np.maximum(membership, 1e-12))).sum() / n_obs
+    nce = (n_obs / float(n_obs - n_clusters)) * entropy
+
+    return fpi, nce
+
+
+@contextmanager
+def _temporary_file(suffix):
+    """ Create an empty file in TEMPDIR which is removed when the block ends."""
+    fd, filename = tempfile.mkstemp(suffix=suffix, dir=TEMPDIR)
+    os.close(fd)
+    try:
+        yield filename
+    finally:
+        try:
+            os.remove(filename)
+        except OSError:
+            pass
+
+
+def _load_evaluation_data(data_file):
+    """ Memory map the evaluation sample saved by kmeans_clustering once per worker process."""
+    if data_file not in _EVALUATION_DATA:
+        _EVALUATION_DATA.clear()
+        _EVALUATION_DATA[data_file] = np.load(data_file, mmap_mode='r')
+    return _EVALUATION_DATA[data_file]
+
+
+def evaluate_kmeans(data, n_clusters, max_iterations=500, n_init=N_INIT, random_state=0,
+                    silhouette_size=SILHOUETTE_SIZE):
+    """ Worker task to fit k-means for one number of clusters and calculate validity metrics.
+
+    Args:
+        data (numpy.ndarray|str): normalised observations of shape (n, features), or a .npy file
+                    holding them which is memory mapped so the sample isn't copied to each task.
+        n_clusters (int): The number of clusters to create.
+        max_iterations (int): The maximum number of mini-batches.
+        n_init (int): The number of starts.
+        random_state (int): seed for the random number generator.
+        silhouette_size (int): the number of observations used for the silhouette coefficient
+
+    Returns:
+        tuple: the cluster centres and a dictionary of the metrics
+    """
+    if isinstance(data, six.string_types):
+        data = np.asarray(_load_evaluation_data(data))
+
+    centres, inertia = fit_kmeans(data, n_clusters, max_iterations, n_init, random_state)
+
+    rng = np.random.default_rng(random_state)
+    subset = data[rng.choice(len(data), min(silhouette_size, len(data)), replace=False)]
+
+    fpi, nce = fuzzy_indices(data, centres)
+    metrics = {'zones': n_clusters,
+               'within_variance': inertia / len(data),
+               'silhouette': silhouette_score(subset, nearest_centre(subset, centres)),
+               'FPI': fpi,
+               'NCE': nce}
+
+    return centres, metrics
+
+
+def choose_cluster_count(metrics_df):
+    """ Choose the best number of clusters from the validity metrics.
+
+    Each number of clusters is ranked by silhouette (highest best), FPI and NCE (lowest best).
+    The lowest average rank is chosen, using the smaller number of clusters for ties.
+
+    Args:
+        metrics_df (pandas.DataFrame): the metrics for each number of clusters
+
+    Returns:
+        int: the chosen number of clusters
+    """
+    ranks = pd.concat([metrics_df['silhouette'].rank(ascending=False),
+                       metrics_df['FPI'].rank(),
+                       metrics_df['NCE'].rank()], axis=1).mean(axis=1)
+
+    best = metrics_df.loc[ranks == ranks.min(), 'zones']
+    return int(best.min())
+
+
+def kmeans_all_pixels(raster_files, output_tif, n_clusters, max_iterations=500):
+    """ Fit k-means clusters to every pixel with pyprecag.processing.kmeans_clustering.
+
+    Args:
+        raster_files (dict[str]): The dictionary ({filename:alias}) of input raster files
+        output_tif (str): The output TIFF file
+        n_clusters (int): The number of clusters/zones to create.
+        max_iterations (int): Maximum number of k-means iterations.
+
+    Returns:
+        pandas.core.frame.DataFrame: A dataframe containing cluster statistics for each image.
+    """
+    return processing.kmeans_clustering(raster_files, output_tif, n_clusters, max_iterations)
+
+
+def kmeans_clustering(raster_files, output_tif, n_clusters=3, max_iterations=500, sample_size=0,
+                      n_init=N_INIT, random_state=0, max_workers=None):
+    """Create zones with k-means clustering from multiple raster files.
+
+    The input raster files should all:
+        - have the same pixel size
+        - be in the same coordinate system
+        - should overlap
+    Only the first band of each raster will be used.
+
+    The output TIFF image extent will be the minimum overlapping extent of the input images.
+
+    When sample_size is 0 the clusters are fitted to every pixel with
+    pyprecag.processing.kmeans_clustering, which holds all rasters in memory.
+
+    Otherwise each raster is normalised (z-score) using the statistics of the common area. A
+    stratified random sample of pixels, allocated to windows in proportion to their valid pixels, is
+    used to fit the clusters with mini-batch k-means. Every pixel is then assigned to the nearest
+    cluster window by window, so memory use is bounded by the sample size.
+
+    If a list of cluster counts is supplied, each is fitted on a sample of up to
+    EVALUATION_SAMPLE_SIZE pixels in parallel worker processes and the within-cluster variance,
+    silhouette, fuzzy performance index (FPI) and normalised classification entropy (NCE) are saved
+    to _cluster_evaluation.csv. The sample is shared with the workers through a memory mapped file.
+    Only the best number of clusters (see choose_cluster_count) is created and written to output_tif.
+
+    Args:
+        raster_files (dict[str]|List[str]): The dictionary ({filename:alias}) of input raster files
+                                  and alias names, or a list of filenames.
+        output_tif (str):   The output TIFF file
+        n_clusters (int|List[int]):  The number of clusters/zones to create, or a list of the
+                                     numbers of clusters to evaluate.
+        max_iterations (int): Maximum number of k-means or mini-batch iterations.
+        sample_size (int): The number of pixels sampled to fit the clusters. Use 0 to fit the clusters
+                     to all pixels.
+        n_init (int): The number of k-means starts. The best fit is used.
+        random_state (int): seed for the random sample so results are repeatable.
+        max_workers (int): the number of worker processes.
+
+    Returns:
+        pandas.core.frame.DataFrame: A dataframe containing cluster statistics for each image.
+    """
+
+    cluster_counts = list(n_clusters) if isinstance(n_clusters, (list, tuple, range)) else [n_clusters]
+
+    for arg_check in [('n_clusters', ea) for ea in cluster_counts] + [('max_iterations', max_iterations),
+                                                                      ('sample_size', sample_size)]:
+        if not isinstance(arg_check[1], six.integer_types):
+            raise TypeError('{} must be an Integer.'.format(arg_check[0]))
+
+    if len(cluster_counts) == 0 or min(cluster_counts) < 2:
+        raise ValueError('n_clusters must be 2 or more.')
+
+    if not isinstance(raster_files, (list, dict)):
+        raise TypeError('Invalid Type: raster_files should be a dictionary of filename and alias')
+
+    if isinstance(raster_files, list) or len(set(raster_files.values())) == 1:
+        raster_files = {ea: os.path.basename(os.path.splitext(ea)[0]) for ea in raster_files}
+    elif len(set(raster_files.values())) != len(raster_files.values()):
+        raise ValueError('Raster Aliases are not unique')
+
+    if output_tif is not None and not os.path.isabs(output_tif):
+        output_tif = os.path.join(TEMPDIR, output_tif)
+
+    if sample_size == 0 and len(cluster_counts) == 1:
+        return kmeans_all_pixels(raster_files, output_tif, cluster_counts[0], max_iterations)
+
+    full_fit = sample_size == 0
+
+    start_time = time.time()
+    step_time = time.time()
+
+    file_list = list(raster_files.keys())
+    aliases = list(raster_files.values())
+
+    profile = common_area_profile(file_list)
+    windows, bounds, shapes = get_window_bounds(profile)
+    n_windows = len(windows)
+    file_lists = [file_list] * n_windows
+
+    # the evaluation sample file is removed after the pool has shut down and the workers have released it.
+    with _temporary_file('.npy') as eval_file, raster_cache(), process_pool(max_workers) as executor:
+        # Pass 1 - statistics for normalising and the valid pixels in each window --------------
+        window_counts = np.zeros(n_windows, dtype=np.int64)
+        total, means, m2 = 0, np.zeros(len(file_list)), np.zeros(len(file_list))
+        for i, (n, w_means, w_m2) in enumerate(map_in_batches(executor, _window_statistics,
+                                                              file_lists, bounds, shapes)):
+            if n == 0:
+                continue
+
+            window_counts[i] = n
+            delta = w_means - means
+            means += delta * n / (total + n)
+            m2 += w_m2 + delta ** 2 * total * n / (total + n)
+            total += n
+
+        if total == 0:
+            raise ValueError('The rasters do not have a common area containing data')
+
+        stds = np.sqrt(m2 / total)
+        stds[stds == 0] = 1
+
+        # Pass 2 - stratified random sample -----------------------------------------------------
+        # when every pixel is clustered, only a sample is needed to evaluate the cluster counts.
+        if sample_size == 0:
+            sample_size = EVALUATION_SAMPLE_SIZE
+
+        if sample_size >= total:
+            window_samples = window_counts
+        else:
+            # allocate the sample to windows by their proportion of valid pixels (largest remainder)
+            quota = window_counts * (sample_size / float(total))
+            window_samples = np.floor(quota).astype(np.int64)
+            remainder = sample_size - window_samples.sum()
+            window_samples[np.argsort(window_samples - quota)[:remainder]] += 1
+
+        sample_idx = np.flatnonzero(window_samples)
+        sample = np.concatenate(list(map_in_batches(
+            executor, _window_sample, [file_list] * len(sample_idx),
+            [bounds[i] for i in sample_idx], [shapes[i] for i in sample_idx],
+            window_samples[sample_idx].tolist(), [[random_state, int(i)] for i in sample_idx])))
+
+        LOGGER.info('{:<30} {:<15} {dur}'.format('Pixels Sampled', '{} of {}'.format(len(sample), total),
+                                                 dur=str(timedelta(seconds=time.time() - step_time))))
+        step_time = time.time()
+
+        # Fit the clusters ----------------------------------------------------------------------
+        sample = (sample - means) / stds
+        if len(cluster_counts) == 1:
+            n_clusters = cluster_counts[0]
+            centres, _ = fit_kmeans(sample, n_clusters, max_iterations, n_init, random_state)
+        else:
+            n_counts = len(cluster_counts)
+
+            rng = np.random.default_rng(random_state)
+            eval_sample = sample
+            if len(sample) > EVALUATION_SAMPLE_SIZE:
+                eval_sample = sample[np.sort(rng.choice(len(sample), EVALUATION_SAMPLE_SIZE, replace=False))]
+
+            # save the sample once for the workers to memory map, rather than pickling it for each count
+            np.save(eval_file, eval_sample)
+            results = list(executor.map(evaluate_kmeans, [eval_file] * n_counts, cluster_counts,
+                                        [max_iterations] * n_counts, [n_init] * n_counts,
+                                        [random_state] * n_counts))
+
+            metrics_df = pd.DataFrame([ea[1] for ea in results])
+            n_clusters = choose_cluster_count(metrics_df)
+
+            if eval_sample is sample:
+                centres = results[cluster_counts.index(n_clusters)][0]
+            elif not full_fit:
+                centres, _ = fit_kmeans(sample, n_clusters, max_iterations, n_init, random_state)
+
+            metrics_df['chosen'] = metrics_df['zones'] == n_clusters
+            metrics_df.to_csv(output_tif.replace('.tif', '_cluster_evaluation.csv'), index=False)
+
+            LOGGER.info('\nCluster Evaluation:\n{}\n'.format(metrics_df.to_string(justify='center', index=False)))
+            LOGGER.info('{:<30} {:<15} {dur}'.format('Clusters Evaluated', '{} zones chosen'.format(n_clusters),
+                                                     dur=str(timedelta(seconds=time.time() - step_time))))
+            step_time = time.time()
+
+        del sample
+
+        if full_fit:
+            executor.shutdown()
+            return kmeans_all_pixels(raster_files, output_tif, n_clusters, max_iterations)
+
+        # Pass 3 - assign every pixel to a cluster ----------------------------------------------
+        clust_counts = np.zeros(n_clusters, dtype=np.int64)
+        clust_sums = np.zeros((n_clusters, len(file_list)))
+        clust_sum_squares = np.zeros((n_clusters, len(file_list)))
+
+        # a unique name so runs with the same output name or running at the same time don't share labels.
+        fd, labels_tif = tempfile.mkstemp(prefix=os.path.splitext(os.path.basename(output_tif))[0] + '_',
+                                          suffix='_kmeans_labels.tif', dir=TEMPDIR)
+        os.close(fd)
+        labels_profile = tiled_profile(profile, count=1, dtype=rasterio.int16, nodata=-1)
+        with rasterio.open(labels_tif, 'w', **labels_profile) as dst:
+            for window, (labels, counts, sums, sum_squares) in zip(windows, map_in_batches(
+                    executor, _window_predict, file_lists, bounds, shapes, [means] * n_windows,
+                    [stds] * n_windows, [centres] * n_windows)):
+                dst.write(labels, 1, window=window)
+                clust_counts += counts
+                clust_sums += sums
+                clust_sum_squares += sum_squares
+
+    LOGGER.info('{:<30} {:<15} {dur}'.format('Clustering complete', '',
+                                             dur=str(timedelta(seconds=time.time() - step_time))))
+    step_time = time.time()
+
+    # create summary statistics ------------------------------------------------------------------
+    rows = []
+    for ea_clust in np.flatnonzero(clust_counts):
+        new_row = {'zone': ea_clust}
+        clust_mean = clust_sums[ea_clust] / clust_counts[ea_clust]
+        clust_std = np.sqrt(np.maximum(clust_sum_squares[ea_clust] / clust_counts[ea_clust] - clust_mean ** 2, 0))
+        for i, alias in enumerate(aliases):
+            new_row[alias + ', mean'] = clust_mean[i]
+            new_row[alias + ', std'] = clust_std[i]
+
+            # add a blank column inorder for populating later
+            new_row[alias + ', vesper'] = np.nan
+        rows.append(new_row)
+
+    results_df = pd.DataFrame(rows)
+
+    # reorder zone numbering based on mean value of all inputs
+    mean_cols = [col for col in results_df.columns if ', mean' in col]
+    results_df['zone_mean'] = results_df[mean_cols].mean(axis=1)
+    results_df['new_zone'] = results_df['zone_mean'].rank(ascending=False).astype(int)
+
+    remap = np.zeros(n_clusters + 1, dtype=np.int64)
+    remap[results_df['zone'].values + 1] = results_df['new_zone'].values
+
+    results_df['zone'] = results_df['new_zone']
+    results_df.drop(['zone_mean', 'new_zone'], axis=1, inplace=True)
+    results_df.sort_values(by='zone', inplace=True)
+
+    # remap the clusters to the new zone numbers with 0 as nodata and write to file
+    cluster_dtype = rasterio.dtypes.get_minimum_dtype([0, remap.max()])
+    with rasterio.open(labels_tif) as src, \
+            rasterio.open(output_tif, 'w', **tiled_profile(profile, count=1, dtype=cluster_dtype, nodata=0)) as dst:
+        for window in windows:
+            dst.write(remap[src.read(1, window=window) + 1].astype(cluster_dtype), 1, window=window)
+
+        build_overviews(dst, Resampling.nearest)
+
+    os.remove(labels_tif)
+
+    # add 95Conf level & MeanPredSE from the PAT tags of vesper kriged rasters
+    new_row = pd.DataFrame(['95ConfLevel', 'MedianPredSE'], columns=['zone'])
+    for raster_file, alias in raster_files.items():
+        with rasterio.open(raster_file) as src:
+            tags = src.tags(1)
+
+        for tag in ['PAT_MedianPredSE', 'PAT_95ConfLevel']:
+            if tag in tags:
+                new_row.loc[new_row['zone'] == tag.replace('PAT_', ''), '{}, vesper'.format(alias)] = tags[tag]
+
+    col_order = list(results_df.columns)
+    results_df = pd.concat([results_df, new_row])[col_order]
+    results_df.dropna(axis='columns', how='all', inplace=True)
+
+    # write to csv without ', ' to assist when loading into ESRI
+    col_names = results_df.columns.str.replace(', ', '_').values
+    results_df.to_csv(output_tif.replace('.tif', '_statistics.csv'), header=col_names, index=False)
+
+    # format the table and print to log.
+    results_df_copy = results_df.copy()
+    col_names = results_df_copy.columns.str.split(', ', expand=True).values
+
+    # replace column name NaNs to '....'. '....' as multiple spaces aren't allowed
+    results_df_copy.columns = pd.MultiIndex.from_tuples(
+        [('.......', x[0]) if pd.isnull(x[1]) else x for x in col_names])
+
+    LOGGER.info('\nCluster Statistics:\n{}\n'.format(results_df_copy.to_string(justify='center', index=False)))
+
+    LOGGER.info('{:<30} {:<15} {dur:<15} {}'.format(
+        'Saved Stats CSV', '', output_tif.replace('.tif', '_statistics.csv'),
+        dur=str(timedelta(seconds=time.time() - step_time))))
+
+    LOGGER.info('{:<30}  {:<15} {dur:<15} {}'.format(
+        'K-Means Clustering Completed', '', '{} zones for {} rasters'.format(n_clusters, len(raster_files)),
+        dur=str(timedelta(seconds=time.time() - start_time))))
+
+    return results_df
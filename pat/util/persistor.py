@@ -0,0 +1,280 @@
+# coding=utf-8
+"""
+/***************************************************************************
+ CSIRO Precision Agriculture Tools (PAT) Plugin
+
+ persistor -  Determine the performance persistence of yield across multiple years as described in
+              Bramley and Hamilton (2005). Rasters are processed as aligned windows across all
+              years in worker processes so only a few windows are held in memory at a time.
+           -------------------
+        begin      : 2026-10-19
+        git sha    : $Format:%H$
+        copyright  : (c) 2026, Commonwealth Scientific and Industrial Research Organisation (CSIRO)
+        email      : PAT@csiro.au
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the associated CSIRO Open Source Software       *
+ *   License Agreement (GPLv3) provided with this plugin.                  *
+ *                                                                         *
+ ***************************************************************************/
+"""
+import logging
+import os
+import time
+from datetime import timedelta
+
+import numpy as np
+import rasterio
+from rasterio.enums import Resampling
+
+from pat import LOGGER_NAME, TEMPDIR
+from pat.util.raster_windows import (build_overviews, common_area_profile, get_window_bounds, raster_cache,
+                                     read_aligned, tiled_profile)
+from pat.util.workers import process_pool, map_in_batches
+
+LOGGER = logging.getLogger(LOGGER_NAME)
+LOGGER.addHandler(logging.NullHandler())  # logging.StreamHandler()
+
+NODATA = -9999
+
+
+def _window_sums(raster_file_sets, bounds, shape):
+    """ Worker task to total the valid pixels in each year for the pre-pass.
+
+    Each year keeps its own mask so the totals match a mean of each raster on its own.
+
+    Returns:
+        list: a tuple of (sum of each year, count of valid pixels in each year) for each set of rasters
+    """
+    results = []
+    for raster_files in raster_file_sets:
+        years = read_aligned(raster_files, bounds, shape, common_mask=False)
+        results.append((years.sum(axis=(1, 2)).filled(0), years.count(axis=(1, 2))))
+    return results
+
+
+def _count_years(years, cutoffs, greater_than):
+    """ Count the years each pixel was above or below the cutoff for that year.
+
+    Returns:
+        numpy.ma.MaskedArray: the int16 count of years
+    """
+    cutoffs = np.asarray(cutoffs).reshape(-1, 1, 1)
+    if greater_than:
+        classified = years > cutoffs
+    else:
+        classified = years < cutoffs
+    return classified.astype(np.int16).sum(axis=0)
+
+
+def _all_years_window(raster_files, bounds, shape, cutoffs, greater_than):
+    """Worker task to calculate the all years persistor for a window."""
+    count = _count_years(read_aligned(raster_files, bounds, shape), cutoffs, greater_than)
+    return count.filled(NODATA).astype(np.int16)
+
+
+def _target_probability_window(upper_files, lower_files, bounds, shape, upper_cutoffs, lower_cutoffs,
+                               upper_min_years, lower_min_years):
+    """Worker task to calculate the target probability persistor for a window."""
+    upper = _count_years(read_aligned(upper_files, bounds, shape), upper_cutoffs, True)
+    lower = _count_years(read_aligned(lower_files, bounds, shape), lower_cutoffs, False)
+
+    result = (upper >= upper_min_years).astype(np.int16) - (lower >= lower_min_years).astype(np.int16)
+    result[np.ma.getmaskarray(upper) | np.ma.getmaskarray(lower)] = np.ma.masked
+    return result.filled(NODATA).astype(np.int16)
+
+
+def _get_cutoffs(executor, raster_file_sets, bounds, shapes, target_percentages):
+    """ Pre-pass to calculate the cutoff (mean +/- the target percentage) for each year.
+
+    The mean of each year is calculated from the valid pixels of that year within the area common
+    to all rasters, matching a nanmean of each year.
+
+    Returns:
+        list: an array of cutoff values for each set of rasters
+    """
+    n_sets = len(raster_file_sets)
+    totals = [np.zeros(len(ea)) for ea in raster_file_sets]
+    counts = [np.zeros(len(ea), dtype=np.int64) for ea in raster_file_sets]
+
+    for result in map_in_batches(executor, _window_sums, [raster_file_sets] * len(bounds), bounds, shapes):
+        for i, (sums, count) in enumerate(result):
+            totals[i] += sums
+            counts[i] += count
+
+    cutoffs = []
+    for i in range(n_sets):
+        if (counts[i] == 0).any():
+            empty = [os.path.basename(ea) for ea, n in zip(raster_file_sets[i], counts[i]) if n == 0]
+            raise ValueError('The rasters do not have data in their common area: {}'.format(', '.join(empty)))
+
+        means = totals[i] / counts[i]
+        cutoffs.append(means + (means * (target_percentages[i] / 100.00)))
+
+    return cutoffs
+
+
+def persistor_all_years(raster_files, output_tif, greater_than, target_percentage, max_workers=None):
+    """Determine the performance persistence of yield by across multiple years as described in
+    Bramley and Hamilton (2005)
+
+    The "Target over all years" method assigns a value to each pixel to indicate the number of
+    instances (in the raster list) in which that pixel was either less than or greater than
+    the mean (+/- a nominated percentage) of that raster.
+
+    All input rasters MUST overlap and have the same coordinate system and pixel size.
+
+    If a path is omitted from output_tif it will be created in your temp folder. If output_tif is
+    None or blank persistor_allyears.tif is created in your temp folder.
+
+    References:
+        Bramley RGV, Hamilton RP (2005) Understanding variability in winegrape production systems
+        1. Within vineyard variation in yield over several vintages. Australian Journal Of Grape And
+        Wine Research 10, 32-45. doi:10.1111/j.1755-0238.2004.tb00006.x.
+
+    Args:
+        raster_files (List[str]): List of rasters to use as inputs
+        output_tif (str): Output TIF file
+        greater_than (bool): if true test above (gt) the mean
+        target_percentage (int): the percent variation either above/below the mean.
+                   This should be a integer between -50 and 50
+        max_workers (int): the number of worker processes.
+
+    Returns:
+        str: The output tif name
+    """
+
+    if not isinstance(target_percentage, int):
+        raise TypeError('target_percentage must an integer between -50 to 50.')
+
+    if target_percentage < -50 or target_percentage > 50:
+        raise ValueError('target_percentage must an integer between -50 to 50.')
+
+    if not isinstance(greater_than, (int, bool)):
+        raise TypeError('greater_than must be boolean.')
+
+    if not isinstance(raster_files, list):
+        raise TypeError('Invalid Type: raster_files should be a list')
+
+    if len(raster_files) == 0:
+        raise TypeError('Invalid Type: Empty list of raster files')
+
+    if output_tif is None or output_tif == '':
+        output_tif = 'persistor_allyears.tif'
+
+    if not os.path.isabs(output_tif):
+        output_tif = os.path.join(TEMPDIR, output_tif)
+
+    start_time = time.time()
+
+    profile = tiled_profile(common_area_profile(raster_files), count=1, dtype=rasterio.int16, nodata=NODATA)
+    windows, bounds, shapes = get_window_bounds(profile)
+    n_windows = len(windows)
+
+    with raster_cache(), process_pool(max_workers) as executor:
+        cutoffs = _get_cutoffs(executor, [raster_files], bounds, shapes, [target_percentage])[0]
+
+        with rasterio.open(output_tif, 'w', **profile) as dst:
+            for window, result in zip(windows, map_in_batches(
+                    executor, _all_years_window, [raster_files] * n_windows, bounds, shapes,
+                    [cutoffs] * n_windows, [greater_than] * n_windows)):
+                dst.write(result, 1, window=window)
+
+            build_overviews(dst, Resampling.nearest)
+
+    arg_str = '{} {}%'.format('>' if greater_than else '<', target_percentage)
+    LOGGER.info('{:<30} {:>15} {dur}'.format('Persistor All Years Completed', arg_str,
+                                             dur=str(timedelta(seconds=time.time() - start_time))))
+
+    return output_tif
+
+
+def persistor_target_probability(upper_raster_files, upper_percentage, upper_probability,
+                                 lower_raster_files, lower_percentage, lower_probability,
+                                 output_tif, max_workers=None):
+    """Determine the probability of a performance being exceeded or not being met with an upper and
+     lower limit as described in Bramley and Hamilton (2005).
+
+    A value is assigned to each pixel which indicates whether the performance in that pixel over
+    a given proportion of years is:
+        a)	Greater than the mean plus or minus the nominated percentage (value = 1)
+        b)	Less than the mean plus or minus the nominated percentage (value = -1)
+        The remaining pixels which do not fall into category a) or b) are given a value of 0.
+
+    All input rasters MUST overlap and have the same coordinate system and pixel size.
+
+    References:
+        Bramley RGV, Hamilton RP (2005) Understanding variability in winegrape production systems
+        1. Within vineyard variation in yield over several vintages. Australian Journal Of Grape
+        And Wine Research 10, 32-45. doi:10.1111/j.1755-0238.2004.tb00006.x.
+
+    Args:
+        upper_raster_files (List[str]): List of rasters to used for the analysis of the
+                    UPPER category
+        upper_percentage (int): the percent variation either above/below the mean to apply
+                    to the UPPER raster category.
+        upper_probability (int):the probability percentage to apply to the UPPER category
+        lower_raster_files (List[str]): List of rasters to used for the analysis of the
+                    LOWER category
+        lower_percentage (int): the percent variation either above/below the mean to apply
+                    to the LOWER raster category.
+        lower_probability (int): the probability percentage to apply to the LOWER category
+        output_tif (str): Output TIF file
+        max_workers (int): the number of worker processes.
+
+    Returns:
+        str: The output tif name
+    """
+
+    for arg_check in [('upper_raster_files', upper_raster_files),
+                      ('lower_raster_files', lower_raster_files)]:
+        if not isinstance(arg_check[-1], list):
+            raise TypeError('Invalid Type: {} should be a list'.format(arg_check[0]))
+
+        if len(arg_check[-1]) == 0:
+            raise TypeError('Invalid Type: {} is a empty list'.format(arg_check[0]))
+
+    for arg_check in [('upper_percentage', upper_percentage),
+                      ('upper_probability', upper_probability),
+                      ('lower_percentage', lower_percentage),
+                      ('lower_probability', lower_probability)]:
+        if not isinstance(arg_check[1], int):
+            raise TypeError('{} must an integer'.format(arg_check[0]))
+
+    if output_tif is None or output_tif == '':
+        raise TypeError('Please specify an output filename')
+
+    if not os.path.exists(os.path.dirname(output_tif)):
+        raise IOError('Output directory {} does not exist'.format(os.path.dirname(output_tif)))
+
+    start_time = time.time()
+
+    profile = tiled_profile(common_area_profile(upper_raster_files + lower_raster_files),
+                            count=1, dtype=rasterio.int16, nodata=NODATA)
+    windows, bounds, shapes = get_window_bounds(profile)
+    n_windows = len(windows)
+
+    upper_min_years = (upper_probability / 100.00) * len(upper_raster_files)
+    lower_min_years = (lower_probability / 100.00) * len(lower_raster_files)
+
+    with raster_cache(), process_pool(max_workers) as executor:
+        upper_cutoffs, lower_cutoffs = _get_cutoffs(executor, [upper_raster_files, lower_raster_files],
+                                                    bounds, shapes, [upper_percentage, lower_percentage])
+
+        with rasterio.open(output_tif, 'w', **profile) as dst:
+            for window, result in zip(windows, map_in_batches(
+                    executor, _target_probability_window,
+                    [upper_raster_files] * n_windows, [lower_raster_files] * n_windows, bounds, shapes,
+                    [upper_cutoffs] * n_windows, [lower_cutoffs] * n_windows,
+                    [upper_min_years] * n_windows, [lower_min_years] * n_windows)):
+                dst.write(result, 1, window=window)
+
+            build_overviews(dst, Resampling.nearest)
+
+    LOGGER.info('{:<30} {:>15} {dur}'.format('Persistor Target Probability Completed', '',
+                                             dur=str(timedelta(seconds=time.time() - start_time))))
+
+    return output_tif
@@ -0,0 +1,118 @@
+# coding=utf-8
+"""
+/***************************************************************************
+ CSIRO Precision Agriculture Tools (PAT) Plugin
+
+ pixel_sampling -  Select random pixels from a raster while reading it window by window. Memory use
+                   is bounded by the number of points selected rather than the size of the raster.
+           -------------------
+        begin      : 2026-10-19
+        git sha    : $Format:%H$
+        copyright  : (c) 2026, Commonwealth Scientific and Industrial Research Organisation (CSIRO)
+        email      : PAT@csiro.au
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the associated CSIRO Open Source Software       *
+ *   License Agreement (GPLv3) provided with this plugin.                  *
+ *                                                                         *
+ ***************************************************************************/
+"""
+import logging
+import os
+
+import numpy as np
+import rasterio
+import six
+from geopandas import GeoDataFrame, points_from_xy
+
+from pyprecag import crs as pyprecag_crs
+from pyprecag.describe import save_geopandas_tofile
+
+from pat import LOGGER_NAME
+from pat.util.raster_windows import get_windows, map_windows
+
+LOGGER = logging.getLogger(LOGGER_NAME)
+LOGGER.addHandler(logging.NullHandler())  # logging.StreamHandler()
+
+
+def random_pixel_selection(raster_file, raster_crs, num_points, out_file=None, seed=None, band_num=1):
+    """Select randomly distributed valid data pixels from a raster file and convert to points
+    representing the center of the pixel.
+
+    The raster is read window by window. Each valid pixel is given a random key and the pixels with
+    the smallest num_points keys are kept, which is a uniform random sample without replacement
+    (reservoir sampling). Only the kept pixels are held in memory.
+
+    Args:
+        raster_file (str): the raster file to sample
+        raster_crs (pyprecag_crs.crs): The Spatial Reference System for the raster file
+        num_points (int): The number of random sample points to select.
+        out_file (str): Optional. The shapefile or geopackage (.gpkg) used to save the points.
+        seed (int): Optional. The seed for the random number generator so results are repeatable.
+        band_num (int): the band used to find valid pixels.
+
+    Returns:
+        geopandas.geodataframe.GeoDataFrame: A dataframe containing the select pixels as points
+        pyprecag_crs.crs: The pyprecag CRS object of the points dataframe.
+    """
+
+    if not isinstance(num_points, six.integer_types):
+        raise TypeError('Size must be an Integer.')
+
+    if not isinstance(raster_crs, pyprecag_crs.crs):
+        raise TypeError('Crs must be an instance of pyprecag.crs.crs')
+
+    if out_file is not None and not os.path.exists(os.path.dirname(out_file)):
+        raise IOError('Output directory {} does not exist'.format(os.path.dirname(out_file)))
+
+    if seed is None:
+        seed = int(np.random.SeedSequence().entropy % (2 ** 32))
+    LOGGER.info('{:<30} {:>15}'.format('Random pixel selection seed', seed))
+
+    rng = np.random.default_rng(seed)
+
+    def _valid_pixels(src, window):
+        rows, cols = np.nonzero(src.read_masks(band_num, window=window))
+        return rows + int(window.row_off), cols + int(window.col_off)
+
+    with rasterio.open(os.path.normpath(raster_file)) as src:
+        transform = src.transform
+        windows = get_windows(src.width, src.height)
+
+    keys = np.empty(0)
+    rows = np.empty(0, dtype=np.int64)
+    cols = np.empty(0, dtype=np.int64)
+    n_valid = 0
+
+    for w_rows, w_cols in map_windows(raster_file, _valid_pixels, windows):
+        n_valid += len(w_rows)
+        keys = np.concatenate([keys, rng.random(len(w_rows))])
+        rows = np.concatenate([rows, w_rows])
+        cols = np.concatenate([cols, w_cols])
+
+        if len(keys) > num_points:
+            keep = np.argpartition(keys, num_points)[:num_points]
+            keys, rows, cols = keys[keep], rows[keep], cols[keep]
+
+    if num_points > n_valid:
+        raise ValueError('Size parameter is greater than the number of data pixels')
+
+    # order the points randomly
+    order = np.argsort(keys)
+    x, y = transform * (cols[order] + 0.5, rows[order] + 0.5)
+
+    random_pts_gdf = GeoDataFrame({'PtID': np.arange(num_points), 'X': x, 'Y': y},
+                                  geometry=points_from_xy(x, y), crs=raster_crs.epsg)
+
+    if out_file is not None:
+        if os.path.splitext(out_file)[-1].lower() == '.gpkg':
+            if os.path.exists(out_file):
+                os.remove(out_file)
+            random_pts_gdf.to_file(out_file, driver='GPKG')
+        else:
+            save_geopandas_tofile(random_pts_gdf, out_file, overwrite=True)
+
+    return random_pts_gdf, raster_crs
@@ -0,0 +1,308 @@
+# coding=utf-8
+"""
+/***************************************************************************
+ CSIRO Precision Agriculture Tools (PAT) Plugin
+
+ point_statistics -  Extract raster neighbourhood statistics at point locations. Only the pixels
+                     surrounding the points are read, one raster block at a time.
+           -------------------
+        begin      : 2026-10-19
+        git sha    : $Format:%H$
+        copyright  : (c) 2026, Commonwealth Scientific and Industrial Research Organisation (CSIRO)
+        email      : PAT@csiro.au
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the associated CSIRO Open Source Software       *
+ *   License Agreement (GPLv3) provided with this plugin.                  *
+ *                                                                         *
+ ***************************************************************************/
+"""
+import logging
+import os
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import rasterio
+from geopandas import GeoDataFrame
+from rasterio.windows import Window
+
+from pyprecag import crs as pyprecag_crs, raster_ops
+from pyprecag.describe import predictCoordinateColumnNames
+
+from pat import LOGGER_NAME, TEMPDIR
+from pat.util.raster_windows import BLOCK_SIZE
+from pat.util.workers import get_worker_count
+
+LOGGER = logging.getLogger(LOGGER_NAME)
+LOGGER.addHandler(logging.NullHandler())  # logging.StreamHandler()
+
+
+def _nancv(values, axis):
+    return np.true_divide(np.nanstd(values, axis=axis), np.nanmean(values, axis=axis))
+
+
+def _pixelcount(values, axis):
+    count = (~np.isnan(values)).sum(axis=axis).astype(np.float64)
+    count[count == 0] = np.nan
+    return count
+
+
+# Vectorised equivalents of the statistics functions used with scipy generic_filter.
+VECTORISED_STATISTICS = {np.nanmean: np.nanmean,
+                         np.nanmin: np.nanmin,
+                         np.nanmax: np.nanmax,
+                         np.nanstd: np.nanstd,
+                         raster_ops.nancv: _nancv,
+                         raster_ops.pixelcount: _pixelcount}
+
+
+def neighbourhood_statistic(function, neighbourhoods):
+    """ Apply a statistic to each neighbourhood.
+
+    Args:
+        function (function): the statistic ie np.nanmean or raster_ops.pixelcount
+        neighbourhoods (numpy.ndarray): pixel values of shape (points, size, size) with nodata as np.nan
+
+    Returns:
+        numpy.ndarray: the statistic for each point
+    """
+    with warnings.catch_warnings():
+        # all nan neighbourhoods return nan
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+
+        if function in VECTORISED_STATISTICS:
+            return VECTORISED_STATISTICS[function](neighbourhoods, axis=(1, 2))
+
+        # custom functions are applied to each neighbourhood
+        return np.array([function(ea.ravel()) for ea in neighbourhoods], dtype=np.float64)
+
+
+def read_neighbourhoods(src, rows, cols, size, band_num=1, block_size=BLOCK_SIZE):
+    """ Read the square neighbourhood of pixels surrounding each point.
+
+    Points are grouped by raster block, and for each block only the window covering the block
+    plus the neighbourhood radius is read.
+
+    Args:
+        src (rasterio.io.DatasetReader): the open raster
+        rows (numpy.ndarray): the pixel row of each point
+        cols (numpy.ndarray): the pixel column of each point
+        size (int): the width of the neighbourhood in pixels. Must be odd.
+        band_num (int): the band to read
+        block_size (int): the size of the blocks used to group points
+
+    Returns:
+        numpy.ndarray: float64 pixel values of shape (points, size, size) with nodata as np.nan
+    """
+    radius = size // 2
+    offsets = np.arange(-radius, radius + 1)
+    neighbourhoods = np.full((len(rows), size, size), np.nan)
+
+    inside = (rows >= 0) & (rows < src.height) & (cols >= 0) & (cols < src.width)
+    block_ids = np.where(inside, (rows // block_size) * (src.width // block_size + 1) + cols // block_size, -1)
+
+    order = np.argsort(block_ids, kind='stable')
+    blocks, starts = np.unique(block_ids[order], return_index=True)
+
+    for block_id, idx in zip(blocks, np.split(order, starts[1:])):
+        if block_id < 0:
+            continue  # points outside the raster
+
+        row_off = (rows[idx].min() // block_size) * block_size - radius
+        col_off = (cols[idx].min() // block_size) * block_size - radius
+        window = Window(col_off, row_off, block_size + 2 * radius, block_size + 2 * radius)
+
+        band = src.read(band_num, window=window, masked=True, boundless=True)
+        band = band.astype(np.float64).filled(np.nan)
+
+        local_rows = (rows[idx] - row_off)[:, None, None] + offsets[None, :, None]
+        local_cols = (cols[idx] - col_off)[:, None, None] + offsets[None, None, :]
+        neighbourhoods[idx] = band[local_rows, local_cols]
+
+    return neighbourhoods
+
+
+def _raster_point_statistics(raster_file, prefix, points, function_list, size_list):
+    """ Extract the statistics for all points from one raster.
+
+    Returns:
+        pandas.DataFrame: a column for each statistic in the same order as the points.
+    """
+
+    # Need to get the wktproj of the raster from gdal NOT rasterio.
+    # RasterIO works from the proj4 string NOT the wkt string so aussie zones details gets lost.
+    rast_crs = pyprecag_crs.getCRSfromRasterFile(raster_file)
+    if rast_crs.epsg_number and rast_crs.epsg_number != points.crs.to_epsg():
+        points = points.to_crs(epsg=rast_crs.epsg_number)
+
+    if prefix is None or prefix == '':
+        prefix = os.path.splitext(os.path.basename(raster_file))[0]
+
+    results = pd.DataFrame(index=points.index)
+    with rasterio.open(os.path.normpath(raster_file)) as src:
+        cols, rows = ~src.transform * (points.x.values, points.y.values)
+        rows, cols = np.floor(rows).astype(np.int64), np.floor(cols).astype(np.int64)
+
+        band_suffix = 'bd1' if src.count > 1 else ''
+
+        for ea_size in size_list:
+            neighbourhoods = read_neighbourhoods(src, rows, cols, ea_size)
+
+            if ea_size == 1:
+                results['pixel{}_{}'.format(band_suffix, prefix)] = neighbourhoods[:, 0, 0].astype(np.float32)
+                continue
+
+            for ea_function in function_list:
+                col_name = '{}{}x{}{}_{}'.format(ea_function.__name__.replace('nan', ''), ea_size, ea_size,
+                                                 band_suffix, prefix)
+                results[col_name] = neighbourhood_statistic(ea_function, neighbourhoods).astype(np.float32)
+
+    return results
+
+
+def extract_pixel_statistics_for_points(points_geodataframe, points_crs, rasterfiles,
+                                        output_csvfile, function_list=[np.nanmean], size_list=[3],
+                                        max_workers=None):
+    """Extract statistics from a list of rasters at set locations.
+
+    All raster files in the list should be of the same pixel size. While multi-bands raster files
+    are supported as an input, statistics will only be calculated and extracted for the first band.
+
+    Statistics are calculated on pixel values with a square neighbourhood and saved to a CSV file.
+    Only the neighbourhoods around the points are read so the time taken depends on the number of
+    points rather than the size of the rasters. Rasters are processed concurrently.
+
+    Pixels assigned with Nodata are converted to np.nan and excluded from the calculations.
+
+    All original columns are included in the output csv file in addition to columns containing the
+    values for each raster -> size -> statistic combination.
+
+    A size of 1 can be used to extract exact pixel values and whereby no statistics are calculated.
+
+    Args:
+        points_geodataframe (geopandas.geodataframe.GeoDataFrame): The input points geodataframe of
+                   locations to extract statistics.
+        points_crs (pyprecag_crs.crs): The Spatial Reference System of the point_geodataframe
+        rasterfiles (List[str]): the list of paths & file names for the input rasters, or a list of
+                   (filename, column name suffix) tuples.
+        output_csvfile (str): the path and filename of the output CSV.
+        function_list (List[function]): A list of statistical functions to apply to the raster.
+                   These can include numpy functions like np.nanmean or custom ones like pixel_count
+        size_list (List[int]): The list of neighbourhood sizes used to apply statistical filtering.
+        max_workers (int): The number of rasters processed at the same time.
+
+    Returns:
+        geopandas.geodataframe.GeoDataFrame: dataframe of the points and calculated statistics
+        pyprecag_crs.crs: The pyprecag CRS object of the points dataframe.
+    """
+
+    if not isinstance(points_geodataframe, GeoDataFrame):
+        raise TypeError('Invalid input data : inputGeodataFrame')
+
+    if not any("POINT" in g.upper() for g in points_geodataframe.geom_type.unique()):
+        raise TypeError('Invalid input data : a points geopandas dataframe is required')
+
+    if points_crs and not isinstance(points_crs, pyprecag_crs.crs):
+        raise TypeError('Crs must be an instance of pyprecag.crs.crs')
+
+    if output_csvfile is None or output_csvfile == '':
+        raise TypeError('Please specify an output CSV filename')
+
+    if not os.path.isabs(output_csvfile):
+        # if a path isn't provided then create in temp. Used for daisy chaining functions.
+        output_csvfile = os.path.join(TEMPDIR, output_csvfile)
+
+    if not os.path.exists(os.path.dirname(output_csvfile)):
+        raise IOError('Output directory {} does not exist'.format(os.path.dirname(output_csvfile)))
+
+    if not isinstance(function_list, list):
+        raise TypeError('Invalid Type: functions should be a list of function_list '
+                        'statistics to process')
+
+    for ea_function in function_list:
+        if not callable(ea_function):
+            raise TypeError('Invalid Type: should be a numpy or custom function like np.nanstd etc')
+
+    if not isinstance(size_list, list):
+        raise TypeError('Invalid Type: size_list should be a list of sizes to process')
+
+    for ea_size in size_list:
+        if not isinstance(ea_size, int) or ea_size % 2 == 0:
+            raise TypeError("Size {} should be an odd integer. Only square "
+                            "filters are supported.".format(ea_size))
+
+    if not isinstance(rasterfiles, list):
+        raise TypeError('Invalid Type: rasterfiles should be a list')
+
+    rasterfiles = [ea if isinstance(ea, tuple) else (ea, '') for ea in rasterfiles]
+
+    not_exists = [my_file for my_file, _ in rasterfiles if not os.path.exists(my_file)]
+    if len(not_exists) > 0:
+        raise IOError('rasterfiles: {} raster file(s) do not exist\n\t({})'.format(
+            len(not_exists), '\n\t'.join(not_exists)))
+
+    # Check that all raster files have the same pixel size.
+    pix = None
+    res_error = []
+    for ea_raster, _ in rasterfiles:
+        with rasterio.open(ea_raster) as src:
+            if pix is None:
+                pix = src.res
+            elif pix != src.res:
+                res_error.append(ea_raster)
+
+    if len(res_error) > 0:
+        raise TypeError('rasterfiles: Inconsistent pixel sizes'
+                        '\n\t{}'.format('\n\t'.join(res_error)))
+
+    start_time = time.time()
+
+    # drop null geometry
+    points_geodataframe = points_geodataframe.dropna(subset=['geometry'], axis=0).reset_index(drop=True)
+
+    # pixel values first, then each size and statistic
+    size_list = sorted(set(size_list), key=lambda x: (x != 1, size_list.index(x)))
+
+    points = points_geodataframe.geometry
+    with ThreadPoolExecutor(max_workers=min(get_worker_count(max_workers), len(rasterfiles))) as executor:
+        raster_stats = list(executor.map(
+            lambda ea: _raster_point_statistics(ea[0], ea[1], points, function_list, size_list), rasterfiles))
+
+    points_geodataframe = pd.concat([points_geodataframe] + raster_stats, axis=1)
+
+    # Make sure the output CSV contains coordinates
+    if None in predictCoordinateColumnNames(points_geodataframe.columns.tolist()):
+        # probably from a shapefile so add coords.
+        if points_geodataframe.crs.is_geographic:
+            points_geodataframe['Longitude'] = points_geodataframe.geometry.x
+            points_geodataframe['Latitude'] = points_geodataframe.geometry.y
+        else:
+            points_geodataframe['Easting'] = points_geodataframe.geometry.x
+            points_geodataframe['Northing'] = points_geodataframe.geometry.y
+
+    # and for good measure add the associated epsg number
+    points_geodataframe['EPSG'] = points_geodataframe.crs.to_epsg()
+
+    step_time = time.time()
+    points_geodataframe.drop(['geometry'], axis=1).to_csv(output_csvfile, index=False)
+
+    LOGGER.info('{:<30}\t{:>10}   {dur:<15} {}'.format(
+        'Saved CSV', '', os.path.basename(output_csvfile),
+        dur=str(timedelta(seconds=time.time() - step_time))))
+
+    LOGGER.info('{:<30}\t{:>10} {dur:>15}\t{}'.format(
+        'extract_pixel_statistics_for_points', '', '{} points'.format(len(points_geodataframe)),
+        dur=str(timedelta(seconds=time.time() - start_time))))
+
+    if points_crs:
+        points_crs = pyprecag_crs.crs()
+        points_crs.getFromEPSG(points_geodataframe.crs.to_epsg())
+
+    return points_geodataframe, points_crs
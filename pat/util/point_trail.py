@@ -0,0 +1,254 @@
+# coding=utf-8
+"""
+/***************************************************************************
+ CSIRO Precision Agriculture Tools (PAT) Plugin
+
+ point_trail -  Create a polygon from a point trail by buffering and dissolving the trail in tiles.
+           -------------------
+        begin      : 2026-10-19
+        git sha    : $Format:%H$
+        copyright  : (c) 2026, Commonwealth Scientific and Industrial Research Organisation (CSIRO)
+        email      : PAT@csiro.au
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the associated CSIRO Open Source Software       *
+ *   License Agreement (GPLv3) provided with this plugin.                  *
+ *                                                                         *
+ ***************************************************************************/
+"""
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import numpy as np
+import shapely
+from geopandas import GeoDataFrame
+
+from pyprecag import config, crs as pyprecag_crs, number_types
+
+from pat import LOGGER_NAME, TEMPDIR
+from pat.util.clean_trim import thin_point_by_distance
+from pat.util.vector_formats import change_vector_format, save_vector
+from pat.util.workers import get_worker_count
+
+LOGGER = logging.getLogger(LOGGER_NAME)
+LOGGER.addHandler(logging.NullHandler())  # logging.StreamHandler()
+
+# The maximum number of vertices in a line piece. Long lines are split into pieces so each can be
+# assigned to a tile.
+PIECE_VERTICES = 256
+
+# The size of a tile as a multiple of the aggregate or buffer distance, whichever is larger.
+TILE_FACTOR = 20
+
+# The number of segments used to approximate a quarter circle. Matches GeoSeries.buffer
+BUFFER_RESOLUTION = 16
+
+
+def split_trail_into_pieces(coords, line_ids, piece_vertices=PIECE_VERTICES):
+    """ Split each line of a point trail into pieces of at most piece_vertices vertices.
+
+    Consecutive pieces of the same line share their end vertex so the union of their buffers is
+    the buffer of the whole line. Lines with a single point are dropped.
+
+    Args:
+        coords (numpy.ndarray): the x,y coordinates of the points in trail order
+        line_ids (numpy.ndarray): the increasing line number of each point
+        piece_vertices (int): the maximum number of vertices in a piece
+
+    Returns:
+        numpy.ndarray: an array of shapely LineStrings
+    """
+    counts = np.bincount(line_ids)
+    keep = counts[line_ids] > 1
+    coords, line_ids = coords[keep], line_ids[keep]
+    if len(coords) == 0:
+        return np.empty(0, dtype=object)
+
+    # the position of each vertex along its line
+    line_start = np.concatenate([[0], np.cumsum(counts[counts > 1])[:-1]])
+    _, line_num = np.unique(line_ids, return_inverse=True)
+    pos = np.arange(len(coords)) - line_start[line_num]
+    is_last = pos == counts[line_ids] - 1
+
+    # a vertex at a piece boundary ends the previous piece and starts the next, unless it is the
+    # last vertex in the line.
+    step = piece_vertices - 1
+    piece = pos // step
+    boundary = (pos > 0) & (pos % step == 0)
+    own = ~(boundary & is_last)
+
+    vertex_idx = np.concatenate([np.flatnonzero(own), np.flatnonzero(boundary)])
+    piece_num = np.concatenate([piece[own], piece[boundary] - 1])
+    piece_key = line_ids[vertex_idx].astype(np.int64) * (piece.max() + 1) + piece_num
+
+    order = np.lexsort((vertex_idx, piece_key))
+    _, piece_ids = np.unique(piece_key[order], return_inverse=True)
+
+    return shapely.linestrings(coords[vertex_idx[order]], indices=piece_ids)
+
+
+def _dissolve_tile(pieces, buffer_dist_m):
+    """ Buffer the line pieces in a tile and dissolve them into a single geometry.
+
+    Shapely releases the GIL for these operations so tiles can be processed on threads.
+    """
+    return shapely.union_all(shapely.buffer(pieces, buffer_dist_m, quad_segs=BUFFER_RESOLUTION))
+
+
+def buffer_and_dissolve(pieces, buffer_dist_m, tile_size, max_workers=None):
+    """ Buffer line pieces and dissolve them into a single geometry.
+
+    The pieces are grouped onto a grid of tiles using the tile holding their first vertex. Each tile
+    is buffered and dissolved in parallel and the tile results are merged with a cascaded union.
+    Each union is between pieces which are close together so it is much cheaper than dissolving
+    the whole trail at once.
+
+    Args:
+        pieces (numpy.ndarray): an array of shapely LineStrings
+        buffer_dist_m (float): the buffer distance in metres
+        tile_size (float): the width and height of a tile in metres
+        max_workers (int): the number of threads used to dissolve tiles
+
+    Returns:
+        shapely.geometry.base.BaseGeometry: the dissolved geometry
+    """
+    first_vertex = shapely.get_coordinates(shapely.get_point(pieces, 0))
+    tile_keys = np.floor(first_vertex / tile_size).astype(np.int64)
+    _, tile_num = np.unique(tile_keys, axis=0, return_inverse=True)
+    tile_num = tile_num.ravel()
+
+    order = np.argsort(tile_num, kind='stable')
+    tiles = np.split(pieces[order], np.flatnonzero(np.diff(tile_num[order])) + 1)
+
+    with ThreadPoolExecutor(max_workers=get_worker_count(max_workers)) as executor:
+        dissolved = list(executor.map(_dissolve_tile, tiles, [buffer_dist_m] * len(tiles)))
+
+    return shapely.union_all(dissolved)
+
+
+def create_polygon_from_point_trail(points_geodataframe, points_crs, out_filename, thin_dist_m=1.0,
+                                    aggregate_dist_m=25, buffer_dist_m=10, shrink_dist_m=3, max_workers=None):
+    """Create a polygon from a Point Trail created from a file containing GPS coordinates.
+
+    This follows the same workflow as pyprecag.processing.create_polygon_from_point_trail:
+          Points -> Thin -> Lines -> Buffer Out (expand) -> Buffer In (shrink)
+
+    Line ends are detected where the distance between points is greater than the aggregate distance.
+    Rather than buffering each line and dissolving them all at once, lines are split into pieces
+    which are hashed onto a grid of tiles. Each tile is buffered and dissolved in parallel then
+    the tiles are merged with a cascaded union. The polygons are the same as the single dissolve
+    apart from the arc approximation where pieces join.
+
+    Args:
+        points_geodataframe (geopandas.geodataframe.GeoDataFrame): Input points vector geodataframe
+        points_crs (pyprecag_crs.crs): The Projected Spatial Reference System of the
+                    point_geodataframe
+        out_filename (str): Output polygon file. The format is set by the extension, eg .gpkg or .shp
+        thin_dist_m (float): The minimum distance in metres between points to be used to thin the
+                    points dataset.
+        aggregate_dist_m (int): A floating number representing the maximum distance between point.
+                    This is used to detect a line end. Typically this is slightly larger than
+                    the row/swath width.
+        buffer_dist_m (int): The Buffer distance in metres. Typically half the swath or row width.
+        shrink_dist_m (int): The shrink distance in metres. Typically about 7 less than the buffer
+                    distance.
+        max_workers (int): the number of threads used to dissolve tiles
+
+    Returns:
+        geopandas.geodataframe.GeoDataFrame|str: the polygons or a message if the polygons are too thin.
+    """
+
+    for argCheck in [('thin_dist_m', thin_dist_m), ('aggregate_dist_m', aggregate_dist_m),
+                     ('buffer_dist_m', buffer_dist_m), ('shrink_dist_m', shrink_dist_m)]:
+        if not isinstance(argCheck[1], number_types):
+            raise TypeError('{} must be a floating number.'.format(argCheck[0]))
+
+    if not isinstance(points_geodataframe, GeoDataFrame):
+        raise TypeError('Invalid input data : inputGeoDataFrame')
+
+    if not any("POINT" in g.upper() for g in points_geodataframe.geom_type.unique()):
+        raise TypeError('Invalid input data : A points geopandas dataframe is required')
+
+    if points_crs and not isinstance(points_crs, pyprecag_crs.crs):
+        raise TypeError('Crs must be an instance of pyprecag.crs.crs')
+
+    if out_filename is None or out_filename == '':
+        raise TypeError('Please specify an output filename')
+
+    if not os.path.exists(os.path.dirname(out_filename)):
+        raise IOError('Output directory {} does not exist'.format(os.path.dirname(out_filename)))
+
+    start_time = time.time()
+    gdf_thin = thin_point_by_distance(points_geodataframe[['geometry']], thin_dist_m)
+    if 'filter' in gdf_thin.columns:
+        gdf_thin = gdf_thin[gdf_thin['filter'].isnull()]
+
+    if config.get_debug_mode():
+        save_vector(gdf_thin, os.path.join(TEMPDIR, change_vector_format(
+            os.path.basename(os.path.splitext(out_filename)[0] + '_0thnpts'))))
+
+    step_time = time.time()
+    coords = shapely.get_coordinates(gdf_thin.geometry.values)
+
+    # apply a new line id when distance between points is greater than the aggregate distance
+    dist_shift = np.hypot(*np.diff(coords, axis=0).T)
+    line_ids = np.concatenate([[0], np.cumsum(dist_shift >= aggregate_dist_m)])
+
+    pieces = split_trail_into_pieces(coords, line_ids)
+    if len(pieces) == 0:
+        raise TypeError('There are no lines with more than one point. Check the aggregate distance and try again')
+
+    LOGGER.info('{:<30} {:>10}   {:<15} {dur}'.format('Convert to lines', len(pieces), 'pieces',
+                                                      dur=str(timedelta(seconds=time.time() - step_time))))
+
+    # buffer and dissolve overlap of lines
+    step_time = time.time()
+    tile_size = TILE_FACTOR * max(aggregate_dist_m, buffer_dist_m, 1)
+    gdf_final = GeoDataFrame(geometry=[buffer_and_dissolve(pieces, buffer_dist_m, tile_size, max_workers)],
+                             crs=gdf_thin.crs)
+    del gdf_thin, pieces
+
+    LOGGER.info('{:<30} {:>10}   {:<15} {dur}'.format('Buffer by {}'.format(buffer_dist_m), '', '',
+                                                      dur=str(timedelta(seconds=time.time() - step_time))))
+
+    if config.get_debug_mode():
+        save_vector(gdf_final, os.path.join(TEMPDIR, change_vector_format(
+            os.path.basename(os.path.splitext(out_filename)[0] + '_2buf'))))
+
+    if shrink_dist_m != 0:
+        step_time = time.time()
+        gdf_final = GeoDataFrame(geometry=gdf_final.buffer(-abs(shrink_dist_m)), crs=gdf_final.crs)
+
+        LOGGER.info('{:<30} {:>10}   {:<15} {dur}'.format('Shrink by {}'.format(shrink_dist_m), '', '',
+                                                          dur=str(timedelta(seconds=time.time() - step_time))))
+
+    gdf_final = GeoDataFrame(geometry=gdf_final.geometry.explode(index_parts=False, ignore_index=True),
+                             crs=gdf_final.crs)
+
+    gdf_final['FID'] = gdf_final.index
+    gdf_final['Area'] = gdf_final.area
+    gdf_final['Perimeter'] = gdf_final.length
+
+    save_vector(gdf_final, out_filename)
+
+    LOGGER.info('{:<30} {:>10}   {:<15} {dur}'.format('Polygon from point trail', len(gdf_final), 'polygons',
+                                                      dur=str(timedelta(seconds=time.time() - start_time))))
+
+    thin_ratio = (4 * 3.14 * gdf_final['Area'].sum() /
+                  (gdf_final['Perimeter'].sum() * gdf_final['Perimeter'].sum()))
+
+    LOGGER.debug('{:<25} {:.5f}'.format('Thin Ratio : ', thin_ratio))
+
+    if thin_ratio < 0.01:
+        LOGGER.warning('For an improved result, increase the buffer width and shrink '
+                       'distance and try again.')
+        return 'For an improved result, increase the buffer width and shrink distance and ' \
+               'try again.'
+    else:
+        return gdf_final
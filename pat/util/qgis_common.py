@@ -25,6 +25,8 @@ standard_library.install_aliases()
 import logging
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from urllib.parse import urlparse
 
 import pandas as pd
@@ -42,12 +44,13 @@ from qgis.core import (QgsProject, QgsProviderRegistry, QgsMapLayer, QgsVectorLa
                        QgsFeature, QgsField)
 
 from pat import LOGGER_NAME
+from util.qgis_crs import resolve_crs, get_epsg, get_utm_crs, get_coordinate_transform
+from util.qgis_symbology import raster_class_breaks, raster_apply_classified_renderer, \
+    raster_apply_unique_value_renderer
 
 LOGGER = logging.getLogger(LOGGER_NAME)
 LOGGER.addHandler(logging.NullHandler())  # logging.StreamHandler()
 
-from pyprecag import crs
-
 dataTypes = {0:'Unk',1:'Byte',2:'UInt16',3:'Int16',4:'UInt32',5:'Int32',
             6:'Float32', 7:'Float64' , 8:'CInt16', 9:'CInt32' , 10:'CFloat32',
             11:'CFloat64'}
@@ -57,24 +60,7 @@ layerTypes= {0:'VectorLayer',  1:'RasterLayer',2:'PluginLayer',3:'MeshLayer',4:"
 
 def get_UTM_Coordinate_System(x, y, epsg):
     """ Determine a utm coordinate system either from coordinates"""
-    if epsg == '':
-        return QgsCoordinateReferenceSystem()
-    
-    if isinstance(epsg, six.string_types):
-        epsg = int(epsg.upper().replace('EPSG:', ''))
-
-    utm_crs = crs.getProjectedCRSForXY(x, y, epsg)
-
-    if utm_crs is not None:
-        out_crs = QgsCoordinateReferenceSystem().fromEpsgId(utm_crs.epsg_number)
-
-    if out_crs is not None:
-        return out_crs
-    else:
-        # self.send_to_messagebar(
-        #     'Auto detect coordinate system Failed. Check coordinate system of input raster layer',
-        #     level=Qgis.Critical, duration=5)
-        return
+    return get_utm_crs(x, y, epsg)
 
 
 def check_for_overlap(rect1, rect2, crs1='', crs2=''):
@@ -142,7 +128,7 @@ def build_layer_table(layer_list=None,only_raster_boundingbox=True):
     dest_crs = QgsProject.instance().crs()
 
     gdf_layers = gpd.GeoDataFrame(columns=['layer', 'layer_name', 'layer_id', 'layer_type', 'source','format',
-                                           'epsg', 'crs_name', 'is_projected', 'extent', 'provider','geometry'],
+                                           'epsg', 'epsg_code', 'crs_name', 'is_projected', 'extent', 'provider','geometry'],
                                            geometry='geometry', crs=dest_crs.authid())  # pd.DataFrame()
 
 
@@ -166,25 +152,12 @@ def build_layer_table(layer_list=None,only_raster_boundingbox=True):
         else:
             format=None
             
-        if layer.crs().isValid() and layer.crs().authid() == '':
-            # Try and convert older style coordinates systems
-            # were correctly definied in QGIS 2 as GDA94 / MGA zone 54 
-            # but get interpreted in QGIS 3 as  Unknown CRS: BOUNDCRS[SOURCECRS[PROJCRS["GDA94 / MGA zone 54",.....
-            
-            layer_crs = QgsCoordinateReferenceSystem()
-            if not layer_crs.createFromProj(layer.crs().toWkt()):
-                #print('Could not match a coordinate system for {}'.format(layer.id()))
-                layer_crs = layer.crs()
-                
-                # could apply to the layer, but what if it's wrong....
-                #layer.setCrs(layer_crs)
-            
-        else: 
-            layer_crs = layer.crs()
-        
+        # Try and convert older style coordinates systems
+        layer_crs = resolve_crs(layer.crs())
+
         # project the bounding box extents to be the same as the qgis project.
         if layer_crs.authid() != dest_crs.authid():
-            transform = QgsCoordinateTransform(layer_crs, dest_crs, QgsProject.instance())
+            transform = get_coordinate_transform(layer_crs, dest_crs)
             prj_ext  = transform.transformBoundingBox(layer.extent())
         else:
             prj_ext  = layer.extent()
@@ -196,6 +169,7 @@ def build_layer_table(layer_list=None,only_raster_boundingbox=True):
                     'format': format,
                     'source': get_layer_source(layer),
                     'epsg': layer_crs.authid(),
+                    'epsg_code': get_epsg(layer_crs),
                     'crs_name': layer_crs.description(),
                     'is_projected': not layer_crs.isGeographic(),
                     'provider': layer.providerType(),
@@ -263,6 +237,136 @@ def get_layer_source(layer):
         return result['path'] 
 
 
+def normalise_source_path(filename):
+    """ Normalise a file path so it can be used to compare layer sources.
+    On Windows this will also ignore the case of the path.
+    """
+    return os.path.normcase(os.path.normpath(filename))
+
+
+def get_layer_source_key(layer):
+    """ Get the normalised path of the file a layer was loaded from. """
+    if layer.providerType() == 'delimitedtext':
+        return normalise_source_path(urlparse(layer.source()).path.strip('/'))
+
+    source = get_layer_source(layer)
+    if source == '':
+        return ''
+
+    return normalise_source_path(source)
+
+
+class LayerSourceIndex(object):
+    """ A normalised file path to layer id index of all layers in the QGIS project.
+
+    The index is kept current through the QgsProject layersAdded and layersWillBeRemoved signals
+    so looking up the layers for a file doesn't require decoding the source of every layer.
+    """
+
+    def __init__(self, project):
+        self.project = project
+        self.path_ids = {}
+        self.id_paths = {}
+
+        # the layer and dataSourceChanged connection for each layer id so they can be disconnected.
+        self.connections = {}
+
+        self.add_layers(list(self.project.mapLayers().values()))
+
+        self.project.layersAdded.connect(self.add_layers)
+        self.project.layersWillBeRemoved.connect(self.remove_layers)
+
+    def index_layer(self, layer):
+        key = get_layer_source_key(layer)
+        if key != '':
+            self.path_ids.setdefault(key, []).append(layer.id())
+            self.id_paths[layer.id()] = key
+
+    def unindex_layer(self, layer_id):
+        key = self.id_paths.pop(layer_id, None)
+        if key is None:
+            return
+
+        self.path_ids[key].remove(layer_id)
+        if len(self.path_ids[key]) == 0:
+            del self.path_ids[key]
+
+    def add_layers(self, layers):
+        for layer in layers:
+            self.index_layer(layer)
+            if layer.id() not in self.connections:
+                connection = layer.dataSourceChanged.connect(partial(self.update_layer, layer.id()))
+                self.connections[layer.id()] = (layer, connection)
+
+    def disconnect_layer(self, layer_id):
+        layer, connection = self.connections.pop(layer_id, (None, None))
+        if layer is None:
+            return
+
+        try:
+            layer.dataSourceChanged.disconnect(connection)
+        except (TypeError, RuntimeError):
+            # the connection is already gone or the layer has been deleted
+            pass
+
+    def remove_layers(self, layer_ids):
+        for lyr_id in layer_ids:
+            self.disconnect_layer(lyr_id)
+            self.unindex_layer(lyr_id)
+
+    def update_layer(self, layer_id):
+        """Re-index a layer when its data source has changed."""
+        self.unindex_layer(layer_id)
+
+        layer = self.project.mapLayer(layer_id)
+        if layer is not None:
+            self.index_layer(layer)
+
+    def layer_ids(self, filename):
+        """ Get a list of the ids of layers loaded from a file.
+
+        Args:
+            filename (str): the file to look for
+
+        Returns:
+            list: the layer ids, an empty list if the file is not loaded into QGIS
+        """
+        return list(self.path_ids.get(normalise_source_path(filename), []))
+
+    def disconnect(self):
+        try:
+            self.project.layersAdded.disconnect(self.add_layers)
+            self.project.layersWillBeRemoved.disconnect(self.remove_layers)
+        except TypeError:
+            pass
+
+        for lyr_id in list(self.connections):
+            self.disconnect_layer(lyr_id)
+
+        self.path_ids.clear()
+        self.id_paths.clear()
+
+
+_LAYER_SOURCE_INDEX = None
+
+
+def get_layer_source_index():
+    """ Get the layer source index for the current QGIS project, creating it on first use."""
+    global _LAYER_SOURCE_INDEX
+    if _LAYER_SOURCE_INDEX is None:
+        _LAYER_SOURCE_INDEX = LayerSourceIndex(QgsProject.instance())
+
+    return _LAYER_SOURCE_INDEX
+
+
+def clear_layer_source_index():
+    """ Disconnect and remove the layer source index. Used when the plugin is unloaded."""
+    global _LAYER_SOURCE_INDEX
+    if _LAYER_SOURCE_INDEX is not None:
+        _LAYER_SOURCE_INDEX.disconnect()
+        _LAYER_SOURCE_INDEX = None
+
+
 def save_as_dialog(dialog, caption, file_filter, default_name=''):
     s, f = QFileDialog.getSaveFileName(
         dialog,
@@ -289,7 +393,7 @@ def save_as_dialog(dialog, caption, file_filter, default_name=''):
 def file_in_use(filename, display_msgbox=True):
     """ Check to see if a file is in use within QGIS.
 
-    Trying to open the file for writing then checking each layers source for the filename.
+    Trying to open the file for writing then checking the layer source index for the filename.
 
     Args:
         filename ():
@@ -311,18 +415,8 @@ def file_in_use(filename, display_msgbox=True):
         return True
 
     # also check to see if it's loaded into QGIS
-    found_lyrs = []
-    layermap = QgsProject.instance().mapLayers()
-    for name, layer in layermap.items():
-        if layer.providerType() == 'delimitedtext':
-
-            url = urlparse(layer.source())
-
-            if os.path.normpath(url.path.strip('/')).upper() == filename.upper():
-                found_lyrs += [layer.name()]
-        else:
-            if os.path.normpath(get_layer_source(layer)) == os.path.normpath(filename):
-                found_lyrs += [layer.name()]
+    found_lyrs = [QgsProject.instance().mapLayer(lyr_id).name()
+                  for lyr_id in get_layer_source_index().layer_ids(filename)]
 
     if display_msgbox and len(found_lyrs) > 0:
         message = 'File <b><i>{}</i></b><br /> is currently in use in QGIS layer(s)<dd>' \
@@ -385,6 +479,90 @@ def addRasterFileToQGIS(filename, layer_name='', group_layer_name='', atTop=True
     return raster_layer
 
 
+def _raster_class_breaks(filename, raster_sym):
+    """ Calculate the class breaks for the renderer of a raster file.
+    This is run in a worker thread by addRasterFilesToQGIS so it only reads the file and doesn't
+    create any QGIS objects.
+    """
+    if raster_sym is None or raster_sym['type'].lower() not in ['quantile', 'equal interval']:
+        return None
+
+    try:
+        return raster_class_breaks(filename, raster_sym['type'], raster_sym['num_classes'])
+    except Exception as err:
+        LOGGER.warning('Could not calculate class breaks for {}: {}'.format(os.path.basename(filename), err))
+        return None
+
+
+def addRasterFilesToQGIS(filenames, group_layer_names='', atTop=True, raster_sym=None):
+    """ Load many raster files into QGIS in one batch.
+
+    The statistics for the renderers are calculated from the files in worker threads, then the
+    layers are created and added to the project and layer tree together with a single map canvas
+    refresh.
+
+    Args:
+        filenames (list): the files to load
+        group_layer_names (str|list): The group to add the layers to, or a list with a group for
+              each file. Use path separators to create multiple groups
+        atTop (bool): Load to top of the table of contents. if false it will load above the
+              active layer.
+        raster_sym (dict): An item from qgis_symbology.RASTER_SYMBOLOGY to apply to each layer.
+
+    Returns:
+        list: The raster layers which have been loaded into QGIS in the same order as filenames
+    """
+
+    if len(filenames) == 0:
+        return []
+
+    if isinstance(group_layer_names, six.string_types):
+        group_layer_names = [group_layer_names] * len(filenames)
+
+    # remove all existing layers for the files in one call
+    remove_layers = []
+    for ea_file in filenames:
+        remove_layers += get_layer_source_index().layer_ids(ea_file)
+
+    if len(remove_layers) > 0:
+        QgsProject.instance().removeMapLayers(remove_layers)
+
+    with ThreadPoolExecutor() as executor:
+        all_breaks = list(executor.map(_raster_class_breaks, filenames, [raster_sym] * len(filenames)))
+
+    # map layers must be created in the main thread.
+    layers = [QgsRasterLayer(ea_file, os.path.splitext(os.path.basename(ea_file))[0]) for ea_file in filenames]
+
+    canvas = iface.mapCanvas()
+    canvas.freeze(True)
+    try:
+        for raster_layer, class_breaks in zip(layers, all_breaks):
+            if raster_sym is None:
+                continue
+
+            if raster_sym['type'].lower() in ['quantile', 'equal interval']:
+                # without class breaks the renderer uses the band statistics from the data provider
+                raster_apply_classified_renderer(raster_layer,
+                                                 rend_type=raster_sym['type'],
+                                                 num_classes=raster_sym['num_classes'],
+                                                 color_ramp=raster_sym['colour_ramp'],
+                                                 class_breaks=class_breaks)
+            elif raster_sym['type'].lower() == 'unique':
+                raster_apply_unique_value_renderer(raster_layer, color_ramp=raster_sym['colour_ramp'],
+                                                   invert=raster_sym['invert'])
+
+        QgsProject.instance().addMapLayers(layers, addToLegend=False)
+
+        for raster_layer, group_layer_name in zip(layers, group_layer_names):
+            addLayerToQGIS(raster_layer, group_layer_name=group_layer_name, atTop=atTop)
+
+    finally:
+        canvas.freeze(False)
+        canvas.refresh()
+
+    return layers
+
+
 def addLayerToQGIS(layer, group_layer_name="", atTop=True):
     """Add a layer to QGIS.
 
@@ -400,7 +578,8 @@ def addLayerToQGIS(layer, group_layer_name="", atTop=True):
 
     """
 
-    QgsProject.instance().addMapLayer(layer, addToLegend=False)
+    if QgsProject.instance().mapLayer(layer.id()) is None:
+        QgsProject.instance().addMapLayer(layer, addToLegend=False)
     root = QgsProject.instance().layerTreeRoot()
 
     # create group layers first:
@@ -438,13 +617,7 @@ def removeFileFromQGIS(filename):
         filename (str): The filename for data to remove from qgis.
     """
 
-    remove_layers = []
-
-    # Loop through layers in reverse so the count/indexing of layers persists if one is removed.
-    layermap = QgsProject.instance().mapLayers()
-    for name, layer in layermap.items():
-        if get_layer_source(layer) == filename:
-            remove_layers.append(layer.id())
+    remove_layers = get_layer_source_index().layer_ids(filename)
 
     if len(remove_layers) > 0:
         QgsProject.instance().removeMapLayers(remove_layers)
@@ -484,7 +657,7 @@ def getGeometryTypeAsString(intGeomType):
     return geom_type_str[intGeomType]
 
 
-def copyLayerToMemory(layer, layer_name, bOnlySelectedFeat=False, bAddUFI=True):
+def copyLayerToMemory(layer, layer_name, bOnlySelectedFeat=False, bAddUFI=True, bEsriFieldNames=True):
     """ Make a copy of an existing layer as a Memory layer
 
     Args:
@@ -492,6 +665,7 @@ def copyLayerToMemory(layer, layer_name, bOnlySelectedFeat=False, bAddUFI=True):
         layer_name (): The name for the memory layer
         bOnlySelectedFeat (): Only copy selected features
         bAddUFI (): Add a unique identifier to the memory layer
+        bEsriFieldNames (): Rename fields to be ESRI Shapefile compatible
 
     Returns:
         Qgis Memory layer
@@ -519,7 +693,9 @@ def copyLayerToMemory(layer, layer_name, bOnlySelectedFeat=False, bAddUFI=True):
     invalid_fields = []
     for eaFld in layer.dataProvider().fields():
         old_name = eaFld.name()
-        new_name = re.sub('[^A-Za-z0-9_-]+', '', old_name)[:10]
+        new_name = old_name
+        if bEsriFieldNames:
+            new_name = re.sub('[^A-Za-z0-9_-]+', '', old_name)[:10]
 
         if old_name != new_name:
             invalid_fields.append('   ' + old_name + '   to   ' + new_name)
@@ -0,0 +1,196 @@
+# coding=utf-8
+"""
+/***************************************************************************
+ CSIRO Precision Agriculture Tools (PAT) Plugin
+
+ qgis_crs -  Memoised coordinate system functions shared by all forms and modules.
+             Resolving older style coordinate systems and finding UTM zones are cached so
+             they are only calculated once per session.
+           -------------------
+        begin      : 2026-10-19
+        git sha    : $Format:%H$
+        copyright  : (c) 2026, Commonwealth Scientific and Industrial Research Organisation (CSIRO)
+        email      : PAT@csiro.au
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the associated CSIRO Open Source Software       *
+ *   License Agreement (GPLv3) provided with this plugin.                  *
+ *                                                                         *
+ ***************************************************************************/
+"""
+import logging
+
+import six
+from qgis.PyQt.QtCore import QCoreApplication, QThread
+from qgis.core import QgsProject, QgsCoordinateReferenceSystem, QgsCoordinateTransform, QgsCsException, QgsPointXY
+
+from pat import LOGGER_NAME
+
+LOGGER = logging.getLogger(LOGGER_NAME)
+LOGGER.addHandler(logging.NullHandler())  # logging.StreamHandler()
+
+from pyprecag import crs
+
+# wkt -> QgsCoordinateReferenceSystem matched from an older style coordinate system
+_RESOLVED_CRS = {}
+
+# (epsg, utm zone, southern hemisphere) -> UTM QgsCoordinateReferenceSystem
+_UTM_CRS = {}
+
+# (source crs key, destination crs key) -> QgsCoordinateTransform created on the main thread
+_TRANSFORMS = {}
+
+# the project whose transformContextChanged signal clears _TRANSFORMS
+_TRANSFORM_PROJECT = []
+
+_WGS84 = QgsCoordinateReferenceSystem('EPSG:4326')
+
+
+def _crs_key(qgs_crs):
+    """Get a string which uniquely identifies a coordinate system."""
+    if qgs_crs.authid() != '':
+        return qgs_crs.authid()
+    return qgs_crs.toWkt()
+
+
+def resolve_crs(qgs_crs):
+    """ Get a coordinate system with an authority id.
+
+    Coordinate systems correctly defined in QGIS 2 as GDA94 / MGA zone 54 can get interpreted in
+    QGIS 3 as  Unknown CRS: BOUNDCRS[SOURCECRS[PROJCRS["GDA94 / MGA zone 54",.....
+    This will try and match them to a known coordinate system. The result is cached by WKT.
+
+    Args:
+        qgs_crs (QgsCoordinateReferenceSystem): the coordinate system to resolve
+
+    Returns:
+        QgsCoordinateReferenceSystem: The matched coordinate system, or the input coordinate
+            system if it is already defined or could not be matched.
+    """
+
+    if not qgs_crs.isValid() or qgs_crs.authid() != '':
+        return qgs_crs
+
+    wkt = qgs_crs.toWkt()
+    if wkt not in _RESOLVED_CRS:
+        new_crs = QgsCoordinateReferenceSystem()
+        if new_crs.createFromProj(wkt):
+            _RESOLVED_CRS[wkt] = new_crs
+        else:
+            _RESOLVED_CRS[wkt] = qgs_crs
+
+    return QgsCoordinateReferenceSystem(_RESOLVED_CRS[wkt])
+
+
+def get_epsg(qgs_crs):
+    """ Get the EPSG number for a coordinate system.
+
+    Args:
+        qgs_crs (QgsCoordinateReferenceSystem|str): the coordinate system or an authid
+                 string ie 'EPSG:28354'
+
+    Returns:
+        int: the EPSG number, or None if the coordinate system is not an EPSG coordinate system
+    """
+    if isinstance(qgs_crs, six.string_types):
+        authid = qgs_crs
+    else:
+        authid = resolve_crs(qgs_crs).authid()
+
+    if authid.upper().startswith('EPSG:'):
+        return int(authid[5:])
+
+    return None
+
+
+def get_utm_crs(x, y, epsg):
+    """ Determine the UTM coordinate system for a coordinate.
+
+    Results are cached against the EPSG number, UTM zone and hemisphere of the coordinate so other
+    coordinates in the same zone use the cached coordinate system.
+
+    Args:
+        x (float): x coordinate
+        y (float): y coordinate
+        epsg (int|str): the EPSG number or authid string of the coordinate
+
+    Returns:
+        QgsCoordinateReferenceSystem: the UTM coordinate system. If it can't be determined an
+            invalid coordinate system is returned.
+    """
+
+    if isinstance(epsg, six.string_types):
+        epsg = get_epsg(epsg) if epsg != '' else None
+
+    if epsg is None:
+        return QgsCoordinateReferenceSystem()
+
+    src_crs = QgsCoordinateReferenceSystem('EPSG:{}'.format(epsg))
+    try:
+        pt = QgsCoordinateTransform(src_crs, _WGS84, QgsProject.instance()).transform(QgsPointXY(x, y))
+    except QgsCsException:
+        return QgsCoordinateReferenceSystem()
+
+    key = (epsg, int((pt.x() + 180) // 6) % 60 + 1, pt.y() < 0)
+    if key not in _UTM_CRS:
+        utm_crs = crs.getProjectedCRSForXY(x, y, epsg)
+
+        if utm_crs is not None:
+            _UTM_CRS[key] = QgsCoordinateReferenceSystem().fromEpsgId(utm_crs.epsg_number)
+        else:
+            _UTM_CRS[key] = QgsCoordinateReferenceSystem()
+
+    return QgsCoordinateReferenceSystem(_UTM_CRS[key])
+
+
+def get_coordinate_transform(source_crs, dest_crs):
+    """ Get a coordinate transform between two coordinate systems using the project transform
+    context.
+
+    Transforms created on the main thread are cached and a copy is returned so the caller can't
+    change the cached transform. Other threads get a new transform for each call as the cached
+    transforms belong to the main thread.
+
+    Args:
+        source_crs (QgsCoordinateReferenceSystem): The source coordinate system
+        dest_crs (QgsCoordinateReferenceSystem): The destination coordinate system
+
+    Returns:
+        QgsCoordinateTransform: the coordinate transform
+    """
+
+    app = QCoreApplication.instance()
+    if app is None or QThread.currentThread() != app.thread():
+        return QgsCoordinateTransform(source_crs, dest_crs, QgsProject.instance())
+
+    if not _TRANSFORM_PROJECT:
+        # datum transformations chosen for the project change the transforms.
+        QgsProject.instance().transformContextChanged.connect(_clear_transforms)
+        _TRANSFORM_PROJECT.append(QgsProject.instance())
+
+    key = (_crs_key(source_crs), _crs_key(dest_crs))
+    if key not in _TRANSFORMS:
+        _TRANSFORMS[key] = QgsCoordinateTransform(source_crs, dest_crs, QgsProject.instance())
+
+    return QgsCoordinateTransform(_TRANSFORMS[key])
+
+
+def _clear_transforms():
+    """Clear the cached transforms when the project transform context changes."""
+    _TRANSFORMS.clear()
+
+
+def clear_crs_cache():
+    """Clear all cached coordinate systems and transforms."""
+    _RESOLVED_CRS.clear()
+    _UTM_CRS.clear()
+    _TRANSFORMS.clear()
+
+    while _TRANSFORM_PROJECT:
+        try:
+            _TRANSFORM_PROJECT.pop().transformContextChanged.disconnect(_clear_transforms)
+        except (TypeError, RuntimeError):
+            pass
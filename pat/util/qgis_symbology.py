@@ -23,6 +23,7 @@
 from builtins import zip
 from builtins import str
 from builtins import range
+import os
 import random
 from collections import OrderedDict
 import numpy as np
@@ -97,8 +98,63 @@ def random_colours(number_of_colours=1):
     return colours
 
 
+# cache of class breaks calculated from raster files. The key includes the file modified time
+# so the breaks are recalculated if the file is overwritten.
+_CLASS_BREAKS_CACHE = {}
+
+# The largest width or height read to calculate class breaks. Larger rasters are read from an
+# overview or decimated.
+MAX_STATS_SIZE = 1024
+
+
+def raster_class_breaks(filename, rend_type, num_classes, band_num=1):
+    """
+    Calculate the minimum, maximum and class breaks for a raster band using numpy.
+
+    This does not use the QGIS layer or data provider so it can be run in a worker thread. Results
+    are cached against the file and its modified time. Rasters larger than MAX_STATS_SIZE are read
+    at a reduced resolution, using an overview when the file has one.
+
+    Args:
+        filename (str): The raster file
+        rend_type (str): The type of classes ('quantile' or 'equal interval')
+        num_classes (int): The number of classes to create
+        band_num(int): The band number to use
+
+    Returns:
+        tuple: minimum value, maximum value and a list of the upper value for each class.
+    """
+
+    key = (os.path.normpath(filename), os.path.getmtime(filename), rend_type.lower(), num_classes, band_num)
+    if key in _CLASS_BREAKS_CACHE:
+        return _CLASS_BREAKS_CACHE[key]
+
+    with rasterio.open(filename) as src:
+        scale = max(src.width, src.height) / float(MAX_STATS_SIZE)
+        if scale > 1:
+            out_shape = (max(1, int(round(src.height / scale))), max(1, int(round(src.width / scale))))
+            band = src.read(band_num, masked=True, out_shape=out_shape)
+        else:
+            band = src.read(band_num, masked=True)
+
+    values = band.compressed()
+    if values.size == 0:
+        return None
+
+    min_val = float(values.min())
+    max_val = float(values.max())
+
+    if rend_type.lower() == 'quantile':
+        breaks = np.percentile(values, np.linspace(0, 100, num_classes + 1)[1:]).tolist()
+    else:
+        breaks = np.linspace(min_val, max_val, num_classes + 1)[1:].tolist()
+
+    _CLASS_BREAKS_CACHE[key] = (min_val, max_val, breaks)
+    return _CLASS_BREAKS_CACHE[key]
+
+
 def raster_apply_classified_renderer(raster_layer, rend_type, num_classes, color_ramp,
-                                     invert=False, band_num=1, n_decimals=1):
+                                     invert=False, band_num=1, n_decimals=1, class_breaks=None):
     """
     Applies quantile or equal intervals render to a raster layer. It also allows for the rounding of the values and
     legend labels.
@@ -111,7 +167,8 @@ def raster_apply_classified_renderer(raster_layer, rend_type, num_classes, color
         band_num(int): The band number to use in the renderer
         invert (bool): invert the colour ramp
         n_decimals (int): the number of decimal places to round the values and labels
-
+        class_breaks (tuple): Pre-calculated (min, max, breaks) from raster_class_breaks. When
+                     supplied the band statistics are not recalculated by QGIS.
 
     Returns:
 
@@ -125,23 +182,45 @@ def raster_apply_classified_renderer(raster_layer, rend_type, num_classes, color
 
     ramp = qgsStyles.colorRamp(color_ramp)
 
-    # get band statistics
-    cbStats = raster_layer.dataProvider().bandStatistics(band_num, QgsRasterBandStats.All, raster_layer.extent(), 0)
+    if class_breaks is not None:
+        min_val, max_val, breaks = class_breaks
 
-    # create the renderer
-    renderer = QgsSingleBandPseudoColorRenderer(raster_layer.dataProvider(), band_num)
+        # the last discrete class is open ended
+        values = breaks[:-1] + [float('inf')]
+        items = []
+        for i, value in enumerate(values):
+            color = ramp.color(float(i) / (len(values) - 1) if len(values) > 1 else 0)
+            items.append(QgsColorRampShader.ColorRampItem(value, color))
 
-    # set the max and min heights we found earlier
-    renderer.setClassificationMin(cbStats.minimumValue)
-    renderer.setClassificationMax(cbStats.maximumValue)
+        color_shader = QgsColorRampShader(min_val, max_val)
+        color_shader.setColorRampType(QgsColorRampShader.Discrete)
+        color_shader.setColorRampItemList(items)
 
-    if rend_type.lower() == 'quantile':
-        renderer.createShader(ramp, QgsColorRampShader.Discrete, QgsColorRampShader.Quantile,
-                              num_classes)
+        raster_shader = QgsRasterShader()
+        raster_shader.setRasterShaderFunction(color_shader)
+
+        renderer = QgsSingleBandPseudoColorRenderer(raster_layer.dataProvider(), band_num, raster_shader)
+        renderer.setClassificationMin(min_val)
+        renderer.setClassificationMax(max_val)
+
+    else:
+        # get band statistics
+        cbStats = raster_layer.dataProvider().bandStatistics(band_num, QgsRasterBandStats.All, raster_layer.extent(), 0)
+
+        # create the renderer
+        renderer = QgsSingleBandPseudoColorRenderer(raster_layer.dataProvider(), band_num)
+
+        # set the max and min heights we found earlier
+        renderer.setClassificationMin(cbStats.minimumValue)
+        renderer.setClassificationMax(cbStats.maximumValue)
+
+        if rend_type.lower() == 'quantile':
+            renderer.createShader(ramp, QgsColorRampShader.Discrete, QgsColorRampShader.Quantile,
+                                  num_classes)
 
-    elif rend_type.lower() == 'equal interval':
-        renderer.createShader(ramp, QgsColorRampShader.Discrete, QgsColorRampShader.EqualInterval,
-                              num_classes)
+        elif rend_type.lower() == 'equal interval':
+            renderer.createShader(ramp, QgsColorRampShader.Discrete, QgsColorRampShader.EqualInterval,
+                                  num_classes)
 
 
     # Round values off to the nearest decimal place and construct the label
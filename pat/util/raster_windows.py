@@ -0,0 +1,528 @@
+# coding=utf-8
+"""
+/***************************************************************************
+ CSIRO Precision Agriculture Tools (PAT) Plugin
+
+ raster_windows -  Process rasters window by window so memory use is bounded by the block size
+                   rather than the size of the raster.
+           -------------------
+        begin      : 2026-10-19
+        git sha    : $Format:%H$
+        copyright  : (c) 2026, Commonwealth Scientific and Industrial Research Organisation (CSIRO)
+        email      : PAT@csiro.au
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the associated CSIRO Open Source Software       *
+ *   License Agreement (GPLv3) provided with this plugin.                  *
+ *                                                                         *
+ ***************************************************************************/
+"""
+import logging
+import multiprocessing.util
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+import rasterio
+from rasterio.enums import Resampling
+from rasterio.windows import Window, from_bounds, bounds as window_bounds
+
+from pat import LOGGER_NAME
+
+LOGGER = logging.getLogger(LOGGER_NAME)
+LOGGER.addHandler(logging.NullHandler())  # logging.StreamHandler()
+
+# The width and height in pixels of the windows used for processing.
+BLOCK_SIZE = 512
+
+# The width and height in pixels of the internal tiles of output GeoTIFFs.
+TILE_SIZE = 256
+
+# The compression methods offered for output GeoTIFFs. NONE writes uncompressed tiles.
+COMPRESSION_METHODS = ['DEFLATE', 'LZW', 'ZSTD', 'NONE']
+
+# The default options used by tiled_profile and build_overviews.
+DEFAULT_GEOTIFF_OPTIONS = {'compress': 'DEFLATE', 'overviews': True}
+
+# The nodata value of float32 outputs. It is the lowest float32 value so it can't collide with rescaled
+# or normalised values.
+FLOAT32_NODATA = float(np.finfo(np.float32).min)
+
+# The profile keys kept by tiled_profile. Creation options of the source such as photometric, interleave
+# and compress are dropped as they may not suit the new raster.
+PROFILE_KEYS = ['crs', 'transform', 'width', 'height', 'count', 'dtype', 'nodata']
+
+# The options set from the plugin settings. Worker processes are given the options of the parent by process_pool.
+_GEOTIFF_OPTIONS = dict(DEFAULT_GEOTIFF_OPTIONS)
+
+# Rasters opened by open_raster_cached. In worker processes these are reused for every window and
+# closed when the process exits or raster_cache ends.
+_DATASETS = {}
+_DATASETS_FINALIZER = []
+
+
+def get_windows(width, height, block_size=BLOCK_SIZE):
+    """ Split a raster into windows.
+
+    Args:
+        width (int): the width of the raster in pixels
+        height (int): the height of the raster in pixels
+        block_size (int): the maximum width and height of each window
+
+    Returns:
+        list: rasterio windows in row order
+    """
+    return [Window(col, row, min(block_size, width - col), min(block_size, height - row))
+            for row in range(0, height, block_size)
+            for col in range(0, width, block_size)]
+
+
+def get_geotiff_options():
+    """ Get the compression and overview options used for output GeoTIFFs.
+
+    Returns:
+        dict: the compress method and whether to build overviews
+    """
+    return dict(_GEOTIFF_OPTIONS)
+
+
+def set_geotiff_options(compress=None, overviews=None):
+    """ Set the compression and overview options used for output GeoTIFFs.
+
+    Args:
+        compress (str): one of COMPRESSION_METHODS. None or an unknown method keeps the current value.
+        overviews (bool): build internal overviews. None keeps the current value.
+    """
+    if compress is not None and compress.upper() in COMPRESSION_METHODS:
+        _GEOTIFF_OPTIONS['compress'] = compress.upper()
+    if overviews is not None:
+        _GEOTIFF_OPTIONS['overviews'] = bool(overviews)
+
+
+def tiled_profile(profile, **kwargs):
+    """ Create a rasterio profile to write a tiled and compressed GeoTIFF.
+
+    Only the size, georeferencing, count, dtype and nodata are copied from the source profile, so
+    creation options like YCbCr photometric or JPEG compression of an RGB image are not applied to the
+    new raster. The compression method is set by set_geotiff_options. A horizontal or floating point
+    predictor is added to suit the data type as it usually halves the size of compressed rasters.
+
+    Args:
+        profile (dict): the rasterio profile or meta to copy
+        **kwargs: other profile values to update ie count, dtype or nodata, or creation options
+            such as tfw='YES'
+
+    Returns:
+        dict: a new rasterio profile
+    """
+    compress = get_geotiff_options()['compress']
+    new_profile = {key: profile[key] for key in PROFILE_KEYS if key in profile}
+    new_profile.update(driver='GTiff', tiled=True, blockxsize=TILE_SIZE, blockysize=TILE_SIZE,
+                       compress=compress.lower(), BIGTIFF='IF_SAFER')
+    new_profile.update(kwargs)
+
+    if compress != 'NONE':
+        new_profile['predictor'] = 3 if np.issubdtype(np.dtype(new_profile['dtype']), np.floating) else 2
+
+    return new_profile
+
+
+def get_overview_factors(width, height, tile_size=TILE_SIZE):
+    """ Get the overview decimation factors for a raster, halving the size until it fits in one tile.
+
+    Args:
+        width (int): the width of the raster in pixels
+        height (int): the height of the raster in pixels
+        tile_size (int): the width and height of a tile
+
+    Returns:
+        List[int]: the factors. eg [2, 4, 8]. Empty when the raster fits in one tile.
+    """
+    factors = []
+    factor = 2
+    while max(width, height) / (factor // 2) > tile_size:
+        factors.append(factor)
+        factor *= 2
+    return factors
+
+
+def build_overviews(dst, resampling=Resampling.nearest):
+    """ Build internal overviews for a raster open for writing, before it is closed.
+
+    Overviews are skipped if they are turned off by set_geotiff_options. QGIS draws the overviews when
+    zoomed out and uses them to estimate statistics, rather than reading every pixel.
+
+    Args:
+        dst (rasterio.io.DatasetWriter): the open raster
+        resampling (rasterio.enums.Resampling): use nearest for classes or zones and average for
+                        continuous values.
+    """
+    if not get_geotiff_options()['overviews']:
+        return
+
+    factors = get_overview_factors(dst.width, dst.height)
+    if len(factors) == 0:
+        return
+
+    dst.build_overviews(factors, resampling)
+    dst.update_tags(ns='rio_overview', resampling=resampling.name)
+
+
+def optimise_geotiff(raster_file, resampling=Resampling.average, block_size=BLOCK_SIZE, raise_errors=True):
+    """ Rewrite a GeoTIFF created by another library as a tiled, compressed GeoTIFF with overviews.
+
+    The raster is copied window by window to a temporary file in the same folder which then replaces
+    the original. If this fails the original is left unchanged. Dataset and band tags and band
+    descriptions are kept.
+
+    Args:
+        raster_file (str): the GeoTIFF to rewrite
+        resampling (rasterio.enums.Resampling): the resampling used for the overviews
+        block_size (int): the size of the windows
+        raise_errors (bool): raise the error if the raster can't be rewritten. If False a warning is
+            logged instead, as the original raster is still valid.
+
+    Returns:
+        bool: True if the raster was rewritten
+    """
+    try:
+        _optimise_geotiff(os.path.normpath(raster_file), resampling, block_size)
+    except Exception as err:
+        if raise_errors:
+            raise
+
+        LOGGER.warning('Could not optimise {}. The unoptimised TIFF will be used.\n{}: {}'.format(
+            os.path.basename(raster_file), type(err).__name__, err))
+        return False
+
+    return True
+
+
+def _optimise_geotiff(raster_file, resampling, block_size):
+    """ Copy a raster to a tiled, compressed temporary GeoTIFF and replace the original. See optimise_geotiff"""
+    with rasterio.open(raster_file) as src:
+        profile = tiled_profile(src.meta)
+        windows = get_windows(src.width, src.height, block_size)
+
+        fd, temp_file = tempfile.mkstemp(suffix='.tif', dir=os.path.dirname(raster_file))
+        os.close(fd)
+        try:
+            with rasterio.open(temp_file, 'w', **profile) as dst:
+                dst.update_tags(**src.tags())
+                for band_num in src.indexes:
+                    dst.update_tags(band_num, **src.tags(band_num))
+                    if src.descriptions[band_num - 1]:
+                        dst.set_band_description(band_num, src.descriptions[band_num - 1])
+
+                for window in windows:
+                    dst.write(src.read(window=window), window=window)
+
+                build_overviews(dst, resampling)
+        except Exception:
+            os.remove(temp_file)
+            raise
+
+    try:
+        os.replace(temp_file, raster_file)
+    except OSError:
+        # eg the original is locked on Windows. It is left unchanged.
+        os.remove(temp_file)
+        raise
+
+
+def get_window_bounds(profile, block_size=BLOCK_SIZE):
+    """ Split a raster into windows and find the bounds and shape of each window.
+
+    Args:
+        profile (dict): the rasterio profile of the raster
+        block_size (int): the maximum width and height of each window
+
+    Returns:
+        tuple: lists of the windows, their bounds (left, bottom, right, top) and shapes (height, width)
+    """
+    windows = get_windows(profile['width'], profile['height'], block_size)
+    bounds = [window_bounds(w, profile['transform']) for w in windows]
+    shapes = [(int(w.height), int(w.width)) for w in windows]
+    return windows, bounds, shapes
+
+
+def common_area_profile(raster_files):
+    """ Find the area common to all rasters aligned to the pixels of the first raster.
+
+    All input rasters MUST overlap and have the same coordinate system and pixel size.
+
+    Args:
+        raster_files (List[str]): the rasters to check
+
+    Returns:
+        dict: a rasterio profile of the first raster for the common area
+    """
+    not_exists = [my_file for my_file in raster_files if not os.path.exists(my_file)]
+    if len(not_exists) > 0:
+        raise IOError('raster_files: {} raster file(s) do '
+                      'not exist\n\t({})'.format(len(not_exists), '\n\t'.join(not_exists)))
+
+    check_pixelsize = set()
+    check_crs = []
+    left, bottom, right, top = -np.inf, -np.inf, np.inf, np.inf
+    for ea_raster in raster_files:
+        with rasterio.open(ea_raster) as src:
+            if src.crs is None:
+                check_crs.append(ea_raster)
+            check_pixelsize.add(src.res)
+            left, bottom = max(left, src.bounds.left), max(bottom, src.bounds.bottom)
+            right, top = min(right, src.bounds.right), min(top, src.bounds.top)
+
+    if len(check_pixelsize) > 1:
+        raise TypeError("raster_files are of different pixel sizes - {}".format(list(check_pixelsize)))
+
+    if len(check_crs) > 0:
+        raise TypeError("{} raster(s) don't have coordinates "
+                        "systems assigned \n\t{}".format(len(check_crs), '\n\t'.join(check_crs)))
+
+    if left >= right or bottom >= top:
+        raise ValueError("Rasters (Images) do not overlap")
+
+    with rasterio.open(raster_files[0]) as src:
+        window = from_bounds(left, bottom, right, top, transform=src.transform)
+        window = window.round_offsets().round_lengths()
+        profile = src.meta.copy()
+        profile.update(transform=src.window_transform(window), width=int(window.width),
+                       height=int(window.height))
+
+    return profile
+
+
+def close_cached_rasters():
+    """Close all rasters opened by open_raster_cached in this process."""
+    while _DATASETS:
+        _, src = _DATASETS.popitem()
+        src.close()
+
+
+@contextmanager
+def raster_cache():
+    """ Close the rasters opened by open_raster_cached in this process when the block ends.
+
+    Open rasters are locked on Windows, so a tool run is wrapped in this to release its inputs.
+    Rasters opened in worker processes are closed when the process pool shuts down.
+    """
+    try:
+        yield
+    finally:
+        close_cached_rasters()
+
+
+def open_raster_cached(raster_file):
+    """ Open a raster for reading once per process.
+
+    The rasters stay open until close_cached_rasters is called, a raster_cache block ends or the
+    process exits.
+
+    Args:
+        raster_file (str): the raster to open
+
+    Returns:
+        rasterio.io.DatasetReader: the open raster
+    """
+    if not _DATASETS_FINALIZER:
+        # runs when a worker process exits, which happens when its process pool shuts down
+        _DATASETS_FINALIZER.append(multiprocessing.util.Finalize(None, close_cached_rasters, exitpriority=10))
+
+    if raster_file not in _DATASETS:
+        _DATASETS[raster_file] = rasterio.open(raster_file)
+    return _DATASETS[raster_file]
+
+
+def read_aligned(raster_files, bounds, shape, common_mask=True):
+    """ Read the same area from the first band of each raster masked to the pixels which are valid
+    in all rasters.
+
+    Args:
+        raster_files (List[str]): the rasters to read
+        bounds (tuple): the bounds of the window (left, bottom, right, top)
+        shape (tuple): the height and width of the window
+        common_mask (bool): mask pixels which are not valid in every raster. If False each raster
+                    keeps its own mask.
+
+    Returns:
+        numpy.ma.MaskedArray: a float64 array of shape (rasters, height, width)
+    """
+    stack = np.ma.empty((len(raster_files),) + tuple(shape), dtype=np.float64)
+    for i, raster_file in enumerate(raster_files):
+        src = open_raster_cached(raster_file)
+        window = from_bounds(*bounds, transform=src.transform).round_offsets()
+        stack[i] = src.read(1, window=window, out_shape=shape, masked=True, boundless=True)
+
+    if common_mask:
+        # mask pixels which are not valid in every raster
+        stack[:, np.ma.getmaskarray(stack).any(axis=0)] = np.ma.masked
+    return stack
+
+
+def map_windows(raster_file, func, windows, max_workers=None):
+    """ Apply a function to windows of a raster using a thread pool.
+
+    Rasterio datasets can't be shared between threads, so each thread opens its own copy of the
+    raster. Windows are submitted in small batches so only a few windows are held in memory.
+
+    Args:
+        raster_file (str): the raster to read
+        func (function): called with the open rasterio dataset and a window
+        windows (list): the windows to process
+        max_workers (int): the number of threads. Defaults to the number of cpus
+
+    Returns:
+        generator: the result of func for each window in the same order as windows
+    """
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    local = threading.local()
+    datasets = []
+
+    def _run(window):
+        if not hasattr(local, 'src'):
+            local.src = rasterio.open(os.path.normpath(raster_file))
+            datasets.append(local.src)
+        return func(local.src, window)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            batch_size = max_workers * 2
+            for i in range(0, len(windows), batch_size):
+                for result in executor.map(_run, windows[i:i + batch_size]):
+                    yield result
+    finally:
+        for ds in datasets:
+            ds.close()
+
+
+def band_statistics(raster_file, band_num=1, block_size=BLOCK_SIZE):
+    """ Calculate the statistics of a raster band window by window, excluding nodata.
+
+    The mean and variance of each window are merged using the parallel algorithm of Chan et al.
+    so they are accurate for large rasters.
+
+    Args:
+        raster_file (str): the raster to read
+        band_num (int): the band number
+        block_size (int): the size of the windows
+
+    Returns:
+        dict: count, min, max, mean and std (population) of the band
+    """
+
+    def _window_stats(src, window):
+        values = src.read(band_num, window=window, masked=True).compressed().astype(np.float64)
+        if values.size == 0:
+            return None
+        mean = values.mean()
+        return values.size, values.min(), values.max(), mean, ((values - mean) ** 2).sum()
+
+    with rasterio.open(os.path.normpath(raster_file)) as src:
+        windows = get_windows(src.width, src.height, block_size)
+
+    count, min_val, max_val, mean, m2 = 0, np.inf, -np.inf, 0.0, 0.0
+    for result in map_windows(raster_file, _window_stats, windows):
+        if result is None:
+            continue
+
+        n, w_min, w_max, w_mean, w_m2 = result
+        delta = w_mean - mean
+        total = count + n
+        mean += delta * n / total
+        m2 += w_m2 + delta ** 2 * count * n / total
+        count = total
+        min_val = min(min_val, w_min)
+        max_val = max(max_val, w_max)
+
+    if count == 0:
+        raise ValueError('{} band {} does not contain any valid pixels'.format(
+            os.path.basename(raster_file), band_num))
+
+    return {'count': count, 'min': min_val, 'max': max_val, 'mean': mean, 'std': np.sqrt(m2 / count)}
+
+
+def apply_to_band(raster_file, out_file, func, band_num=1, crs_wkt=None, block_size=BLOCK_SIZE):
+    """ Apply a function to a raster band window by window and write the result to a tiled,
+    compressed single band float32 GeoTIFF with overviews. Nodata is written as FLOAT32_NODATA.
+
+    Args:
+        raster_file (str): the raster to read
+        out_file (str): the GeoTIFF to write
+        func (function): called with a masked float64 array for each window and returns the new values
+        band_num (int): the band number
+        crs_wkt (str): the coordinate system to write. Defaults to that of the input raster
+        block_size (int): the size of the windows
+    """
+
+    def _process(src, window):
+        band = src.read(band_num, window=window, masked=True).astype(np.float64)
+        return window, func(band)
+
+    with rasterio.open(os.path.normpath(raster_file)) as src:
+        profile = tiled_profile(src.meta, count=1, dtype=rasterio.float32, nodata=FLOAT32_NODATA)
+        if crs_wkt is not None:
+            profile['crs'] = str(crs_wkt)
+
+        windows = get_windows(src.width, src.height, block_size)
+
+    with rasterio.open(os.path.normpath(out_file), 'w', **profile) as dst:
+        for window, result in map_windows(raster_file, _process, windows):
+            dst.write(np.ma.filled(result, FLOAT32_NODATA).astype(rasterio.float32), 1, window=window)
+
+        build_overviews(dst, Resampling.average)
+
+
+def rescale_raster(raster_file, out_file, min_value, max_value, band_num=1, crs_wkt=None,
+                   block_size=BLOCK_SIZE):
+    """ Rescale a single band between a set number of values, excluding nodata.
+
+    The band minimum and maximum are calculated in a first pass, then the band is rescaled and
+    written window by window.
+
+    Args:
+        raster_file (str): the raster to read
+        out_file (str): the GeoTIFF to write
+        min_value (float): The lower/min value to use during rescaling
+        max_value (float): The Upper/max value to use during rescaling
+        band_num (int): The band number to apply rescaling too.
+        crs_wkt (str): the coordinate system to write. Defaults to that of the input raster
+        block_size (int): the size of the windows
+    """
+    stats = band_statistics(raster_file, band_num, block_size)
+    data_range = stats['max'] - stats['min']
+
+    def _rescale(band):
+        return (band - stats['min']) * (max_value - min_value) / data_range + min_value
+
+    apply_to_band(raster_file, out_file, _rescale, band_num, crs_wkt, block_size)
+
+
+def normalise_raster(raster_file, out_file, band_num=1, crs_wkt=None, block_size=BLOCK_SIZE):
+    """ Normalise a single band to a mean of zero and standard deviation of 1, excluding nodata.
+
+    The band mean and standard deviation are calculated in a first pass, then the band is
+    normalised and written window by window.
+
+    Args:
+        raster_file (str): the raster to read
+        out_file (str): the GeoTIFF to write
+        band_num (int): The band number to normalise.
+        crs_wkt (str): the coordinate system to write. Defaults to that of the input raster
+        block_size (int): the size of the windows
+    """
+    stats = band_statistics(raster_file, band_num, block_size)
+
+    def _normalise(band):
+        return (band - stats['mean']) / stats['std']
+
+    apply_to_band(raster_file, out_file, _normalise, band_num, crs_wkt, block_size)
@@ -0,0 +1,217 @@
+# coding=utf-8
+"""
+/***************************************************************************
+ CSIRO Precision Agriculture Tools (PAT) Plugin
+
+ result_cache -  Reuse the outputs of a tool when it is re-run with unchanged inputs and parameters.
+           -------------------
+        begin      : 2026-10-19
+        git sha    : $Format:%H$
+        copyright  : (c) 2026, Commonwealth Scientific and Industrial Research Organisation (CSIRO)
+        email      : PAT@csiro.au
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the associated CSIRO Open Source Software       *
+ *   License Agreement (GPLv3) provided with this plugin.                  *
+ *                                                                         *
+ ***************************************************************************/
+"""
+import glob
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+from pat import LOGGER_NAME, PLUGIN_NAME, TEMPDIR
+from util.settings import read_setting
+
+LOGGER = logging.getLogger(LOGGER_NAME)
+LOGGER.addHandler(logging.NullHandler())  # logging.StreamHandler()
+
+CACHE_DIR = os.path.join(TEMPDIR, 'cache')
+MANIFEST = 'manifest.json'
+
+# The default size limit of the cache in megabytes. Set PAT/CACHE_SIZE_MB to 0 to disable the cache.
+DEFAULT_CACHE_SIZE_MB = 2048
+
+
+def get_cache_size_limit():
+    """ Get the size limit of the cache in bytes from the settings."""
+    size_mb = read_setting(PLUGIN_NAME + '/CACHE_SIZE_MB', int)
+    if size_mb is None:
+        size_mb = DEFAULT_CACHE_SIZE_MB
+    return max(size_mb, 0) * 1024 * 1024
+
+
+def get_related_files(filename):
+    """ Get a file and the files which share its name and differ only by extension. eg a shapefile and its
+    .dbf, .prj and .shx files or a tif and its .tfw and .aux.xml files."""
+    stem = os.path.splitext(filename)[0]
+    related = set(glob.glob(glob.escape(stem) + '.*'))
+    if os.path.exists(filename):
+        related.add(filename)
+    return sorted(related)
+
+
+def file_fingerprint(filename):
+    """ Fingerprint a file and its related files using their name, size and modified time.
+
+    Reading the whole file would make checking the cache as slow as running some tools, and a changed
+    file will almost always have a new size or modified time.
+
+    Args:
+        filename (str): the file to fingerprint
+
+    Returns:
+        List[List]: the path, size and modified time of each file
+    """
+    fingerprint = []
+    for ea_file in get_related_files(os.path.normpath(filename)):
+        stats = os.stat(ea_file)
+        fingerprint.append([os.path.normcase(os.path.abspath(ea_file)), stats.st_size, stats.st_mtime_ns])
+    return fingerprint
+
+
+def result_cache_key(tool_key, parameters, input_files, output_files=()):
+    """ Create the cache key for a run of a tool.
+
+    The key is a hash of the tool name, the parameters and the fingerprint of the input files. The parameters are
+    usually the 'Parameters:' string written to the log. Lines naming an output file are excluded so a run saved
+    to a different file can reuse the same result.
+
+    Args:
+        tool_key (str): the tool name. Usually the dialog toolKey
+        parameters (str): the tool parameters
+        input_files (List[str]): the input files
+        output_files (List[str]): the output files
+
+    Returns:
+        str: the cache key or None if an input is not a file, eg a memory layer.
+    """
+    if not all(os.path.isfile(ea) for ea in input_files):
+        return None
+
+    lines = [ea for ea in parameters.splitlines()
+             if not any(os.path.normpath(out) in os.path.normpath(ea) for out in output_files if out)]
+
+    content = json.dumps([tool_key, lines, [file_fingerprint(ea) for ea in input_files]])
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+def fetch_cached_result(key, output_files):
+    """ Copy the cached outputs for a key to the output files.
+
+    Args:
+        key (str): the cache key from result_cache_key. None is never found.
+        output_files (List[str]): the output files in the same order they were stored
+
+    Returns:
+        bool: True if the outputs were found and copied.
+    """
+    if key is None:
+        return False
+
+    entry_dir = os.path.join(CACHE_DIR, key)
+    manifest_file = os.path.join(entry_dir, MANIFEST)
+    if get_cache_size_limit() == 0 or not os.path.exists(manifest_file):
+        return False
+
+    try:
+        with open(manifest_file) as f:
+            manifest = json.load(f)
+
+        if len(manifest['outputs']) != len(output_files):
+            return False
+
+        for i, (stored_stem, out_file) in enumerate(zip(manifest['outputs'], output_files)):
+            out_stem = os.path.splitext(out_file)[0]
+            for ea_file in os.listdir(os.path.join(entry_dir, str(i))):
+                shutil.copy2(os.path.join(entry_dir, str(i), ea_file),
+                             out_stem + ea_file[len(stored_stem):])
+
+    except (IOError, OSError, ValueError, KeyError) as err:
+        LOGGER.warning('Could not use cached result {}: {}'.format(key, err))
+        return False
+
+    # mark as recently used
+    os.utime(manifest_file, None)
+    LOGGER.info('{:<30} {:>10}   {:<15}'.format('Reused cached result', '', key))
+    return True
+
+
+def store_result(key, output_files):
+    """ Store the outputs of a tool in the cache then evict the least recently used results over the size limit.
+
+    Args:
+        key (str): the cache key from result_cache_key
+        output_files (List[str]): the output files. Related files such as .dbf or .tfw files are also stored.
+    """
+    if key is None or get_cache_size_limit() == 0:
+        return
+
+    entry_dir = os.path.join(CACHE_DIR, key)
+    if not os.path.exists(CACHE_DIR):
+        os.makedirs(CACHE_DIR)
+
+    # copy to a temporary folder then rename so an incomplete entry is never used.
+    temp_dir = tempfile.mkdtemp(prefix='tmp_', dir=CACHE_DIR)
+    try:
+        stems = []
+        for i, out_file in enumerate(output_files):
+            os.mkdir(os.path.join(temp_dir, str(i)))
+            stem = os.path.basename(os.path.splitext(out_file)[0])
+            stems.append(stem)
+            for ea_file in get_related_files(out_file):
+                shutil.copy2(ea_file, os.path.join(temp_dir, str(i), os.path.basename(ea_file)))
+
+        with open(os.path.join(temp_dir, MANIFEST), 'w') as f:
+            json.dump({'outputs': stems, 'created': time.time()}, f)
+
+        if os.path.exists(entry_dir):
+            shutil.rmtree(entry_dir)
+        os.rename(temp_dir, entry_dir)
+
+    except (IOError, OSError) as err:
+        LOGGER.warning('Could not cache result {}: {}'.format(key, err))
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        return
+
+    evict_cache()
+
+
+def get_folder_size(folder):
+    """ Get the total size in bytes of all files in a folder."""
+    return sum(os.path.getsize(os.path.join(root, ea)) for root, _, files in os.walk(folder) for ea in files)
+
+
+def evict_cache(max_size=None):
+    """ Remove the least recently used results until the cache is smaller than the size limit.
+
+    Args:
+        max_size (int): the size limit in bytes. Defaults to the CACHE_SIZE_MB setting.
+    """
+    if max_size is None:
+        max_size = get_cache_size_limit()
+
+    if not os.path.exists(CACHE_DIR):
+        return
+
+    entries = []
+    for ea in os.listdir(CACHE_DIR):
+        entry_dir = os.path.join(CACHE_DIR, ea)
+        manifest_file = os.path.join(entry_dir, MANIFEST)
+        if os.path.exists(manifest_file):
+            entries.append((os.path.getmtime(manifest_file), get_folder_size(entry_dir), entry_dir))
+
+    total = sum(ea[1] for ea in entries)
+    for _, size, entry_dir in sorted(entries):
+        if total <= max_size:
+            break
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        total -= size
@@ -0,0 +1,559 @@
+# coding=utf-8
+"""
+/***************************************************************************
+ CSIRO Precision Agriculture Tools (PAT) Plugin
+
+ strip_stats -  Moving window statistics for strip trial analysis calculated from cumulative sums
+                so each window is calculated in constant time.
+           -------------------
+        begin      : 2026-10-19
+        git sha    : $Format:%H$
+        copyright  : (c) 2026, Commonwealth Scientific and Industrial Research Organisation (CSIRO)
+        email      : PAT@csiro.au
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the associated CSIRO Open Source Software       *
+ *   License Agreement (GPLv3) provided with this plugin.                  *
+ *                                                                         *
+ ***************************************************************************/
+"""
+import logging
+import os
+import time
+import warnings
+from collections import OrderedDict, defaultdict
+from datetime import timedelta
+
+import matplotlib as mpl
+# suppress ImportError: No module named _tkinter, please install the python-tk package
+mpl.use('Agg')
+import matplotlib.patheffects as pe
+import matplotlib.pyplot as plt
+from matplotlib import gridspec
+
+import numpy as np
+import pandas as pd
+import rasterio
+import six
+from geopandas import GeoDataFrame
+from rasterio.windows import from_bounds, get_data_window, intersection
+from scipy import stats
+from shapely.geometry import LineString
+
+from pyprecag import config, crs as pyprecag_crs
+from pyprecag.convert import text_rotation
+from pyprecag.errors import GeometryError
+
+from pat import LOGGER_NAME
+from pat.util.point_statistics import extract_pixel_statistics_for_points
+
+LOGGER = logging.getLogger(LOGGER_NAME)
+LOGGER.addHandler(logging.NullHandler())  # logging.StreamHandler()
+
+
+def rolling_sums(values, size):
+    """ Calculate the sums of centred moving windows from a cumulative sum.
+
+    Windows match pandas rolling(size, center=True). Windows which extend past either end of the
+    array or contain nan are returned as nan.
+
+    Args:
+        values (numpy.ndarray): the values
+        size (int): the size of the moving window
+
+    Returns:
+        numpy.ndarray: the sum of each window
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n_values = len(values)
+    result = np.full(n_values, np.nan)
+    if size < 1 or size > n_values:
+        return result
+
+    is_nan = np.isnan(values)
+    cum_values = np.concatenate([[0], np.cumsum(np.where(is_nan, 0, values))])
+    cum_nan = np.concatenate([[0], np.cumsum(is_nan)])
+
+    # window for position i is [i - (size - 1 - offset), i + offset]
+    offset = (size - 1) // 2
+    end = np.arange(size, n_values + 1)
+    idx = end - 1 - offset
+
+    sums = cum_values[end] - cum_values[end - size]
+    sums[(cum_nan[end] - cum_nan[end - size]) > 0] = np.nan
+    result[idx] = sums
+    return result
+
+
+def rolling_paired_ttest(treatment, control, size):
+    """ Calculate the two-tailed paired t-test p value for centred moving windows.
+
+    This gives the same result as applying scipy.stats.ttest_rel to each window.
+
+    Args:
+        treatment (numpy.ndarray): the treatment values
+        control (numpy.ndarray): the control values
+        size (int): the size of the moving window
+
+    Returns:
+        numpy.ndarray: the p value of each window
+    """
+    diff = np.asarray(treatment, dtype=np.float64) - np.asarray(control, dtype=np.float64)
+
+    # centre the differences to limit precision loss in the sum of squares.
+    shift = np.nanmean(diff) if np.isfinite(diff).any() else 0
+    diff = diff - shift
+
+    sum_diff = rolling_sums(diff, size)
+    sum_sq = rolling_sums(diff ** 2, size)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = sum_diff / size
+        variance = np.maximum((sum_sq - size * mean ** 2) / (size - 1), 0)
+        t_stat = (mean + shift) / np.sqrt(variance / size)
+
+    return 2 * stats.t.sf(np.abs(t_stat), size - 1)
+
+
+def calculate_strip_stats(input_table, treatment_column, control_columns=[], size=5):
+    """Calculate statistics for a strip
+
+    A moving window is used for some of the statistics. This window is centred so for a window
+    size of 5, 2 NAN or blanks will be added to start and end of the output column.
+
+    Statistics include (output column names):
+        controls_mean  - row by row mean of the control columns
+        treat_diff -   row by row difference between the treatment and controls_mean columns
+        av_treat_diff - calculate mean of values using a moving window using the treat_diff column
+        p_value - calculate p_value using a moving window using treatment and controls_mean columns
+        RI  - Response Index using the treatment and controls_mean columns
+
+    Args:
+        input_table (pandas.core.frame.DataFrame): the table to calculate statistics for
+        treatment_column (str): The column containing the treatment values
+        control_columns (List[str]): The column containing the control values.
+                                     This can be one or two columns
+        size (int):The size of the moving window.
+
+    Returns:
+        pandas.core.frame.DataFrame: The output table containing new statistics columns
+        control_mean (str): The column used as the control mean.
+    """
+
+    if isinstance(input_table, GeoDataFrame):
+        # drop geometry etc. and create flat table.
+        input_table = pd.DataFrame(input_table.drop(columns='geometry', inplace=False))
+
+    if not isinstance(control_columns, list):
+        raise TypeError("control_columns should be a list.")
+
+    if not isinstance(treatment_column, six.string_types):
+        raise TypeError("treatment_column should be a string.")
+
+    if treatment_column is None or treatment_column == '':
+        raise ValueError('Invalid treatment column')
+
+    missing = [ea for ea in [treatment_column] + control_columns
+               if ea and ea not in input_table.columns]
+    if len(missing) > 0:
+        raise ValueError('columns not found - {}'.format(','.join(missing)))
+
+    input_table = input_table.copy()
+
+    if len(control_columns) > 1:
+        # calculate the mean for the column(s)
+        control_mean = '-'.join(control_columns)
+        control_mean = control_mean.replace(' Strip Value', '')
+        control_mean = control_mean.replace(' Strip Control', '')
+        control_mean = '{}_mean'.format(control_mean.strip())
+        input_table[control_mean] = input_table[control_columns].mean(axis=1)
+    else:
+        control_mean = control_columns[0]
+
+    treatment = input_table[treatment_column].values.astype(np.float64)
+    control = input_table[control_mean].values.astype(np.float64)
+
+    # calculate the difference and its moving mean
+    input_table['treat_diff'] = treatment - control
+    input_table['av_treat_dif'] = rolling_sums(treatment - control, size) / size
+
+    # Rolling window using two-tailed paired student t-test
+    input_table['p_value'] = rolling_paired_ttest(treatment, control, size)
+
+    # Response index is the ratio of the window means
+    with np.errstate(divide='ignore', invalid='ignore'):
+        input_table['RI'] = rolling_sums(treatment, size) / rolling_sums(control, size)
+
+    input_table.set_index('TrialPtID', drop=False, inplace=True)
+
+    return input_table, control_mean
+
+
+def check_rasters_overlap(raster_files):
+    """ Check the data extents of the first band of the rasters overlap.
+
+    Args:
+        raster_files (List[str]): the rasters to check
+
+    Raises:
+        rasterio.errors.WindowError: if the rasters do not overlap
+    """
+    try:
+        for i, ea_raster in enumerate(raster_files, start=1):
+            with rasterio.open(ea_raster) as src:
+                data_window = get_data_window(src.read(1, masked=True))
+
+                if i == 1:
+                    min_window = data_window
+                else:
+                    # create a window from the last bounds for this image in case the extents or
+                    # pixel origins are different
+                    min_img_window = from_bounds(*min_bbox, transform=src.transform)
+                    min_window = intersection(min_img_window, data_window).round_lengths()
+
+                min_bbox = src.window_bounds(min_window)
+
+    except rasterio.errors.WindowError as e:
+        # reword 'windows do not intersect' error message
+        e.args = ("Rasters do not overlap",)
+        raise
+
+
+def _save_trial_map(gdf_map, gdf_strip, line_id, transect_column, out_folder):
+    """ Save a png map showing the strips of a trial with labels at the start, middle and end."""
+
+    # get start middle and ends of lines for labelling
+    start_end_pts = gdf_map[gdf_map[transect_column] == 'Strip'].iloc[[0, -1]]
+    middle_pts = gdf_map[gdf_map['PointID'] == gdf_map.iloc[int(len(gdf_map) / 2)]['PointID']]
+
+    # Aggregate points into lines
+    try:
+        gdf_lines = gdf_map.groupby(['Strip_Name'])['geometry'].apply(
+            lambda x: LineString(x.tolist()) if x.size > 1 else x.tolist())
+    except ValueError:
+        gdf_lines = gdf_map.groupby(['Strip_Name'])['geometry'].apply(
+            lambda x: LineString([(p.x, p.y) for p in x]))
+
+    gdf_lines = GeoDataFrame(gdf_lines, geometry='geometry')
+
+    fig_map, ax = plt.subplots(figsize=(5, 5))
+
+    # fix the extent to the vector
+    ax.set_aspect('equal')
+    ax.set_title('Map for Trial {}'.format(line_id), fontsize=8)
+    ax.set_xlim(left=gdf_strip.total_bounds[0] - 50, right=gdf_strip.total_bounds[2] + 50)
+    ax.set_ylim(bottom=gdf_strip.total_bounds[1] - 50, top=gdf_strip.total_bounds[3] + 50)
+
+    gdf_lines.plot(ax=ax, cmap='rainbow', legend=True)
+
+    ax.tick_params(which='major', width=0.75, length=2.5, labelsize=4)
+    plt.setp(ax.spines.values(), linewidth=0.5)
+
+    ax.get_xaxis().set_major_formatter(mpl.ticker.FuncFormatter(lambda x, p: "{:,.0f}".format(x)))
+    ax.get_yaxis().set_major_formatter(mpl.ticker.FuncFormatter(lambda x, p: "{:,.0f}".format(x)))
+
+    anno_kwargs = {'size': 7, 'va': 'center', 'ha': 'center',
+                   'path_effects': [pe.withStroke(linewidth=4, foreground="white")]}
+
+    middle_pts.apply(lambda x: ax.annotate(x['Strip_Name'], xy=(x.geometry.x, x.geometry.y),
+                                           rotation=x['label_angle'], **anno_kwargs), axis=1)
+
+    ax.annotate('Start', xy=(start_end_pts.iloc[0].geometry.x, start_end_pts.iloc[0].geometry.y),
+                rotation=start_end_pts.iloc[0]['label_angle'], **anno_kwargs)
+
+    ax.annotate('End', xy=(start_end_pts.iloc[-1].geometry.x, start_end_pts.iloc[-1].geometry.y),
+                rotation=start_end_pts.iloc[-1]['label_angle'], **anno_kwargs)
+
+    map_file = os.path.join(out_folder, "Trial-{}_map.png".format(line_id))
+    plt.savefig(map_file, dpi=300)
+    plt.close(fig_map)
+
+    return map_file
+
+
+def _save_strip_graphs(df_statstable, value_column, control_mean, line_id, offset_subst, graph_file):
+    """ Save a png of the treatment and control values, the moving window treatment difference and
+    response index along a strip."""
+
+    fig_graph = plt.figure(figsize=(15, 10))  # width, height
+    fig_graph.subplots_adjust(hspace=0, wspace=0.05)
+    gs = gridspec.GridSpec(3, 1, height_ratios=[3, 3, 1])
+
+    if config.get_debug_mode():
+        gs = gridspec.GridSpec(4, 1, height_ratios=[3, 3, 1, 3])
+
+    axs = []
+    for igs, ss in enumerate(gs):
+        if igs == 0:
+            axs.append(fig_graph.add_subplot(ss))
+        else:
+            axs.append(fig_graph.add_subplot(ss, sharex=axs[0]))
+
+    axs[0].set_title('Strip trial analysis for Trial {} - {} strip'.format(line_id, offset_subst), fontsize=16)
+
+    df_statstable.plot(x='DistOnLine', y=value_column, marker='.', ax=axs[0], label='Treatment')
+    df_statstable.plot(x='DistOnLine', y=control_mean, marker='.', ax=axs[0], label='Control')
+
+    for name, group in df_statstable.groupby(['Strip Zone', 'zone_marker', 'sig_color', 'sig_label']):
+        group.plot.scatter(x='DistOnLine', y='av_treat_dif', marker=name[1], s=25, c=name[2], ax=axs[1],
+                           zorder=2, label='Zone {} {}'.format(name[0], name[3]))
+
+        group.plot.scatter(x='DistOnLine', y='RI', marker=name[1], s=25, c='k', ax=axs[2], zorder=2,
+                           label='Zone {}'.format(name[0]))
+
+    axs[0].set(ylabel="Treatment Units")
+    axs[1].set(ylabel="Treatment Difference")
+    axs[2].set(ylabel="Response\nIndex")
+
+    for ea_ax in axs:
+        ea_ax.grid(True, which='major', axis='x')
+        ea_ax.set(xlabel="Distance (m) from start of strip (see map)")
+        plt.setp(ea_ax.spines.values(), linewidth=1)
+
+        # Shrink current axis by 20%  https://stackoverflow.com/a/4701285
+        box = ea_ax.get_position()
+        ea_ax.set_position([box.x0, box.y0, box.width * 0.8, box.height])
+
+        # remove duplicates labels from legend  https://stackoverflow.com/a/13589144
+        handles, labels = ea_ax.get_legend_handles_labels()
+        by_label = OrderedDict(zip(labels, handles))
+        ea_ax.legend(by_label.values(), by_label.keys(), loc='center left', bbox_to_anchor=(1, 0.5),
+                     edgecolor='w')
+
+    plt.savefig(graph_file)
+    plt.close(fig_graph)
+
+
+def ttest_analysis(points_geodataframe, points_crs, values_raster, out_folder,
+                   zone_raster='', control_raster='', size=5, create_graph=False):
+    """Run a moving window t-test analysis for a strip trial as described in Lawes
+    and Bramley (2012).
+
+    This produces the same outputs as pyprecag.processing.ttest_analysis using the PAT point
+    extraction and moving window statistics.
+
+    Format of the points must be from the create_points_along_line tools.
+    All input rasters must be of the same coordinate system and pixel size and overlap with the
+    points.
+
+    Output Files include:
+        For each line and strip combination :
+            - png Map showing orientation of the line (start and ends)
+            - png set of graphs
+            - CSV file of derived statistics. See calculate_strip_stats
+
+    Reference:
+        Lawes RA, Bramley RGV. 2012. A Simple Method for the Analysis of On-Farm Strip Trials.
+         Agronomy Journal 104, 371-377.
+
+    Args:
+        points_geodataframe (geopandas.geodataframe.GeoDataFrame): points derived using
+                create_points_along_line
+        points_crs (pyprecag.crs.crs):the coordinate system for the points.
+        values_raster (str): a kriged raster containing the treatment  values
+        out_folder (str):  folder for output files.
+        zone_raster (str): a raster containing zones.
+        control_raster (str): a kriged raster of the control values
+        size (int): the size used to calculate the moving window statistics.
+        create_graph (bool): not used. The map and graphs are always created.
+
+    Returns:
+        pandas.core.frame.DataFrame: dataframe containing output statistics
+    """
+    warnings.warn("Moving window T-test will be modified to include Dutilleul's correction. For now the reported \
+                   p value should not be regarded as a true indication of significance", DeprecationWarning)
+
+    if not isinstance(points_geodataframe, GeoDataFrame):
+        raise TypeError('Invalid input data : inputGeodataFrame')
+
+    if not any("POINT" in g.upper() for g in points_geodataframe.geom_type.unique()):
+        raise GeometryError('Invalid input data : a points geopandas dataframe is required')
+
+    if not isinstance(points_crs, pyprecag_crs.crs):
+        raise TypeError('Crs must be an instance of pyprecag.crs.crs')
+
+    if out_folder is None or out_folder == '':
+        raise ValueError('Please specify an output folder')
+
+    if not os.path.exists(out_folder):
+        raise IOError('Output directory {} does not exist'.format(out_folder))
+
+    if not isinstance(size, int):
+        raise TypeError("Size {} should be an integer.".format(size))
+
+    if zone_raster is None:
+        zone_raster = ''
+
+    if control_raster is None:
+        control_raster = ''
+
+    not_exists = [ea for ea in [values_raster, control_raster, zone_raster] if ea and not os.path.exists(ea)]
+    if len(not_exists) > 0:
+        raise IOError('raster files: {} raster file(s) '
+                      'do not exist\n\t({})'.format(len(not_exists), '\n\t'.join(not_exists)))
+
+    missing = [ea for ea in ['TrialID', 'PointID', 'Strip_Name', 'DistOnLine']
+               if ea not in points_geodataframe.columns]
+    if len(missing) > 0:
+        raise ValueError("columns not found - {}. Please use the output from the "
+                         "create_points_along_line. (PAT's create strip trial points)".format(','.join(missing)))
+
+    raster_files = [ea for ea in [values_raster, control_raster, zone_raster] if ea]
+    check_rasters_overlap(raster_files)
+
+    transect_column = 'Strip_Name'
+    line_count = len(points_geodataframe['TrialID'].unique())
+
+    # Extract raster values for points ------------------------------------------------------------
+    gdf_points, points_crs = extract_pixel_statistics_for_points(points_geodataframe, points_crs,
+                                                                 raster_files, 'extract_pixels.csv',
+                                                                 size_list=[1])
+    gdf_points.index.name = 'FID'
+
+    # find the columns relating to the rasters
+    column_names = {}
+    for key, ea_raster in [('Value', values_raster), ('Control', control_raster), ('Zone', zone_raster)]:
+        if ea_raster != '':
+            rastname = os.path.splitext(os.path.basename(ea_raster))[0]
+            column_names[key] = next(ea for ea in gdf_points.columns if rastname in ea)
+
+    if zone_raster == '':
+        # Add a zone col with a constant value
+        gdf_points['Zone'] = 1
+        column_names['Zone'] = 'Zone'
+
+    # rename columns from raster name to the dictionary key to be more generic
+    gdf_points.rename(columns={v: k for k, v in six.iteritems(column_names)}, inplace=True)
+
+    # remove trials where no points overlap the rasters
+    dfnulls = gdf_points.set_index('TrialID')['Value'].isnull().groupby('TrialID').all()
+    gdf_points = gdf_points[~gdf_points['TrialID'].isin(dfnulls[dfnulls].index.values.tolist())]
+
+    # create a unique id for each line/point
+    gdf_points.insert(1, 'TrialPtID', gdf_points.apply(lambda x: "'{}-{}'".format(x['TrialID'], x['PointID']),
+                                                       axis=1))
+
+    # Apply bearing to all transects
+    for _, gdf_group in gdf_points.groupby(['TrialID', transect_column]):
+        gdf_group = gdf_group.copy()
+        gdf_group['geom2'] = gdf_group['geometry'].shift()
+        gdf_group['label_angle'] = gdf_group.dropna(subset=['geom2'], axis=0).apply(
+            lambda p: text_rotation(p['geometry'], p['geom2']), axis=1)
+
+        # update the main dataframe - needs matching indexes
+        gdf_points.loc[gdf_points.index.isin(gdf_group.index), 'label_angle'] = gdf_group[['label_angle']]
+
+    offset_names = gdf_points['Strip_Name'].unique().tolist()
+    strip_name = offset_names.pop(offset_names.index('Strip'))
+
+    # pivot/transpose the table.
+    df_pivot = pd.DataFrame(gdf_points).pivot(index='TrialPtID', columns=transect_column,
+                                              values=list(column_names.keys()))
+
+    if control_raster != '':  # only keep offset strips
+        dropcols = [('Control', strip_name)] + [('Value', ea) for ea in offset_names]
+        df_pivot.drop(dropcols, axis=1, inplace=True)
+
+    # change the order before joining levels together
+    df_pivot.columns = df_pivot.columns.swaplevel(0, 1)
+    df_pivot.columns = df_pivot.columns.map(' '.join).str.strip()
+
+    # Prepare to join tables. Keep only minimum of columns and the first (Strip) of duplicate points
+    df_table = pd.DataFrame(gdf_points.drop(columns='geometry', inplace=False))
+    df_table.drop([ea for ea in df_table.columns if ea not in ['FID', 'TrialPtID', 'TrialID', 'PointID',
+                                                               'DistOnLine']], axis=1, inplace=True)
+    df_table.drop_duplicates(subset=['TrialPtID'], keep='first', inplace=True)
+
+    df_table = pd.merge(df_table, df_pivot, on='TrialPtID')
+
+    pivot_columns = df_pivot.columns
+    del df_pivot
+
+    markers = ['.', '^', '+', 'x', '*', 'o', ',', 'v', '<', '>', 's', 'd']
+    zone_column = 'Strip Zone'
+
+    for iline, (line_id, gdf_strip) in enumerate(gdf_points.groupby(by='TrialID'), start=1):
+        status = '{} of {}'.format(iline, line_count)
+        loop_time = time.time()
+        df_subtable = df_table[df_table['TrialID'] == line_id].copy()
+
+        offset_names = gdf_strip['Strip_Name'].unique().tolist()
+        offset_names.pop(offset_names.index('Strip'))
+
+        # determine which columns to use
+        keepcols = [col for col in pivot_columns if len(col.split(' ')) == 2]
+        keepcols += [col for x in offset_names for col in pivot_columns if col.startswith(x)]
+        dropcols = [ea for ea in pivot_columns if ea not in keepcols]
+
+        line_columns = defaultdict(list)
+        for ea in keepcols:
+            parts = ea.split(' ')
+            if len(parts) == 2 or parts[-1] == 'Zone':
+                line_columns[parts[-1]].append(ea)
+            else:
+                line_columns['Control'].append(ea)
+
+        df_subtable.drop(dropcols, axis=1, inplace=True)
+
+        # Convert zones to integer - there should be no NAN's
+        df_subtable[line_columns['Zone']] = df_subtable[line_columns['Zone']].astype(pd.Int64Dtype())
+
+        # run loop for the three scenarios. 1) both sides (N+S), 2) North, 3) South
+        for iscenario, scenario in enumerate([offset_names] + offset_names, start=1):
+            if not isinstance(scenario, list):
+                scenario = [scenario]
+
+            control_col = [col for x in scenario for col in line_columns['Control'] if col.startswith(x)]
+            valid_zone_col = [col for x in scenario + ['Strip'] for col in line_columns['Zone']
+                              if col.startswith(x)]
+
+            keep = control_col + valid_zone_col + line_columns['Value']
+            dropcols = [col for col in line_columns['Control'] + line_columns['Zone'] if col not in keep]
+
+            offset_subst = '-'.join([ea.split(' ')[0] for ea in control_col])
+            file_path_noext = os.path.join(out_folder, "Trial-{}_{}-strip".format(line_id, offset_subst))
+
+            df_statstable, control_mean = calculate_strip_stats(df_subtable.drop(columns=dropcols),
+                                                                line_columns['Value'][0],
+                                                                control_col, size=size)
+
+            df_statstable.drop(columns=df_statstable.columns.intersection(['FID', 'TrialPtID']), axis=1).to_csv(
+                file_path_noext + '.csv', index=False)
+
+            if config.get_debug_mode():
+                LOGGER.info('{:<30}\t{:>10}   {dur:<15} {}'.format(
+                    'Saved CSV', '', file_path_noext + '.csv', dur=str(timedelta(seconds=time.time() - loop_time))))
+
+            # add plotting parameters to table
+            df_statstable['zone_UID'] = df_statstable.groupby(zone_column).ngroup()
+            df_statstable["zone_marker"] = df_statstable['zone_UID'].apply(lambda x: markers[x])
+
+            # drop nan's introduced by the rolling window
+            df_statstable = df_statstable.dropna(subset=['av_treat_dif'], axis=0).copy()
+            df_statstable['sig_color'] = 'k'
+            df_statstable['sig_label'] = ' '
+
+            # Create the map only once for both lines
+            if iscenario == 1:
+                gdf_map = pd.merge(gdf_strip, df_statstable[['RI']], on='TrialPtID')
+                map_file = _save_trial_map(gdf_map, gdf_strip, line_id, transect_column, out_folder)
+
+                if config.get_debug_mode():
+                    LOGGER.info('{:<30}\t{:>10}   {dur:<15} {}'.format(
+                        'Map Saved', '', map_file, dur=str(timedelta(seconds=time.time() - loop_time))))
+
+            _save_strip_graphs(df_statstable, line_columns['Value'][0], control_mean, line_id, offset_subst,
+                               file_path_noext + '_graph.png')
+
+            if config.get_debug_mode():
+                LOGGER.info('{:<30}\t{:>10}   {dur:<15} {}'.format(
+                    'Saved graph', '', file_path_noext + '_graph.png',
+                    dur=str(timedelta(seconds=time.time() - loop_time))))
+
+        LOGGER.info('{:<30} {:>15} {dur}'.format('T-Test for Line {} Completed'.format(line_id), status,
+                                                 dur=str(timedelta(seconds=time.time() - loop_time))))
+
+    return df_table
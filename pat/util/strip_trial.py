@@ -0,0 +1,258 @@
+# coding=utf-8
+"""
+/***************************************************************************
+ CSIRO Precision Agriculture Tools (PAT) Plugin
+
+ strip_trial -  Create strip trial points along lines using array operations.
+           -------------------
+        begin      : 2026-10-19
+        git sha    : $Format:%H$
+        copyright  : (c) 2026, Commonwealth Scientific and Industrial Research Organisation (CSIRO)
+        email      : PAT@csiro.au
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the associated CSIRO Open Source Software       *
+ *   License Agreement (GPLv3) provided with this plugin.                  *
+ *                                                                         *
+ ***************************************************************************/
+"""
+import logging
+import math
+import os
+import time
+from datetime import timedelta
+
+import numpy as np
+import shapely
+from geopandas import GeoDataFrame
+from shapely.ops import linemerge
+
+from pyprecag import config, crs as pyprecag_crs, number_types
+from pyprecag.errors import GeometryError
+
+from pat import LOGGER_NAME, TEMPDIR
+from pat.util.vector_formats import save_vector
+
+LOGGER = logging.getLogger(LOGGER_NAME)
+LOGGER.addHandler(logging.NullHandler())  # logging.StreamHandler()
+
+COMPASS_8 = np.array(["N", "NE", "E", "SE", "S", "SW", "W", "NW"])
+
+
+class LineMeasures(object):
+    """ The cumulative length and first moment of length along each line in an array of LineStrings.
+
+    These are calculated once and used to interpolate points and the centroids of line sections
+    for many distances along the lines at once.
+    """
+
+    def __init__(self, lines):
+        self.coords, index = shapely.get_coordinates(lines, return_index=True)
+        n_lines = len(lines)
+
+        self.first = np.searchsorted(index, np.arange(n_lines), side='left')
+        self.last = np.searchsorted(index, np.arange(n_lines), side='right') - 1
+
+        # segment lengths, excluding the jump from the end of one line to the start of the next.
+        seg_len = np.hypot(*np.diff(self.coords, axis=0).T)
+        seg_len[index[1:] != index[:-1]] = 0
+        mid = (self.coords[1:] + self.coords[:-1]) / 2
+
+        self.cum_len = np.concatenate([[0], np.cumsum(seg_len)])
+        self.moment = np.concatenate([[[0, 0]], np.cumsum(seg_len[:, None] * mid, axis=0)])
+        self.length = self.cum_len[self.last] - self.cum_len[self.first]
+
+    def bearing(self):
+        """ The bearing from north between the end and start of each line. Matches pyprecag.convert.line_bearing"""
+        start, end = self.coords[self.first], self.coords[self.last]
+        return 180 + np.arctan2(start[:, 0] - end[:, 0], start[:, 1] - end[:, 1]) * (180 / math.pi)
+
+    def locate(self, line_ids, distance):
+        """ Find the point at a distance along a line and the moment of the line up to that point.
+
+        Args:
+            line_ids (numpy.ndarray): the line for each distance
+            distance (numpy.ndarray): the distance along the line
+
+        Returns:
+            numpy.ndarray, numpy.ndarray: the x,y of each point and its moment
+        """
+        first, last = self.first[line_ids], self.last[line_ids]
+        distance = self.cum_len[first] + np.clip(distance, 0, self.length[line_ids])
+
+        seg = np.clip(np.searchsorted(self.cum_len, distance, side='left') - 1, first, np.maximum(last - 1, first))
+        along = distance - self.cum_len[seg]
+        seg_len = self.cum_len[np.minimum(seg + 1, last)] - self.cum_len[seg]
+        frac = np.divide(along, seg_len, out=np.zeros_like(along), where=seg_len > 0)
+
+        start = self.coords[seg]
+        end = self.coords[np.minimum(seg + 1, last)]
+        points = start + frac[:, None] * (end - start)
+        moment = self.moment[seg] + along[:, None] * (start + points) / 2
+        return points, moment
+
+    def centroids(self, line_ids, start, end):
+        """ The centroid of the section of each line between two distances.
+
+        This is the same as the centroid of shapely.ops.substring(line, start, end).
+        """
+        low, high = np.minimum(start, end), np.maximum(start, end)
+        low_pt, low_moment = self.locate(line_ids, low)
+        _, high_moment = self.locate(line_ids, high)
+
+        length = (np.clip(high, 0, self.length[line_ids]) - np.clip(low, 0, self.length[line_ids]))[:, None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(length > 0, (high_moment - low_moment) / length, low_pt)
+
+
+def compass_point_names(bearings):
+    """ Convert bearings to 8 point compass strip names. Matches pyprecag.convert.deg_to_8_compass_pts """
+    bearings = np.where(bearings < 0, bearings + 360, bearings)
+    return np.char.add(COMPASS_8[np.floor(bearings / 45.0 + .5).astype(int) % 8], ' Strip')
+
+
+def create_points_along_line(lines_geodataframe, lines_crs, distance_between_points,
+                             offset_distance, out_epsg=0, out_points_shapefile=None,
+                             out_lines_shapefile=None):
+    """Add points along a line using a specified distance and create left/right parallel points
+    offset by a distance.
+
+    This gives the same result as pyprecag.processing.create_points_along_line. The segment
+    distances for every line are generated at once and the point for each segment is found from the
+    cumulative length and moment of the lines, rather than building a substring for every point.
+    The outputs are then saved in a single write each.
+
+    All touching lines will be treated as one and multipart geometry will be converted to single part
+    geometry. The first and last points will be offset from start/end of the line evenly. Attributes
+    from the input lines will be lost.
+
+    Args:
+        lines_geodataframe (geopandas.geodataframe.GeoDataFrame): A Geopandas dataframe containing Lines
+        lines_crs (pyprecag.crs.crs): The detailed coordinate system
+        distance_between_points (int): The separation distance between points.
+        offset_distance (int): The distance between the Strip point and parallel point.
+        out_epsg (int): Optionally specify the epsg number for the output coordinate system.
+                        This should be a project coordinate system
+        out_points_shapefile (str): Optionally specify the file used to save the points to.
+                        The format is set by the extension, eg .gpkg or .shp
+        out_lines_shapefile (str): Optionally specify the file used to save the lines to.
+
+    Returns:
+         geopandas.geodataframe.GeoDataFrame: The geodataframe containing the created points.
+         pyprecag.crs.crs: The coordinate system of both the points and lines geodataframe.
+         geopandas.geodataframe.GeoDataFrame: The geodataframe containing the created lines.
+    """
+
+    if not isinstance(lines_geodataframe, GeoDataFrame):
+        raise TypeError('Invalid input data : inputGeodataFrame')
+
+    if not any("LINE" in g.upper() for g in lines_geodataframe.geom_type.unique()):
+        raise GeometryError('Invalid input data : A lines geopandas dataframe is required')
+
+    for argCheck in [('offset_distance', offset_distance),
+                     ('distance_between_points', distance_between_points)]:
+        if not isinstance(argCheck[1], number_types):
+            raise TypeError('{} must be a floating number.'.format(argCheck[0]))
+
+    if not isinstance(lines_crs, pyprecag_crs.crs):
+        raise TypeError('Crs must be an instance of pyprecag.crs.crs')
+
+    if not isinstance(out_epsg, int):
+        raise TypeError('out_epsg must be a integer - Got {}'.format(out_epsg))
+
+    for out_file in [out_points_shapefile, out_lines_shapefile]:
+        if out_file is not None and os.path.isabs(out_file) and not os.path.exists(os.path.dirname(out_file)):
+            raise IOError('Output directory {} does not exist'.format(os.path.dirname(out_file)))
+
+    if out_points_shapefile is not None and out_points_shapefile == out_lines_shapefile:
+        raise IOError('Output points and lines shapefile names are identical')
+
+    start_time = time.time()
+
+    # input needs to be a projected coordinate system to work with metric distances
+    points_crs = lines_crs
+    if lines_geodataframe.crs.is_geographic:
+        if out_epsg > 0:
+            points_crs = pyprecag_crs.crs()
+            points_crs.getFromEPSG(out_epsg)
+        else:
+            xmin, ymin, _, _ = lines_geodataframe.total_bounds
+            points_crs = pyprecag_crs.getProjectedCRSForXY(xmin, ymin, lines_crs.epsg_number)
+
+    if lines_crs.epsg_number != points_crs.epsg_number:
+        lines_geodataframe = lines_geodataframe.to_crs(epsg=points_crs.epsg_number)
+
+    # merge touching lines into single parts
+    lines = shapely.get_parts(shapely.force_2d(linemerge(lines_geodataframe.geometry.tolist())))
+    lines = lines[~shapely.is_empty(lines)]
+    out_crs = lines_geodataframe.crs
+
+    sides = [('s', lines)]
+    for side, dist in [('r', -offset_distance), ('l', offset_distance)]:
+        offset_lines = shapely.offset_curve(lines, dist, quad_segs=16, join_style='mitre')
+        if np.any(shapely.get_type_id(offset_lines) != shapely.GeometryType.LINESTRING):
+            raise GeometryError('Offsetting the lines by {} created multipart lines. Simplify the '
+                                'lines or reduce the offset distance and try again.'.format(offset_distance))
+        sides.append((side, offset_lines))
+
+    measures = [LineMeasures(ea_lines) for _, ea_lines in sides]
+    names = [np.full(len(lines), 'Strip', dtype=object)]
+    names.append(compass_point_names(measures[1].bearing() + 90).astype(object))
+    names.append(compass_point_names(measures[2].bearing() - 90).astype(object))
+
+    # the start distance of each segment along the strip line, centred on the line
+    strip = measures[0]
+    start_offset = np.mod(strip.length, distance_between_points) / 2
+    n_segments = np.maximum(np.ceil((strip.length - start_offset) / distance_between_points).astype(np.int64) - 1, 0)
+
+    line_ids = np.repeat(np.arange(len(lines)), n_segments)
+    point_ids = np.arange(n_segments.sum()) - np.repeat(np.cumsum(n_segments) - n_segments, n_segments)
+    seg_start = start_offset[line_ids] + point_ids * distance_between_points
+    seg_end = start_offset[line_ids] + (point_ids + 1) * distance_between_points
+
+    strip_start, _ = strip.locate(line_ids, seg_start)
+    strip_end, _ = strip.locate(line_ids, seg_end)
+
+    centroids = []
+    for (side, side_lines), side_measures in zip(sides, measures):
+        if side == 's':
+            centroids.append(strip.centroids(line_ids, seg_start, seg_end))
+        else:
+            # match each strip segment to the same section of the offset line
+            start = shapely.line_locate_point(side_lines[line_ids], shapely.points(strip_start))
+            end = shapely.line_locate_point(side_lines[line_ids], shapely.points(strip_end))
+            centroids.append(side_measures.centroids(line_ids, start, end))
+
+    LOGGER.info('{:<30} {:>10}   {:<15} {dur}'.format('Create strip points', len(line_ids) * 3, 'points',
+                                                      dur=str(timedelta(seconds=time.time() - start_time))))
+
+    n_sides = len(sides)
+    points_gdf = GeoDataFrame({'TrialID': np.tile(line_ids, n_sides),
+                               'PointID': np.tile(point_ids, n_sides),
+                               'DistOnLine': np.tile(seg_end - start_offset[line_ids], n_sides),
+                               'Strip_Name': np.concatenate([ea[line_ids] for ea in names])},
+                              geometry=shapely.points(np.concatenate(centroids)), crs=out_crs)
+
+    lines_gdf = GeoDataFrame({'TrialID': np.tile(np.arange(len(lines)), n_sides)},
+                             geometry=np.concatenate([ea_lines for _, ea_lines in sides]), crs=out_crs)
+    lines_gdf['Strip_Name'] = np.concatenate(names)
+
+    if config.get_debug_mode():
+        if out_lines_shapefile is None:
+            out_lines_shapefile = os.path.join(TEMPDIR, 'strip_treatment_lines.gpkg')
+        if out_points_shapefile is None:
+            out_points_shapefile = os.path.join(TEMPDIR, 'strip_treatment_points.gpkg')
+
+    if out_lines_shapefile is not None:
+        save_vector(lines_gdf, out_lines_shapefile)
+
+    if out_points_shapefile is not None:
+        save_vector(points_gdf, out_points_shapefile)
+
+    LOGGER.info('{:<30} {:>10}   {:<15} {dur}'.format('Create Points Along Line Completed', '', '',
+                                                      dur=str(timedelta(seconds=time.time() - start_time))))
+
+    return points_gdf, points_crs, lines_gdf
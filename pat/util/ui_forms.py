@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ CSIRO Precision Agriculture Tools (PAT) Plugin
+
+ ui_forms -  Load the Qt Designer forms used by the PAT dialogs from pre-compiled python
+             modules, falling back to compiling the .ui file at runtime.
+
+             To pre-compile the forms from an OSGeo4W shell run:
+                 python -m pat.util.ui_forms
+           -------------------
+        begin      : 2026-10-19
+        git sha    : $Format:%H$
+        copyright  : (c) 2026, Commonwealth Scientific and Industrial Research Organisation (CSIRO)
+        email      : PAT@csiro.au
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the associated CSIRO Open Source Software       *
+ *   License Agreement (GPLv3) provided with this plugin.                  *
+ *                                                                         *
+ ***************************************************************************/
+"""
+from __future__ import print_function
+
+import glob
+import hashlib
+import importlib.util
+import io
+import logging
+import os
+import xml.etree.ElementTree as ET
+
+from qgis.PyQt import uic, QtWidgets
+
+from pat import LOGGER_NAME
+
+LOGGER = logging.getLogger(LOGGER_NAME)
+LOGGER.addHandler(logging.NullHandler())  # logging.StreamHandler()
+
+# the sub folder of gui containing the pre-compiled forms.
+FORMS_FOLDER = 'forms'
+
+
+def get_ui_hash(ui_file):
+    """Get a hash of the .ui file contents used to determine if a compiled form is stale."""
+    with open(ui_file, 'rb') as f:
+        return hashlib.md5(f.read()).hexdigest()
+
+
+def get_form_file(ui_file):
+    """Get the path to the pre-compiled python module for a .ui file."""
+    module_name = os.path.splitext(os.path.basename(ui_file))[0]
+    return os.path.join(os.path.dirname(ui_file), FORMS_FOLDER, module_name + '.py')
+
+
+def load_ui_form(ui_file):
+    """ Load the form and base classes for a Qt Designer .ui file.
+
+    The pre-compiled form module is used if it exists and was compiled from the current version
+    of the .ui file, otherwise the .ui file is compiled at runtime using uic.loadUiType.
+
+    Args:
+        ui_file (str): The path to the .ui file
+
+    Returns:
+        tuple: The form class and the Qt base class ie (FORM_CLASS, QDialog)
+    """
+
+    form_file = get_form_file(ui_file)
+
+    if os.path.exists(form_file):
+        try:
+            spec = importlib.util.spec_from_file_location(
+                'pat_form_{}'.format(os.path.splitext(os.path.basename(form_file))[0]), form_file)
+            form_module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(form_module)
+
+            if getattr(form_module, 'UI_HASH', None) == get_ui_hash(ui_file):
+                return (getattr(form_module, form_module.FORM_CLASS),
+                        getattr(QtWidgets, form_module.BASE_CLASS))
+
+            LOGGER.debug('Compiled form {} is out of date. Loading from {}'.format(
+                os.path.basename(form_file), os.path.basename(ui_file)))
+
+        except Exception as err:
+            LOGGER.debug('Could not load compiled form {}: {}'.format(os.path.basename(form_file), err))
+
+    return uic.loadUiType(ui_file)
+
+
+def compile_ui_form(ui_file):
+    """ Compile a Qt Designer .ui file to a python module in the forms folder.
+
+    The module also records the hash of the .ui file and the form and base class names so
+    load_ui_form can check it is current and return the same classes as uic.loadUiType.
+
+    Args:
+        ui_file (str): The path to the .ui file
+
+    Returns:
+        str: The path to the compiled python module.
+    """
+
+    form_file = get_form_file(ui_file)
+
+    if not os.path.exists(os.path.dirname(form_file)):
+        os.mkdir(os.path.dirname(form_file))
+
+    top_widget = ET.parse(ui_file).getroot().find('widget')
+
+    code = io.StringIO()
+    # resources.qrc is compiled to pat/resources.py so import it from the plugin package.
+    uic.compileUi(ui_file, code, from_imports=True, resource_suffix='', import_from='pat')
+
+    with open(form_file, 'w') as f:
+        f.write(code.getvalue())
+        f.write('\n\nUI_HASH = {!r}\n'.format(get_ui_hash(ui_file)))
+        f.write('FORM_CLASS = {!r}\n'.format('Ui_' + top_widget.get('name')))
+        f.write('BASE_CLASS = {!r}\n'.format(top_widget.get('class')))
+
+    return form_file
+
+
+def compile_ui_forms(gui_folder=None):
+    """ Compile all .ui files in the gui folder.
+
+    Args:
+        gui_folder (str): The folder containing the .ui files. Defaults to the PAT gui folder.
+    """
+    if gui_folder is None:
+        gui_folder = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'gui')
+
+    for ui_file in sorted(glob.glob(os.path.join(gui_folder, '*.ui'))):
+        form_file = compile_ui_form(ui_file)
+        print('Compiled {} to {}'.format(os.path.basename(ui_file), os.path.relpath(form_file, gui_folder)))
+
+
+if __name__ == '__main__':
+    compile_ui_forms()
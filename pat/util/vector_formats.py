@@ -0,0 +1,129 @@
+# coding=utf-8
+"""
+/***************************************************************************
+ CSIRO Precision Agriculture Tools (PAT) Plugin
+
+ vector_formats -  Read and write vector files as GeoPackage, GeoParquet or ESRI Shapefile.
+           -------------------
+        begin      : 2026-10-19
+        git sha    : $Format:%H$
+        copyright  : (c) 2026, Commonwealth Scientific and Industrial Research Organisation (CSIRO)
+        email      : PAT@csiro.au
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the associated CSIRO Open Source Software       *
+ *   License Agreement (GPLv3) provided with this plugin.                  *
+ *                                                                         *
+ ***************************************************************************/
+"""
+import logging
+import os
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from pyprecag.describe import save_geopandas_tofile
+
+from pat import LOGGER_NAME
+
+LOGGER = logging.getLogger(LOGGER_NAME)
+LOGGER.addHandler(logging.NullHandler())  # logging.StreamHandler()
+
+try:
+    import pyarrow
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# The OGR driver name, display name and extension of each supported format.
+VECTOR_FORMATS = OrderedDict([
+    ('GPKG', ('GeoPackage', '.gpkg')),
+    ('Parquet', ('GeoParquet', '.parquet')),
+    ('ESRI Shapefile', ('ESRI Shapefile', '.shp')),
+])
+
+# GeoPackage has no field name or 2 GB limits and includes a spatial index.
+DEFAULT_VECTOR_FORMAT = 'GPKG'
+
+
+def get_available_formats():
+    """ Get the formats which can be written. GeoParquet requires pyarrow."""
+    return [ea for ea in VECTOR_FORMATS if ea != 'Parquet' or HAS_PYARROW]
+
+
+def get_vector_driver(filename):
+    """ Get the OGR driver name for a vector file using its extension.
+
+    Args:
+        filename (str): the vector file
+
+    Returns:
+        str: the driver name
+    """
+    ext = os.path.splitext(filename)[-1].lower()
+    for driver, (_, fmt_ext) in VECTOR_FORMATS.items():
+        if ext == fmt_ext:
+            return driver
+    raise ValueError('{} is not a supported vector format. Use one of {}'.format(
+        ext, ', '.join(ea[1] for ea in VECTOR_FORMATS.values())))
+
+
+def change_vector_format(filename, driver=DEFAULT_VECTOR_FORMAT):
+    """ Replace the extension of a file with the extension of a vector format."""
+    return os.path.splitext(filename)[0] + VECTOR_FORMATS[driver][1]
+
+
+def vector_file_filter(formats=None):
+    """ Create a file dialog filter for vector formats. The first format is the default.
+
+    Args:
+        formats (List[str]): the drivers to include. Defaults to all available formats.
+
+    Returns:
+        str: the filter. eg 'GeoPackage (*.gpkg);;ESRI Shapefile (*.shp);;'
+    """
+    if formats is None:
+        formats = get_available_formats()
+    return ''.join('{} (*{});;'.format(*VECTOR_FORMATS[ea]) for ea in formats)
+
+
+def save_vector(gdf, filename, overwrite=True):
+    """ Save a geodataframe using the format matching the file extension.
+
+    Shapefiles are saved with pyprecag so the field names are made ESRI compatible. GeoPackages are
+    written with a spatial index. An empty geodataframe raises an error rather than silently not
+    writing the file, so callers expecting no features must check before saving.
+
+    Args:
+        gdf (geopandas.geodataframe.GeoDataFrame): the data to save
+        filename (str): the output file
+        overwrite (bool): replace an existing file
+    """
+    driver = get_vector_driver(filename)
+    if gdf.empty:
+        raise ValueError('Nothing to save to {}. The geodataframe is empty'.format(os.path.basename(filename)))
+
+    if driver == 'ESRI Shapefile':
+        save_geopandas_tofile(gdf, filename, overwrite=overwrite)
+        return
+
+    if os.path.exists(filename):
+        if not overwrite:
+            raise IOError('Output file ({}) already exists.'.format(filename))
+        os.remove(filename)
+
+    step_time = time.time()
+    if driver == 'Parquet':
+        if not HAS_PYARROW:
+            raise ImportError('GeoParquet requires the pyarrow package. Save as a GeoPackage instead.')
+        gdf.to_parquet(filename, index=False)
+    else:
+        gdf.to_file(filename, driver=driver, layer=os.path.splitext(os.path.basename(filename))[0],
+                    SPATIAL_INDEX='YES')
+
+    LOGGER.info('{:<30} {:>10}   {:<15} {dur}'.format('Save to {}'.format(VECTOR_FORMATS[driver][0]), len(gdf),
+                                                      os.path.basename(filename),
+                                                      dur=str(timedelta(seconds=time.time() - step_time))))
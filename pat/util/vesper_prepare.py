@@ -0,0 +1,490 @@
+# coding=utf-8
+"""
+/***************************************************************************
+ CSIRO Precision Agriculture Tools (PAT) Plugin
+
+ vesper_prepare -  Write VESPER data and control files using vectorised formatting.
+           -------------------
+        begin      : 2026-10-19
+        git sha    : $Format:%H$
+        copyright  : (c) 2026, Commonwealth Scientific and Industrial Research Organisation (CSIRO)
+        email      : PAT@csiro.au
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the associated CSIRO Open Source Software       *
+ *   License Agreement (GPLv3) provided with this plugin.                  *
+ *                                                                         *
+ ***************************************************************************/
+"""
+import glob
+import logging
+import os
+import re
+import shutil
+import time
+import warnings
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import six
+
+from pyprecag.describe import predictCoordinateColumnNames
+from pyprecag.kriging_ops import VesperControl, vesper_exe
+
+from pat import LOGGER_NAME
+
+LOGGER = logging.getLogger(LOGGER_NAME)
+LOGGER.addHandler(logging.NullHandler())  # logging.StreamHandler()
+
+# The columns which may hold the EPSG number of the coordinates. These are kept in the data file.
+EPSG_COLUMNS = ['EN_EPSG', 'ENEPSG', 'EPSG']
+
+# The number of rows formatted and written at a time.
+CHUNK_ROWS = 200000
+
+# The most decimal places written for a float column.
+MAX_DECIMALS = 10
+
+# The number of values of a column formatted as text to check the column format. See get_column_format
+FORMAT_SAMPLE_SIZE = 10000
+
+# The pixel size in the name of the tif files created by vesper_text_to_raster. eg PRED_2m or SE_50cm
+PIXEL_SIZE_PATTERN = r'\d+(?:km|m|cm|mm)'
+
+BAT_FILE_STRING = ("@echo off\n"
+                   "setlocal enabledelayedexpansion\n"
+                   "echo Processing control files in %CD%\n"
+                   "echo.\n"
+                   "set icount=0\n"
+                   "set tcount=0\n"
+                   "\nREM count the number of control files\n"
+                   "for %%x in (*control*.txt) do set /a tcount+=1'\n"
+                   "echo Found %tcount% control file_csv(s) to process....\n"
+                   "echo.\n"
+                   "FOR %%f IN (*control*) DO (\n"
+                   "   set /a icount+=%icount%+1\n"
+                   "    <nul set /p mystr=Kriging !icount! of %tcount% - %%~nxf \n"
+                   '   start "" /HIGH /WAIT /SHARED \"{exe}\" %%~nxf\n'
+                   "   echo - Finished \n"
+                   ")\n")
+
+
+def get_vesper_file_names(control_textfile, grid_filename, krig_column):
+    """ Get the names of the VESPER files for a control file. Matches pyprecag.kriging_ops.prepare_for_vesper_krige
+
+    Args:
+        control_textfile (str): The name of the control text file without the path. If blank it is derived
+                    from the grid file and krig column.
+        grid_filename (str): The vesper grid file.
+        krig_column (str): The column containing the data to krige.
+
+    Returns:
+        dict: the control, data, grid, report, kriged and param file names without a path
+    """
+    # Create a filename compatible copy of the krig_column
+    krig_col_file = re.sub('[^A-Za-z0-9_-]+', '', six.ensure_str(krig_column, encoding='ascii', errors='ignore'))
+    out_sub_name = os.path.basename(grid_filename)[:20]
+
+    if control_textfile.strip() == '':
+        control_textfile = "{}_control_{}.txt".format(out_sub_name, krig_col_file)
+
+    stem = os.path.splitext(control_textfile)[0]
+    if 'control' in control_textfile:
+        names = {key: stem.replace('control', key) + ext for key, ext in
+                 [('vesperdata', '.csv'), ('vespergrid', '.txt'), ('report', '.txt'), ('kriged', '.txt'),
+                  ('parameter', '.txt')]}
+    else:
+        names = {key: '{}_{}{}'.format(stem, key, ext) for key, ext in
+                 [('vesperdata', '.csv'), ('vespergrid', '.txt'), ('report', '.txt'), ('kriged', '.txt'),
+                  ('parameter', '.txt')]}
+
+    return {'control': control_textfile, 'data': names['vesperdata'], 'grid': names['vespergrid'],
+            'report': names['report'], 'kriged': names['kriged'], 'param': names['parameter']}
+
+
+def _is_rounded(values, decimals):
+    """ Check every value is within a unit in the last place of the value rounded to a number of decimals."""
+    return np.all(np.abs(values - np.round(values, decimals)) <= np.spacing(np.abs(values)))
+
+
+def get_column_format(values):
+    """ Get the printf format for a numeric column.
+
+    Integer columns are written without decimals. Float columns use the fewest decimal places which
+    hold every value, up to MAX_DECIMALS, so coordinates are written as they were read, otherwise
+    '%.17g' is used.
+
+    Formatting values as text is slow, so the decimals are chosen using a sample of FORMAT_SAMPLE_SIZE
+    values spread through the column plus the largest value, which must read back exactly from the
+    formatted text. Every value is then checked to be rounded to the chosen decimals, which is a
+    single vectorised pass over the column. A value outside the sample may read back at most a unit in
+    the last place from the original.
+
+    Args:
+        values (numpy.ndarray): the column values
+
+    Returns:
+        str: the format. eg '%d' or '%.3f'
+    """
+    if np.issubdtype(values.dtype, np.integer) or np.issubdtype(values.dtype, np.bool_):
+        return '%d'
+
+    values = values[np.isfinite(values)].astype(np.float64)
+
+    sample = values[::max(1, len(values) // FORMAT_SAMPLE_SIZE)]
+    if len(values) > 0:
+        sample = np.append(sample, values[np.argmax(np.abs(values))])
+
+    for decimals in range(MAX_DECIMALS + 1):
+        fmt = '%.{}f'.format(decimals)
+        if _is_rounded(sample, decimals) and \
+                np.array_equal(np.char.mod(fmt, sample).astype(np.float64), sample) and \
+                _is_rounded(values, decimals):
+            return fmt
+
+    return '%.17g'
+
+
+def write_vesper_data_file(in_dataframe, columns, out_file, chunk_rows=CHUNK_ROWS):
+    """ Write columns of a dataframe to a comma delimited VESPER data file.
+
+    The columns are converted to a single float64 array and the printf format of each column is worked
+    out once, then the rows are written in chunks with numpy.savetxt. Rows with a missing value are
+    not written as VESPER can't read them.
+
+    Args:
+        in_dataframe (pandas.core.frame.DataFrame): the data
+        columns (List[str]): the numeric columns to write in order
+        out_file (str): the data file
+        chunk_rows (int): the number of rows written at a time
+
+    Returns:
+        int: the number of rows written
+    """
+    step_time = time.time()
+
+    # the same rows as count_vesper_data_rows
+    values = in_dataframe[columns].to_numpy(dtype=np.float64)
+    fmt = ','.join(get_column_format(in_dataframe[ea].to_numpy()) for ea in columns)
+
+    valid = ~np.isnan(values).any(axis=1)
+    if not valid.all():
+        LOGGER.warning('{:,} rows with missing values were not written to {}'.format(
+            int((~valid).sum()), os.path.basename(out_file)))
+        values = values[valid]
+
+    with open(out_file, 'w') as f:
+        f.write(','.join(columns) + '\n')
+        for start in range(0, len(values), chunk_rows):
+            np.savetxt(f, values[start:start + chunk_rows], fmt=fmt)
+
+    LOGGER.info('{:<30} {:>10,}   {:<15} {dur}'.format('Write VESPER data file', len(values),
+                                                      os.path.basename(out_file),
+                                                      dur=str(timedelta(seconds=time.time() - step_time))))
+    return len(values)
+
+
+def get_vesper_variant_file_names(file_names, control_textfile):
+    """ Get the names of the VESPER files for another control file which reuses an existing data and grid file.
+
+    Args:
+        file_names (dict): the file names of the control file which created the data and grid files.
+                    See get_vesper_file_names
+        control_textfile (str): The name of the new control text file without the path.
+
+    Returns:
+        dict: the control, data, grid, report, kriged and param file names without a path
+    """
+    if control_textfile.strip() == '':
+        raise ValueError('Please specify a control file name for the variant')
+
+    if os.path.normcase(control_textfile) == os.path.normcase(file_names['control']):
+        raise ValueError('The variant control file {} would replace the original'.format(control_textfile))
+
+    variant_names = get_vesper_file_names(control_textfile, file_names['grid'], '')
+    variant_names.update(data=file_names['data'], grid=file_names['grid'])
+    return variant_names
+
+
+def get_vesper_output_files(vesper_outdir, file_names):
+    """ Find the existing outputs of a control file. These are the report, kriged and parameter files written
+    by VESPER and the CI text file and PRED and SE tif files created from them by vesper_text_to_raster.
+
+    Only these exact names are matched so the files of other control files in the folder are never included.
+
+    Args:
+        vesper_outdir (str): the folder holding the control file
+        file_names (dict): the file names. See get_vesper_file_names
+
+    Returns:
+        List[str]: the paths of the output files which exist
+    """
+    outputs = {file_names['report'], file_names['kriged'], file_names['param']}
+
+    # vesper_text_to_raster replaces 'control' in the control file name to name its outputs. The tif names
+    # also have every '.txt' replaced, including one from the grid file name.
+    tif_pattern = None
+    if 'control' in os.path.splitext(file_names['control'])[0]:
+        outputs.add(file_names['control'].replace('control', 'CI'))
+        tif_stem = os.path.splitext(file_names['control'].replace('.txt', '.tif'))[0]
+        tif_pattern = re.compile(re.escape(tif_stem).replace('control', '(?:PRED|SE)_' + PIXEL_SIZE_PATTERN) +
+                                 r'\.(?:tif|tfw|tif\.aux\.xml)')
+
+    outputs.difference_update([file_names['control'], file_names['data'], file_names['grid']])
+    return sorted(os.path.join(vesper_outdir, ea) for ea in os.listdir(vesper_outdir)
+                  if ea in outputs or (tif_pattern is not None and tif_pattern.fullmatch(ea)))
+
+
+def get_vesper_data_columns(in_dataframe, coord_columns, krig_column):
+    """ Get the columns written to the VESPER data file in order.
+
+    These are any EPSG columns followed by the coordinate columns and the krig column.
+
+    Returns:
+        List[str]: the column names
+    """
+    data_columns = [col for col in EPSG_COLUMNS if col in in_dataframe.columns]
+    return data_columns + list(coord_columns) + [krig_column]
+
+
+def count_vesper_data_rows(in_dataframe, columns):
+    """ Count the rows written to a VESPER data file. ie rows with a value in every column.
+
+    Use this for the VESPER maxpts so it matches the data file. See write_vesper_data_file
+
+    Returns:
+        int: the number of rows
+    """
+    return int(in_dataframe[columns].notna().all(axis=1).sum())
+
+
+def write_vesper_control_file(vesper_outdir, file_names, data_columns, coord_columns, krig_column, epsg=0,
+                              display_graphics=False, control_options=None):
+    """ Write a VESPER control file for a data file and grid file which already exist.
+
+    This can be called many times with different control options and control file names to krige
+    the same data file, without writing the data file again. See add_vesper_control_variant. Existing
+    outputs of the control file are removed so the files in the folder belong to the new control file.
+
+    Args:
+        vesper_outdir (str): the folder holding the data and grid files
+        file_names (dict): the file names. See get_vesper_file_names. data and grid may name files created
+                    for another control file.
+        data_columns (List[str]): the columns in the data file in order
+        coord_columns (List[str]): The columns representing the X and Y coordinates.
+        krig_column (str): The column containing the data to krige.
+        epsg (int): The epsg number for the data.
+        display_graphics (bool): Option to display graphics while running vesper kriging.
+        control_options (pyprecag.kriging_ops.VesperControl): Vesper control settings parameters
+
+    Returns:
+        str: the path of the control file
+    """
+    if control_options is None:
+        control_options = VesperControl()
+
+    for key in ['data', 'grid']:
+        ea_file = os.path.join(vesper_outdir, file_names[key])
+        if not os.path.exists(ea_file):
+            raise IOError('VESPER file {} does not exist. Use prepare_for_vesper_krige to create it'.format(ea_file))
+
+    vesper_ctrlfile = os.path.join(vesper_outdir, file_names['control'])
+
+    # remove the outputs of a previous run of this control file.
+    for ea_file in get_vesper_output_files(vesper_outdir, file_names):
+        os.remove(ea_file)
+        LOGGER.debug('Deleted file {}'.format(ea_file))
+
+    control_options.update(epsg=int(epsg),
+                           title="kriging of {} configured by pyprecag".format(file_names['control']),
+                           datfil=file_names['data'],
+                           gridfile=file_names['grid'],
+                           outdir="",  # blank writes to control file_csv folder
+                           repfil=file_names['report'],
+                           outfil=file_names['kriged'],
+                           parfil=file_names['param'],
+                           numcol=len(data_columns),
+                           icol_x=data_columns.index(coord_columns[0]) + 1,
+                           icol_y=data_columns.index(coord_columns[1]) + 1,
+                           icol_z=data_columns.index(krig_column) + 1,
+                           jigraph=int(display_graphics),  # 1, show graph, otherwise 0
+                           jimap=int(display_graphics),  # 1, show map, otherwise 0
+                           )
+
+    control_options.write_to_file(vesper_ctrlfile)
+    return vesper_ctrlfile
+
+
+def add_vesper_control_variant(vesper_ctrlfile, control_textfile, epsg=0, display_graphics=False,
+                               control_options=None):
+    """ Add a control file which kriges the data file of an existing control file with other settings.
+
+    The data and grid files written by prepare_for_vesper_krige for vesper_ctrlfile are reused, so only
+    the new control file is written. The data file columns are read from its header. The krig column
+    is the last column and the coordinates are the two columns before it.
+
+    Args:
+        vesper_ctrlfile (str): the control file created by prepare_for_vesper_krige
+        control_textfile (str): The name of the new control text file without the path. Include 'control' in
+                    the name so it is run by Do_Vesper.bat
+        epsg (int): The epsg number for the data. If 0 the EPSG column of the data file is used if it exists.
+        display_graphics (bool): Option to display graphics while running vesper kriging.
+        control_options (pyprecag.kriging_ops.VesperControl): Vesper control settings parameters
+
+    Returns:
+        str: the path of the new control file
+    """
+    vesper_outdir = os.path.dirname(vesper_ctrlfile)
+    file_names = get_vesper_variant_file_names(get_vesper_file_names(os.path.basename(vesper_ctrlfile), '', ''),
+                                               control_textfile)
+
+    data_file = os.path.join(vesper_outdir, file_names['data'])
+    if not os.path.exists(data_file):
+        raise IOError('VESPER file {} does not exist. Use prepare_for_vesper_krige to create it'.format(data_file))
+
+    df_head = pd.read_csv(data_file, nrows=1)
+    data_columns = df_head.columns.tolist()
+    if len(data_columns) < 3:
+        raise ValueError('VESPER data file {} should have coordinate and krig columns'.format(file_names['data']))
+
+    if epsg == 0:
+        for col in [ea for ea in data_columns if ea in EPSG_COLUMNS]:
+            if len(df_head) > 0 and df_head.iloc[0][col] > 0:
+                epsg = int(df_head.iloc[0][col])
+                break
+
+    vesper_ctrlfile = write_vesper_control_file(vesper_outdir, file_names, data_columns, data_columns[-3:-1],
+                                                data_columns[-1], epsg, display_graphics, control_options)
+
+    LOGGER.info('{:<30} {:>10}   {:<15}'.format('Add VESPER control variant', '', file_names['control']))
+    return vesper_ctrlfile
+
+
+def write_vesper_batch_file(vesper_outdir, vesper_exe=vesper_exe):
+    """ Write the Do_Vesper.bat file which runs VESPER for every control file in a folder.
+
+    Returns:
+        str: the path of the batch file or '' if the VESPER executable does not exist.
+    """
+    if not os.path.exists(vesper_exe):
+        warnings.warn('Vesper*.exe at "{exe}" does not exist. Batch file not created'.format(exe=vesper_exe))
+        return ''
+
+    vesper_batfile = os.path.join(vesper_outdir, "Do_Vesper.bat")
+    with open(vesper_batfile, 'w') as f:
+        f.write(BAT_FILE_STRING.format(exe=vesper_exe))
+    return vesper_batfile
+
+
+def prepare_for_vesper_krige(in_dataframe, krig_column, grid_filename, out_folder,
+                             control_textfile='', coord_columns=[], epsg=0, display_graphics=False,
+                             control_options=None, vesper_exe=vesper_exe):
+    """Prepare data for vesper kriging and create a windows batch file to run outside the
+    python/pyprecag environment.
+
+    This creates the same files as pyprecag.kriging_ops.prepare_for_vesper_krige but the data file
+    is written with write_vesper_data_file. Use add_vesper_control_variant to add more control files
+    for the same data file.
+
+    Args:
+        in_dataframe (geopandas.geodataframe.GeoDataFrame, pandas.core.frame.DataFrame):
+        krig_column (str): The column containing the data to krige.
+        grid_filename (str): The vesper grid file.
+        out_folder (str): The folder to add outputs too. A 'Vesper' sub directory will be created
+        control_textfile (str): The name of the control text file without the path
+        coord_columns (List): The columns representing the X and Y coordinates.
+        epsg (int) : The epsg_number number for the data. If 0 the en_epsg or
+                     enepsg column (if exists) will be used.
+        display_graphics (bool): Option to display graphics while running vesper kriging.
+        control_options (pyprecag.kriging_ops.VesperControl): Vesper control settings parameters
+        vesper_exe (str): The path for the location of the Vesper executable
+
+    Returns:
+       vesper_batfile, vesper_ctrlfile: The paths to the generated batch file and control file.
+    """
+
+    if not isinstance(in_dataframe, pd.DataFrame):
+        raise TypeError('Invalid input data :in_dataframe')
+
+    if not os.path.exists(grid_filename):
+        raise IOError("Invalid path: {}".format(grid_filename))
+
+    if out_folder is None or out_folder.strip() == '':
+        raise TypeError('Please specify an output folder')
+
+    if not os.path.exists(os.path.dirname(out_folder)):
+        raise IOError('Output directory {} does not exist'.format(os.path.dirname(out_folder)))
+
+    if not isinstance(coord_columns, list):
+        raise TypeError('Coordinate columns should be a list.')
+
+    if len(coord_columns) == 0:
+        coord_columns = predictCoordinateColumnNames(in_dataframe.columns)
+
+    for eaFld in [krig_column] + coord_columns:
+        if eaFld not in in_dataframe.columns:
+            raise TypeError('Column {} does not exist'.format(eaFld))
+
+    if not isinstance(epsg, six.integer_types):
+        raise TypeError('EPSG {} must be a integer.'.format(epsg))
+
+    if control_options is None:
+        control_options = VesperControl()
+
+    if not isinstance(control_options, VesperControl):
+        raise TypeError('control_options must of type VesperControl')
+
+    start_time = time.time()
+
+    file_names = get_vesper_file_names(control_textfile, grid_filename, krig_column)
+
+    vesper_outdir = out_folder
+    if not os.path.basename(out_folder) == 'Vesper':
+        vesper_outdir = os.path.join(out_folder, 'Vesper')
+
+    if not os.path.exists(vesper_outdir):
+        os.mkdir(vesper_outdir)
+
+    # check Permission Denied or WindowsError: [Error 32]) errors which may indicate that the files
+    # are in use either by vesper or another app. Always start with the control file.
+    krig_col_file = re.sub('[^A-Za-z0-9_-]+', '', six.ensure_str(krig_column, encoding='ascii', errors='ignore'))
+    files_list = glob.glob(os.path.join(vesper_outdir, "{}_*_{}.*".format(os.path.basename(grid_filename)[:20],
+                                                                         krig_col_file)))
+    vesper_ctrlfile = os.path.join(vesper_outdir, file_names['control'])
+    if vesper_ctrlfile in files_list:
+        files_list.insert(0, files_list.pop(files_list.index(vesper_ctrlfile)))
+
+    for eaFile in files_list:
+        try:
+            with open(eaFile, "a"):
+                pass
+        except IOError:
+            raise IOError('File(s) in use - {}'.format(eaFile))
+
+    # replace the control file and delete all matching kriging outputs and tiff files.
+    for eaFile in files_list:
+        os.remove(eaFile)
+        LOGGER.debug('Deleted file {}'.format(eaFile))
+
+    data_columns = get_vesper_data_columns(in_dataframe, coord_columns, krig_column)
+    if epsg == 0:
+        for col in [ea for ea in data_columns if ea in EPSG_COLUMNS]:
+            if in_dataframe.iloc[0][col] > 0:
+                epsg = int(in_dataframe.iloc[0][col])
+                break
+
+    write_vesper_data_file(in_dataframe, data_columns, os.path.join(vesper_outdir, file_names['data']))
+    shutil.copy2(grid_filename, os.path.join(vesper_outdir, file_names['grid']))
+
+    vesper_ctrlfile = write_vesper_control_file(vesper_outdir, file_names, data_columns, coord_columns, krig_column,
+                                                epsg, display_graphics, control_options)
+
+    vesper_batfile = write_vesper_batch_file(vesper_outdir, vesper_exe)
+
+    LOGGER.info('{:<30} {:>10}   {:<15} {dur}'.format('Prepare for VESPER krige', '', file_names['control'],
+                                                      dur=str(timedelta(seconds=time.time() - start_time))))
+    return vesper_batfile, vesper_ctrlfile
@@ -0,0 +1,143 @@
+# coding=utf-8
+"""
+/***************************************************************************
+ CSIRO Precision Agriculture Tools (PAT) Plugin
+
+ workers -  Create process pools which work from inside QGIS and run tasks on them with a
+            bounded number of results held in memory.
+           -------------------
+        begin      : 2026-10-19
+        git sha    : $Format:%H$
+        copyright  : (c) 2026, Commonwealth Scientific and Industrial Research Organisation (CSIRO)
+        email      : PAT@csiro.au
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the associated CSIRO Open Source Software       *
+ *   License Agreement (GPLv3) provided with this plugin.                  *
+ *                                                                         *
+ ***************************************************************************/
+"""
+import logging
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
+
+from pat import LOGGER_NAME
+from pat.util.raster_windows import get_geotiff_options, set_geotiff_options
+
+LOGGER = logging.getLogger(LOGGER_NAME)
+LOGGER.addHandler(logging.NullHandler())  # logging.StreamHandler()
+
+
+def get_worker_count(max_workers=None):
+    """ Get the number of workers to use. Defaults to one less than the number of cpus so QGIS
+    remains responsive.
+
+    Args:
+        max_workers (int): the requested number of workers.
+
+    Returns:
+        int: the number of workers
+    """
+    if max_workers is None or max_workers < 1:
+        max_workers = max((os.cpu_count() or 1) - 1, 1)
+    return max_workers
+
+
+def get_python_executable():
+    """ Get the python interpreter used to start worker processes.
+
+    Inside QGIS sys.executable is the QGIS application, so the python interpreter installed
+    with QGIS is used instead.
+
+    Returns:
+        str: the path to the python interpreter
+    """
+    if os.path.basename(sys.executable).lower().startswith('python'):
+        return sys.executable
+
+    for exe in ['pythonw.exe', 'python.exe', 'python3']:
+        python_exe = os.path.join(sys.exec_prefix, exe)
+        if os.path.exists(python_exe):
+            return python_exe
+
+    return sys.executable
+
+
+class _ParentLogHandler(logging.Handler):
+    """ Pass log records received from worker processes to the logger of the same name in the
+    parent process so they reach the PAT log file and the QGIS message log."""
+
+    def emit(self, record):
+        logging.getLogger(record.name).handle(record)
+
+
+def _init_worker(log_queue, level, geotiff_options):
+    """ Worker initializer which sends the plugin log records to the parent process and uses the GeoTIFF
+    options of the parent."""
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.handlers = [QueueHandler(log_queue)]
+    logger.setLevel(level)
+    logger.propagate = False
+
+    set_geotiff_options(**geotiff_options)
+
+
+@contextmanager
+def process_pool(max_workers=None):
+    """ Create a process pool which can be used from inside QGIS.
+
+    Processes are spawned so tasks must be module level functions with picklable arguments.
+    The workers inherit sys.path so they can import the plugin modules. Log records from the
+    workers are forwarded to the parent process through a queue. The workers use the GeoTIFF
+    options set in the parent process.
+
+    Args:
+        max_workers (int): the number of processes. See get_worker_count
+
+    Yields:
+        concurrent.futures.ProcessPoolExecutor: the process pool
+    """
+    context = multiprocessing.get_context('spawn')
+    context.set_executable(get_python_executable())
+
+    log_queue = context.Queue()
+    listener = QueueListener(log_queue, _ParentLogHandler())
+    listener.start()
+    try:
+        with ProcessPoolExecutor(max_workers=get_worker_count(max_workers), mp_context=context,
+                                 initializer=_init_worker,
+                                 initargs=(log_queue, LOGGER.getEffectiveLevel(),
+                                           get_geotiff_options())) as executor:
+            yield executor
+    finally:
+        listener.stop()
+        log_queue.close()
+
+
+def map_in_batches(executor, func, *iterables, **kwargs):
+    """ Map a function over iterables using an executor, submitting tasks in batches so the number
+    of completed results waiting to be consumed is bounded.
+
+    Args:
+        executor (concurrent.futures.Executor): the thread or process pool
+        func (function): the function to run
+        *iterables: the arguments for each call of func
+        batch_size (int): the number of tasks per batch. Defaults to 2 per worker.
+
+    Returns:
+        generator: the results in the same order as the arguments
+    """
+    batch_size = kwargs.get('batch_size') or executor._max_workers * 2
+
+    args = list(zip(*iterables))
+    for i in range(0, len(args), batch_size):
+        batch = args[i:i + batch_size]
+        for result in executor.map(func, *zip(*batch)):
+            yield result
@@ -0,0 +1,265 @@
+# coding=utf-8
+"""
+/***************************************************************************
+ CSIRO Precision Agriculture Tools (PAT) Plugin
+
+ workspace -  Manage the PAT temporary folder using a folder per run, reusable layer exports and a disk quota.
+           -------------------
+        begin      : 2026-10-19
+        git sha    : $Format:%H$
+        copyright  : (c) 2026, Commonwealth Scientific and Industrial Research Organisation (CSIRO)
+        email      : PAT@csiro.au
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the associated CSIRO Open Source Software       *
+ *   License Agreement (GPLv3) provided with this plugin.                  *
+ *                                                                         *
+ ***************************************************************************/
+"""
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from qgis.core import QgsProject, QgsVectorFileWriter
+
+from pat import LOGGER_NAME, PLUGIN_NAME, TEMPDIR
+from util.qgis_common import get_layer_source_key, normalise_source_path
+from util.result_cache import get_folder_size, result_cache_key
+from util.settings import read_setting
+from util.vector_formats import DEFAULT_VECTOR_FORMAT, change_vector_format
+
+LOGGER = logging.getLogger(LOGGER_NAME)
+LOGGER.addHandler(logging.NullHandler())  # logging.StreamHandler()
+
+RUNS_DIR = os.path.join(TEMPDIR, 'runs')
+EXPORTS_DIR = os.path.join(TEMPDIR, 'exports')
+
+# The default disk quota for run folders and exports in megabytes.
+DEFAULT_TEMPDIR_QUOTA_MB = 5120
+
+# Folders used within this many seconds are kept so a tool which is still running is not affected.
+MIN_AGE_SECONDS = 3600
+
+_cleanup_lock = threading.Lock()
+
+# The normalised run folders of tools which are still running. These are never removed by cleanup_workspace.
+_active_runs = set()
+
+
+def get_workspace_quota():
+    """ Get the disk quota for run folders and exports in bytes from the settings."""
+    quota_mb = read_setting(PLUGIN_NAME + '/TEMPDIR_QUOTA_MB', int)
+    if quota_mb is None or quota_mb <= 0:
+        quota_mb = DEFAULT_TEMPDIR_QUOTA_MB
+    return quota_mb * 1024 * 1024
+
+
+def get_intermediate_format():
+    """ Get the OGR driver used for intermediate files from the settings. Defaults to GeoPackage.
+
+    Intermediates are read back using fiona so GeoParquet is not used.
+    """
+    driver = read_setting(PLUGIN_NAME + '/INTERMEDIATE_VECTOR_FORMAT')
+    if driver not in ['GPKG', 'ESRI Shapefile']:
+        driver = DEFAULT_VECTOR_FORMAT
+    return driver
+
+
+def get_folders_in_use():
+    """ Get the workspace folders holding layers loaded in the current QGIS project.
+
+    This must be called from the main thread.
+
+    Returns:
+        Set[str]: the normalised folder paths
+    """
+    workspace = [normalise_source_path(RUNS_DIR), normalise_source_path(EXPORTS_DIR)]
+    in_use = set()
+    for layer in QgsProject.instance().mapLayers().values():
+        folder = os.path.dirname(get_layer_source_key(layer))
+        if os.path.dirname(folder) in workspace:
+            in_use.add(folder)
+    return in_use
+
+
+def cleanup_workspace(quota=None, in_use=()):
+    """ Remove the oldest run folders and exports until the workspace is smaller than the quota.
+
+    Folders holding layers loaded in QGIS, run folders of tools which are still running and folders
+    used within the last hour are never removed. Each folder is checked again under the lock just
+    before it is removed, so an export reused by export_layer or a run started after the scan is kept.
+
+    Args:
+        quota (int): the quota in bytes. Defaults to the TEMPDIR_QUOTA_MB setting
+        in_use (Set[str]): the normalised folders to keep. See get_folders_in_use
+    """
+    if quota is None:
+        quota = get_workspace_quota()
+
+    entries = []
+    for parent in [RUNS_DIR, EXPORTS_DIR]:
+        if not os.path.exists(parent):
+            continue
+
+        for ea in os.listdir(parent):
+            folder = os.path.join(parent, ea)
+            try:
+                entries.append((os.path.getmtime(folder), get_folder_size(folder), folder))
+            except OSError:
+                # removed while scanning
+                continue
+
+    total = sum(ea[1] for ea in entries)
+    for modified, size, folder in sorted(entries):
+        if total <= quota or time.time() - modified < MIN_AGE_SECONDS:
+            break
+
+        if normalise_source_path(folder) in in_use:
+            continue
+
+        with _cleanup_lock:
+            if normalise_source_path(folder) in _active_runs:
+                continue
+
+            try:
+                # skip folders used since the scan
+                if time.time() - os.path.getmtime(folder) < MIN_AGE_SECONDS:
+                    continue
+            except OSError:
+                # already removed
+                total -= size
+                continue
+
+            shutil.rmtree(folder, ignore_errors=True)
+            if not os.path.exists(folder):
+                total -= size
+
+    LOGGER.debug('{:<30} {:>10}   {:<15}'.format('Workspace size', '{:.1f}'.format(total / 1024.0 / 1024.0), 'MB'))
+
+
+def start_cleanup():
+    """ Clean up the workspace in a background thread so the tool can continue."""
+    thread = threading.Thread(target=cleanup_workspace, kwargs={'in_use': get_folders_in_use()},
+                              name='PAT workspace cleanup')
+    thread.daemon = True
+    thread.start()
+    return thread
+
+
+def new_run_folder(tool_key):
+    """ Create a new scratch folder for a run of a tool and start a background clean up of old runs.
+
+    The folder is kept by the clean up until it is released with release_run_folder when the tool finishes.
+
+    Args:
+        tool_key (str): the tool name. Usually the dialog toolKey
+
+    Returns:
+        str: the path to the new folder
+    """
+    if not os.path.exists(RUNS_DIR):
+        os.makedirs(RUNS_DIR)
+
+    run_folder = tempfile.mkdtemp(prefix='{}_{:%Y%m%d_%H%M%S}_'.format(tool_key, datetime.now()), dir=RUNS_DIR)
+    with _cleanup_lock:
+        _active_runs.add(normalise_source_path(run_folder))
+
+    start_cleanup()
+    return run_folder
+
+
+def release_run_folder(run_folder):
+    """ Mark a run folder as finished so cleanup_workspace can remove it once it is old enough and its
+    layers are no longer loaded in QGIS.
+
+    Args:
+        run_folder (str): the folder from new_run_folder. None is ignored.
+    """
+    if run_folder is None:
+        return
+
+    with _cleanup_lock:
+        _active_runs.discard(normalise_source_path(run_folder))
+
+
+def export_layer(layer, file_name, crs=None, only_selected=False, prepare_layer=None, run_folder=None):
+    """ Save a layer or its selected features to the workspace, reusing an identical export.
+
+    The file is written in the intermediate format so the extension of file_name may be replaced.
+
+    An export is identical if it has the same file name, coordinate system, selected features and filter, and the
+    layer source file is unchanged. Layers which are not a file or have unsaved edits are always exported.
+
+    Args:
+        layer (qgis.core.QgsVectorLayer): the layer to export
+        file_name (str): the name of the exported file. eg 'paddock_selection.shp'
+        crs (qgis.core.QgsCoordinateReferenceSystem): the output coordinate system. Defaults to the layer crs.
+        only_selected (bool): export only the selected features
+        prepare_layer (function): optional function returning the layer to write. eg a memory copy of the layer.
+        run_folder (str): the folder to use when the export can't be reused. Defaults to a new run folder which
+            is not released so it is kept for the rest of the QGIS session.
+
+    Returns:
+        str: the path to the exported file
+    """
+    if crs is None:
+        crs = layer.crs()
+
+    driver = get_intermediate_format()
+    file_name = change_vector_format(file_name, driver)
+
+    params = [file_name, crs.authid(), layer.subsetString(), prepare_layer is not None]
+    if only_selected:
+        params.append(sorted(layer.selectedFeatureIds()))
+
+    key = None
+    if not layer.isModified():
+        key = result_cache_key('export', json.dumps(params), [get_layer_source_key(layer)])
+
+    if key is not None:
+        out_file = os.path.join(EXPORTS_DIR, key, file_name)
+
+        # hold the lock so cleanup_workspace can't remove the export between the check and marking it used
+        with _cleanup_lock:
+            reuse = os.path.exists(out_file)
+            if reuse:
+                # mark as recently used
+                os.utime(os.path.dirname(out_file), None)
+
+        if reuse:
+            LOGGER.info('{:<30} {:<15} {}'.format('Reuse layer/selection file', '', out_file))
+            return out_file
+
+        if not os.path.exists(EXPORTS_DIR):
+            os.makedirs(EXPORTS_DIR)
+        out_folder = tempfile.mkdtemp(prefix='tmp_', dir=EXPORTS_DIR)
+    else:
+        out_folder = run_folder or new_run_folder('export')
+
+    step_time = time.time()
+    out_layer = prepare_layer() if prepare_layer is not None else layer
+    QgsVectorFileWriter.writeAsVectorFormat(out_layer, os.path.join(out_folder, file_name), "utf-8", crs,
+                                            driverName=driver,
+                                            onlySelected=only_selected and prepare_layer is None)
+
+    if key is not None:
+        # move the complete export into place so a partial export is never reused.
+        try:
+            os.rename(out_folder, os.path.join(EXPORTS_DIR, key))
+            out_folder = os.path.join(EXPORTS_DIR, key)
+        except OSError:
+            # exported by another run at the same time.
+            pass
+
+    out_file = os.path.join(out_folder, file_name)
+    LOGGER.info('{:<30} {:<15} {}'.format('Save layer/selection to file',
+                                          str(timedelta(seconds=time.time() - step_time)), out_file))
+    return out_file
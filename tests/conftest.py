@@ -0,0 +1,16 @@
+# coding=utf-8
+"""
+Make the plugin importable for the tests.
+
+The plugin adds its own folder to sys.path so modules are imported both as pat.util.x and util.x. Both
+are added here to match. The tests need the QGIS python environment with pyprecag installed and are
+skipped when it is not available.
+"""
+import os
+import sys
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir))
+
+for ea_path in [ROOT_DIR, os.path.join(ROOT_DIR, 'pat')]:
+    if ea_path not in sys.path:
+        sys.path.insert(0, ea_path)
@@ -0,0 +1,28 @@
+# coding=utf-8
+import os
+
+import pytest
+
+pytest.importorskip('qgis.core')
+pytest.importorskip('pyprecag')
+rasterio = pytest.importorskip('rasterio')
+
+from shapely.geometry import box
+
+from pat.util.block_grid import write_block_grid
+
+
+def test_write_block_grid_creates_world_file(tmp_path):
+    out_tif = str(tmp_path / 'block.tif')
+    out_vesper = str(tmp_path / 'block_v.txt')
+
+    write_block_grid(box(300000, 6100000, 300100, 6100050), 10, out_tif, out_vesper, 28354, max_workers=1)
+
+    assert os.path.exists(str(tmp_path / 'block.tfw'))
+
+    with rasterio.open(out_tif) as src:
+        assert src.nodata == -9999
+        assert (src.read(1) == 1).sum() == 50
+
+    with open(out_vesper) as f:
+        assert len(f.readlines()) == 50
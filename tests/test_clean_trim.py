@@ -0,0 +1,109 @@
+# coding=utf-8
+import pytest
+
+pytest.importorskip('qgis.core')
+pytest.importorskip('pyprecag')
+np = pytest.importorskip('numpy')
+pd = pytest.importorskip('pandas')
+gpd = pytest.importorskip('geopandas')
+
+from pyprecag import vector_ops
+
+from pat.util.clean_trim import _batch_output_names, thin_point_by_distance, trim_outliers
+
+
+def reference_trim(values, stdevs, iterative=True):
+    """ The standard deviation trim from pyprecag.processing.clean_trim_points returning the iteration each
+    value was trimmed or 0 for those remaining."""
+    values = pd.Series(values, dtype=np.float64)
+    trimmed = np.zeros(len(values), dtype=np.int64)
+    remaining = np.ones(len(values), dtype=bool)
+
+    i = 0
+    while remaining.any():
+        i += 1
+        subset = values[remaining]
+        norm = (subset - subset.mean()) / subset.std()
+        removed = subset.index[norm.abs() >= stdevs]
+        if len(removed) == 0:
+            break
+
+        trimmed[removed] = i
+        remaining[removed] = False
+
+        if not iterative:
+            break
+
+    return trimmed
+
+
+@pytest.mark.parametrize('iterative', [True, False])
+@pytest.mark.parametrize('stdevs', [1, 2, 2.5, 3])
+def test_trim_outliers_matches_pyprecag(iterative, stdevs):
+    rng = np.random.RandomState(11)
+    values = np.concatenate([rng.normal(5, 1, 2000), rng.normal(15, 4, 50), rng.lognormal(2, 1, 50)])
+
+    # repeated values so there are ties either side of the cut off
+    values = np.round(values, 1)
+
+    np.testing.assert_array_equal(trim_outliers(values, stdevs, iterative),
+                                  reference_trim(values, stdevs, iterative))
+
+
+def test_trim_outliers_ties_at_cut_off():
+    # mean 0 and std 3 so both -3 and 3 are exactly 1 std from the mean and are trimmed
+    values = np.array([3., 0., -3.])
+    np.testing.assert_array_equal(trim_outliers(values, 1), [1, 0, 1])
+    np.testing.assert_array_equal(reference_trim(values, 1), [1, 0, 1])
+
+
+@pytest.mark.parametrize('values', [[4.2] * 10, [7.0], []])
+def test_trim_outliers_zero_or_undefined_std(values):
+    # a std of 0 or a single value can't be normalised so nothing is trimmed
+    np.testing.assert_array_equal(trim_outliers(np.array(values), 3), np.zeros(len(values)))
+    np.testing.assert_array_equal(reference_trim(np.array(values), 3), np.zeros(len(values)))
+
+
+def test_trim_outliers_not_iterative():
+    values = np.concatenate([np.zeros(20), [1., 50., 100.]])
+    trimmed = trim_outliers(values, 2, iterative=False)
+
+    assert trimmed.max() == 1
+    np.testing.assert_array_equal(trimmed, reference_trim(values, 2, iterative=False))
+
+
+@pytest.mark.parametrize('thin_dist', [0.5, 1.0, 2.5])
+def test_thin_point_by_distance_matches_pyprecag(thin_dist):
+    rng = np.random.RandomState(3)
+
+    # a header trail with points at around 1m spacing, some repeated
+    x = 300000 + np.cumsum(rng.uniform(0, 2, 3000))
+    y = 6100000 + np.cumsum(rng.normal(0, 0.5, 3000))
+    x[100:110] = x[99]
+    y[100:110] = y[99]
+
+    gdf = gpd.GeoDataFrame({'Yield': rng.normal(3, 1, 3000), 'filter': np.nan, 'filter_inc': 0},
+                           geometry=gpd.points_from_xy(x, y), crs='EPSG:28354')
+
+    result = thin_point_by_distance(gdf, thin_dist)
+    expected = vector_ops.thin_point_by_distance(gdf, None, thin_dist)
+
+    pd.testing.assert_series_equal(result['filter'].fillna(''), expected['filter'].fillna(''),
+                                   check_dtype=False)
+    np.testing.assert_array_equal(result['filter_inc'].values, expected['filter_inc'].values)
+
+
+def test_batch_output_names_unique():
+    assert _batch_output_names(['/a/x/f.csv', '/a/y/g.csv'], 'Yld') == ['f_Yld_normtrimmed.csv',
+                                                                       'g_Yld_normtrimmed.csv']
+
+
+def test_batch_output_names_collisions():
+    csv_files = ['/a/x/f.csv', '/a/y/F.csv', '/b/x/f.csv', '/c/g.csv']
+
+    out_names = _batch_output_names(csv_files, 'Yld')
+
+    # the parent folder is added when names match ignoring case, and a counter if they still match.
+    assert out_names == ['x_f_Yld_normtrimmed.csv', 'y_F_Yld_normtrimmed.csv',
+                         'x_f_2_Yld_normtrimmed.csv', 'g_Yld_normtrimmed.csv']
+    assert len(set(ea.lower() for ea in out_names)) == len(csv_files)
@@ -0,0 +1,88 @@
+# coding=utf-8
+import pytest
+
+pytest.importorskip('qgis.core')
+pytest.importorskip('pyprecag')
+np = pytest.importorskip('numpy')
+rasterio = pytest.importorskip('rasterio')
+
+from rasterio.transform import from_origin
+
+from pyprecag import crs as pyprecag_crs
+
+from pat.util.pixel_sampling import random_pixel_selection
+
+WIDTH, HEIGHT, NODATA = 700, 600, -9999
+
+
+@pytest.fixture
+def raster(tmp_path):
+    """ A raster spanning several processing windows with a block of nodata in the top left."""
+    data = np.arange(WIDTH * HEIGHT, dtype=np.float32).reshape(HEIGHT, WIDTH)
+    data[:100, :150] = NODATA
+
+    raster_file = str(tmp_path / 'values.tif')
+    with rasterio.open(raster_file, 'w', driver='GTiff', width=WIDTH, height=HEIGHT, count=1, dtype='float32',
+                       crs='EPSG:28354', transform=from_origin(300000, 6100000, 1, 1), nodata=NODATA) as dst:
+        dst.write(data, 1)
+    return raster_file, data
+
+
+@pytest.fixture
+def raster_crs():
+    crs = pyprecag_crs.crs()
+    crs.getFromEPSG(28354)
+    return crs
+
+
+def _pixels(gdf):
+    cols = (gdf['X'].values - 300000 - 0.5).round().astype(int)
+    rows = (6100000 - gdf['Y'].values - 0.5).round().astype(int)
+    return rows, cols
+
+
+def test_points_are_unique_valid_pixels(raster, raster_crs):
+    raster_file, data = raster
+    gdf, _ = random_pixel_selection(raster_file, raster_crs, 5000, seed=1)
+
+    rows, cols = _pixels(gdf)
+    assert len(gdf) == 5000
+    assert len(set(zip(rows, cols))) == 5000
+    assert (data[rows, cols] != NODATA).all()
+    assert list(gdf['PtID']) == list(range(5000))
+
+
+def test_seed_repeats_selection(raster, raster_crs):
+    raster_file, _ = raster
+    first, _ = random_pixel_selection(raster_file, raster_crs, 100, seed=3)
+    second, _ = random_pixel_selection(raster_file, raster_crs, 100, seed=3)
+    third, _ = random_pixel_selection(raster_file, raster_crs, 100, seed=4)
+
+    assert first[['X', 'Y']].equals(second[['X', 'Y']])
+    assert not first[['X', 'Y']].equals(third[['X', 'Y']])
+
+
+def test_all_valid_pixels(raster, raster_crs):
+    raster_file, data = raster
+    n_valid = int((data != NODATA).sum())
+
+    gdf, _ = random_pixel_selection(raster_file, raster_crs, n_valid, seed=5)
+    assert len(set(zip(*_pixels(gdf)))) == n_valid
+
+    with pytest.raises(ValueError):
+        random_pixel_selection(raster_file, raster_crs, n_valid + 1, seed=5)
+
+
+def test_sample_is_uniform_across_windows(raster, raster_crs):
+    raster_file, data = raster
+    gdf, _ = random_pixel_selection(raster_file, raster_crs, 20000, seed=9)
+    rows, cols = _pixels(gdf)
+
+    # the share of points in each quarter of the raster matches its share of valid pixels
+    valid = data != NODATA
+    for row_slice in [slice(0, HEIGHT // 2), slice(HEIGHT // 2, HEIGHT)]:
+        for col_slice in [slice(0, WIDTH // 2), slice(WIDTH // 2, WIDTH)]:
+            expected = valid[row_slice, col_slice].sum() / float(valid.sum())
+            in_quarter = ((rows >= row_slice.start) & (rows < row_slice.stop) &
+                          (cols >= col_slice.start) & (cols < col_slice.stop))
+            assert abs(in_quarter.mean() - expected) < 0.02
@@ -0,0 +1,58 @@
+# coding=utf-8
+import pytest
+
+pytest.importorskip('qgis.core')
+pytest.importorskip('pyprecag')
+np = pytest.importorskip('numpy')
+shapely = pytest.importorskip('shapely', minversion='2.0')
+
+from pat.util.point_trail import split_trail_into_pieces
+
+
+def reference_pieces(coords, line_ids, piece_vertices):
+    """ Split each line in a loop with consecutive pieces sharing their end vertex."""
+    pieces = []
+    for line_id in np.unique(line_ids):
+        line = coords[line_ids == line_id]
+        if len(line) < 2:
+            continue
+
+        step = piece_vertices - 1
+        for start in range(0, len(line) - 1, step):
+            pieces.append(line[start:start + step + 1])
+    return pieces
+
+
+@pytest.mark.parametrize('piece_vertices', [2, 3, 5, 256])
+def test_split_trail_into_pieces(piece_vertices):
+    rng = np.random.default_rng(0)
+
+    # lines of 1 to 20 points including lengths around a multiple of the piece size.
+    counts = [1, 2, 3, 4, 5, 9, 10, 11, 1, 20, 1]
+    line_ids = np.repeat(np.arange(len(counts)), counts)
+    coords = rng.uniform(0, 100, (len(line_ids), 2))
+
+    pieces = split_trail_into_pieces(coords, line_ids, piece_vertices)
+    expected = reference_pieces(coords, line_ids, piece_vertices)
+
+    assert len(pieces) == len(expected)
+    for piece, exp in zip(pieces, expected):
+        np.testing.assert_array_equal(shapely.get_coordinates(piece), exp)
+        assert shapely.get_num_points(piece) <= piece_vertices
+
+
+def test_split_trail_into_pieces_skipped_line_ids():
+    # line numbers increase but are not consecutive when lines are removed by thinning.
+    coords = np.arange(14, dtype=float).reshape(7, 2)
+    line_ids = np.array([0, 0, 0, 3, 5, 5, 5])
+
+    pieces = split_trail_into_pieces(coords, line_ids, 2)
+
+    expected = reference_pieces(coords, line_ids, 2)
+    assert [shapely.get_coordinates(ea).tolist() for ea in pieces] == [ea.tolist() for ea in expected]
+
+
+def test_split_trail_into_pieces_single_points():
+    coords = np.arange(6, dtype=float).reshape(3, 2)
+
+    assert len(split_trail_into_pieces(coords, np.array([0, 1, 2]))) == 0
@@ -0,0 +1,62 @@
+# coding=utf-8
+import pytest
+
+pytest.importorskip('qgis.core')
+np = pytest.importorskip('numpy')
+rasterio = pytest.importorskip('rasterio')
+
+from rasterio.transform import from_origin
+
+from pat.util import raster_windows
+from pat.util.raster_windows import get_geotiff_options, optimise_geotiff, set_geotiff_options, tiled_profile
+
+
+@pytest.fixture
+def geotiff_options():
+    """ Restore the GeoTIFF options after a test changes them."""
+    options = get_geotiff_options()
+    yield
+    set_geotiff_options(**options)
+
+
+def test_set_geotiff_options(geotiff_options):
+    set_geotiff_options(compress='lzw', overviews=False)
+    assert get_geotiff_options() == {'compress': 'LZW', 'overviews': False}
+    assert tiled_profile({'dtype': 'float32'})['compress'] == 'lzw'
+
+    # unknown methods and None keep the current value
+    set_geotiff_options(compress='JPEG')
+    set_geotiff_options()
+    assert get_geotiff_options() == {'compress': 'LZW', 'overviews': False}
+
+    set_geotiff_options(compress='NONE')
+    assert 'predictor' not in tiled_profile({'dtype': 'float32'})
+
+
+def test_optimise_geotiff(tmp_path, geotiff_options):
+    set_geotiff_options(compress='DEFLATE', overviews=True)
+    raster_file = str(tmp_path / 'striped.tif')
+    data = np.arange(600 * 700, dtype=np.float32).reshape(1, 600, 700)
+    with rasterio.open(raster_file, 'w', driver='GTiff', width=700, height=600, count=1, dtype='float32',
+                       crs='EPSG:28354', transform=from_origin(300000, 6100000, 2, 2), nodata=-9999) as dst:
+        dst.write(data)
+        dst.set_band_description(1, 'Yield')
+
+    assert optimise_geotiff(raster_file)
+
+    with rasterio.open(raster_file) as src:
+        assert src.is_tiled and src.block_shapes[0] == (raster_windows.TILE_SIZE, raster_windows.TILE_SIZE)
+        assert src.compression.name == 'deflate'
+        assert src.overviews(1) == [2, 4]
+        assert src.descriptions == ('Yield',)
+        np.testing.assert_array_equal(src.read(), data)
+
+
+def test_optimise_geotiff_errors(tmp_path):
+    missing_file = str(tmp_path / 'missing.tif')
+
+    with pytest.raises(rasterio.errors.RasterioIOError):
+        optimise_geotiff(missing_file)
+
+    assert not optimise_geotiff(missing_file, raise_errors=False)
+    assert list(tmp_path.iterdir()) == []
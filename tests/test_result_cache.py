@@ -0,0 +1,105 @@
+# coding=utf-8
+import os
+
+import pytest
+
+pytest.importorskip('qgis.core')
+
+from pat.util import result_cache
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    """ Use an empty cache folder with a 1MB limit."""
+    monkeypatch.setattr(result_cache, 'CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setattr(result_cache, 'get_cache_size_limit', lambda: 1024 * 1024)
+    return result_cache
+
+
+def write_file(filename, content):
+    with open(str(filename), 'w') as f:
+        f.write(content)
+    return str(filename)
+
+
+def manifest_file(key):
+    return os.path.join(result_cache.CACHE_DIR, key, result_cache.MANIFEST)
+
+
+def test_result_cache_key(cache, tmp_path):
+    in_file = write_file(tmp_path / 'points.csv', 'x,y\n1,2\n')
+    out_file = str(tmp_path / 'out.csv')
+    params = 'Parameters:\n    Size:\t3\n    Output CSV File:\t{}'.format(out_file)
+
+    key = cache.result_cache_key('tool', params, [in_file], [out_file])
+    assert key == cache.result_cache_key('tool', params, [in_file], [out_file])
+
+    # a different output file, parameter or tool gives a different key except for the output.
+    assert key == cache.result_cache_key('tool', params.replace(out_file, str(tmp_path / 'out2.csv')),
+                                         [in_file], [str(tmp_path / 'out2.csv')])
+    assert key != cache.result_cache_key('tool', params.replace('Size:\t3', 'Size:\t5'), [in_file], [out_file])
+    assert key != cache.result_cache_key('other tool', params, [in_file], [out_file])
+
+    # a changed input file
+    write_file(in_file, 'x,y\n1,2\n3,4\n')
+    assert key != cache.result_cache_key('tool', params, [in_file], [out_file])
+
+    # inputs which are not files are never cached
+    assert cache.result_cache_key('tool', params, [in_file, ''], [out_file]) is None
+
+
+def test_store_and_fetch(cache, tmp_path):
+    out_file = write_file(tmp_path / 'result.shp', 'shp')
+    write_file(tmp_path / 'result.dbf', 'dbf')
+
+    cache.store_result('abc', [out_file])
+    assert os.path.exists(manifest_file('abc'))
+
+    # fetch to a new name copies the file and its related files.
+    new_file = str(tmp_path / 'other' / 'new.shp')
+    os.mkdir(os.path.dirname(new_file))
+    assert cache.fetch_cached_result('abc', [new_file])
+    assert sorted(os.listdir(os.path.dirname(new_file))) == ['new.dbf', 'new.shp']
+    with open(new_file) as f:
+        assert f.read() == 'shp'
+
+
+def test_fetch_not_found(cache, tmp_path):
+    out_file = str(tmp_path / 'result.csv')
+
+    assert not cache.fetch_cached_result(None, [out_file])
+    assert not cache.fetch_cached_result('missing', [out_file])
+
+    # the number of outputs must match
+    cache.store_result('abc', [write_file(out_file, 'a')])
+    assert not cache.fetch_cached_result('abc', [out_file, str(tmp_path / 'result2.csv')])
+
+
+def test_cache_disabled(cache, tmp_path, monkeypatch):
+    monkeypatch.setattr(result_cache, 'get_cache_size_limit', lambda: 0)
+    out_file = write_file(tmp_path / 'result.csv', 'a')
+
+    cache.store_result('abc', [out_file])
+    assert not os.path.exists(manifest_file('abc'))
+    assert not cache.fetch_cached_result('abc', [out_file])
+
+
+def test_least_recently_used_eviction(cache, tmp_path, monkeypatch):
+    # room for two results but not three
+    monkeypatch.setattr(result_cache, 'get_cache_size_limit', lambda: 2500)
+
+    for i, key in enumerate(['a', 'b']):
+        cache.store_result(key, [write_file(tmp_path / '{}.csv'.format(key), 'x' * 1000)])
+        os.utime(manifest_file(key), (1000 + i, 1000 + i))
+
+    # using a marks it as the most recent so b is the least recently used.
+    assert cache.fetch_cached_result('a', [str(tmp_path / 'a_copy.csv')])
+
+    cache.store_result('c', [write_file(tmp_path / 'c.csv', 'x' * 1000)])
+
+    assert os.path.exists(manifest_file('a'))
+    assert not os.path.exists(os.path.join(result_cache.CACHE_DIR, 'b'))
+    assert os.path.exists(manifest_file('c'))
+
+    cache.evict_cache(0)
+    assert os.listdir(result_cache.CACHE_DIR) == []
@@ -0,0 +1,58 @@
+# coding=utf-8
+import pytest
+
+pytest.importorskip('qgis.core')
+pytest.importorskip('pyprecag')
+np = pytest.importorskip('numpy')
+pd = pytest.importorskip('pandas')
+
+from scipy import stats
+
+from pyprecag import table_ops
+
+from pat.util.strip_stats import calculate_strip_stats, rolling_paired_ttest, rolling_sums
+
+
+@pytest.fixture
+def strip_table():
+    rng = np.random.RandomState(42)
+    n_points = 60
+    treatment = rng.normal(3.0, 0.5, n_points)
+    return pd.DataFrame({'TrialPtID': ["'1-{}'".format(i) for i in range(n_points)],
+                         'Strip Value': treatment,
+                         'N Strip Control': treatment - rng.normal(0.2, 0.3, n_points),
+                         'S Strip Control': treatment - rng.normal(0.1, 0.3, n_points)})
+
+
+@pytest.mark.parametrize('size', [3, 4, 5, 9])
+def test_rolling_sums_match_pandas(size):
+    values = np.random.RandomState(1).normal(size=30)
+    values[[4, 17]] = np.nan
+
+    expected = pd.Series(values).rolling(size, center=True).sum().values
+    np.testing.assert_allclose(rolling_sums(values, size), expected, equal_nan=True)
+
+
+@pytest.mark.parametrize('size', [3, 5, 9])
+def test_rolling_paired_ttest_matches_ttest_rel(size):
+    rng = np.random.RandomState(7)
+    treatment = rng.normal(3.0, 0.5, 40)
+    control = treatment - rng.normal(0.2, 0.3, 40)
+
+    offset = (size - 1) // 2
+    expected = np.full(40, np.nan)
+    for i in range(size - 1 - offset, 40 - offset):
+        window = slice(i - (size - 1 - offset), i + offset + 1)
+        expected[i] = stats.ttest_rel(treatment[window], control[window]).pvalue
+
+    np.testing.assert_allclose(rolling_paired_ttest(treatment, control, size), expected, equal_nan=True)
+
+
+@pytest.mark.parametrize('control_columns', [['N Strip Control'], ['N Strip Control', 'S Strip Control']])
+def test_calculate_strip_stats_matches_pyprecag(strip_table, control_columns):
+    result, control_mean = calculate_strip_stats(strip_table, 'Strip Value', control_columns, size=5)
+    expected, expected_mean = table_ops.calculate_strip_stats(strip_table, 'Strip Value', control_columns, size=5)
+
+    assert control_mean == expected_mean
+    for column in ['treat_diff', 'av_treat_dif', 'p_value', 'RI']:
+        np.testing.assert_allclose(result[column].values, expected[column].values, rtol=1e-9, equal_nan=True)
@@ -0,0 +1,47 @@
+# coding=utf-8
+import pytest
+
+pytest.importorskip('qgis.core')
+pytest.importorskip('pyprecag')
+np = pytest.importorskip('numpy')
+shapely = pytest.importorskip('shapely', minversion='2.0')
+
+from shapely.geometry import LineString
+from shapely.ops import substring
+
+from pat.util.strip_trial import LineMeasures
+
+LINES = np.array([LineString([(0, 0), (10, 0), (10, 20), (35, 20)]),
+                  LineString([(100, 100), (103, 104)]),
+                  LineString([(0, 0), (5, 5), (5, 5), (0, 10), (-20, 10)])], dtype=object)
+
+
+@pytest.mark.parametrize('start, end', [(0, 5), (2, 12), (9.5, 10.5), (10, 30), (0, 55), (12, 2),
+                                        (40, 70), (5, 5), (0, 0), (60, 80)])
+def test_centroids_match_substring(start, end):
+    measures = LineMeasures(LINES)
+    line_ids = np.arange(len(LINES))
+
+    result = measures.centroids(line_ids, np.full(len(LINES), float(start)), np.full(len(LINES), float(end)))
+
+    for line, centroid in zip(LINES, result):
+        expected = substring(line, start, end).centroid
+        np.testing.assert_allclose(centroid, [expected.x, expected.y], atol=1e-9)
+
+
+def test_locate_matches_interpolate():
+    measures = LineMeasures(LINES)
+    line_ids = np.repeat(np.arange(len(LINES)), 6)
+    distance = np.tile([0, 1, 4.9, 10, 22.5, 100], len(LINES))
+
+    points, _ = measures.locate(line_ids, distance)
+
+    expected = [LINES[i].interpolate(d).coords[0] for i, d in zip(line_ids, distance)]
+    np.testing.assert_allclose(points, expected, atol=1e-9)
+
+
+def test_bearing_and_length():
+    measures = LineMeasures(LINES)
+
+    np.testing.assert_allclose(measures.length, [ea.length for ea in LINES])
+    np.testing.assert_allclose(measures.bearing()[:2], [np.degrees(np.arctan2(35, 20)), np.degrees(np.arctan2(3, 4))])
@@ -0,0 +1,142 @@
+# coding=utf-8
+import os
+
+import pytest
+
+pytest.importorskip('qgis.core')
+pytest.importorskip('pyprecag')
+np = pytest.importorskip('numpy')
+pd = pytest.importorskip('pandas')
+
+from pyprecag.kriging_ops import VesperControl
+
+from pat.util.vesper_prepare import (add_vesper_control_variant, get_column_format, get_vesper_file_names,
+                                     get_vesper_output_files, get_vesper_variant_file_names,
+                                     prepare_for_vesper_krige, write_vesper_data_file)
+
+
+@pytest.fixture
+def points():
+    rng = np.random.default_rng(0)
+    n_rows = 5000
+    return pd.DataFrame({'EN_EPSG': np.full(n_rows, 28354),
+                         'Easting': np.round(rng.uniform(300000, 301000, n_rows), 2),
+                         'Northing': np.round(rng.uniform(6100000, 6101000, n_rows), 3),
+                         'Yield': rng.gamma(2, 1.5, n_rows),
+                         'Count': rng.integers(0, 100, n_rows)})
+
+
+def test_write_vesper_data_file_matches_to_csv(points, tmp_path):
+    columns = ['EN_EPSG', 'Easting', 'Northing', 'Yield', 'Count']
+    out_file = str(tmp_path / 'vesperdata.csv')
+    ref_file = str(tmp_path / 'to_csv.csv')
+
+    # small chunks so the rows are written in several parts
+    assert write_vesper_data_file(points, columns, out_file, chunk_rows=999) == len(points)
+
+    # pyprecag.kriging_ops.prepare_for_vesper_krige writes the data file with to_csv
+    points[columns].to_csv(ref_file, index=False)
+
+    result = pd.read_csv(out_file, float_precision='round_trip')
+    expected = pd.read_csv(ref_file, float_precision='round_trip')
+    pd.testing.assert_frame_equal(result, expected, check_exact=True)
+
+    # integers and rounded coordinates are written as they were read
+    with open(out_file) as f:
+        f.readline()
+        epsg, easting, northing, _, count = f.readline().strip().split(',')
+    assert epsg == '28354' and count == str(points['Count'].iloc[0])
+    assert easting == '{:.2f}'.format(points['Easting'].iloc[0])
+    assert northing == '{:.3f}'.format(points['Northing'].iloc[0])
+
+
+def test_write_vesper_data_file_missing_values(points, tmp_path):
+    points.loc[[3, 10], 'Yield'] = np.nan
+    out_file = str(tmp_path / 'vesperdata.csv')
+
+    assert write_vesper_data_file(points, ['Easting', 'Northing', 'Yield'], out_file) == len(points) - 2
+
+    expected = points[['Easting', 'Northing', 'Yield']].dropna().reset_index(drop=True)
+    pd.testing.assert_frame_equal(pd.read_csv(out_file, float_precision='round_trip'), expected, check_exact=True)
+
+
+@pytest.mark.parametrize('values, expected', [
+    (np.array([1, 2, 3]), '%d'),
+    (np.array([1.0, 2.5, np.nan]), '%.1f'),
+    (np.array([300000.12, 300001.5]), '%.2f'),
+    (np.array([0.1 + 0.2]), '%.17g'),
+    (np.array([], dtype=np.float64), '%.0f'),
+])
+def test_get_column_format(values, expected):
+    assert get_column_format(values) == expected
+
+
+def test_get_column_format_outside_sample():
+    # the sample doesn't include the only value needing more decimals
+    values = np.arange(100000, dtype=np.float64)
+    values[12345] = 0.125
+
+    fmt = get_column_format(values)
+
+    assert fmt == '%.3f'
+    np.testing.assert_array_equal(np.char.mod(fmt, values).astype(np.float64), values)
+
+
+def test_get_vesper_variant_file_names():
+    file_names = get_vesper_file_names('', 'paddock_v.txt', 'Yield')
+    assert file_names['control'] == 'paddock_v.txt_control_Yield.txt'
+
+    variant = get_vesper_variant_file_names(file_names, 'paddock_v.txt_control_Yield_range50.txt')
+
+    assert variant['data'] == file_names['data'] and variant['grid'] == file_names['grid']
+    assert variant['kriged'] == 'paddock_v.txt_kriged_Yield_range50.txt'
+    assert variant['report'] == 'paddock_v.txt_report_Yield_range50.txt'
+
+    for control_textfile in ['', file_names['control']]:
+        with pytest.raises(ValueError):
+            get_vesper_variant_file_names(file_names, control_textfile)
+
+
+def test_add_vesper_control_variant(points, tmp_path):
+    grid_file = str(tmp_path / 'paddock_v.txt')
+    with open(grid_file, 'w') as f:
+        f.write(' 300000.5   6100000.5\n')
+
+    _, vesper_ctrlfile = prepare_for_vesper_krige(points, 'Yield', grid_file, str(tmp_path),
+                                                  coord_columns=['Easting', 'Northing'],
+                                                  vesper_exe=str(tmp_path / 'missing.exe'))
+    vesper_outdir = os.path.dirname(vesper_ctrlfile)
+    file_names = get_vesper_file_names(os.path.basename(vesper_ctrlfile), grid_file, 'Yield')
+
+    # outputs of the original control file. The tif names have .txt from the grid file name replaced.
+    original_outputs = [file_names['report'], file_names['kriged'], file_names['param'],
+                        'paddock_v.txt_CI_Yield.txt', 'paddock_v.tif_PRED_2m_Yield.tif',
+                        'paddock_v.tif_SE_2m_Yield.tfw']
+    for ea in original_outputs:
+        open(os.path.join(vesper_outdir, ea), 'w').close()
+
+    data_mtime = os.stat(os.path.join(vesper_outdir, file_names['data'])).st_mtime_ns
+
+    options = VesperControl()
+    options.update(xside=5, yside=5)
+    variant_ctrlfile = add_vesper_control_variant(vesper_ctrlfile, 'paddock_v.txt_control_Yield_b5.txt',
+                                                  control_options=options)
+
+    assert os.path.exists(variant_ctrlfile)
+    with open(variant_ctrlfile) as f:
+        variant_text = f.read()
+    assert file_names['data'] in variant_text and 'paddock_v.txt_kriged_Yield_b5.txt' in variant_text
+
+    # the variant reuses the data file and leaves the outputs of the original
+    assert os.stat(os.path.join(vesper_outdir, file_names['data'])).st_mtime_ns == data_mtime
+    assert all(os.path.exists(os.path.join(vesper_outdir, ea)) for ea in original_outputs)
+
+    # outputs of a variant don't belong to the original control file
+    variant_names = get_vesper_file_names(os.path.basename(variant_ctrlfile), grid_file, 'Yield')
+    open(os.path.join(vesper_outdir, 'paddock_v.tif_PRED_2m_Yield_b5.tif'), 'w').close()
+    open(os.path.join(vesper_outdir, variant_names['kriged']), 'w').close()
+
+    assert get_vesper_output_files(vesper_outdir, file_names) == sorted(
+        os.path.join(vesper_outdir, ea) for ea in original_outputs)
+    assert get_vesper_output_files(vesper_outdir, variant_names) == sorted(
+        os.path.join(vesper_outdir, ea) for ea in [variant_names['kriged'], 'paddock_v.tif_PRED_2m_Yield_b5.tif'])